@@ -41,10 +41,17 @@ import os.path as path
 import nrobo.cli.detection as detect
 
 from nrobo.util.constants import CONST
-from nrobo.appium import AUTOMATION_NAMES, CAPABILITY
+from nrobo.appium import AUTOMATION_NAMES, CAPABILITY, appium_options
 from selenium.common.exceptions import WebDriverException
 
 
+# per test durations and outcomes collected from phase reports till teardown
+_NROBO_TEST_DURATIONS = {}
+
+# asset cache proxy of this run, started by controller process only
+_NROBO_ASSET_CACHE = None
+
+
 def update_pytest_life_cycle_log(life_cycle_item: str, item_type: str = "fixture"):
     if detect.developer_machine():
         from nrobo import NROBO_PATHS
@@ -197,6 +204,9 @@ def pytest_addoption(parser):
     group.addoption(f"--{nCLI.GRID}", help="Url of remote selenium grid server")
     group.addoption(f"--{nCLI.FULLPAGE_SCREENSHOT}",
                     help="Take full page screenshot", action="store_true", default=False)
+    group.addoption(f"--{nCLI.SHARD}", help="Run only i-th of N duration balanced shards of tests. Format: i/N")
+    group.addoption(f"--{nCLI.LAUNCH_PROFILE}",
+                    help="Browser launch profile (lean, ci-headless, debug or own). Pin version with name@version")
 
     # ini option
     parser.addini(f"--{nCLI.APPIUM}", type='bool', help=f"Tells nRoBo to trigger via appium client")
@@ -306,6 +316,8 @@ def driver(request):
 
     # initialize driver with None
     _driver = None
+    _appium_pool = _appium_session = None
+    _device_scheduler = _device = None
 
     # Set driver log name
     # current test function name
@@ -316,236 +328,414 @@ def driver(request):
                        NREPORT.LOG_DIR_DRIVER + os.sep + \
                        test_method_name + NREPORT.LOG_EXTENTION
 
-    if int(os.environ[EnvKeys.APPIUM]):
-
-        """get appium driver with given capabilities"""
-        from appium import webdriver as _webdriver
-        from nrobo import NROBO_PATHS
-
-        capabilities = get_appium_capabilities_from_file(request.config.getoption(f"--{nCLI.CAP}"))
-
-        if capabilities[CAPABILITY.AUTOMATION_NAME] == AUTOMATION_NAMES.UI_AUTOMATION2:
-            """Create uiautomator2 driver instance"""
-            from appium.options.android import UiAutomator2Options
-
-            options = UiAutomator2Options().load_capabilities(capabilities)
-
-        elif capabilities[CAPABILITY.AUTOMATION_NAME] == AUTOMATION_NAMES.XCUITEST:
-            from appium.options.ios import XCUITestOptions
-
-            options = XCUITestOptions().load_capabilities(capabilities)
-
-        _grid_url_missing = False
-
-        if _grid_server_url is None:
-            _grid_url_missing = True
-            _grid_server_url = "http://localhost:4723"
-
-        try:
-            _driver = _webdriver.Remote(_grid_server_url, options=options)
-        except Exception as e:
-            if _grid_url_missing:
-                console.rule(f"[{STYLE.HLRed}]\n\nAppium server url is missing![/]\n\n")
+    # driver service log goes to file, to in-memory buffer (written on failure only) or nowhere
+    from nrobo.selenese import read_nrobo_configs
+    from nrobo.browsers.driver_logs import driver_log_settings, driver_log_output, \
+        chromium_service_args, gecko_service_args
+    _nconfig = read_nrobo_configs()  # once per test
+    _driver_log_settings = driver_log_settings(_nconfig)
+    _driver_log_output, _driver_log_buffer = driver_log_output(_driver_log_settings, _driver_log_path)
+
+    # network blocking profile of the test (block_network marker or network_blocking_profile config)
+    from nrobo.browsers.network_blocking import NETWORK_BLOCKING, selected_profile_name, blocking_profile, \
+        enable_performance_log, network_blocker
+    # local browsers download static assets through asset cache proxy of this run, if enabled
+    from nrobo.util.network.cache_proxy import proxy_address, apply_proxy
+    _asset_cache_proxy = None if _grid_server_url else proxy_address()
+
+    _network_blocking = blocking_profile(_nconfig, selected_profile_name(request.node, _nconfig)) is not None
+
+    # named launch profile (--launch-profile or launch_profile config) applied to chrome, edge and firefox
+    from nrobo.browsers.launch_profiles import selected_launch_profile, apply_launch_profile
+    _launch_profile = selected_launch_profile(request.config.getoption(f"--{nCLI.LAUNCH_PROFILE}"), _nconfig)
+
+    # browser is launched on first use of driver, so tests never touching it launch none
+    _profile_templates = _profile = _device_started = _network_blocker = _screencast = None
+    _templated = False
+
+    def _launch_driver():
+        nonlocal _driver, _grid_server_url, _appium_pool, _appium_session, _device_scheduler, _device, \
+            _device_started, _profile_templates, _profile, _templated, _network_blocker, _screencast
+
+        # local chrome, edge and firefox sessions start from a clone of pre-warmed profile template, if enabled
+        import time
+        from nrobo.browsers.profile_templates import profile_templates, apply_profile, record_startup
+        _startup_started = time.perf_counter()
+        _profile_templates = None if _grid_server_url else profile_templates(_nconfig)
+        _profile, _templated = None, False
+        if _profile_templates is not None and browser in [Browsers.CHROME, Browsers.CHROME_HEADLESS, Browsers.EDGE,
+                                                          Browsers.FIREFOX, Browsers.FIREFOX_HEADLESS]:
+            _profile, _templated = _profile_templates.acquire(browser)
+
+        if int(os.environ[EnvKeys.APPIUM]):
+
+            """get appium driver with given capabilities"""
+            from appium import webdriver as _webdriver
+            from nrobo import NROBO_PATHS
+
+            capabilities = get_appium_capabilities_from_file(request.config.getoption(f"--{nCLI.CAP}"))
+
+            _grid_url_missing = False
+
+            if _grid_server_url is None:
+                _grid_url_missing = True
+                _grid_server_url = "http://localhost:4723"
+
+            # lease device matching platform markers of the test, if appium device inventory is configured
+            from nrobo.appium.devices import device_scheduler, required_tags
+            _device_scheduler = device_scheduler(_nconfig, get_appium_capabilities_from_file)
+
+            # reuse pooled appium session of same capabilities, if enabled
+            from nrobo.appium.session_pool import appium_session_pool
+            _appium_pool = appium_session_pool(_nconfig)
+
+            while True:
+                _capabilities = capabilities
+                if _device_scheduler is not None:
+                    _device = _device_scheduler.lease(required_tags(request.node, _device_scheduler.tags))
+                    _grid_server_url, _grid_url_missing = _device.endpoint, False
+                    _capabilities = _device.session_capabilities(capabilities)
+
+                options = appium_options(_capabilities)
+
+                try:
+                    if _appium_pool is None:
+                        _driver = _webdriver.Remote(_grid_server_url, options=options)
+                    else:
+                        _appium_session = _appium_pool.acquire(_grid_server_url, _capabilities,
+                                                               lambda: _webdriver.Remote(_grid_server_url,
+                                                                                         options=options))
+                        _driver = _appium_session.driver
+                    break
+                except Exception as e:
+                    if _device is not None:
+                        """device can not start a session, move on to another device"""
+                        _device_scheduler.unhealthy(_device)
+                        continue
+
+                    if _grid_url_missing:
+                        console.rule(f"[{STYLE.HLRed}]\n\nAppium server url is missing![/]\n\n")
+                    else:
+                        console.rule(f"[{STYLE.HLRed}]\n\nIt seems like appium server is not running? "
+                                     f"\nor Is appium server url incorrect?"
+                                     f"\nPlease check!!![/]\n\n")
+                    break
+
+            _device_started = time.time()
+
+        elif browser == Browsers.CHROME:
+            """if browser requested is chrome"""
+
+            options = webdriver.ChromeOptions()
+            options.add_argument("--disable-blink-features=AutomationControlled")
+            options.add_experimental_option("useAutomationExtension", False)
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            prefs = {"credentials_enable_service": False,
+                     "profile.password_manager_enabled": False}
+            options.add_experimental_option("prefs", prefs)
+            options = add_capabilities_from_file(options)
+            if _network_blocking:
+                options = enable_performance_log(options)
+            options = apply_proxy(options, _asset_cache_proxy)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply chrome options
+            [options.add_argument(_option) for _option in _browser_options]
+            options = apply_launch_profile(options, _launch_profile)
+            options = apply_profile(options, _profile)
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url,
+                                           options=options)
             else:
-                console.rule(f"[{STYLE.HLRed}]\n\nIt seems like appium server is not running? "
-                             f"\nor Is appium server url incorrect?"
-                             f"\nPlease check!!![/]\n\n")
-
-    elif browser == Browsers.CHROME:
-        """if browser requested is chrome"""
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("useAutomationExtension", False)
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        prefs = {"credentials_enable_service": False,
-                 "profile.password_manager_enabled": False}
-        options.add_experimental_option("prefs", prefs)
-        options = add_capabilities_from_file(options)
-
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply chrome options
-        [options.add_argument(_option) for _option in _browser_options]
-
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url,
-                                       options=options)
-        else:
-            """Get instance of local chrom driver"""
-            _driver = webdriver.Chrome(options=options,
-                                       service=ChromeService(
-                                           ChromeDriverManager().install(),
-                                           log_output=_driver_log_path))
-
-        # Anti Bot Detection logic by ZenRows
-        # URL: https://www.zenrows.com/blog/selenium-avoid-bot-detection#how-anti-bots-work
-        _driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-        _driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": get_fake_user_agents()})
-
-    elif browser == Browsers.CHROME_HEADLESS:
-        """if browser requested is chrome"""
-
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless=new')
-        options = add_capabilities_from_file(options)
-
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply chrome options
-        [options.add_argument(_option) for _option in _browser_options]
-
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url,
-                                       options=options)
-        else:
-            """Get instance of local chrom driver"""
-            _driver = webdriver.Chrome(options=options,
-                                       service=ChromeService(
-                                           ChromeDriverManager().install(),
-                                           log_output=_driver_log_path))
-
-    elif browser == Browsers.ANTI_BOT_CHROME:
-        """if browser requested is anti_bot_chrome"""
-
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless=new')
-        options = add_capabilities_from_file(options)
-
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply chrome options
-        [options.add_argument(_option) for _option in _browser_options]
-
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            from nrobo import console
-            console.rule(f"[{STYLE.HLRed}]Anti-Bot Chrome is not supported by Grid Infrastructure![/]")
-            sys.exit()
-            # _driver = webdriver.Remote(_grid_server_url,
-            #                            options=options)
-        else:
-            """Get instance of local chrom driver"""
-            import undetected_chromedriver as uc
-            _driver = uc.Chrome(use_subprocess=False, options=options)
-            # _driver = webdriver.Chrome(options=options,
-            #                            service=ChromeService(
-            #                                ChromeDriverManager().install(),
-            #                                log_output=_driver_log_path))
-
-    elif browser == Browsers.SAFARI:
-        """if browser requested is safari"""
-
-        options = webdriver.SafariOptions()
-        options.add_argument("ShowOverlayStatusBar=YES")
-        options = add_capabilities_from_file(options)
-
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply Safari options
-        [options.add_argument(_option) for _option in _browser_options]
-
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url,
-                                       options=options)
-        else:
-            """Get instance of local chrom driver"""
-            _service = webdriver.SafariService(service_args=["--diagnose"])
-            _driver = webdriver.Safari(options=options, service=_service)
+                """Get instance of local chrom driver"""
+                _driver = webdriver.Chrome(options=options,
+                                           service=ChromeService(
+                                               ChromeDriverManager().install(),
+                                               log_output=_driver_log_output,
+                                               service_args=chromium_service_args(_driver_log_settings['level'])))
+
+            # Anti Bot Detection logic by ZenRows
+            # URL: https://www.zenrows.com/blog/selenium-avoid-bot-detection#how-anti-bots-work
+            _driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+            _driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": get_fake_user_agents()})
+
+        elif browser == Browsers.CHROME_HEADLESS:
+            """if browser requested is chrome"""
+
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless=new')
+            options = add_capabilities_from_file(options)
+            if _network_blocking:
+                options = enable_performance_log(options)
+            options = apply_proxy(options, _asset_cache_proxy)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply chrome options
+            [options.add_argument(_option) for _option in _browser_options]
+            options = apply_launch_profile(options, _launch_profile)
+            options = apply_profile(options, _profile)
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url,
+                                           options=options)
+            else:
+                """Get instance of local chrom driver"""
+                _driver = webdriver.Chrome(options=options,
+                                           service=ChromeService(
+                                               ChromeDriverManager().install(),
+                                               log_output=_driver_log_output,
+                                               service_args=chromium_service_args(_driver_log_settings['level'])))
+
+        elif browser == Browsers.ANTI_BOT_CHROME:
+            """if browser requested is anti_bot_chrome"""
+
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless=new')
+            options = add_capabilities_from_file(options)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply chrome options
+            [options.add_argument(_option) for _option in _browser_options]
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                from nrobo import console
+                console.rule(f"[{STYLE.HLRed}]Anti-Bot Chrome is not supported by Grid Infrastructure![/]")
+                sys.exit()
+                # _driver = webdriver.Remote(_grid_server_url,
+                #                            options=options)
+            else:
+                """Get instance of local chrom driver"""
+                import undetected_chromedriver as uc
+                _driver = uc.Chrome(use_subprocess=False, options=options)
+                # _driver = webdriver.Chrome(options=options,
+                #                            service=ChromeService(
+                #                                ChromeDriverManager().install(),
+                #                                log_output=_driver_log_path))
+
+        elif browser == Browsers.SAFARI:
+            """if browser requested is safari"""
+
+            options = webdriver.SafariOptions()
+            options.add_argument("ShowOverlayStatusBar=YES")
+            options = add_capabilities_from_file(options)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply Safari options
+            [options.add_argument(_option) for _option in _browser_options]
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url,
+                                           options=options)
+            else:
+                """Get instance of local chrom driver"""
+                _service = webdriver.SafariService(service_args=["--diagnose"])
+                _driver = webdriver.Safari(options=options, service=_service)
+
+        elif browser in [Browsers.FIREFOX, Browsers.FIREFOX_HEADLESS]:
+            """if browser requested is firefox"""
+
+            options = webdriver.FirefoxOptions()
+            options = add_capabilities_from_file(options)
+
+            if browser == Browsers.FIREFOX_HEADLESS:
+                options.add_argument("-headless")
+            options = apply_proxy(options, _asset_cache_proxy)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply Safari options
+            [options.add_argument(_option) for _option in _browser_options]
+            options = apply_launch_profile(options, _launch_profile)
+            options = apply_profile(options, _profile)
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url,
+                                           options=options)
+            else:
+                """Get instance of local firefox driver"""
+                _service = webdriver.FirefoxService(log_output=_driver_log_output,
+                                                    service_args=gecko_service_args(_driver_log_settings['level']))
+                _driver = webdriver.Firefox(options=options, service=_service)
+
+        elif browser == Browsers.EDGE:
+            """if browser requested is microsoft edge"""
+
+            options = webdriver.EdgeOptions()
+            options = add_capabilities_from_file(options)
+            if _network_blocking:
+                options = enable_performance_log(options)
+            options = apply_proxy(options, _asset_cache_proxy)
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply Safari options
+            [options.add_argument(_option) for _option in _browser_options]
+            options = apply_launch_profile(options, _launch_profile)
+            options = apply_profile(options, _profile)
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url, options=options)
+            else:
+                """Get instance of local firefox driver"""
+                _service = webdriver.EdgeService(log_output=_driver_log_output,
+                                                 service_args=chromium_service_args(_driver_log_settings['level']))
+                _driver = webdriver.Edge(options=options, service=_service)
+
+        elif browser == Browsers.IE:
+            """if browser requested is microsoft internet explorer"""
+
+            if sys.platform != "win32":
+                """No need to proceed"""
+                from nrobo.cli.tools import console
+                console.rule("IE support available on WIN32 platform only! Quiting test run.")
+                console.print(
+                    """Please note that the Internet Explorer (IE) 11 desktop application ended support 
+                    for certain operating systems on June 15, 2022. 
+                    Customers are encouraged to move to Microsoft Edge with IE mode.""")
+                exit(1)
+
+            options = webdriver.IeOptions()
+
+            # enable/disable chrome options from a file
+            _browser_options = read_browser_config_options(
+                request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
+            # apply Safari options
+            [options.add_argument(_option) for _option in _browser_options]
+
+            if _grid_server_url:
+                """Get instance of remote webdriver"""
+                _driver = webdriver.Remote(_grid_server_url, options=options)
+            else:
+                """Get instance of local firefox driver"""
+                _service = webdriver.IeService(log_output=_driver_log_output)
+                _driver = webdriver.Ie(options=options)
 
-    elif browser in [Browsers.FIREFOX, Browsers.FIREFOX_HEADLESS]:
-        """if browser requested is firefox"""
+        else:
+            from nrobo.cli.tools import console
+            console.rule(f"[{STYLE.HLRed}]DriverNotConfigured Error!")
+            console.print(f"[{STYLE.HLRed}]Driver not configured in nrobo for browser <{browser}>")
+            exit(1)
 
-        options = webdriver.FirefoxOptions()
-        options = add_capabilities_from_file(options)
+        if _profile is not None:
+            """record startup time for comparing sessions with and without profile template"""
+            record_startup(NREPORT.REPORT_DIR, browser, time.perf_counter() - _startup_started, _templated)
 
-        if browser == Browsers.FIREFOX_HEADLESS:
-            options.add_argument("-headless")
+        # block requests as per network blocking profile, non chromium browsers run unblocked
+        _network_blocker = network_blocker(_driver, request.node, _nconfig) if _network_blocking else None
 
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply Safari options
-        [options.add_argument(_option) for _option in _browser_options]
+        # record screencast of chromium sessions, kept for failed tests only
+        from nrobo.browsers.screencast import start_screencast
+        _screencast = start_screencast(_driver, _nconfig)
 
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url,
-                                       options=options)
-        else:
-            """Get instance of local firefox driver"""
-            _service = webdriver.FirefoxService(log_output=_driver_log_path, service_args=['--log', 'debug'])
-            _driver = webdriver.Firefox(options=options, service=_service)
+        return _driver
 
-    elif browser == Browsers.EDGE:
-        """if browser requested is microsoft edge"""
+    from nrobo.browsers.lazy_driver import LazyDriver, record_launch
+    _lazy_driver = LazyDriver(_launch_driver)
 
-        options = webdriver.EdgeOptions()
-        options = add_capabilities_from_file(options)
+    # store web driver ref in request
+    request.node.funcargs['driver'] = _lazy_driver
+    # yield driver instance to calling test method
+    yield _lazy_driver
 
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply Safari options
-        [options.add_argument(_option) for _option in _browser_options]
+    record_launch(_lazy_driver.materialised)
+    _test_failed = any(getattr(getattr(request.node, f"rep_{when}", None), 'failed', False)
+                       for when in ['setup', 'call'])
 
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url, options=options)
-        else:
-            """Get instance of local firefox driver"""
-            _service = webdriver.EdgeService(log_output=_driver_log_path)
-            _driver = webdriver.Edge(options=options, service=_service)
+    # every step of the teardown runs even if an earlier one raises, so browsers and profile clones never leak
+    try:
+        if _driver is None:
+            """test never used its browser (or it failed to start), nothing to tear down"""
+            return
 
-    elif browser == Browsers.IE:
-        """if browser requested is microsoft internet explorer"""
+        try:
+            if _network_blocker is not None:
+                """record blocked requests of the test"""
+                request.node.user_properties.append((NETWORK_BLOCKING.USER_PROPERTY, _network_blocker.counters()))
+
+            if _screencast is not None:
+                """encode screencast of failed test in background while browser quits, drop it otherwise"""
+                from nrobo.browsers.screencast import stop_screencast
+                stop_screencast(request.node, _screencast, _test_failed, NREPORT.REPORT_DIR, _nconfig)
+
+            # performance samples of the test, last page of passed test is sampled as per perf_metrics config
+            from nrobo.browsers.perf import flush_perf_samples
+            flush_perf_samples(_driver, request.node.nodeid, NREPORT.REPORT_DIR, _nconfig, passed=not _test_failed)
+
+            # report routes mocked by the test, stop recording browser events and close devtools session
+            from nrobo.browsers.route_mock import MOCK, close_route_mocker
+            from nrobo.browsers.events import close_event_log
+            from nrobo.browsers.cdp import close_cdp_session
+            _mocked_routes = close_route_mocker(_driver)
+            if _mocked_routes:
+                request.node.user_properties.append((MOCK.USER_PROPERTY, _mocked_routes))
+            close_event_log(_driver)
+            close_cdp_session(_driver)
+
+        finally:
+            try:
+                if _appium_session is not None:
+                    """keep appium session for next test, recycle it if test failed"""
+                    _appium_pool.release(_appium_session, failed=_test_failed)
+                else:
+                    # quit the browser
+                    _driver.quit()
+
+            finally:
+                if _device is not None:
+                    """record device busy time, failed test makes device health checked"""
+                    _device_scheduler.record(_device, _device_started, failed=_test_failed)
+
+    finally:
+        if _profile is not None:
+            """seal template seeded by this session or remove its clone in background"""
+            _profile_templates.release(browser, _profile)
+
+        if _driver_log_buffer is not None:
+            """keep driver log only if test failed or errored, also when browser failed to start"""
+            _driver_log_buffer.close()
+            if _test_failed:
+                _driver_log_buffer.flush(_driver_log_path)
 
-        if sys.platform != "win32":
-            """No need to proceed"""
-            from nrobo.cli.tools import console
-            console.rule("IE support available on WIN32 platform only! Quiting test run.")
-            console.print(
-                """Please note that the Internet Explorer (IE) 11 desktop application ended support 
-                for certain operating systems on June 15, 2022. 
-                Customers are encouraged to move to Microsoft Edge with IE mode.""")
-            exit(1)
 
-        options = webdriver.IeOptions()
+@pytest.fixture(scope='function')
+def auth_state(driver, url, username, password):
+    """
+    Log driver in with auth state cached per worker.
 
-        # enable/disable chrome options from a file
-        _browser_options = read_browser_config_options(
-            request.config.getoption(f"--{nCLI.BROWSER_CONFIG}"))
-        # apply Safari options
-        [options.add_argument(_option) for _option in _browser_options]
+    Login registered through nrobo.browsers.auth_state.register_login() runs
+    once per worker, later tests get cookies and web storage restored instead.
 
-        if _grid_server_url:
-            """Get instance of remote webdriver"""
-            _driver = webdriver.Remote(_grid_server_url, options=options)
-        else:
-            """Get instance of local firefox driver"""
-            _service = webdriver.IeService(log_output=_driver_log_path)
-            _driver = webdriver.Ie(options=options)
+    Usage:
+        def test_dashboard(self, auth_state):
+            ...
+            auth_state.check(self.driver)  # logs in again if app answered with 401
+    """
 
-    else:
-        from nrobo.cli.tools import console
-        console.rule(f"[{STYLE.HLRed}]DriverNotConfigured Error!")
-        console.print(f"[{STYLE.HLRed}]Driver not configured in nrobo for browser <{browser}>")
-        exit(1)
+    update_pytest_life_cycle_log("auth_state")
 
-    # store web driver ref in request
-    request.node.funcargs['driver'] = _driver
-    # yield driver instance to calling test method
-    yield _driver
+    from nrobo.selenese import read_nrobo_configs
+    from nrobo.browsers.auth_state import auth_state_cache
+    _auth_state = auth_state_cache(url, username, password, read_nrobo_configs())
+    _auth_state.apply(driver)
 
-    # quit the browser
-    _driver.quit()
+    yield _auth_state
 
 
 @pytest.fixture(scope='function')
@@ -575,6 +765,38 @@ def logger(request):
     yield logger
 
 
+@pytest.fixture(scope='session')
+def db():
+    """
+    Session wide access to pooled database connections.
+
+    Usage:
+        def test_orders(self, db):
+            connection = db.connect(config)  # leased for this test only
+            database = db.isolated(config)  # changes are rolled back after this test
+            database = db.isolated(config, mode="snapshot")  # database restored after this test
+            ...
+            db.metrics()  # pool metrics per config hash
+    """
+
+    update_pytest_life_cycle_log("db")
+
+    from nrobo.util.database.pool import database_session
+    _db = database_session()
+
+    yield _db
+
+    # close every pooled connection
+    _db.close()
+
+
+def pytest_runtest_teardown(item, nextitem):
+    """Give back database connections leased by the finished test and undo its database changes"""
+
+    from nrobo.util.database.pool import release_test_leases
+    release_test_leases()
+
+
 def pytest_report_header(config):
     """
     Returns console header
@@ -598,6 +820,17 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
 
+    if report.when == 'call':
+        """deferred visual checks of this test fail its report"""
+        from nrobo.util.visual import resolve_visual_checks
+        _visual_failures = resolve_visual_checks(item.nodeid)
+        if _visual_failures and not report.failed:
+            report.outcome = 'failed'
+            report.longrepr = "\n".join(_visual_failures)
+
+    # keep report of each phase on test item. Fixtures use it at teardown to know the test outcome.
+    setattr(item, f"rep_{report.when}", report)
+
     # test_fn = item.obj
     # docstring = getattr(test_fn, '__doc__')
     # if docstring:
@@ -614,6 +847,10 @@ def pytest_runtest_makereport(item, call):
             feature_request = item.funcargs['request']
             # Get driver reference from test method by calling driver(request) fixture
             driver = feature_request.getfixturevalue('driver')
+            if not getattr(driver, 'materialised', True):
+                # test never launched its browser, nothing to take screenshot of
+                report.extras = extras
+                return
 
             # replace unwanted chars from node id, datetime and prepare a good name for screenshot file
             screenshot_filename = f'{node_id}_{datetime.today().strftime("%Y-%m-%d_%H:%M")}' \
@@ -631,6 +868,11 @@ def pytest_runtest_makereport(item, call):
             # Handle fullpagescreenshot cli switch
             fullpagescreenshot = feature_request.config.getoption(f"--{nCLI.FULLPAGE_SCREENSHOT}")
 
+            # screenshots are transcoded in background unless screenshot_format is png
+            from nrobo.selenese import read_nrobo_configs
+            from nrobo.util.screenshots import screenshot_pipeline
+            _screenshot_pipeline = screenshot_pipeline(read_nrobo_configs())
+
             if fullpagescreenshot:
                 driver.maximize_window()
                 document_height = \
@@ -640,30 +882,40 @@ def pytest_runtest_makereport(item, call):
                         'document.documentElement.offsetHeight );')
                 document_size = driver.get_window_size()
                 driver.set_window_size(document_size['width'], document_height)
-                driver.find_element(By.TAG_NAME, 'body').screenshot(screenshot_filepath)
+                if _screenshot_pipeline is None:
+                    driver.find_element(By.TAG_NAME, 'body').screenshot(screenshot_filepath)
 
             # Attach screenshot to allure report
             try:
+                _screenshot_png = driver.get_screenshot_as_png() if not fullpagescreenshot \
+                    else driver.find_element(By.TAG_NAME, 'body').screenshot_as_png
                 allure.attach(
                     # Not working. Still work in progress...
-                    driver.get_screenshot_as_png() if not fullpagescreenshot else driver.find_element(By.TAG_NAME,
-                                                                                                      'body').screenshot_as_png,
+                    _screenshot_png,
                     name='screenshot',
                     attachment_type=allure.attachment_type.PNG
                 )
 
-                # Attach screenshot to html report
-                # Create and save screenshot at <screenshot_filepath>
-                if not fullpagescreenshot:
-                    driver.save_screenshot(screenshot_filepath)
-
-                # get base64 screenshot
-                # failure_screen_shot = driver.get_screenshot_as_base64()
-
-                # attach screenshot with html report. Use relative path to report directory
-                extras.append(pytest_html.extras.image(screenshot_relative_path))
-                # add relative path to screenshot in the html report
-                extras.append(pytest_html.extras.url(screenshot_relative_path))
+                if _screenshot_pipeline is not None:
+                    # thumbnail in html report linking to transcoded image, to png original for failures
+                    _image, _thumbnail = _screenshot_pipeline.submit(_screenshot_png, screenshot_filepath,
+                                                                     failed=report.failed)
+                    extras.append(pytest_html.extras.image(os.path.relpath(_thumbnail, NREPORT.REPORT_DIR)))
+                    extras.append(pytest_html.extras.url(os.path.relpath(_image, NREPORT.REPORT_DIR)))
+                else:
+                    # Attach screenshot to html report
+                    # Create and save screenshot at <screenshot_filepath>
+                    if not fullpagescreenshot:
+                        with open(screenshot_filepath, 'wb') as _screenshot_file:
+                            _screenshot_file.write(_screenshot_png)
+
+                    # get base64 screenshot
+                    # failure_screen_shot = driver.get_screenshot_as_base64()
+
+                    # attach screenshot with html report. Use relative path to report directory
+                    extras.append(pytest_html.extras.image(screenshot_relative_path))
+                    # add relative path to screenshot in the html report
+                    extras.append(pytest_html.extras.url(screenshot_relative_path))
 
             except Exception as e:
                 extras = []
@@ -671,6 +923,21 @@ def pytest_runtest_makereport(item, call):
         # update the report.extras
         report.extras = extras
 
+    if report.when == 'teardown':
+        from nrobo.browsers.screencast import screencast_of
+        _screencast_path = screencast_of(item)
+        if _screencast_path is not None:
+            """attach screencast of failed test"""
+            _video = _screencast_path.endswith('.mp4')
+            allure.attach.file(_screencast_path, name='screencast',
+                               attachment_type=allure.attachment_type.MP4 if _video else None,
+                               extension=None if _video else 'webp')
+            _screencast_relative_path = os.path.relpath(_screencast_path, NREPORT.REPORT_DIR)
+            report.extras = getattr(report, 'extras', []) + [
+                pytest_html.extras.url(_screencast_relative_path, name='screencast') if _video
+                else pytest_html.extras.image(_screencast_relative_path, name='screencast',
+                                              mime_type='image/webp', extension='webp')]
+
 
 def pytest_configure(config):
     """
@@ -691,6 +958,9 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "api: mark as api tests")
     config.addinivalue_line("markers", "nogui: mark as NOGUI tests")
     config.addinivalue_line("markers", "unit: mark as unit test")
+    config.addinivalue_line("markers", "block_network(profile): block requests as per network blocking profile")
+    config.addinivalue_line("markers", "android: run on android device of appium device inventory")
+    config.addinivalue_line("markers", "ios: run on ios device of appium device inventory")
 
     from nrobo import NROBO_PATHS
     if detect.production_machine() and not detect.developer_machine():
@@ -700,6 +970,181 @@ def pytest_configure(config):
     for marker, desc in markers.items():
         config.addinivalue_line("markers", f"{marker}: {desc}")
 
+    if not os.environ.get("PYTEST_XDIST_WORKER"):
+        """start asset cache proxy once per run, workers inherit its address"""
+        global _NROBO_ASSET_CACHE
+        from nrobo.selenese import read_nrobo_configs
+        from nrobo.util.network.cache_proxy import start_asset_cache
+        _NROBO_ASSET_CACHE = start_asset_cache(read_nrobo_configs())
+
+        """profile templates are shared by workers of this run"""
+        from nrobo.browsers.profile_templates import start_profile_templates
+        start_profile_templates(read_nrobo_configs(), NREPORT.REPORT_DIR)
+
+        """performance percentiles are of this run only"""
+        from nrobo.browsers.perf import start_perf_samples
+        start_perf_samples(NREPORT.REPORT_DIR)
+
+        """test durations are of this run only"""
+        from nrobo.util.sharding import start_results
+        start_results(NREPORT.REPORT_DIR)
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """Keep only the tests of requested shard"""
+
+    update_pytest_life_cycle_log("pytest_collection_modifyitems", "hook")
+
+    _shard = config.getoption(f"--{nCLI.SHARD}")
+    if not _shard:
+        return
+
+    from nrobo import NROBO_PATHS
+    from nrobo.util.sharding import select_shard, load_durations, SHARD
+    selected = set(select_shard([item.nodeid for item in items], _shard,
+                                load_durations(NROBO_PATHS.EXEC_DIR / SHARD.DURATIONS_FILE)))
+
+    deselected = [item for item in items if item.nodeid not in selected]
+    items[:] = [item for item in items if item.nodeid in selected]
+    config.hook.pytest_deselected(items=deselected)
+
+
+def pytest_runtest_logreport(report):
+    """Record nRoBo result data of each test for merging sharded runs"""
+
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        return  # controller records results of all the workers
+
+    _durations = _NROBO_TEST_DURATIONS.setdefault(report.nodeid, {'duration': 0.0, 'outcome': 'passed'})
+    _durations['duration'] += report.duration
+    if report.failed:
+        _durations['outcome'] = 'error' if report.when != 'call' else 'failed'
+    elif report.skipped and _durations['outcome'] == 'passed':
+        _durations['outcome'] = 'skipped'
+
+    if report.when == 'teardown':
+        from nrobo.util.sharding import append_result, SHARD
+        ensure_logs_dir_exists()
+        append_result(Path(NREPORT.REPORT_DIR) / SHARD.RESULTS_FILE,
+                      {'nodeid': report.nodeid, **_NROBO_TEST_DURATIONS.pop(report.nodeid)})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Report asset cache, profile templates, appium session pool, device utilisation, visual checks, screenshots
+       and browser launches.
+       Save durations of an unsharded run for balancing next sharded runs."""
+
+    update_pytest_life_cycle_log("pytest_sessionfinish", "hook")
+
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        """finish background removal of profile clones, quit pooled appium sessions and release device of this worker"""
+        from nrobo.browsers.profile_templates import close_profile_templates
+        close_profile_templates()
+        from nrobo.appium.session_pool import close_appium_session_pool
+        close_appium_session_pool()
+        from nrobo.appium.devices import close_device_scheduler
+        close_device_scheduler(NREPORT.REPORT_DIR)
+        from nrobo.util.visual import finish_visual_checks
+        finish_visual_checks(NREPORT.REPORT_DIR)
+        from nrobo.util.screenshots import close_screenshot_pipeline
+        close_screenshot_pipeline(NREPORT.REPORT_DIR)
+        from nrobo.browsers.screencast import close_screencast_encoder
+        close_screencast_encoder()
+        from nrobo.browsers.lazy_driver import flush_launch_stats
+        flush_launch_stats(NREPORT.REPORT_DIR)
+        return
+
+    global _NROBO_ASSET_CACHE
+    if _NROBO_ASSET_CACHE is not None:
+        """report hit ratio and bandwidth saved by asset cache"""
+        from nrobo import console
+        from nrobo.util.network.cache_proxy import stop_asset_cache
+        _report = stop_asset_cache(_NROBO_ASSET_CACHE, NREPORT.REPORT_DIR)
+        _NROBO_ASSET_CACHE = None
+        console.print(f"Asset cache: hit ratio {_report['hit_ratio']:.0%}, "
+                      f"{_report['bytes_saved'] / (1024 * 1024):.1f} MB saved, "
+                      f"{_report['entries']} entries cached")
+
+    from nrobo.appium.session_pool import close_appium_session_pool
+    _appium_pool_report = close_appium_session_pool()
+    if _appium_pool_report is not None:
+        """report appium sessions saved by pooling"""
+        from nrobo import console
+        console.print(f"Appium session pool: {_appium_pool_report['created']} sessions created, "
+                      f"{_appium_pool_report['reused']} reused, {_appium_pool_report['recycled']} recycled")
+
+    from nrobo.appium.devices import close_device_scheduler, utilisation_report
+    close_device_scheduler(NREPORT.REPORT_DIR)
+    for _device_name, _usage in utilisation_report(NREPORT.REPORT_DIR).items():
+        """report per device utilisation of mobile run"""
+        from nrobo import console
+        console.print(f"Device {_device_name}: {_usage['tests']} tests ({_usage['failed']} failed), "
+                      f"busy {_usage['busy_s']}s, utilisation {_usage['utilisation']:.0%}")
+
+    from nrobo.selenese import read_nrobo_configs
+    from nrobo.browsers.profile_templates import stop_profile_templates
+    for _browser, _startup in stop_profile_templates(read_nrobo_configs(), NREPORT.REPORT_DIR).items():
+        """compare browser startup with and without profile template"""
+        from nrobo import console
+        console.print(f"Profile templates ({_browser}): " + ", ".join(
+            f"{_kind.replace('_', ' ')} {_stats['median_s']}s median of {_stats['sessions']} sessions"
+            for _kind, _stats in _startup.items()))
+
+    from nrobo.util.visual import finish_visual_checks, visual_report
+    finish_visual_checks(NREPORT.REPORT_DIR)
+    _visual = visual_report(NREPORT.REPORT_DIR)
+    if _visual:
+        """report visual checks, batch compared ones fail the run here"""
+        from nrobo import console
+        console.print(f"Visual checks: {_visual['checks']} compared, {_visual['failed']} failed, "
+                      f"{_visual['new']} new baselines, {_visual['updated']} updated")
+        for _failure in _visual['failures']:
+            console.print(f"  {_failure['nodeid']} {_failure['name']}: {_failure['summary']}")
+        if _visual['failed'] and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    from nrobo.browsers.screencast import close_screencast_encoder
+    close_screencast_encoder()
+
+    from nrobo.browsers.lazy_driver import flush_launch_stats, launch_report
+    flush_launch_stats(NREPORT.REPORT_DIR)
+    _launches = launch_report(NREPORT.REPORT_DIR)
+    if _launches.get('tests'):
+        """report browser launches avoided by tests not using driver"""
+        from nrobo import console
+        console.print(f"Browsers: {_launches['launched']} launched for {_launches['tests']} tests, "
+                      f"{_launches['avoided']} launches avoided")
+
+    from nrobo.browsers.perf import PERF, perf_report
+    _perf = perf_report(NREPORT.REPORT_DIR)
+    if _perf:
+        """point to front-end performance percentiles per page"""
+        from nrobo import console
+        console.print(f"Performance: {len(_perf)} pages sampled, percentiles in "
+                      f"{Path(NREPORT.REPORT_DIR) / PERF.REPORT_FILE}")
+
+    from nrobo.util.screenshots import close_screenshot_pipeline, screenshot_report
+    close_screenshot_pipeline(NREPORT.REPORT_DIR)
+    _screenshots = screenshot_report(NREPORT.REPORT_DIR)
+    if _screenshots.get('screenshots'):
+        """report space saved by transcoding screenshots"""
+        from nrobo import console
+        console.print(f"Screenshots: {_screenshots['screenshots']} transcoded, "
+                      f"{_screenshots['png_bytes'] / (1024 * 1024):.1f} MB png stored as "
+                      f"{_screenshots['stored_bytes'] / (1024 * 1024):.1f} MB")
+
+    from nrobo import NROBO_PATHS
+    from nrobo.util.sharding import save_durations, SHARD
+    _results_file = Path(NREPORT.REPORT_DIR) / SHARD.RESULTS_FILE
+    if _results_file.exists() and not session.config.getoption(f"--{nCLI.SHARD}"):
+        """a shard knows only its own durations. Shards must partition from the same durations file,
+           so sharded runs update it through --merge-results only."""
+        import json
+        with open(_results_file) as f:
+            _records = [json.loads(line) for line in f if line.strip()]
+        save_durations(NROBO_PATHS.EXEC_DIR / SHARD.DURATIONS_FILE,
+                       {record['nodeid']: record['duration'] for record in _records})
+
 
 def pytest_metadata(metadata):
     """
@@ -812,6 +1257,12 @@ def pytest_html_results_summary(prefix, summary, postfix, session):
 
     update_pytest_life_cycle_log("pytest_html_results_summary", "hook")
 
+    # front-end performance section
+    from nrobo.browsers.perf import perf_html, perf_report
+    _perf_section = perf_html(perf_report(NREPORT.REPORT_DIR))
+    if _perf_section:
+        postfix.append(_perf_section)
+
 
 def pytest_html_results_table_header(cells):
     """Called after building results table header."""
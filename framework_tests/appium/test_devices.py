@@ -0,0 +1,155 @@
+import pytest
+
+from nrobo.appium.devices import DEVICES, DeviceLeases, DeviceScheduler, load_inventory, required_tags, \
+    utilisation_report
+from nrobo.exceptions import NRoBoNoDeviceAvailable
+
+INVENTORY = {"devices": {
+    "pixel": {"endpoint": "http://localhost:4723/", "capabilities": {"platformName": "Android"}},
+    "tab": {"endpoint": "http://localhost:4724", "tags": ["Tablet"], "capabilities": {"platformName": "Android"}},
+    "iphone": {"endpoint": "http://localhost:4725", "capabilities": {"platformName": "iOS"}},
+}}
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Marker:
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Item:
+
+    def __init__(self, *markers):
+        self.markers = [Marker(name) for name in markers]
+
+    def iter_markers(self):
+        return iter(self.markers)
+
+
+def scheduler(tmp_path, owner="gw0", clock=None, healthy=lambda endpoint: True, released=None, timeout=0):
+    clock = clock or Clock()
+    return DeviceScheduler(load_inventory(INVENTORY), DeviceLeases(tmp_path, cooldown=60, clock=clock),
+                           owner, timeout=timeout, health_check=healthy,
+                           on_release=released.append if released is not None else None,
+                           clock=clock, sleep=clock.sleep)
+
+
+class TestDevices:
+    """Tests for nrobo.appium.devices module"""
+
+    def test_inventory_tags_include_platform(self):
+        """Validate that inventory devices are tagged with their platform and bring their capabilities"""
+
+        devices = {device.name: device for device in load_inventory(INVENTORY)}
+
+        assert devices["tab"].tags == {"android", "tablet"}
+        assert devices["pixel"].endpoint == "http://localhost:4723"
+        assert devices["iphone"].session_capabilities({"platformName": "Android", "noReset": True}) == \
+               {"platformName": "iOS", "noReset": True}
+
+    def test_required_tags_are_known_platform_markers(self):
+        """Validate that only markers naming inventory tags are required from a device"""
+
+        assert required_tags(Item("android", "regression"), {"android", "ios", "tablet"}) == {"android"}
+
+    def test_least_specialised_matching_device_is_leased(self, tmp_path):
+        """Validate that the matching device with fewest tags is leased first"""
+
+        assert scheduler(tmp_path).lease({"android"}).name == "pixel"
+        assert scheduler(tmp_path, owner="gw1").lease({"android"}).name == "tab"
+        assert scheduler(tmp_path, owner="gw2").lease({"ios"}).name == "iphone"
+
+    def test_busy_devices_time_out(self, tmp_path):
+        """Validate that waiting for a busy device times out"""
+
+        scheduler(tmp_path).lease({"tablet"})
+
+        with pytest.raises(NRoBoNoDeviceAvailable):
+            scheduler(tmp_path, owner="gw1", timeout=5).lease({"tablet"})
+
+    def test_lease_is_kept_while_tests_fit(self, tmp_path):
+        """Validate that a worker keeps its device while tests fit it and releases it otherwise"""
+
+        released = []
+        devices = scheduler(tmp_path, released=released)
+
+        first = devices.lease({"android"})
+        assert devices.lease(set()) is first
+        assert devices.lease({"ios"}).name == "iphone"
+        assert released == [first]
+        assert scheduler(tmp_path, owner="gw1").lease({"android"}) is not None  # pixel is free again
+
+    def test_unhealthy_device_is_skipped_till_cooldown(self, tmp_path):
+        """Validate that an unhealthy device is not leased until its cooldown ends"""
+
+        clock = Clock()
+        devices = scheduler(tmp_path, clock=clock, healthy=lambda endpoint: not endpoint.endswith("4723"))
+
+        assert devices.lease({"android"}).name == "tab"
+        devices.release()
+
+        devices.health_check = lambda endpoint: True
+        assert devices.lease({"android"}).name == "tab"
+        devices.release()
+        clock.now += 61
+        assert devices.lease({"android"}).name == "pixel"
+
+    def test_device_failing_test_is_rebalanced(self, tmp_path):
+        """Validate that an unhealthy device failing a test is given up"""
+
+        devices = scheduler(tmp_path)
+        pixel = devices.lease({"android"})
+
+        devices.health_check = lambda endpoint: False
+        devices.record(pixel, devices.clock(), failed=True)
+        assert devices.current is None
+
+        devices.health_check = lambda endpoint: True
+        assert devices.lease({"android"}).name == "tab"
+
+    def test_no_healthy_device_raises(self, tmp_path):
+        """Validate that no healthy device raises NRoBoNoDeviceAvailable"""
+
+        devices = scheduler(tmp_path, healthy=lambda endpoint: False)
+
+        with pytest.raises(NRoBoNoDeviceAvailable):
+            devices.lease({"ios"})
+
+    def test_lease_of_dead_process_is_reclaimed(self, tmp_path):
+        """Validate that lease held by a dead worker is taken over"""
+
+        scheduler(tmp_path).lease({"ios"})
+        devices = scheduler(tmp_path, owner="gw1")
+        devices.leases.alive = lambda pid: False
+
+        assert devices.lease({"ios"}).name == "iphone"
+
+    def test_utilisation_report(self, tmp_path):
+        """Validate that utilisation report gives tests and busy time per device"""
+
+        clock = Clock()
+        devices = scheduler(tmp_path / "leases", clock=clock)
+        pixel = devices.lease({"android"})
+        for _ in range(3):
+            started = clock()
+            clock.now += 10
+            devices.record(pixel, started)
+            clock.now += 10
+
+        devices.close(tmp_path)
+        report = utilisation_report(tmp_path)
+
+        assert report["pixel"] == {"tests": 3, "failed": 0, "busy_s": 30.0, "utilisation": 0.6}
+        assert (tmp_path / DEVICES.REPORT_FILE).exists()
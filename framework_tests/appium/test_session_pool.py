@@ -0,0 +1,197 @@
+import json
+import threading
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nrobo.appium.session_pool import APPIUM_POOL, AppiumSessionPool, reset_mode
+
+ANDROID = {"platformName": "Android", "appium:automationName": "uiautomator2", "appium:appPackage": "com.nrobo.app"}
+
+
+class MockAppium:
+    """Local appium endpoint recording commands it receives"""
+
+    def __init__(self):
+        self.sessions = set()
+        self.commands = []
+        self.fail_commands = False
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def _answer(self, status, value):
+                body = json.dumps({"value": value}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+                if self.path == "/session":
+                    session_id = uuid.uuid4().hex
+                    mock.sessions.add(session_id)
+                    return self._answer(200, {"sessionId": session_id, "capabilities": payload})
+                command = self.path.split("/", 3)[3]
+                mock.commands.append((command, payload))
+                if mock.fail_commands:
+                    return self._answer(500, {"error": "unknown error", "message": "app crashed"})
+                self._answer(200, None)
+
+            def do_DELETE(self):
+                mock.sessions.discard(self.path.split("/")[2])
+                self._answer(200, None)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Client:
+    """Just enough of appium webdriver to drive the mock endpoint"""
+
+    def __init__(self, url, capabilities):
+        self.url = url
+        self.session_id = self._request("POST", "/session", capabilities)["sessionId"]
+
+    def _request(self, method, path, payload=None):
+        request = urllib.request.Request(self.url + path, method=method, data=json.dumps(payload or {}).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())["value"]
+
+    def execute_script(self, script, args):
+        self._request("POST", f"/session/{self.session_id}/execute/sync", {"script": script, "args": [args]})
+
+    def terminate_app(self, app_id):
+        self._request("POST", f"/session/{self.session_id}/appium/device/terminate_app", {"appId": app_id})
+
+    def activate_app(self, app_id):
+        self._request("POST", f"/session/{self.session_id}/appium/device/activate_app", {"appId": app_id})
+
+    def quit(self):
+        self._request("DELETE", f"/session/{self.session_id}")
+
+
+@pytest.fixture
+def appium():
+    mock = MockAppium()
+    yield mock
+    mock.close()
+
+
+def run_tests(pool, appium, capabilities, count, failed=()):
+    drivers = []
+    for test in range(count):
+        session = pool.acquire(appium.url, capabilities, lambda: Client(appium.url, capabilities))
+        drivers.append(session.driver)
+        pool.release(session, failed=test in failed)
+    return drivers
+
+
+class TestSessionPool:
+    """Tests for nrobo.appium.session_pool module"""
+
+    def test_reset_mode(self):
+        """Validate that reset mode follows noReset, fullReset and platform capabilities"""
+
+        assert reset_mode(ANDROID) == APPIUM_POOL.CLEAR
+        assert reset_mode({**ANDROID, "appium:noReset": True}) == APPIUM_POOL.RESTART
+        assert reset_mode({**ANDROID, "fullReset": "true"}) is None
+        assert reset_mode({**ANDROID, "platformName": "iOS"}) is None
+        assert reset_mode({**ANDROID, "platformName": "iOS", "noReset": True}) == APPIUM_POOL.RESTART
+
+    def test_session_is_reused_and_app_data_cleared(self, appium):
+        """Validate that one session serves all tests and app data is cleared between them"""
+
+        pool = AppiumSessionPool()
+
+        drivers = run_tests(pool, appium, ANDROID, 3)
+
+        assert len({driver.session_id for driver in drivers}) == 1
+        assert pool.report() == {"created": 1, "reused": 2, "recycled": 0}
+        assert [command for command, _ in appium.commands] == ["execute/sync", "appium/device/activate_app"] * 2
+        assert appium.commands[0][1]["script"] == "mobile: clearApp"
+
+        pool.close()
+        assert not appium.sessions
+
+    def test_no_reset_restarts_app(self, appium):
+        """Validate that app is restarted, not cleared, for noReset capabilities"""
+
+        pool = AppiumSessionPool()
+
+        run_tests(pool, appium, {**ANDROID, "appium:noReset": True}, 2)
+
+        assert [command for command, _ in appium.commands] == ["appium/device/terminate_app",
+                                                               "appium/device/activate_app"]
+        pool.close()
+
+    def test_sessions_are_keyed_by_capabilities(self, appium):
+        """Validate that different capabilities get different sessions"""
+
+        pool = AppiumSessionPool()
+
+        run_tests(pool, appium, ANDROID, 1)
+        run_tests(pool, appium, {**ANDROID, "appium:appPackage": "com.nrobo.other"}, 1)
+
+        assert pool.created == 2 and pool.idle_sessions() == 2
+        pool.close()
+
+    def test_session_is_recycled_after_max_uses(self, appium):
+        """Validate that a session is replaced after max uses"""
+
+        pool = AppiumSessionPool(max_uses=2)
+
+        drivers = run_tests(pool, appium, ANDROID, 4)
+
+        assert len({driver.session_id for driver in drivers}) == 2
+        assert pool.recycled == 2
+        assert not appium.sessions
+        pool.close()
+
+    def test_session_is_recycled_after_failed_test(self, appium):
+        """Validate that a session of a failed test is not reused"""
+
+        pool = AppiumSessionPool()
+
+        drivers = run_tests(pool, appium, ANDROID, 2, failed=[0])
+
+        assert drivers[0].session_id != drivers[1].session_id
+        assert pool.recycled == 1
+        pool.close()
+
+    def test_session_is_recycled_when_reset_fails(self, appium):
+        """Validate that a session is replaced when app reset fails"""
+
+        pool = AppiumSessionPool()
+        run_tests(pool, appium, ANDROID, 1)
+
+        appium.fail_commands = True
+        session = pool.acquire(appium.url, ANDROID, lambda: Client(appium.url, ANDROID))
+
+        assert pool.report() == {"created": 2, "reused": 0, "recycled": 1}
+        assert appium.sessions == {session.driver.session_id}
+        pool.release(session)
+        pool.close()
+
+    def test_full_reset_is_never_pooled(self, appium):
+        """Validate that fullReset capabilities get a new session every test"""
+
+        pool = AppiumSessionPool()
+
+        drivers = run_tests(pool, appium, {**ANDROID, "appium:fullReset": True}, 2)
+
+        assert drivers[0].session_id != drivers[1].session_id
+        assert not appium.sessions and pool.recycled == 0
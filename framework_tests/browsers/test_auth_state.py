@@ -0,0 +1,157 @@
+import http.cookiejar
+from pathlib import Path
+
+import pytest
+
+from nrobo.browsers.auth_state import AuthState, AuthStateCache, AUTH_STATE, auth_state_from_login_result, \
+    auth_state_settings, restore_auth_state, storage_restore_script, cdp_cookie
+
+URL = "https://app.example.com/dashboard"
+ORIGIN = "https://app.example.com"
+
+
+class StubDriver:
+    """Records webdriver calls of auth state code"""
+
+    def __init__(self, status=200):
+        self.calls = []
+        self.status = status
+        self.current_url = URL
+
+    def get(self, url):
+        self.calls.append(("get", url))
+        self.status = 200  # logged in again
+
+    def add_cookie(self, cookie):
+        self.calls.append(("add_cookie", cookie))
+
+    def get_cookies(self):
+        return [{"name": "sid", "value": "ui", "domain": "app.example.com", "path": "/"}]
+
+    def execute_script(self, script):
+        if "getEntriesByType" in script:
+            return self.status
+        if "dump" in script:
+            return {"local": {"token": "abc"}, "session": {}}
+        self.calls.append(("execute_script", script))
+
+
+class StubChromiumDriver(StubDriver):
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+
+
+def http_login(calls):
+    def login(url, username, password):
+        calls.append((url, username, password))
+        return {"cookies": [{"name": "sid", "value": f"s{len(calls)}", "domain": "app.example.com"}],
+                "local_storage": {"token": "abc"}}
+    return login
+
+
+class TestAuthState:
+    """Tests for nrobo.browsers.auth_state module"""
+
+    def test_login_once_and_share_cache_file(self, tmp_path):
+        """Validate that login happens once and other workers reuse the cache file"""
+
+        logins = []
+        worker1 = AuthStateCache(URL, "admin", "secret", http_login(logins), cache_dir=tmp_path)
+        worker2 = AuthStateCache(URL, "admin", "secret", http_login(logins), cache_dir=tmp_path)
+
+        for cache in [worker1, worker1, worker2]:
+            cache.apply(StubDriver())
+
+        assert logins == [(URL, "admin", "secret")]
+        assert worker1.logins == 1 and worker2.logins == 0 and worker1.restores == 2
+
+    def test_cache_file_is_readable_by_owner_only(self, tmp_path):
+        """Validate that cached cookies and tokens are written with mode 0600"""
+
+        cache = AuthStateCache(URL, "admin", "secret", http_login([]), cache_dir=tmp_path / "auth")
+        cache.apply(StubDriver())
+
+        assert cache.path.stat().st_mode & 0o777 == AUTH_STATE.FILE_MODE
+
+    def test_cache_dir_setting(self, tmp_path):
+        """Validate that auth_state_dir may point anywhere and empty value means system temp directory"""
+
+        import tempfile
+
+        assert auth_state_settings({})['cache_dir'] == AUTH_STATE.DEFAULT_CACHE_DIR
+        assert auth_state_settings({AUTH_STATE.CACHE_DIR: "results/.nrobo-auth"})['cache_dir'] == "results/.nrobo-auth"
+        assert auth_state_settings({AUTH_STATE.CACHE_DIR: ""})['cache_dir'] == \
+               str(Path(tempfile.gettempdir()) / AUTH_STATE.TEMP_CACHE_DIR)
+
+    def test_expired_state_is_refreshed(self, tmp_path):
+        """Validate that state is captured again after its ttl"""
+
+        now = [1000.0]
+        logins = []
+        cache = AuthStateCache(URL, "admin", "secret", http_login(logins), ttl=60, cache_dir=tmp_path,
+                               clock=lambda: now[0])
+
+        cache.get()
+        now[0] += 61
+        state, logged_in = cache.get()
+
+        assert logged_in and len(logins) == 2 and state.expires_at == now[0] + 60
+
+    def test_unauthorized_page_triggers_login(self, tmp_path):
+        """Validate that 401 answer throws away cached state and logs in again"""
+
+        logins = []
+        cache = AuthStateCache(URL, "admin", "secret", http_login(logins), cache_dir=tmp_path)
+        cache.apply(StubDriver())
+
+        driver = StubDriver(status=AUTH_STATE.UNAUTHORIZED)
+        assert cache.check(driver)
+        assert len(logins) == 2
+        assert not cache.check(StubDriver())
+
+    def test_restore_through_cdp_without_navigation(self):
+        """Validate bulk cookie restore on chromium and add_cookie fallback elsewhere"""
+
+        state = AuthState(ORIGIN, [{"name": "sid", "value": "1", "domain": "app.example.com", "expiry": 99,
+                                    "extra": "ignored"}], {"token": "abc"})
+
+        chromium = StubChromiumDriver()
+        assert restore_auth_state(chromium, state) == "cdp"
+        assert [call[0] for call in chromium.calls] == ["Network.setCookies", "Page.addScriptToEvaluateOnNewDocument"]
+        assert chromium.calls[0][1]["cookies"][0]["expires"] == 99
+
+        other = StubDriver()
+        assert restore_auth_state(other, state) == "add_cookie"
+        assert other.calls[0] == ("get", ORIGIN)
+        assert "extra" not in other.calls[1][1]
+        assert other.calls[2] == ("execute_script", storage_restore_script(state))
+
+    def test_ui_login_happens_in_driver(self, tmp_path):
+        """Validate ui login captures state of the driver it logged in"""
+
+        drivers = []
+        cache = AuthStateCache(URL, "admin", "secret", lambda driver, *args: drivers.append(driver),
+                               kind=AUTH_STATE.LOGIN_UI, cache_dir=tmp_path)
+        driver = StubDriver()
+        state = cache.apply(driver, verify=False)
+
+        assert drivers == [driver] and driver.calls == []
+        assert state.local_storage == {"token": "abc"} and state.cookies[0]["value"] == "ui"
+
+    def test_login_result_formats(self):
+        """Validate requests style cookie jars are converted to selenium cookies"""
+
+        jar = http.cookiejar.CookieJar()
+        jar.set_cookie(http.cookiejar.Cookie(0, "sid", "42", None, False, "app.example.com", True, False, "/",
+                                             True, True, 2000, False, None, None, {"HttpOnly": None}))
+
+        state = auth_state_from_login_result(jar, URL, ttl=10, now=100)
+
+        assert state.origin == ORIGIN and state.expires_at == 110
+        assert state.cookies == [{"name": "sid", "value": "42", "domain": "app.example.com", "path": "/",
+                                  "secure": True, "httpOnly": True, "expiry": 2000}]
+        assert cdp_cookie({"name": "a", "value": "b"}, ORIGIN)["url"] == ORIGIN
+
+        with pytest.raises(ValueError):
+            AuthStateCache(URL, "admin", "secret", print, kind="sso")
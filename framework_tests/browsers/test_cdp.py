@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from nrobo.browsers.cdp import CDP, CdpSession, accept_key, encode_frame, read_frame, read_message
+from nrobo.exceptions import NRoBoCdpError
+
+
+class StandInDevtools:
+    """Local stand-in of browser devtools websocket endpoint"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.received = []
+        self.port = None
+        started = threading.Event()
+
+        async def serve():
+            server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(serve(), self.loop)
+        started.wait(5)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/devtools/browser/stand-in"
+
+    async def handle(self, reader, writer):
+        request = (await reader.readuntil(b"\r\n\r\n")).decode()
+        key = [line.split(": ")[1] for line in request.split("\r\n") if line.startswith("Sec-WebSocket-Key")][0]
+        writer.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n".encode())
+
+        def send(message):
+            writer.write(encode_frame(json.dumps(message).encode(), mask=False))
+
+        while True:
+            message = await read_message(reader, writer)
+            if message is None:
+                break
+            command = json.loads(message)
+            self.received.append(command)
+            if command["method"] == "Target.getTargets":
+                send({"id": command["id"], "result": {"targetInfos": [
+                    {"targetId": "T0", "type": "service_worker"}, {"targetId": "T1", "type": "page"},
+                    {"targetId": "T2", "type": "page"}]}})
+            elif command["method"] == "Target.attachToTarget":
+                send({"id": command["id"], "result": {"sessionId": f"S-{command['params']['targetId']}"}})
+            elif command["method"] == "Bad.method":
+                send({"id": command["id"], "error": {"code": -32601, "message": "not found"}})
+            else:
+                send({"id": command["id"], "result": {"echo": "x" * 70000}})
+                send({"method": "Page.loadEventFired", "params": {"other": True}, "sessionId": "S-other"})
+                send({"method": "Page.loadEventFired", "params": {"n": len(self.received)},
+                      "sessionId": command.get("sessionId")})
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class TestCdp:
+    """Tests for nrobo.browsers.cdp module"""
+
+    def test_frames_round_trip(self):
+        """Validate masked and unmasked frames of all length encodings"""
+
+        async def round_trip(payload, mask):
+            reader = asyncio.StreamReader()
+            reader.feed_data(encode_frame(payload, mask=mask))
+            return await read_frame(reader)
+
+        for size in [0, 125, 126, 65535, 65536]:
+            for mask in [True, False]:
+                assert asyncio.run(round_trip(b"a" * size, mask)) == (True, CDP.OPCODE_TEXT, b"a" * size)
+
+    def test_session_attaches_sends_and_receives_events(self):
+        """Validate commands, errors and events of the attached page only"""
+
+        devtools = StandInDevtools()
+        session = CdpSession(devtools.url, target_id="T2").start()
+        events = []
+        session.on("Page.loadEventFired", events.append)
+
+        try:
+            assert session.session_id == "S-T2"
+            assert len(session.send("Page.enable")["echo"]) == 70000
+            with pytest.raises(NRoBoCdpError):
+                session.send("Bad.method")
+
+            deadline = time.time() + 5
+            while not events and time.time() < deadline:
+                time.sleep(0.01)
+
+            assert events == [{"n": 3}]
+            assert devtools.received[-1]["sessionId"] == "S-T2"
+            assert "sessionId" not in devtools.received[1]  # attach goes to browser session
+        finally:
+            session.close()
+            devtools.close()
+
+        assert session.closed
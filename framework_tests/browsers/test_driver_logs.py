@@ -0,0 +1,86 @@
+import gzip
+import os
+import subprocess
+import sys
+
+from nrobo.browsers.driver_logs import DRIVER_LOG, DriverLogBuffer, driver_log_settings, driver_log_output, \
+    chromium_service_args, gecko_service_args
+
+
+class TestDriverLogs:
+    """Tests for nrobo.browsers.driver_logs module"""
+
+    def test_buffer_captures_output_of_child_process(self, tmp_path):
+        """Validate that output of a service process is captured through the pipe"""
+
+        buffer = DriverLogBuffer(max_lines=100)
+        subprocess.run([sys.executable, "-c", "print('driver started'); print('driver stopped')"],
+                       stdout=buffer.fileno(), stderr=buffer.fileno(), check=True)
+        buffer.close()
+
+        assert buffer.lines() == [b"driver started\n", b"driver stopped\n"]
+
+        log_path = buffer.flush(tmp_path / "test_one.log")
+        assert log_path.name == "test_one.log" + DRIVER_LOG.COMPRESSED_EXTENSION
+        with gzip.open(log_path) as f:
+            assert f.read() == b"driver started\ndriver stopped\n"
+
+    def test_close_after_service_closed_its_fd(self, tmp_path):
+        """Validate that close() leaves the fd closed by selenium Service.stop() alone, even when reused"""
+
+        buffer = DriverLogBuffer(max_lines=100)
+        service_fd = buffer.fileno()
+        os.write(service_fd, b"driver stopped\n")
+        os.close(service_fd)  # as Service.stop() does
+
+        with open(tmp_path / "unrelated.txt", "w") as unrelated:  # usually reuses the fd number
+            buffer.close(timeout=1)
+            unrelated.write("still open")  # fails on flush if close() closed the reused number
+
+        assert (tmp_path / "unrelated.txt").read_text() == "still open"
+        assert buffer.lines() == [b"driver stopped\n"]
+        assert not buffer._reader.is_alive()
+
+    def test_close_when_service_never_started(self):
+        """Validate that a copy handed out but never used does not keep the reader waiting"""
+
+        buffer = DriverLogBuffer(max_lines=100)
+        buffer.fileno()
+        buffer.close(timeout=1)
+
+        assert not buffer._reader.is_alive()
+
+    def test_buffer_is_bounded(self):
+        """Validate that only latest <max_lines> lines are kept"""
+
+        buffer = DriverLogBuffer(max_lines=3)
+        os.write(buffer.fileno(), b"".join(f"line {idx}\n".encode() for idx in range(10)))
+        buffer.close()
+
+        assert buffer.lines() == [b"line 7\n", b"line 8\n", b"line 9\n"]
+        assert buffer.dropped == 7
+
+    def test_driver_log_output_per_mode(self, tmp_path):
+        """Validate log_output for each driver log mode"""
+
+        log_path = tmp_path / "test.log"
+
+        output, buffer = driver_log_output(driver_log_settings({}), log_path)
+        assert output == str(log_path) and buffer is None
+
+        output, buffer = driver_log_output(driver_log_settings({DRIVER_LOG.MODE: "off"}), log_path)
+        assert output == os.devnull and buffer is None
+
+        output, buffer = driver_log_output(driver_log_settings({DRIVER_LOG.MODE: "failure"}), log_path)
+        os.write(output, b"from service\n")
+        os.close(output)
+        buffer.close()
+        assert buffer.lines() == [b"from service\n"]
+
+    def test_service_args_for_log_level(self):
+        """Validate driver specific log level switches"""
+
+        assert chromium_service_args(None) == []
+        assert chromium_service_args("warn") == ["--log-level=WARNING"]
+        assert gecko_service_args(None) == ["--log", "debug"]
+        assert gecko_service_args("info") == ["--log", "info"]
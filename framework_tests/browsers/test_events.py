@@ -0,0 +1,158 @@
+import asyncio
+import threading
+
+import pytest
+
+from nrobo.browsers.events import EVENTS, EventLog, close_event_log, event_log, events_settings, matches
+from nrobo.exceptions import NRoBoCdpNotAvailable
+
+
+class StubSession:
+    """CDP session delivering events to listeners synchronously"""
+
+    def __init__(self):
+        self.listeners = {}
+        self.sent = []
+        self.closed = False
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def off(self, event, callback):
+        self.listeners[event].remove(callback)
+
+    def send(self, method, params=None):
+        self.sent.append(method)
+        return {}
+
+    def emit(self, event, params):
+        for callback in list(self.listeners.get(event, [])):
+            callback(params)
+
+
+@pytest.fixture
+def session():
+    return StubSession()
+
+
+@pytest.fixture
+def log(session):
+    return EventLog(session, buffer=5).start()
+
+
+class TestEvents:
+    """Tests for nrobo.browsers.events module"""
+
+    def test_subscribes_and_converts_events(self, session, log):
+        """Validate that console, exception and navigation cdp events are recorded as plain events"""
+
+        assert session.sent == EVENTS.ENABLE
+
+        session.emit("Runtime.consoleAPICalled", {"type": "error", "args": [{"type": "string", "value": "boom"},
+                                                                            {"type": "number", "value": 42}],
+                                                  "stackTrace": {"callFrames": [{"url": "http://app/a.js",
+                                                                                 "lineNumber": 7}]}})
+        session.emit("Runtime.exceptionThrown", {"exceptionDetails": {"text": "Uncaught", "exception": {
+            "description": "TypeError: x is undefined"}, "url": "http://app/b.js", "lineNumber": 3}})
+        session.emit("Page.frameNavigated", {"frame": {"id": "F2", "parentId": "F1", "url": "http://ads/"}})
+        session.emit("Page.frameNavigated", {"frame": {"id": "F1", "url": "http://app/orders"}})
+
+        console, exception, navigation = log.filter()
+        assert (console["kind"], console["level"], console["text"], console["line"]) == \
+               ("console", "error", "boom 42", 7)
+        assert exception["text"] == "TypeError: x is undefined"
+        assert (navigation["kind"], navigation["url"], navigation["seq"]) == ("navigation", "http://app/orders", 3)
+        assert log.console_errors() == [console, exception]
+
+    def test_network_events_and_failed_requests(self, session, log):
+        """Validate that error responses and failed requests are reported as failed requests"""
+
+        session.emit("Network.requestWillBeSent", {"requestId": "1", "type": "XHR",
+                                                   "request": {"url": "http://app/api/orders", "method": "POST"}})
+        session.emit("Network.responseReceived", {"requestId": "1", "type": "XHR", "response": {
+            "url": "http://app/api/orders", "status": 503, "mimeType": "application/json"}})
+        session.emit("Network.requestWillBeSent", {"requestId": "2", "request": {"url": "http://cdn/x.js",
+                                                                                 "method": "GET"}})
+        session.emit("Network.loadingFailed", {"requestId": "2", "errorText": "net::ERR_NAME_NOT_RESOLVED"})
+
+        failed = log.failed_requests()
+        assert [(event["kind"], event["url"]) for event in failed] == [("response", "http://app/api/orders"),
+                                                                      ("request_failed", "http://cdn/x.js")]
+        assert log.first("request", method="POST")["request_id"] == "1"
+
+    def test_buffer_is_bounded(self, log):
+        """Validate that oldest events are dropped when the buffer is full"""
+
+        for index in range(8):
+            log.record("load", {"n": index})
+
+        assert [event["n"] for event in log.filter()] == [3, 4, 5, 6, 7]
+        assert log.dropped == 3
+        assert log.filter(since=6) == log.filter("load", n=lambda n: n > 5)
+
+    def test_filters(self):
+        """Validate that events match by kind and by values, wildcards and predicates"""
+
+        event = {"kind": "response", "url": "http://app/api/orders?page=2", "status": 200}
+
+        assert matches(event, None, {})
+        assert matches(event, ["request", "response"], {"url": "*/api/orders*"})
+        assert not matches(event, "request", {})
+        assert not matches(event, "response", {"status": 404})
+        assert matches(event, "response", {"status": lambda status: status < 400})
+
+    def test_wait_for_event_from_background_thread(self, log):
+        """Validate that wait_for returns an event recorded by another thread and times out otherwise"""
+
+        mark = log.mark()
+        log.record("load", {})
+
+        threading.Timer(0.05, log.record, args=("response", {"url": "http://app/api", "status": 200})).start()
+
+        assert log.wait_for("response", url="*/api", since=mark)["status"] == 200
+        with pytest.raises(TimeoutError):
+            log.wait_for("response", timeout=0.05, since=log.mark())
+
+    def test_expect_and_until(self, log):
+        """Validate that expect resolves on the first matching event and until awaits one"""
+
+        pending = log.expect("navigation", url="*/thank-you")
+        log.record("navigation", {"url": "http://app/cart"})
+        assert not pending.done()
+        log.record("navigation", {"url": "http://app/thank-you"})
+        assert pending.result(1)["url"] == "http://app/thank-you"
+
+        async def wait():
+            threading.Timer(0.05, log.record, args=("load", {})).start()
+            return await log.until("load", timeout=5, since=log.mark())
+
+        assert asyncio.run(wait())["kind"] == "load"
+
+    def test_close_unsubscribes_and_cancels(self, session, log):
+        """Validate that closing the log unsubscribes from cdp and cancels pending expectations"""
+
+        pending = log.expect("load")
+        log.close()
+
+        assert pending.cancelled()
+        assert not any(session.listeners.values())
+
+    def test_event_log_of_driver(self, monkeypatch, session):
+        """Validate that a driver gets one event log and drivers without cdp raise NRoBoCdpNotAvailable"""
+
+        import nrobo.browsers.cdp as cdp
+
+        class Driver:
+            pass
+
+        driver = Driver()
+        monkeypatch.setattr(cdp, "cdp_session", lambda driver: None)
+        with pytest.raises(NRoBoCdpNotAvailable):
+            event_log(driver)
+
+        monkeypatch.setattr(cdp, "cdp_session", lambda driver: session)
+        log = event_log(driver, {EVENTS.BUFFER: 10})
+        assert event_log(driver) is log and log.events.maxlen == 10
+        close_event_log(driver)
+        assert getattr(driver, EVENTS.ATTRIBUTE) is None
+        assert events_settings(None) == {"buffer": EVENTS.DEFAULT_BUFFER}
@@ -0,0 +1,102 @@
+import pytest
+
+from nrobo.browsers.launch_profiles import LAUNCH_PROFILE, apply_launch_profile, merge_chromium_switches, \
+    resolve_launch_profile, selected_launch_profile
+
+
+class StubChromiumOptions:
+
+    def __init__(self, *arguments):
+        self.arguments = list(arguments)
+
+    def add_argument(self, argument):
+        self.arguments.append(argument)
+
+    def add_experimental_option(self, name, value):
+        pass
+
+
+class StubFirefoxOptions:
+
+    def __init__(self):
+        self.arguments = []
+        self.preferences = {}
+
+    def add_argument(self, argument):
+        self.arguments.append(argument)
+
+    def set_preference(self, name, value):
+        self.preferences[name] = value
+
+
+class TestLaunchProfiles:
+    """Tests for nrobo.browsers.launch_profiles module"""
+
+    def test_none_selects_no_profile(self):
+        """Validate that no profile or none selects no launch profile"""
+
+        assert resolve_launch_profile(None) is None
+        assert resolve_launch_profile(LAUNCH_PROFILE.NONE) is None
+
+    def test_version_pin(self):
+        """Validate that a profile can be pinned to its version"""
+
+        assert resolve_launch_profile("lean@1")["name"] == LAUNCH_PROFILE.LEAN
+
+        with pytest.raises(ValueError, match="version"):
+            resolve_launch_profile("lean@2")
+
+    def test_unknown_profile(self):
+        """Validate that an unknown profile raises ValueError"""
+
+        with pytest.raises(ValueError, match="Unknown launch profile"):
+            resolve_launch_profile("turbo")
+
+    def test_command_line_takes_precedence_over_config(self):
+        """Validate that profile given on command line wins over nrobo-config.yaml"""
+
+        nconfig = {LAUNCH_PROFILE.PROFILE: LAUNCH_PROFILE.DEBUG}
+
+        assert selected_launch_profile(None, nconfig)["name"] == LAUNCH_PROFILE.DEBUG
+        assert selected_launch_profile(LAUNCH_PROFILE.CI_HEADLESS, nconfig)["name"] == LAUNCH_PROFILE.CI_HEADLESS
+
+    def test_profile_defined_in_config(self):
+        """Validate that profiles defined in nrobo-config.yaml can be selected"""
+
+        nconfig = {LAUNCH_PROFILE.PROFILES: {"kiosk": {"version": 2, "chromium": ["--kiosk"]}}}
+
+        profile = resolve_launch_profile("kiosk@2", nconfig)
+
+        assert profile[LAUNCH_PROFILE.CHROMIUM] == ["--kiosk"]
+        assert profile[LAUNCH_PROFILE.FIREFOX_PREFS] == {}
+
+    def test_disable_features_are_folded_into_one_switch(self):
+        """Validate that duplicate switches are dropped and disabled features folded into one switch"""
+
+        switches = merge_chromium_switches(["--mute-audio", "--disable-features=Translate",
+                                            "--mute-audio", "--disable-features=Translate,MediaRouter",
+                                            "--user-data-dir=<path>"])
+
+        assert switches == ["--mute-audio", "--disable-features=Translate,MediaRouter"]
+
+    def test_apply_to_chromium_keeps_existing_switches(self):
+        """Validate that profile switches are merged with switches chromium options have already"""
+
+        options = StubChromiumOptions("--headless=new", "--disable-features=Translate")
+
+        apply_launch_profile(options, resolve_launch_profile(LAUNCH_PROFILE.CI_HEADLESS))
+
+        assert options.arguments.count("--headless=new") == 1
+        disable_features = [a for a in options.arguments if a.startswith(LAUNCH_PROFILE.DISABLE_FEATURES)]
+        assert len(disable_features) == 1
+        assert "Translate" in disable_features[0] and "IntensiveWakeUpThrottling" in disable_features[0]
+
+    def test_apply_to_firefox(self):
+        """Validate that profile arguments and preferences are applied to firefox options"""
+
+        options = StubFirefoxOptions()
+
+        apply_launch_profile(options, resolve_launch_profile(LAUNCH_PROFILE.CI_HEADLESS))
+
+        assert "-headless" in options.arguments
+        assert options.preferences
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from nrobo.browsers import lazy_driver
+from nrobo.browsers.lazy_driver import LAZY_DRIVER, LazyDriver, flush_launch_stats, launch_report, record_launch
+
+
+class StubDriver:
+
+    def __init__(self):
+        self.title = "Home"
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Factory:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return StubDriver()
+
+
+class TestLazyDriver:
+    """Tests for nrobo.browsers.lazy_driver module"""
+
+    def test_unused_driver_launches_nothing(self):
+        """Validate that a driver which is never used launches no browser"""
+
+        factory = Factory()
+        driver = LazyDriver(factory)
+
+        assert not driver.materialised
+        assert repr(driver) == "<LazyDriver (not launched)>"
+        assert getattr(driver, "materialised", True) is False
+        assert factory.calls == 0
+
+    def test_first_use_launches_once(self):
+        """Validate that the browser is launched on first use and only once"""
+
+        factory = Factory()
+        driver = LazyDriver(factory)
+
+        assert driver.title == "Home"
+        driver.quit()
+
+        assert driver.materialised and factory.calls == 1
+        assert driver.quit_called
+
+    def test_attributes_are_set_on_real_driver(self):
+        """Validate that attributes set on the lazy driver end up on the launched driver"""
+
+        driver = LazyDriver(Factory())
+
+        driver.custom = 1
+
+        assert driver.materialise().custom == 1
+        assert getattr(driver, "missing", None) is None
+
+    def test_concurrent_first_use_launches_once(self):
+        """Validate that concurrent first uses launch one browser"""
+
+        factory = Factory()
+        driver = LazyDriver(factory)
+
+        threads = [threading.Thread(target=lambda: driver.title) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert factory.calls == 1
+
+    def test_failed_launch_is_not_retried(self):
+        """Validate that a failed launch raises its error on later uses without launching again"""
+
+        calls = []
+
+        def factory():
+            calls.append(1)
+            raise OSError("no browser")
+
+        driver = LazyDriver(factory)
+        with pytest.raises(OSError, match="no browser"):
+            driver.get("https://example.com")
+        with pytest.raises(OSError, match="no browser"):
+            driver.title
+
+        assert driver.materialised and len(calls) == 1
+
+    def test_launch_report_adds_up_processes(self, tmp_path, monkeypatch):
+        """Validate that launch report adds up tests, launches and avoided launches of all processes"""
+
+        # counts of this process so far, e.g. of the driver fixture of this test, are not part of the report
+        monkeypatch.setattr(lazy_driver, "_LAUNCHES", {"tests": 0, "launched": 0})
+
+        for launched in [True, False, False]:
+            record_launch(launched)
+        flush_launch_stats(tmp_path)
+        record_launch(True)
+        flush_launch_stats(tmp_path)
+
+        assert launch_report(tmp_path) == {"tests": 4, "launched": 2, "avoided": 2}
+        assert not (tmp_path / LAZY_DRIVER.STATS_FILE).exists()
+        assert launch_report(tmp_path) == {}
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from nrobo.browsers.network_blocking import NETWORK_BLOCKING, TYPICAL_BYTES, blocking_profile, \
+    blocked_url_patterns, network_blocker, selected_profile_name
+
+NCONFIG = {
+    NETWORK_BLOCKING.PROFILES: {
+        "lean": {"urls": ["*analytics*"], "resource_types": ["Font"]},
+        "no-images": {"resource_types": ["Image"]},
+    },
+    NETWORK_BLOCKING.PROFILE: "lean",
+}
+
+
+class Marker:
+
+    def __init__(self, *args):
+        self.args = args
+        self.kwargs = {}
+
+
+class Item:
+
+    def __init__(self, marker=None):
+        self.marker = marker
+
+    def get_closest_marker(self, name):
+        return self.marker if name == NETWORK_BLOCKING.MARKER else None
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class StubChromiumDriver:
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+    def get_log(self, log_type):
+        return [log_entry("Network.loadingFailed", requestId="1", type="Font", blockedReason="inspector"),
+                log_entry("Network.loadingFailed", requestId="2", type="Script", errorText="net::ERR_FAILED"),
+                log_entry("Network.loadingFailed", requestId="3", type="Ping", blockedReason="inspector")]
+
+
+class StubFirefoxDriver:
+    pass
+
+
+class TestNetworkBlocking:
+    """Tests for nrobo.browsers.network_blocking module"""
+
+    def test_profile_selection(self):
+        """Validate marker overrides default profile of config"""
+
+        assert selected_profile_name(Item(), NCONFIG) == "lean"
+        assert selected_profile_name(Item(Marker("no-images")), NCONFIG) == "no-images"
+        assert blocking_profile(NCONFIG, "none") is None
+        assert blocking_profile(NCONFIG, None) is None
+
+        with pytest.raises(ValueError):
+            blocking_profile(NCONFIG, "unknown")
+
+    def test_patterns_of_profile(self):
+        """Validate resource types are translated into url patterns"""
+
+        patterns = blocked_url_patterns(blocking_profile(NCONFIG, "lean"))
+
+        assert patterns[0] == "*analytics*" and "*.woff2" in patterns and "*.woff2?*" in patterns
+        assert "*analytics*?*" not in patterns
+        assert blocked_url_patterns({NETWORK_BLOCKING.URLS: ["https://ads.example/pixel.gif", "*/track?id=*"],
+                                     NETWORK_BLOCKING.RESOURCE_TYPES: []}) == [
+            "https://ads.example/pixel.gif", "https://ads.example/pixel.gif?*", "*/track?id=*"]
+        with pytest.raises(ValueError):
+            blocked_url_patterns({NETWORK_BLOCKING.URLS: [], NETWORK_BLOCKING.RESOURCE_TYPES: ["Video"]})
+
+    def test_chromium_blocks_and_counts(self):
+        """Validate setBlockedURLs is sent and blocked requests are counted"""
+
+        driver = StubChromiumDriver()
+        blocker = network_blocker(driver, Item(), NCONFIG)
+
+        assert driver.commands[1] == ("Network.setBlockedURLs", {"urls": blocker.patterns})
+        assert blocker.counters() == {"profile": "lean", "enabled": True, "blocked_requests": 2,
+                                      "blocked_by_type": {"Font": 1, "Ping": 1},
+                                      "estimated_bytes_saved": TYPICAL_BYTES["Font"] + TYPICAL_BYTES["Other"],
+                                      "estimated_bytes_saved_by_type": {"Font": TYPICAL_BYTES["Font"],
+                                                                        "Ping": TYPICAL_BYTES["Other"]}}
+
+    def test_non_chromium_runs_unblocked(self):
+        """Validate graceful degradation on browsers without CDP"""
+
+        blocker = network_blocker(StubFirefoxDriver(), Item(), NCONFIG)
+
+        assert not blocker.enabled
+        assert blocker.counters()["blocked_requests"] == 0
+        assert network_blocker(StubFirefoxDriver(), Item(Marker("none")), NCONFIG) is None
@@ -0,0 +1,117 @@
+import json
+
+from nrobo.browsers.perf import PERF, aggregate, flatten, flush_perf_samples, page_key, percentile, perf_collector, \
+    perf_html, perf_report, start_perf_samples
+
+NAVIGATION = {"startTime": 0, "domainLookupStart": 1, "domainLookupEnd": 6, "connectStart": 6, "connectEnd": 16,
+              "responseStart": 120, "responseEnd": 150, "domInteractive": 400, "domContentLoadedEventEnd": 450,
+              "loadEventEnd": 900, "transferSize": 2048}
+
+
+class StubDriver:
+    """Answers perf script and CDP Performance domain"""
+
+    def __init__(self, url="https://shop.example/cart?id=1", lcp=800.0):
+        self.url = url
+        self.lcp = lcp
+        self.cdp_commands = []
+
+    def execute_async_script(self, script, wait_ms):
+        assert "largest-contentful-paint" in script and wait_ms == PERF.WAIT_MS
+        return {"url": self.url, "navigation": NAVIGATION, "lcp": self.lcp, "cls": 0.02,
+                "paint": {"first-paint": 300.0, "first-contentful-paint": 310.0},
+                "heap": {"used": 1000000, "total": 2000000}}
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append(command)
+        if command == "Performance.getMetrics":
+            return {"metrics": [{"name": "Nodes", "value": 420}, {"name": "ScriptDuration", "value": 0.25},
+                                {"name": "Timestamp", "value": 1.0}]}
+        return {}
+
+
+class TestPerf:
+    """Tests for nrobo.browsers.perf module"""
+
+    def test_metrics_of_page(self):
+        """Validate that navigation timing, paint, layout shift and cdp metrics of a page are collected"""
+
+        driver = StubDriver()
+
+        metrics = perf_collector(driver).metrics()
+
+        assert metrics["ttfb"] == 120 and metrics["dns"] == 5 and metrics["connect"] == 10
+        assert (metrics["fcp"], metrics["lcp"], metrics["cls"]) == (310.0, 800.0, 0.02)
+        assert metrics["dom_nodes"] == 420 and metrics["script_ms"] == 250
+        assert "Timestamp" not in metrics
+        assert perf_collector(driver).samples == [metrics]
+
+    def test_cdp_domain_enabled_once(self):
+        """Validate that cdp Performance domain is enabled once per driver"""
+
+        driver = StubDriver()
+        perf_collector(driver).metrics()
+        perf_collector(driver).metrics(record=False)
+
+        assert driver.cdp_commands.count("Performance.enable") == 1
+        assert len(perf_collector(driver).samples) == 1
+
+    def test_missing_measurements_are_left_out(self):
+        """Validate that measurements the browser did not give are left out"""
+
+        assert flatten({"url": "about:blank", "navigation": None, "lcp": None, "heap": None}) == {"url": "about:blank"}
+
+    def test_page_key_drops_query(self):
+        """Validate that pages are keyed by url without query and fragment"""
+
+        assert page_key("https://shop.example/cart?id=1#top") == "https://shop.example/cart"
+
+    def test_percentile(self):
+        """Validate nearest rank percentiles"""
+
+        values = list(range(1, 101))
+        assert (percentile(values, 50), percentile(values, 95), percentile([7], 95)) == (50, 95, 7)
+
+    def test_samples_of_run_aggregate_per_page(self, tmp_path):
+        """Validate that samples of the run are aggregated to percentiles per page"""
+
+        for lcp in [100.0, 200.0, 300.0]:
+            driver = StubDriver(lcp=lcp)
+            perf_collector(driver).metrics()
+            assert flush_perf_samples(driver, "tests/test_cart.py::test_cart", tmp_path, {}) == 1
+        flush_perf_samples(StubDriver("https://shop.example/"), "tests/test_home.py::test_home", tmp_path,
+                           {PERF.ENABLED: True})
+
+        report = perf_report(tmp_path)
+
+        assert list(report) == ["https://shop.example/", "https://shop.example/cart"]
+        assert report["https://shop.example/cart"]["lcp"] == {"count": 3, "p50": 200.0, "p75": 300.0, "p95": 300.0,
+                                                               "max": 300.0}
+        assert json.loads((tmp_path / PERF.REPORT_FILE).read_text()) == report
+        assert "<td>https://shop.example/cart</td><td>3</td>" in perf_html(report)
+
+    def test_next_run_starts_without_samples_of_previous_run(self, tmp_path):
+        """Validate that samples of a previous run are not part of the report"""
+
+        driver = StubDriver()
+        perf_collector(driver).metrics()
+        flush_perf_samples(driver, "test_a", tmp_path, {})
+        assert perf_report(tmp_path) == perf_report(tmp_path)  # html summary aggregates again
+
+        start_perf_samples(tmp_path)
+        driver = StubDriver()
+        perf_collector(driver).metrics()
+        flush_perf_samples(driver, "test_a", tmp_path, {})
+
+        assert perf_report(tmp_path)["https://shop.example/cart"]["lcp"]["count"] == 1
+
+    def test_failed_test_last_page_not_sampled(self, tmp_path):
+        """Validate that last page of a failed test is not sampled"""
+
+        assert flush_perf_samples(StubDriver(), "test_a", tmp_path, {PERF.ENABLED: True}, passed=False) == 0
+        assert perf_report(tmp_path) == {} and perf_html({}) == ""
+
+    def test_aggregate_ignores_text(self):
+        """Validate that only numeric metrics are aggregated"""
+
+        assert list(aggregate([{"url": "https://a/", "nodeid": "t", "lcp": 1.0}])["https://a/"]) == ["lcp"]
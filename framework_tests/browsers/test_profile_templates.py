@@ -0,0 +1,116 @@
+import os
+
+from nrobo.browsers.profile_templates import PROFILE_TEMPLATE, ProfileTemplates, apply_profile, clone_tree, \
+    record_startup, startup_report
+
+
+class StubChromiumOptions:
+
+    def __init__(self):
+        self.arguments = []
+
+    def add_argument(self, argument):
+        self.arguments.append(argument)
+
+
+class StubFirefoxOptions(StubChromiumOptions):
+
+    def set_preference(self, name, value):
+        pass
+
+
+def make_profile(path):
+    (path / "Default" / "Cache").mkdir(parents=True)
+    (path / "Default" / "Cache" / "entry_0").write_text("cached asset")
+    (path / "Default" / "Preferences").write_text("{}")
+    (path / "Default" / "Cookies").write_text("session cookie")
+    (path / "First Run").write_text("")
+
+
+class TestProfileTemplates:
+    """Tests for nrobo.browsers.profile_templates module"""
+
+    def test_clone_tree_copies_files(self, tmp_path):
+        """Validate that copy method clones every file of the profile"""
+
+        make_profile(tmp_path / "source")
+
+        method = clone_tree(tmp_path / "source", tmp_path / "clone", PROFILE_TEMPLATE.COPY)
+
+        assert method == PROFILE_TEMPLATE.COPY
+        assert (tmp_path / "clone" / "Default" / "Cache" / "entry_0").read_text() == "cached asset"
+        assert (tmp_path / "clone" / "First Run").exists()
+
+    def test_clone_tree_hard_links_cache_dirs_only(self, tmp_path):
+        """Validate that hardlink method links cache files and copies the rest"""
+
+        make_profile(tmp_path / "source")
+
+        method = clone_tree(tmp_path / "source", tmp_path / "clone", PROFILE_TEMPLATE.HARDLINK,
+                            PROFILE_TEMPLATE.CACHE_DIRS[PROFILE_TEMPLATE.CHROMIUM])
+
+        assert method == PROFILE_TEMPLATE.HARDLINK
+        assert os.stat(tmp_path / "clone" / "Default" / "Cache" / "entry_0").st_nlink == 2
+        assert os.stat(tmp_path / "clone" / "Default" / "Preferences").st_nlink == 1
+
+    def test_first_session_seeds_template_and_later_sessions_clone_it(self, tmp_path):
+        """Validate that the first session seeds the template and later sessions start from clones of it"""
+
+        templates = ProfileTemplates(tmp_path, "run", PROFILE_TEMPLATE.COPY)
+
+        seed, templated = templates.acquire("chrome")
+        assert not templated
+        make_profile(seed)
+
+        """template still being seeded"""
+        empty, templated = templates.acquire("chrome")
+        assert not templated and not any(empty.iterdir())
+        templates.release("chrome", empty)
+
+        templates.release("chrome", seed)
+        assert not (seed / "Default" / "Cookies").exists()
+
+        clone, templated = templates.acquire("chrome")
+        assert templated and clone != seed
+        assert (clone / "Default" / "Cache" / "entry_0").read_text() == "cached asset"
+
+        templates.release("chrome", clone)
+        templates.close()
+        assert not clone.exists() and not empty.exists()
+        assert seed.exists()
+
+    def test_templates_are_kept_per_browser(self, tmp_path):
+        """Validate that every browser gets its own template"""
+
+        templates = ProfileTemplates(tmp_path, "run")
+
+        chrome, _ = templates.acquire("chrome")
+        firefox, _ = templates.acquire("firefox")
+
+        assert chrome != firefox
+        templates.close()
+
+    def test_apply_profile(self):
+        """Validate that chromium and firefox options are pointed at the profile directory"""
+
+        chromium, firefox = StubChromiumOptions(), StubFirefoxOptions()
+
+        apply_profile(chromium, "/tmp/profile")
+        apply_profile(firefox, "/tmp/profile")
+
+        assert chromium.arguments == ["--user-data-dir=/tmp/profile"]
+        assert firefox.arguments == ["-profile", "/tmp/profile"]
+        assert apply_profile(chromium, None) is chromium
+
+    def test_startup_report(self, tmp_path):
+        """Validate that startup report gives median startup with and without template"""
+
+        record_startup(tmp_path, "chrome", 2.0, False)
+        record_startup(tmp_path, "chrome", 0.8, True)
+        record_startup(tmp_path, "chrome", 1.0, True)
+
+        report = startup_report(tmp_path)
+
+        assert report["chrome"]["without_template"] == {"sessions": 1, "median_s": 2.0}
+        assert report["chrome"]["with_template"] == {"sessions": 2, "median_s": 0.9}
+        assert (tmp_path / PROFILE_TEMPLATE.REPORT_FILE).exists()
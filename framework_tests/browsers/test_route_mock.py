@@ -0,0 +1,135 @@
+import base64
+import json
+
+import pytest
+
+from nrobo.browsers.route_mock import MOCK, RouteMocker, load_fixture, handler_response
+from nrobo.exceptions import NRoBoCdpError
+
+
+class StubSession:
+    """Records CDP commands and lets tests fire events"""
+
+    def __init__(self, response_body=b'{"orders": [1, 2]}'):
+        self.commands = []
+        self.listeners = {}
+        self.response_body = response_body
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def off(self, event, callback):
+        self.listeners[event].remove(callback)
+
+    def send(self, method, params=None):
+        self.commands.append((method, params))
+        if method == "Fetch.getResponseBody":
+            return {"body": base64.b64encode(self.response_body).decode(), "base64Encoded": True}
+        return {}
+
+    def fire(self, event, params):
+        for callback in list(self.listeners.get(event, [])):
+            callback(params)
+
+
+def paused(url, request_id="R1", **params):
+    return {"requestId": request_id, "request": {"url": url, "method": "GET"}, **params}
+
+
+def fulfilled(session):
+    method, params = session.commands[-1]
+    assert method == "Fetch.fulfillRequest"
+    return params["responseCode"], base64.b64decode(params["body"])
+
+
+class TestRouteMock:
+    """Tests for nrobo.browsers.route_mock module"""
+
+    def test_callable_route(self, tmp_path):
+        """Validate callable answers matching requests and others continue to network"""
+
+        session = StubSession()
+        mocker = RouteMocker(session, fixtures_dir=tmp_path)
+        mocker.add("*/api/user*", lambda request: {"name": "nRoBo", "method": request["method"]})
+
+        assert session.commands[0] == ("Fetch.enable", {"patterns": [{"urlPattern": "*/api/user*",
+                                                                      "requestStage": "Request"}]})
+
+        session.fire("Fetch.requestPaused", paused("http://app/api/user?id=1"))
+        assert fulfilled(session) == (200, b'{"name": "nRoBo", "method": "GET"}')
+
+        session.fire("Fetch.requestPaused", paused("http://app/index.html", "R2"))
+        assert session.commands[-1] == ("Fetch.continueRequest", {"requestId": "R2"})
+
+        assert mocker.report()[0]["served"] == 1
+
+    def test_record_then_replay(self, tmp_path):
+        """Validate record mode writes fixture files which replay mode serves"""
+
+        recorder_session = StubSession()
+        recorder = RouteMocker(recorder_session, mode=MOCK.RECORD, fixtures_dir=tmp_path)
+        recorder.add("*/api/orders", "orders")
+        assert recorder_session.commands[0][1]["patterns"][0]["requestStage"] == "Response"
+
+        recorder_session.fire("Fetch.requestPaused", paused(
+            "http://app/api/orders", responseStatusCode=200,
+            responseHeaders=[{"name": "Content-Type", "value": "application/json"},
+                             {"name": "Content-Encoding", "value": "gzip"},
+                             {"name": "Content-Length", "value": "42"}]))
+
+        assert recorder_session.commands[-1] == ("Fetch.continueResponse", {"requestId": "R1"})
+        assert load_fixture(tmp_path / "orders.json") == (200, {"Content-Type": "application/json"},
+                                                          b'{"orders": [1, 2]}')
+        assert recorder.report()[0]["recorded"] == 1
+
+        session = StubSession()
+        mocker = RouteMocker(session, fixtures_dir=tmp_path)
+        mocker.add("*/api/orders", "orders")
+        session.fire("Fetch.requestPaused", paused("http://app/api/orders"))
+
+        assert fulfilled(session) == (200, b'{"orders": [1, 2]}')
+        assert ("Fetch.getResponseBody", {"requestId": "R1"}) not in session.commands
+
+    def test_record_without_continue_response(self, tmp_path):
+        """Validate recording on browsers without Fetch.continueResponse fulfills decoded body as plain"""
+
+        class OldBrowserSession(StubSession):
+            def send(self, method, params=None):
+                if method == "Fetch.continueResponse":
+                    raise NRoBoCdpError(method, {"message": "'Fetch.continueResponse' wasn't found"})
+                return super().send(method, params)
+
+        session = OldBrowserSession()
+        recorder = RouteMocker(session, mode=MOCK.RECORD, fixtures_dir=tmp_path)
+        recorder.add("*/api/orders", "orders")
+        session.fire("Fetch.requestPaused", paused(
+            "http://app/api/orders", responseStatusCode=200,
+            responseHeaders=[{"name": "content-encoding", "value": "br"},
+                             {"name": "Transfer-Encoding", "value": "chunked"}]))
+
+        assert fulfilled(session) == (200, b'{"orders": [1, 2]}')
+        assert session.commands[-1][1]["responseHeaders"] == []
+
+    def test_replay_without_fixture_passes_through(self, tmp_path):
+        """Validate missing fixture in replay mode goes to backend and is reported"""
+
+        session = StubSession()
+        mocker = RouteMocker(session, fixtures_dir=tmp_path)
+        mocker.add("*/api/missing", "missing.json")
+        session.fire("Fetch.requestPaused", paused("http://app/api/missing"))
+        mocker.close()
+
+        assert session.commands[-2] == ("Fetch.continueRequest", {"requestId": "R1"})
+        assert session.commands[-1] == ("Fetch.disable", None)
+        assert mocker.report()[0]["passthrough"] == 1 and not session.listeners["Fetch.requestPaused"]
+
+    def test_fixture_and_handler_formats(self, tmp_path):
+        """Validate fixture bodies and callable results"""
+
+        (tmp_path / "json.json").write_text(json.dumps({"status": 201, "body": {"id": 7}}))
+        assert load_fixture(tmp_path / "json.json") == (201, {}, b'{"id": 7}')
+        assert handler_response("plain") == (200, {}, b"plain")
+        assert handler_response({"status": 503, "body": b"down"}) == (503, {}, b"down")
+
+        with pytest.raises(ValueError):
+            RouteMocker(StubSession(), mode="live")
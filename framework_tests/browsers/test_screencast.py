@@ -0,0 +1,128 @@
+import base64
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from nrobo.browsers.screencast import SCREENCAST, ScreencastRecorder, encode_screencast, frame_durations, \
+    screencast_of, screencast_settings, stop_screencast
+
+
+class StubSession:
+    """Records CDP commands and lets tests fire events"""
+
+    def __init__(self):
+        self.commands = []
+        self.listeners = {}
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def off(self, event, callback):
+        self.listeners[event].remove(callback)
+
+    def send(self, method, params=None):
+        self.commands.append((method, params))
+        return {}
+
+    def fire(self, event, params):
+        for callback in list(self.listeners.get(event, [])):
+            callback(params)
+
+
+class Item:
+
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+
+def jpeg(shade) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), (shade, shade, shade)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def frame(session, timestamp, shade=0):
+    session.fire(SCREENCAST.FRAME_EVENT, {"data": base64.b64encode(jpeg(shade)).decode(),
+                                          "sessionId": int(timestamp * 100), "metadata": {"timestamp": timestamp}})
+
+
+class TestScreencast:
+    """Tests for nrobo.browsers.screencast module"""
+
+    def test_every_frame_is_acked(self):
+        """Validate that every screencast frame is acknowledged so chromium keeps sending frames"""
+
+        session = StubSession()
+        recorder = ScreencastRecorder(session, fps=5, seconds=2).start()
+
+        frame(session, 1.0)
+        frame(session, 1.05)
+
+        assert session.commands[0][0] == "Page.startScreencast"
+        assert [params for method, params in session.commands if method == "Page.screencastFrameAck"] == \
+               [{"sessionId": 100}, {"sessionId": 105}]
+        assert recorder.received == 2
+
+    def test_frames_are_throttled_and_bounded(self):
+        """Validate that frames are kept at the configured fps for the last seconds only"""
+
+        session = StubSession()
+        recorder = ScreencastRecorder(session, fps=4, seconds=2).start()
+
+        for i in range(40):
+            frame(session, i * 0.125)
+
+        timestamps = [timestamp for timestamp, _ in recorder.frames()]
+        assert len(timestamps) == 8  # 2 seconds at 4 fps
+        assert timestamps[0] == 3.0 and timestamps[-1] == 4.75
+
+    def test_frame_durations(self):
+        """Validate that frame durations follow frame timestamps"""
+
+        assert frame_durations([1.0, 1.2, 1.7], 5) == [200, 500, 200]
+        assert frame_durations([], 5) == []
+
+    def test_encode_animated_webp(self, tmp_path):
+        """Validate that frames are encoded to an animated webp"""
+
+        path = encode_screencast([(1.0, jpeg(0)), (1.2, jpeg(255))], tmp_path / "tests_test_a.py_test_x",
+                                 SCREENCAST.WEBP, 5)
+
+        assert path == str(tmp_path / "tests_test_a.py_test_x.webp")
+        with Image.open(path) as animation:
+            assert animation.n_frames == 2
+
+    def test_passed_test_drops_frames(self, tmp_path):
+        """Validate that screencast of a passed test is stopped and dropped"""
+
+        session = StubSession()
+        recorder = ScreencastRecorder(session).start()
+        frame(session, 1.0)
+        item = Item("tests/test_a.py::test_x")
+
+        assert stop_screencast(item, recorder, False, tmp_path, {}, ThreadPoolExecutor(1)) is None
+        assert session.commands[-1][0] == "Page.stopScreencast"
+        assert not session.listeners[SCREENCAST.FRAME_EVENT]
+        assert screencast_of(item) is None
+        assert recorder.frames() == []
+
+    def test_failed_test_gets_screencast(self, tmp_path):
+        """Validate that a failed test gets its screencast attached once"""
+
+        session = StubSession()
+        recorder = ScreencastRecorder(session).start()
+        frame(session, 1.0)
+        frame(session, 1.5, 255)
+        item = Item("tests/test_a.py::test_x")
+
+        stop_screencast(item, recorder, True, tmp_path, {}, ThreadPoolExecutor(1))
+
+        assert screencast_of(item) == str(tmp_path / SCREENCAST.DIR / "tests_test_a.py_test_x.webp")
+        assert screencast_of(item) is None  # attached once
+
+    def test_settings_defaults(self):
+        """Validate that screencast settings fall back to defaults"""
+
+        settings = screencast_settings({SCREENCAST.ENABLED: True, SCREENCAST.FPS: 2})
+        assert settings['enabled'] and settings['fps'] == 2 and settings['format'] == SCREENCAST.WEBP
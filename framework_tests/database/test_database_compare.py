@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from nrobo.util.database.compare import compare_tables, compare_databases
+from nrobo.util.database.connectors import CONNECTOR_TYPE, CONNECTOR_ATTRIBUTES
+from nrobo.util.database.pool import close_pools
+from nrobo.util.database.registry import connect, row_hash
+
+
+def _seed(path, rows):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer TEXT, amount REAL)")
+        connection.executemany("INSERT INTO orders VALUES (?, ?, ?)", rows)
+    return {CONNECTOR_ATTRIBUTES.TYPE: CONNECTOR_TYPE.SQLITE, 'database': str(path)}
+
+
+@pytest.fixture
+def orders():
+    """Rows of the orders table"""
+    return [(idx, f"customer{idx % 7}", idx * 1.5) for idx in range(1, 5001)]
+
+
+class TestDatabaseCompare:
+    """Tests for nrobo.util.database.compare module"""
+
+    def test_equal_tables(self, tmp_path, orders):
+        """Validate that equal tables are compared by checksums only"""
+
+        result = compare_tables(_seed(tmp_path / "source.db", orders), _seed(tmp_path / "target.db", orders),
+                                "orders", key="id", chunk_size=1000)
+
+        assert result.equal
+        assert result.chunks_compared == 5 and result.chunks_mismatched == 0
+        assert result.rows_fetched == 0
+
+    def test_row_level_diffs_drill_down_into_mismatching_chunks(self, tmp_path, orders):
+        """Validate missing, extra and changed rows are reported and only mismatching chunks are fetched"""
+
+        target = [row for row in orders if row[0] != 1234]
+        target[10] = (target[10][0], "someone else", target[10][2])
+        target.append((9999, "new", 1.0))
+
+        result = compare_tables(_seed(tmp_path / "source.db", orders), _seed(tmp_path / "target.db", target),
+                                "orders", key="id", chunk_size=1000, leaf_size=50, max_workers=3)
+
+        assert not result.equal
+        assert result.missing == [(1234, "customer2", 1851.0)]
+        assert result.extra == [(9999, "new", 1.0)]
+        assert result.changed == [((11, "customer4", 16.5), (11, "someone else", 16.5))]
+        assert result.rows_fetched < len(orders) / 10
+        assert result.summary()["changed"] == 1
+
+    def test_chunks_follow_rows_not_key_range(self, tmp_path, monkeypatch):
+        """Validate sparse keys give chunks of about chunk_size rows and workers reuse their connections"""
+
+        import nrobo.util.database.compare as compare
+
+        connections = []
+        monkeypatch.setattr(compare, "connect", lambda config: connections.append(config) or connect(config))
+        rows = [(idx, "a", 1.0) for idx in range(1, 1001)] + [(10 ** 9 + idx, "b", 2.0) for idx in range(1000)]
+        target = rows[:1500] + [(rows[1500][0], "c", 2.0)] + rows[1501:]
+
+        result = compare_tables(_seed(tmp_path / "source.db", rows), _seed(tmp_path / "target.db", target),
+                                "orders", key="id", chunk_size=500, leaf_size=50, max_workers=2)
+
+        assert result.changed == [(rows[1500], target[1500])]
+        # 4 chunks of 500 rows, mismatching one split into 8 of 63 rows, mismatching one of them into 8 of 8
+        assert (result.chunks_compared, result.chunks_mismatched) == (4 + 8 + 8, 3)
+        assert result.rows_fetched == 2 * 8
+        assert len(connections) <= 4 + 2 * 2  # columns, bounds of both sides, chunks + per worker and side
+
+    def test_null_is_not_empty_text(self, tmp_path):
+        """Validate NULL and empty string hash differently"""
+
+        result = compare_tables(_seed(tmp_path / "source.db", [(1, None, 1.0), (2, "", None)]),
+                                _seed(tmp_path / "target.db", [(1, "", 1.0), (2, None, None)]),
+                                "orders", key="id")
+
+        assert result.changed == [((1, None, 1.0), (1, "", 1.0)), ((2, "", None), (2, None, None))]
+        assert row_hash(None, "a") != row_hash("a") != row_hash("", "a")
+
+    def test_compare_databases_with_pooled_connections(self, tmp_path, orders):
+        """Validate comparison of several tables over pooled connections and empty tables"""
+
+        source = {**_seed(tmp_path / "source.db", orders), CONNECTOR_ATTRIBUTES.POOLED: True}
+        target = {**_seed(tmp_path / "target.db", orders[:-1]), CONNECTOR_ATTRIBUTES.POOLED: True}
+        for config in (source, target):
+            with sqlite3.connect(config['database']) as connection:
+                connection.execute("CREATE TABLE empty (id INTEGER PRIMARY KEY)")
+
+        results = compare_databases(source, target, {"orders": "id", "empty": "id"}, chunk_size=2000)
+
+        assert [row[0] for row in results["orders"].missing] == [5000]
+        assert results["empty"].equal and results["empty"].chunks_compared == 0
+
+        close_pools()
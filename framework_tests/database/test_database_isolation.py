@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from nrobo.util.database.connectors import CONNECTOR_TYPE, CONNECTOR_ATTRIBUTES
+from nrobo.util.database.pool import DatabaseSession
+
+
+@pytest.fixture
+def seeded_config(tmp_path):
+    """Config of a seeded sqlite stand-in database"""
+
+    database = tmp_path / "seeded.db"
+    with sqlite3.connect(database) as connection:
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.executemany("INSERT INTO users (name) VALUES (?)", [("alice",), ("bob",)])
+    connection.close()
+
+    yield {CONNECTOR_ATTRIBUTES.TYPE: CONNECTOR_TYPE.SQLITE, 'database': str(database)}
+
+
+def _names(config):
+    with sqlite3.connect(config['database']) as connection:
+        return [row[0] for row in connection.execute("SELECT name FROM users ORDER BY id")]
+
+
+class TestDatabaseIsolation:
+    """Tests for nrobo.util.database.isolation module"""
+
+    def test_transaction_is_rolled_back_at_teardown(self, seeded_config):
+        """Validate that changes of a test, even committed ones, are rolled back"""
+
+        session = DatabaseSession()
+
+        database = session.isolated(seeded_config)
+        database.bulk_insert("users", ["name"], [("carol",)])  # commits
+        database.execute("DELETE FROM users WHERE name = ?", ("alice",))
+        assert [row[0] for row in database.iter_rows("SELECT name FROM users ORDER BY id")] == ["bob", "carol"]
+
+        database.rollback()
+        assert database.fetch_all("SELECT count(*) FROM users") == [(2,)]
+
+        database.execute("DELETE FROM users")
+        session.release_leases()  # test teardown
+
+        assert _names(seeded_config) == ["alice", "bob"]
+        session.close()
+
+    def test_failing_statement_keeps_earlier_changes_of_test(self, seeded_config):
+        """Validate that a failing bulk insert or statement is undone alone, not with the test savepoint"""
+
+        session = DatabaseSession()
+
+        database = session.isolated(seeded_config)
+        database.execute("DELETE FROM users WHERE name = ?", ("alice",))
+        with pytest.raises(sqlite3.IntegrityError):
+            database.bulk_insert("users", ["id", "name"], [(10, "carol"), (10, "dave")], batch_size=1)
+        with pytest.raises(sqlite3.OperationalError):
+            database.execute("INSERT INTO missing VALUES (1)")
+
+        assert [row[0] for row in database.iter_rows("SELECT name FROM users ORDER BY id")] == ["bob"]
+
+        session.release_leases()
+        assert _names(seeded_config) == ["alice", "bob"]
+        session.close()
+
+    def test_snapshot_is_taken_once_and_restored_per_test(self, seeded_config):
+        """Validate that changes made by any connection are undone by restoring the snapshot"""
+
+        session = DatabaseSession()
+
+        for test in range(3):
+            database = session.isolated(seeded_config, mode="snapshot")
+            with sqlite3.connect(seeded_config['database']) as app_connection:  # e.g. application under test
+                app_connection.execute("INSERT INTO users (name) VALUES (?)", (f"user{test}",))
+            app_connection.close()
+            assert database.fetch_all("SELECT count(*) FROM users") == [(3,)]
+            session.release_leases()  # test teardown
+
+            assert _names(seeded_config) == ["alice", "bob"]
+
+        snapshot = list(session._snapshots.values())[0]
+        assert len(session._snapshots) == 1 and snapshot.restores == 3
+        session.close()
+
+    def test_invalid_mode(self, seeded_config):
+        """Validate that unknown isolation mode is rejected"""
+
+        with pytest.raises(ValueError):
+            DatabaseSession().isolated(seeded_config, mode="reseed")
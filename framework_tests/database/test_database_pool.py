@@ -0,0 +1,134 @@
+import sqlite3
+import threading
+
+import pytest
+
+from nrobo.exceptions import NRoBoDatabaseConnectionError, NRoBoDatabasePoolExhausted
+from nrobo.util.database.connectors import db_connector, CONNECTOR_TYPE, CONNECTOR_ATTRIBUTES
+from nrobo.util.database.pool import ConnectionPool, DatabaseSession, POOL_ATTRIBUTES, backoff_delay, \
+    close_pools, get_pool
+
+
+@pytest.fixture
+def sqlite_config(tmp_path):
+    """Config of a local sqlite stand-in database"""
+
+    database = tmp_path / "stand-in.db"
+    with sqlite3.connect(database) as connection:
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.executemany("INSERT INTO users (name) VALUES (?)", [("alice",), ("bob",)])
+
+    yield {CONNECTOR_ATTRIBUTES.TYPE: CONNECTOR_TYPE.SQLITE, 'database': str(database)}
+
+    close_pools()
+
+
+class TestDatabasePool:
+    """Tests for nrobo.util.database.pool module"""
+
+    def test_connections_are_reused(self, sqlite_config):
+        """Validate that released connection is leased again instead of opening a new one"""
+
+        pool = get_pool(sqlite_config)
+
+        with pool.lease() as connection:
+            first = connection.raw
+            assert connection.execute("SELECT count(*) FROM users").fetchone() == (2,)
+        with pool.lease() as connection:
+            assert connection.raw is first
+
+        metrics = pool.metrics()
+        assert metrics['created'] == 1 and metrics['reused'] == 1 and metrics['in_use'] == 0
+
+    def test_one_pool_per_config(self, sqlite_config):
+        """Validate that pools are keyed by config but not by pool settings"""
+
+        assert get_pool(sqlite_config) is get_pool(dict(sqlite_config))
+        assert get_pool(sqlite_config) is get_pool({**sqlite_config, POOL_ATTRIBUTES.SIZE: 5})
+        assert get_pool(sqlite_config) is not get_pool({**sqlite_config, 'database': ':memory:'})
+
+    def test_pool_is_bounded(self, sqlite_config):
+        """Validate that lease waits for a free connection and times out"""
+
+        pool = get_pool({**sqlite_config, POOL_ATTRIBUTES.SIZE: 1})
+        leased = pool.acquire()
+
+        with pytest.raises(NRoBoDatabasePoolExhausted):
+            pool.acquire(timeout=0.1)
+
+        threading.Timer(0.1, leased.close).start()
+        with pool.lease(timeout=5) as connection:
+            assert connection.raw is leased.raw
+        assert pool.metrics()['waits'] == 2
+
+    def test_unhealthy_and_idle_connections_are_replaced(self):
+        """Validate health check on reuse and idle eviction"""
+
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), health_check_interval=0)
+        with pool.lease() as connection:
+            first = connection.raw
+        first.close()  # connection dies while idle
+
+        with pool.lease() as connection:
+            assert connection.raw is not first
+        assert pool.metrics()['health_check_failures'] == 1
+
+        pool.max_idle = 0
+        with pool.lease():
+            pass
+        assert pool.metrics()['evicted'] == 1
+
+    def test_health_check_runs_outside_pool_lock(self):
+        """Validate that a hanging ping of one lease does not block other leases"""
+
+        pinging, release_ping = threading.Event(), threading.Event()
+
+        def ping(connection):
+            pinging.set()
+            return release_ping.wait(5)
+
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:", check_same_thread=False), ping=ping,
+                              size=2, health_check_interval=0)
+        pool.acquire().close()  # idle connection, pinged on reuse
+
+        pinged = []
+        leasing = threading.Thread(target=lambda: pinged.append(pool.acquire()))
+        leasing.start()
+        assert pinging.wait(5)
+
+        other = pool.acquire(timeout=1)  # pool lock is free while the ping hangs
+        release_ping.set()
+        leasing.join(5)
+        assert pinged and pinged[0].raw is not other.raw
+        assert pool.metrics()['created'] == 2 and pool.metrics()['reused'] == 1
+
+    def test_reconnect_backs_off_exponentially(self):
+        """Validate connect retries with exponential backoff"""
+
+        sleeps = []
+
+        def connect():
+            raise sqlite3.OperationalError("server down")
+
+        pool = ConnectionPool(connect, max_retry=4, sleep=sleeps.append)
+
+        with pytest.raises(NRoBoDatabaseConnectionError):
+            pool.acquire()
+        assert sleeps == [backoff_delay(0), backoff_delay(1), backoff_delay(2)]
+        assert sleeps == sorted(sleeps) and sleeps[0] < sleeps[-1]
+        assert pool.metrics()['open'] == 0
+
+    def test_pooled_db_connector_and_database_session(self, sqlite_config):
+        """Validate pooled db_connector and leases of db fixture"""
+
+        result = db_connector({**sqlite_config, CONNECTOR_ATTRIBUTES.POOLED: True})
+        result['cursor'].execute("SELECT name FROM users ORDER BY id")
+        assert result['cursor'].fetchall() == [("alice",), ("bob",)]
+        result['connection'].close()  # back to pool
+
+        session = DatabaseSession()
+        session.connect(sqlite_config)
+        assert list(session.metrics().values())[0]['in_use'] == 1
+        session.release_leases()
+        assert list(session.metrics().values())[0]['in_use'] == 0
+        assert list(session.metrics().values())[0]['created'] == 1
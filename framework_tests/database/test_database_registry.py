@@ -0,0 +1,120 @@
+import pytest
+
+from nrobo.util.database import Connector, Database, connect, register_connector, get_connector, connector_types
+from nrobo.util.database.connectors import CONNECTOR_TYPE, CONNECTOR_ATTRIBUTES, db_connector
+from nrobo.util.database.pool import close_pools
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Local sqlite stand-in database with a users table"""
+
+    with connect({CONNECTOR_ATTRIBUTES.TYPE: CONNECTOR_TYPE.SQLITE,
+                  'database': str(tmp_path / "stand-in.db")}) as _database:
+        _database.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, score REAL)")
+        yield _database
+
+
+class TestDatabaseRegistry:
+    """Tests for nrobo.util.database.registry module"""
+
+    def test_builtin_connectors_are_registered(self):
+        """Validate that sqlite, mysql and postgresql connectors are available"""
+
+        assert {CONNECTOR_TYPE.SQLITE, CONNECTOR_TYPE.MYSQL, CONNECTOR_TYPE.POSTGRESQL} <= set(connector_types())
+        assert get_connector(CONNECTOR_TYPE.SQLITE).placeholder == "?"
+        assert get_connector(CONNECTOR_TYPE.POSTGRESQL).placeholder == "%s"
+
+    def test_custom_connector_can_be_registered(self, tmp_path):
+        """Validate that a custom connector is used by connect() and db_connector()"""
+
+        import sqlite3
+
+        class MemoryConnector(Connector):
+            type = "memory"
+            placeholder = "?"
+
+            def connect(self, config):
+                return sqlite3.connect(":memory:")
+
+        register_connector(MemoryConnector())
+
+        with connect({CONNECTOR_ATTRIBUTES.TYPE: "memory"}) as _database:
+            assert _database.fetch_all("SELECT 1") == [(1,)]
+        assert db_connector({CONNECTOR_ATTRIBUTES.TYPE: "memory"})['cursor'].execute("SELECT 2").fetchone() == (2,)
+
+    def test_bulk_insert_consumes_generator_in_batches(self, database):
+        """Validate bulk insert of seeding data"""
+
+        rows = ((idx, f"user{idx}", idx / 2) for idx in range(2500))
+
+        assert database.bulk_insert("users", ["id", "name", "score"], rows, batch_size=1000) == 2500
+        assert database.fetch_all("SELECT count(*) FROM users") == [(2500,)]
+
+    def test_stream_yields_chunks(self, database):
+        """Validate that rows are yielded chunk by chunk"""
+
+        database.bulk_insert("users", ["id", "name", "score"], [(idx, f"user{idx}", 0.0) for idx in range(25)])
+
+        chunks = list(database.stream("SELECT id FROM users ORDER BY id", chunk_size=10))
+
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert database.last_columns == ["id"]
+        assert next(database.iter_rows("SELECT name FROM users WHERE id = ?", (3,))) == ("user3",)
+
+    def test_stream_reads_columns_described_on_first_fetch(self):
+        """Validate that columns of a server side cursor, described only once rows are fetched, are known"""
+
+        class NamedCursor:
+            """Stand-in for psycopg2 named cursor, description is set by the first fetch"""
+
+            description = None
+
+            def __init__(self):
+                self.rows = [(1,), (2,), (3,)]
+
+            def execute(self, sql, params):
+                pass
+
+            def fetchmany(self, size):
+                self.description = (("id", None),)
+                rows, self.rows = self.rows[:size], self.rows[size:]
+                return rows
+
+            def close(self):
+                pass
+
+        class NamedCursorConnector(Connector):
+            type = "named-cursor"
+
+            def stream_cursor(self, connection, chunk_size):
+                return NamedCursor()
+
+        _database = Database(None, NamedCursorConnector())
+
+        assert list(_database.stream("SELECT id FROM users", chunk_size=2)) == [[(1,), (2,)], [(3,)]]
+        assert _database.last_columns == ["id"]
+
+    def test_columnar_export(self, database):
+        """Validate export of result set to columns and numpy arrays"""
+
+        database.bulk_insert("users", ["id", "name", "score"], [(1, "a", 1.5), (2, "b", 2.5)])
+
+        assert database.to_columns("SELECT id, score FROM users ORDER BY id") == {"id": [1, 2], "score": [1.5, 2.5]}
+
+        numpy = pytest.importorskip("numpy")
+        columns = database.to_numpy("SELECT id, score FROM users ORDER BY id", chunk_size=1)
+        assert numpy.array_equal(columns["score"], numpy.array([1.5, 2.5]))
+
+    def test_pooled_connect(self, tmp_path):
+        """Validate that pooled Database gives connection back to the pool on close"""
+
+        config = {CONNECTOR_ATTRIBUTES.TYPE: CONNECTOR_TYPE.SQLITE, 'database': str(tmp_path / "pooled.db"),
+                  CONNECTOR_ATTRIBUTES.POOLED: True}
+
+        with connect(config) as first:
+            raw = first.connection.raw
+        with connect(config) as second:
+            assert isinstance(second, Database) and second.connection.raw is raw
+
+        close_pools()
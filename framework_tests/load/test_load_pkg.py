@@ -0,0 +1,159 @@
+import json
+import urllib.request
+
+import pytest
+
+from nrobo.util.load import LOAD, LoadRunner, load_flow, ramp_schedule, run_load, step
+from nrobo.util.load.histogram import LatencyHistogram
+
+FLOWS = '''
+from nrobo.util.load import step
+
+
+def browse(driver, url):
+    with step("home"):
+        driver.get(url)
+    with step("product"):
+        driver.get(url.replace("index.html", "product.html"))
+
+
+def broken(driver, logger):
+    with step("home"):
+        raise RuntimeError("boom")
+
+
+def needs_fixture(driver, db):
+    pass
+
+
+class TestShop:
+
+    def test_browse(self, driver, url):
+        browse(driver, url)
+'''
+
+
+class UrlDriver:
+    """Stands in for a browser by fetching pages over http"""
+
+    created = 0
+
+    def __init__(self):
+        UrlDriver.created += 1
+        self.quits = 0
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.status == 200
+
+    def quit(self):
+        self.quits += 1
+
+
+@pytest.fixture
+def flows(tmp_path):
+    path = tmp_path / "load_flows.py"
+    path.write_text(FLOWS)
+    return path
+
+
+class TestLoadPkg:
+    """Tests for nrobo.util.load package"""
+
+    def test_histogram_percentiles_within_precision(self):
+        """Validate that histogram percentiles are within its precision"""
+
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+
+        assert histogram.count == 1000 and histogram.max == 1.0
+        for q, expected in [(50, 0.5), (95, 0.95), (99, 0.99), (100, 1.0)]:
+            assert histogram.percentile(q) == pytest.approx(expected, rel=0.011)
+        assert histogram.mean == pytest.approx(0.5005)
+
+    def test_histogram_merge(self):
+        """Validate that merged histograms count latencies of both"""
+
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.010)
+        second.record(0.200)
+        second.record(0.300)
+
+        merged = first.merge(second)
+
+        assert (merged.count, merged.min, merged.max) == (3, 0.010, 0.300)
+        assert merged.percentile(50) == pytest.approx(0.2, rel=0.011)
+        assert LatencyHistogram().percentile(99) == 0.0
+
+    def test_ramp_schedule(self):
+        """Validate that virtual users start evenly over the ramp up"""
+
+        assert ramp_schedule(4, 10) == [0, 2.5, 5, 7.5]
+        assert ramp_schedule(3, 0) == [0, 0, 0]
+
+    def test_load_flow_targets(self, flows, monkeypatch):
+        """Validate that flows are loaded from file or module targets and flows needing fixtures are refused"""
+
+        monkeypatch.syspath_prepend(str(flows.parent))
+
+        assert load_flow(f"{flows}::browse").__name__ == "browse"
+        assert load_flow(f"{flows}::TestShop::test_browse").__name__ == "test_browse"
+        assert load_flow("load_flows:browse").__name__ == "browse"
+        with pytest.raises(ValueError, match="db"):
+            load_flow(f"{flows}::needs_fixture")
+
+    def test_step_outside_load_run_only_runs_block(self):
+        """Validate that a step outside a load run only runs its block"""
+
+        with step("anything"):
+            ran = True
+        assert ran
+
+    def test_iterations_against_stand_in_site(self, flows, tmp_path):
+        """Validate that iterations of every user are timed per step against a stand-in site"""
+
+        UrlDriver.created = 0
+
+        report = run_load(f"{flows}::TestShop::test_browse", users=3, iterations=4, report_dir=tmp_path,
+                          driver_factory=UrlDriver)
+
+        assert report["url"] == "stand-in" and report["sessions"] == 3 == UrlDriver.created
+        assert list(report["steps"]) == [LOAD.FLOW_STEP, "home", "product"]
+        for stats in report["steps"].values():
+            assert stats["count"] == 12 and stats["errors"] == 0
+            assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert json.loads((tmp_path / LOAD.REPORT_FILE).read_text()) == report
+
+    def test_failed_iteration_gets_fresh_browser(self, flows):
+        """Validate that a failed iteration is counted and next iteration gets a new browser"""
+
+        drivers = []
+
+        def factory():
+            drivers.append(UrlDriver())
+            return drivers[-1]
+
+        report = LoadRunner(load_flow(f"{flows}::broken"), factory, users=2, iterations=3).run()
+
+        assert report["steps"]["home"] == {**report["steps"]["home"], "count": 0, "errors": 6, "error_rate": 1.0}
+        assert report["steps"][LOAD.FLOW_STEP]["errors"] == 6
+        assert len(drivers) == 6 and all(driver.quits == 1 for driver in drivers)
+
+    def test_browser_start_failure_is_counted(self, flows):
+        """Validate that browsers failing to start are counted as session errors"""
+
+        def factory():
+            raise OSError("no browser")
+
+        report = LoadRunner(load_flow(f"{flows}::browse"), factory, users=1, iterations=2).run()
+
+        assert report["session_errors"] == 2 and report["steps"][LOAD.FLOW_STEP]["errors"] == 2
+
+    def test_duration_bounds_run(self, flows):
+        """Validate that a duration ends the run instead of iterations"""
+
+        report = run_load(f"{flows}::browse", users=2, duration=0.3, ramp_up=0.1, driver_factory=UrlDriver)
+
+        assert report["steps"][LOAD.FLOW_STEP]["count"] > 2
+        assert report["elapsed_s"] < 2
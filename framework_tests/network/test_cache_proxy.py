@@ -0,0 +1,169 @@
+import threading
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nrobo.util.network.cache_proxy import CachingProxy, DiskCache, cacheable, apply_proxy, ASSET_CACHE, \
+    start_asset_cache, stop_asset_cache
+
+
+@pytest.fixture
+def stand_in_site(tmp_path):
+    """Locally served stand-in site counting requests per path"""
+
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "app.js").write_bytes(b"console.log('app');" * 100)
+    (site / "vendor.js").write_bytes(b"console.log('app');" * 100)  # same content, other url
+    (site / "index.html").write_text("<html></html>")
+    (site / "style.css").write_text("body {}")  # Last-Modified only, revalidated
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(site), **kwargs)
+
+        def end_headers(self):
+            if self.path.endswith(".js"):
+                self.send_header("Cache-Control", "max-age=600")
+            super().end_headers()
+
+        def log_message(self, format, *args):
+            requests.append(self.path)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(proxy, url, **headers):
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": f"http://{proxy.address}"}))
+    with opener.open(urllib.request.Request(url, headers=headers), timeout=10) as response:
+        return response.read()
+
+
+class TestCacheProxy:
+    """Tests for nrobo.util.network.cache_proxy module"""
+
+    def test_repeats_are_served_from_cache(self, tmp_path, stand_in_site):
+        """Validate static assets are downloaded once and pages are not cached"""
+
+        site, requests = stand_in_site
+        proxy = CachingProxy(tmp_path / "cache", 10 * 1024 * 1024).start()
+
+        bodies = [fetch(proxy, f"{site}/app.js") for _ in range(3)]
+        fetch(proxy, f"{site}/index.html")
+        fetch(proxy, f"{site}/index.html")
+        fetch(proxy, f"{site}/vendor.js")
+
+        report = proxy.stop()
+
+        assert bodies[0] == bodies[2] == b"console.log('app');" * 100
+        assert requests.count("/app.js") == 1 and requests.count("/index.html") == 2
+        assert report["hits"] == 2 and report["misses"] == 2 and report["passthrough"] == 2
+        assert report["hit_ratio"] == 0.5 and report["bytes_saved"] == 2 * len(bodies[0])
+        assert report["entries"] == 2 and report["cache_bytes"] == len(bodies[0])  # content hashed blobs
+
+    def test_stale_entries_are_revalidated(self, tmp_path, stand_in_site):
+        """Validate entries without max-age are served after upstream answers 304"""
+
+        site, requests = stand_in_site
+        proxy = CachingProxy(tmp_path / "cache", 10 * 1024 * 1024).start()
+
+        bodies = [fetch(proxy, f"{site}/style.css") for _ in range(3)]
+        report = proxy.stop()
+
+        assert bodies == [b"body {}"] * 3 and requests.count("/style.css") == 3
+        assert (report["misses"], report["revalidated"], report["hits"]) == (1, 2, 0)
+        assert report["bytes_saved"] == 2 * len(bodies[0])
+
+    def test_requests_with_credentials_bypass_cache(self, tmp_path, stand_in_site):
+        """Validate requests carrying Cookie or Authorization are neither served from nor stored in cache"""
+
+        site, requests = stand_in_site
+        proxy = CachingProxy(tmp_path / "cache", 10 * 1024 * 1024).start()
+
+        fetch(proxy, f"{site}/app.js", Cookie="session=1")
+        fetch(proxy, f"{site}/app.js")
+        fetch(proxy, f"{site}/app.js", Authorization="Bearer x")
+        report = proxy.stop()
+
+        assert requests.count("/app.js") == 3
+        assert (report["passthrough"], report["misses"], report["hits"]) == (2, 1, 0)
+
+    def test_cache_survives_runs(self, tmp_path, stand_in_site):
+        """Validate next run starts with the cache of previous run"""
+
+        site, requests = stand_in_site
+        start_asset_cache({ASSET_CACHE.ENABLED: False})
+
+        proxy = start_asset_cache({ASSET_CACHE.ENABLED: True, ASSET_CACHE.DIR: str(tmp_path / "cache")})
+        fetch(proxy, f"{site}/app.js")
+        stop_asset_cache(proxy, tmp_path / "results")
+
+        proxy = CachingProxy(tmp_path / "cache", 10 * 1024 * 1024).start()
+        fetch(proxy, f"{site}/app.js")
+
+        assert proxy.stop()["hits"] == 1 and requests.count("/app.js") == 1
+        assert (tmp_path / "results" / ASSET_CACHE.REPORT_FILE).exists()
+
+    def test_lru_eviction(self, tmp_path):
+        """Validate least recently used entries are evicted beyond size limit"""
+
+        cache = DiskCache(tmp_path, max_bytes=25)
+        fresh = [("Cache-Control", "max-age=600")]
+        cache.put("http://a/1.js", 200, fresh, b"1" * 10)
+        cache.put("http://a/2.js", 200, fresh, b"2" * 10)
+        cache.get("http://a/1.js")
+        cache.put("http://a/3.js", 200, fresh, b"3" * 10)
+
+        assert cache.get("http://a/2.js") is None
+        assert cache.get("http://a/1.js")[2] == b"1" * 10 and cache.size == 20
+
+    def test_expiry_and_validators(self, tmp_path):
+        """Validate entries are fresh for max-age only and stale ones carry their validators"""
+
+        cache = DiskCache(tmp_path, max_bytes=1000)
+        cache.put("http://a/app.js", 200, [("Cache-Control", "max-age=0"), ("ETag", '"v1"')], b"app")
+        cache.put("http://a/old.js", 200, [("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT"),
+                                           ("Date", "Wed, 11 Dec 2024 00:00:00 GMT")], b"old")
+
+        assert cache.get("http://a/app.js") is None
+        assert cache.get("http://a/app.js", stale=True)[2] == b"app"
+        assert cache.validators("http://a/app.js") == {"If-None-Match": '"v1"'}
+        assert cache.validators("http://a/new.js") == {}
+
+        assert cache.refresh("http://a/app.js", [("Cache-Control", "max-age=600")])[2] == b"app"
+        assert cache.get("http://a/app.js")[1] == [["ETag", '"v1"'], ["Cache-Control", "max-age=600"]]
+        assert cache.get("http://a/old.js")[2] == b"old"  # a tenth of 345 days since last modified
+
+    def test_cacheable(self):
+        """Validate only static, shareable responses are cached"""
+
+        assert cacheable("http://a/app.js", 200, {"ETag": '"v1"'})
+        assert cacheable("http://a/app.js", 200, {"Cache-Control": "no-cache", "ETag": '"v1"'})
+        assert cacheable("http://a/api/config", 200, {"Cache-Control": "public, max-age=600"})
+        assert not cacheable("http://a/app.js", 200, {})  # could never be served again
+        assert not cacheable("http://a/api/orders.json", 200, {"ETag": '"v1"'})
+        assert not cacheable("http://a/app.js", 200, {"Cache-Control": "no-store"})
+        assert not cacheable("http://a/app.js", 404, {})
+        assert not cacheable("http://a/page", 200, {})
+
+    def test_apply_proxy(self):
+        """Validate chromium and firefox options are pointed to proxy"""
+
+        class ChromiumOptions:
+            arguments = []
+
+            def add_argument(self, argument):
+                self.arguments.append(argument)
+
+        options = apply_proxy(ChromiumOptions(), "127.0.0.1:8899")
+
+        assert options.arguments[0] == "--proxy-server=http=127.0.0.1:8899"
+        assert apply_proxy(options, None) is options
@@ -0,0 +1,99 @@
+import os
+import tarfile
+import time
+
+from nrobo.util.retention import RETENTION, stage_results, archive_pending, list_bundles, compact, gc, \
+    start_compaction
+
+
+def _make_results(results_dir, files=3):
+    """Create dummy results directory with few files"""
+    (results_dir / "screenshots").mkdir(parents=True)
+    for idx in range(files):
+        (results_dir / "screenshots" / f"shot_{idx}.png").write_bytes(os.urandom(64))
+    (results_dir / "junit-report.xml").write_text("<testsuites/>")
+
+
+class TestRetentionPkg:
+    """Tests for nrobo.util.retention package"""
+
+    def test_stage_results_moves_results_dir_aside(self, tmp_path):
+        """Validate that results of previous run are moved to archive directory"""
+
+        results_dir, archive_dir = tmp_path / "results", tmp_path / "results-archive"
+        _make_results(results_dir)
+
+        staged = stage_results(results_dir, archive_dir)
+
+        assert not results_dir.exists()
+        assert staged.parent == archive_dir
+        assert staged.name.startswith(RETENTION.PENDING_PREFIX)
+        assert (staged / "junit-report.xml").exists()
+
+    def test_stage_results_skips_missing_or_empty_results_dir(self, tmp_path):
+        """Validate that nothing is staged when there are no results"""
+
+        results_dir, archive_dir = tmp_path / "results", tmp_path / "results-archive"
+
+        assert stage_results(results_dir, archive_dir) is None
+
+        results_dir.mkdir()
+        assert stage_results(results_dir, archive_dir) is None
+
+    def test_archive_pending_creates_readable_bundle(self, tmp_path):
+        """Validate that staged results are compressed into a bundle"""
+
+        results_dir, archive_dir = tmp_path / "results", tmp_path / "results-archive"
+        _make_results(results_dir)
+        stage_results(results_dir, archive_dir)
+
+        bundles = archive_pending(archive_dir, compression=RETENTION.GZIP)
+
+        assert len(bundles) == 1
+        assert bundles[0].name.endswith(RETENTION.EXT[RETENTION.GZIP])
+        assert not list(archive_dir.glob(RETENTION.PENDING_PREFIX + "*"))
+        with tarfile.open(bundles[0]) as tar:
+            assert any(name.endswith("junit-report.xml") for name in tar.getnames())
+
+    def test_compact_keeps_latest_runs(self, tmp_path):
+        """Validate that only latest <keep_runs> bundles are kept"""
+
+        for idx in range(5):
+            (tmp_path / f"{RETENTION.BUNDLE_PREFIX}2024010{idx}_000000_000000.tar.gz").write_bytes(b"x")
+
+        removed = compact(tmp_path, keep_runs=2, keep_days=0)
+
+        assert len(removed) == 3
+        assert [b.name[:len(RETENTION.BUNDLE_PREFIX) + 8] for b in list_bundles(tmp_path)] == \
+               [f"{RETENTION.BUNDLE_PREFIX}20240104", f"{RETENTION.BUNDLE_PREFIX}20240103"]
+
+    def test_compact_removes_bundles_older_than_keep_days(self, tmp_path):
+        """Validate that bundles older than <keep_days> are removed"""
+
+        old = tmp_path / f"{RETENTION.BUNDLE_PREFIX}20240101_000000_000000.tar.gz"
+        new = tmp_path / f"{RETENTION.BUNDLE_PREFIX}20240102_000000_000000.tar.gz"
+        old.write_bytes(b"x")
+        new.write_bytes(b"x")
+        ten_days_ago = time.time() - 10 * 24 * 60 * 60
+        os.utime(old, (ten_days_ago, ten_days_ago))
+
+        removed = compact(tmp_path, keep_runs=0, keep_days=7)
+
+        assert removed == [old]
+        assert new.exists()
+
+    def test_start_compaction_runs_gc_in_background(self, tmp_path):
+        """Validate that startup compaction frees results dir and archives it in background"""
+
+        results_dir, archive_dir = tmp_path / "results", tmp_path / "results-archive"
+        _make_results(results_dir)
+
+        thread = start_compaction(results_dir, archive_dir, keep_runs=1, keep_days=0,
+                                  compression=RETENTION.GZIP)
+
+        assert not results_dir.exists()
+        thread.join(timeout=30)
+        assert len(list_bundles(archive_dir)) == 1
+
+        summary = gc(archive_dir, keep_runs=1, keep_days=0)
+        assert summary['archived'] == [] and summary['removed'] == []
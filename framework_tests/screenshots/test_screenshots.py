@@ -0,0 +1,90 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import pytest
+from PIL import Image
+
+from nrobo.util.screenshots import SCREENSHOT, ScreenshotPipeline, close_screenshot_pipeline, screenshot_report, \
+    screenshot_settings
+
+
+def screenshot(width=1280, height=800) -> bytes:
+    """noisy png, the size of a real screenshot"""
+    pixels = numpy.random.default_rng(0).integers(0, 255, (height, width, 3), dtype="uint8")
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def pipeline(**nconfig):
+    return ScreenshotPipeline(screenshot_settings(nconfig), executor_factory=ThreadPoolExecutor)
+
+
+class TestScreenshots:
+    """Tests for nrobo.util.screenshots package"""
+
+    @pytest.mark.parametrize("image_format, ext", [("webp", ".webp"), ("jpg", ".jpg")])
+    def test_passed_test_screenshot_is_transcoded_with_thumbnail(self, tmp_path, image_format, ext):
+        """Validate that screenshot of a passed test is replaced by a transcoded image and a thumbnail"""
+
+        screenshots = pipeline(**{SCREENSHOT.FORMAT: image_format})
+
+        image, thumbnail = screenshots.submit(screenshot(), tmp_path / "test_login.png")
+        stats = screenshots.close()
+
+        assert (image, thumbnail) == (str(tmp_path / f"test_login{ext}"), str(tmp_path / f"test_login_thumb{ext}"))
+        assert not (tmp_path / "test_login.png").exists()
+        with Image.open(image) as full, Image.open(thumbnail) as thumb:
+            assert full.size == (1280, 800)
+            assert thumb.size == (320, 200)
+        assert stats["screenshots"] == 1 and stats["stored_bytes"] < stats["png_bytes"]
+
+    def test_failed_test_keeps_png_original(self, tmp_path):
+        """Validate that screenshot of a failed test keeps its png original"""
+
+        screenshots = pipeline()
+
+        image, thumbnail = screenshots.submit(screenshot(), tmp_path / "test_login.png", failed=True)
+        screenshots.close()
+
+        assert image == str(tmp_path / "test_login.png")
+        assert (tmp_path / "test_login.png").read_bytes() == screenshot()
+        assert (tmp_path / "test_login.webp").exists() and (tmp_path / "test_login_thumb.webp").exists()
+
+    def test_max_width_downscales_transcoded_image(self, tmp_path):
+        """Validate that transcoded images wider than max width are downscaled"""
+
+        screenshots = pipeline(**{SCREENSHOT.MAX_WIDTH: 640})
+
+        image, _ = screenshots.submit(screenshot(), tmp_path / "test_login.png")
+        screenshots.close()
+
+        with Image.open(image) as full:
+            assert full.size == (640, 400)
+
+    def test_broken_screenshot_is_counted_as_error(self, tmp_path):
+        """Validate that a screenshot which is not an image is counted as error"""
+
+        screenshots = pipeline()
+        screenshots.submit(b"not a png", tmp_path / "test_login.png")
+        assert screenshots.close()["errors"] == 1
+
+    def test_invalid_format(self):
+        """Validate that an unsupported image format raises ValueError"""
+
+        with pytest.raises(ValueError):
+            pipeline(**{SCREENSHOT.FORMAT: "gif"})
+
+    def test_report_adds_up_processes(self, tmp_path, monkeypatch):
+        """Validate that screenshot report adds up statistics of all processes"""
+
+        import nrobo.util.screenshots as screenshots
+
+        for _ in range(2):
+            monkeypatch.setattr(screenshots, "_PIPELINE", pipeline())
+            screenshots._PIPELINE.submit(screenshot(64, 64), tmp_path / "shots" / "test_login.png")
+            close_screenshot_pipeline(tmp_path)
+
+        assert screenshot_report(tmp_path)["screenshots"] == 2
+        assert not (tmp_path / SCREENSHOT.STATS_FILE).exists()
@@ -0,0 +1,164 @@
+import pytest
+
+from nrobo.selenese import forms
+from nrobo.selenese.form_benchmark import measure, round_trips, stand_in_form
+from nrobo.selenese.forms import FORMS, clear_many, fill_form, typing_actions
+
+pytest.importorskip("selenium")
+
+
+class Element:
+
+    def __init__(self, id, checked=None):
+        self.id = id
+        self.checked = checked
+
+
+class StubDriver:
+    """Answers fill and find scripts from a dict of fields, every command is a round trip"""
+
+    def __init__(self, fields, platform="linux"):
+        self.fields = fields  # (by, value): value, or Element for find script
+        self.capabilities = {"platformName": platform}
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append((command, params))
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.execute("w3cExecuteScript", {"script": script, "args": args})
+        if script.startswith("/* nrobo fill form */"):
+            missing = []
+            for index, (by, value, text) in enumerate(args[0]):
+                if (by, value) in self.fields:
+                    self.fields[(by, value)] = text
+                else:
+                    missing.append(index)
+            return missing
+        if script.startswith("/* nrobo find fields */"):
+            elements = [self.fields.get((by, value)) for by, value, _ in args[0]]
+            elements = [element if element is None or isinstance(element, Element) else Element(value)
+                        for element, (by, value, _) in zip(elements, args[0])]
+            return [None if element is None else [element, element.checked] for element in elements]
+        return list(self.fields.values())
+
+
+class TestForms:
+    """Tests for nrobo.selenese.forms module"""
+
+    def test_fill_form_sets_every_field_in_one_round_trip(self):
+        """Validate that fill_form sets every field with one script"""
+
+        driver = StubDriver({("id", "name"): "", ("name", "age"): "", ("id", "terms"): False})
+
+        fill_form(driver, {("id", "name"): "Panchdev", ("name", "age"): 30, ("id", "terms"): True})
+
+        assert len(driver.commands) == 1
+        assert driver.fields == {("id", "name"): "Panchdev", ("name", "age"): "30", ("id", "terms"): True}
+
+    def test_fields_not_present_are_looked_up_again(self, monkeypatch):
+        """Validate that fields not rendered yet are filled by a later lookup"""
+
+        driver = StubDriver({("id", "name"): ""})
+        monkeypatch.setattr(FORMS, "POLL", 0)
+        original = driver.execute_script
+
+        def appearing(script, *args):
+            if len(driver.commands) == 1:
+                driver.fields.setdefault(("id", "late"), "")  # field rendered after first lookup
+            return original(script, *args)
+
+        driver.execute_script = appearing
+        fill_form(driver, {("id", "name"): "a", ("id", "late"): "b"}, timeout=5)
+
+        assert driver.fields == {("id", "name"): "a", ("id", "late"): "b"}
+        assert len(driver.commands) == 2
+        assert driver.commands[1][1]["args"][0] == [["id", "late", "b"]]
+
+    def test_missing_field_times_out(self):
+        """Validate that a field which never appears raises TimeoutException naming it"""
+
+        from selenium.common import TimeoutException
+
+        with pytest.raises(TimeoutException, match="'id', 'gone'"):
+            fill_form(StubDriver({("id", "name"): ""}), {("id", "name"): "a", ("id", "gone"): "b"}, timeout=0)
+
+    def test_typing_is_one_find_and_one_actions_payload(self):
+        """Validate that typing mode finds fields with one script and types with one actions payload"""
+
+        driver = StubDriver({("id", "name"): Element("e1"), ("id", "terms"): Element("e2", checked=False),
+                             ("id", "news"): Element("e3", checked=True)})
+
+        fill_form(driver, {("id", "name"): "ab", ("id", "terms"): True, ("id", "news"): True}, typing=True)
+
+        assert [command for command, _ in driver.commands] == ["w3cExecuteScript", "actions"]
+        pointer, keys = driver.commands[1][1]["actions"]
+        assert len(pointer["actions"]) == len(keys["actions"])
+        clicked = [action["origin"][FORMS.ELEMENT_KEY] for action in pointer["actions"]
+                   if action["type"] == "pointerMove"]
+        assert clicked == ["e1", "e2"]  # news already checked
+        typed = [action["value"] for action in keys["actions"] if action["type"] == "keyDown"]
+        assert typed == [FORMS.CONTROL, "a", FORMS.DELETE, "a", "b"]
+
+    def test_typing_selects_all_with_command_on_mac(self):
+        """Validate that typing mode selects field content with command key on mac"""
+
+        payload = typing_actions([["id", "name", "x"]], [[Element("e1"), None]], forms.select_all_key(
+            StubDriver({}, platform="mac")))
+
+        assert payload["actions"][1]["actions"][3] == {"type": "keyDown", "value": FORMS.COMMAND}
+
+    def test_typing_bool_into_text_field(self):
+        """Validate that True and False are typed into fields which are not checkable"""
+
+        payload = typing_actions([["id", "remember", True], ["id", "opt-out", False]],
+                                 [[Element("e1"), None], [Element("e2"), None]])
+
+        typed = [action["value"] for action in payload["actions"][1]["actions"] if action["type"] == "keyDown"]
+        assert typed == [FORMS.CONTROL, "a", FORMS.DELETE, *"true", FORMS.CONTROL, "a", FORMS.DELETE, *"false"]
+
+    def test_clear_many(self):
+        """Validate that clear_many clears every field with one script"""
+
+        driver = StubDriver({("id", "name"): "old", ("css selector", ".email"): "old"})
+
+        clear_many(driver, [("id", "name"), ("css selector", ".email")])
+
+        assert len(driver.commands) == 1
+        assert set(driver.fields.values()) == {""}
+
+
+class TestFormBenchmark:
+    """Tests for nrobo.selenese.form_benchmark module"""
+
+    def test_benchmark_counts_round_trips(self):
+        """Validate that benchmark counts round trips of field by field and fill_form filling"""
+
+        class Page:
+            """Page object sending one command per find, clear and send keys"""
+
+            def __init__(self, driver):
+                self.driver = driver
+
+            def clear(self, by, value):
+                self.driver.execute("findElement")
+                self.driver.execute("actions")
+
+            def send_keys(self, by, value, text):
+                self.driver.execute("findElement")
+                self.driver.fields[(by, value)] = text
+
+            def fill_form(self, fields, typing=False):
+                fill_form(self.driver, fields, typing=typing)
+
+        fields = {("id", f"field-{index}"): "" for index in range(3)}
+        driver = StubDriver(fields)
+        driver.get = lambda url: fields.update({key: "" for key in fields})
+        with round_trips(driver) as trips:
+            driver.execute("status")
+        assert trips["count"] == 1 and "execute" not in vars(driver)
+
+        results = measure(Page(driver), "http://stand-in", 3)
+        assert [(result["round_trips"], result["filled"]) for result in results[:2]] == [(9, True), (1, True)]
+        assert stand_in_form(3).count("<input") == 3
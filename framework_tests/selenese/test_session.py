@@ -0,0 +1,118 @@
+import logging
+
+import pytest
+
+from nrobo import EnvKeys
+from nrobo.selenese.page_benchmark import StandInDriver, measure
+from nrobo.selenese.session import DriverSession, driver_session
+
+pytest.importorskip("selenium")
+
+
+@pytest.fixture
+def web(monkeypatch):
+    monkeypatch.setenv(EnvKeys.APPIUM, "0")
+
+
+class TestSession:
+    """Tests for nrobo.selenese.session module"""
+
+    def test_session_is_per_driver(self):
+        """Validate that every driver has one session and config is read for a new session only"""
+
+        driver, other = StandInDriver(), StandInDriver()
+
+        session = driver_session(driver, {"wait": 1})
+
+        assert driver_session(driver) is session
+        assert driver_session(other) is not session
+        assert session.nconfig == {"wait": 1}
+        assert driver_session(driver, lambda: pytest.fail("config read for existing session")) is session
+        assert driver_session(StandInDriver(), lambda: {"wait": 2}).nconfig == {"wait": 2}
+        with pytest.raises(AttributeError):
+            session.anything = 1  # __slots__
+
+    def test_session_marks_page_changed_by_changing_commands(self):
+        """Validate that commands which may change the page mark it changed"""
+
+        driver = StandInDriver()
+        session = driver_session(driver)
+        session.page_changed = False
+
+        driver.execute("findElement", {"using": "id", "value": "a"})
+        driver.execute_script("/* nrobo snapshot */ return 1")
+        assert not session.page_changed
+
+        driver.execute("clickElement", {"id": "a"})
+        assert session.page_changed
+        assert driver.commands == 3  # commands still reach the driver
+
+    def test_snapshot_unwatch_keeps_session_watching(self):
+        """Validate that snapshot and session watch commands independently of each other"""
+
+        from nrobo.selenese.listeners import remove_command_listener
+        from nrobo.selenese.snapshot import Snapshot
+
+        driver = StandInDriver()
+        session = driver_session(driver)
+        snapshot = Snapshot(driver, kind="html")
+        snapshot.watch()
+        session.page_changed = False
+
+        snapshot.unwatch()  # used to restore execute from before the session wrapped it
+        driver.execute("clickElement", {"id": "a"})
+        assert session.page_changed
+
+        snapshot.watch()
+        remove_command_listener(driver, session._on_command)
+        driver.execute("get", {"url": "http://app/next"})
+        assert snapshot.stale_by == "get"
+
+        snapshot.unwatch()
+        assert "execute" not in driver.__dict__  # last listener gone, driver's own execute again
+
+    def test_page_objects_share_session(self, web):
+        """Validate that page objects of one driver share its session"""
+
+        from nrobo.selenese import NRobo
+
+        driver = StandInDriver()
+        first, second = NRobo(driver, logging.getLogger()), NRobo(driver, logging.getLogger())
+
+        assert first.session is second.session and isinstance(first.session, DriverSession)
+        first.windows["Home"] = "handle-1"
+        assert second.windows == {"Home": "handle-1"}
+        assert first.action_chain() is second.action_chain()
+        assert first.print_options is second.print_options
+        assert first.nconfig is second.nconfig
+
+    def test_page_object_waits_for_page_load_only_after_page_changed(self, web):
+        """Validate that a new page object waits for page load only after the page changed"""
+
+        from nrobo.selenese import NRobo
+
+        driver = StandInDriver()
+        NRobo(driver, logging.getLogger())
+        assert driver.commands == 2  # page load timeout and ready state, once per session
+
+        NRobo(driver, logging.getLogger())
+        assert driver.commands == 2
+
+        driver.get("http://app/next")
+        NRobo(driver, logging.getLogger())
+        assert driver.commands == 4  # get and ready state
+
+
+class TestPageBenchmark:
+    """Tests for nrobo.selenese.page_benchmark module"""
+
+    def test_benchmark_measures_creation(self, web):
+        """Validate that benchmark measures page object creation with and without navigation"""
+
+        from nrobo.selenese import NRobo
+
+        same_page, navigated = measure(NRobo, 50), measure(NRobo, 50, navigate=True)
+
+        assert same_page["commands_per_page"] == 0
+        assert navigated["commands_per_page"] == 1
+        assert same_page["mean_us"] > 0
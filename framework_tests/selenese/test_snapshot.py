@@ -0,0 +1,122 @@
+import pytest
+
+from nrobo.exceptions import NRoBoStaleSnapshot
+from nrobo.selenese.snapshot import SNAPSHOT, Snapshot
+
+pytest.importorskip("lxml")
+
+PAGE = """<html><head><title>Orders</title></head><body>
+<h1 id="heading">Your <b>orders</b></h1>
+<table><tr class="order first"><td>A-1</td></tr><tr class="order"><td>A-2</td></tr></table>
+<a href="/help">Need  help?</a>
+<input name="q" disabled>
+<div style="display: none"><span class="note">hidden note</span></div>
+<p>Total <span hidden>(draft)</span>: 2</p>
+</body></html>"""
+
+HIERARCHY = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy><android.widget.FrameLayout displayed="true">
+<android.widget.Button resource-id="com.nrobo.app:id/login" content-desc="Login" text="Log in"
+    enabled="true" displayed="true"/>
+<android.widget.CheckBox resource-id="com.nrobo.app:id/remember" text="Remember me" checked="true"
+    displayed="false"/>
+</android.widget.FrameLayout></hierarchy>"""
+
+
+class StubDriver:
+
+    def __init__(self, source, capabilities=None):
+        self.source = source
+        self.capabilities = capabilities or {"browserName": "chrome"}
+        self.mutations = 0
+        self.commands = []
+
+    @property
+    def page_source(self):
+        self.commands.append("getPageSource")
+        return self.source
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.execute("w3cExecuteScript", {"script": script, "args": args})
+        if "outerHTML" in script:
+            return [self.source, self.mutations, "http://app/orders"]
+        return [self.mutations, "http://app/orders"]
+
+
+class TestSnapshot:
+    """Tests for nrobo.selenese.snapshot module"""
+
+    def test_html_queries_share_one_fetch(self):
+        """Validate that all queries of an html snapshot are answered from one page fetch"""
+
+        driver = StubDriver(PAGE)
+
+        with Snapshot(driver) as dom:
+            assert dom.text("id", "heading") == "Your orders"
+            assert dom.text(("xpath", "//h1")) == "Your orders"
+            assert dom.count("css selector", "tr.order") == 2
+            assert dom.texts("class name", "order") == ["A-1", "A-2"]
+            assert dom.get_attribute("href", ("link text", "Need help?")) == "/help"
+            assert dom.exists("partial link text", "help")
+            assert not dom.is_enabled("name", "q")
+            assert not dom.is_displayed("css selector", "span.note")
+            assert dom.text("tag name", "P") == "Total : 2"
+
+        assert driver.commands == ["w3cExecuteScript"]
+
+    def test_action_makes_snapshot_stale(self):
+        """Validate that a command changing the page makes the snapshot stale until refreshed"""
+
+        driver = StubDriver(PAGE)
+
+        with Snapshot(driver) as dom:
+            driver.execute("getElementText")
+            driver.execute("w3cExecuteScript", {"script": "/* isDisplayed */return (function(){})"})
+            assert dom.text("id", "heading") == "Your orders"
+
+            driver.execute("clickElement", {"id": "1"})
+            assert dom.is_stale()
+            with pytest.raises(NRoBoStaleSnapshot, match="clickElement"):
+                dom.text("id", "heading")
+
+            dom.refresh()
+            assert dom.text("id", "heading") == "Your orders"
+
+        assert "execute" not in driver.__dict__
+
+    def test_page_changing_by_itself_is_detected_on_verify(self):
+        """Validate that page mutations are detected when staleness is verified"""
+
+        driver = StubDriver(PAGE)
+
+        with Snapshot(driver) as dom:
+            assert not dom.is_stale(verify=True)
+            driver.mutations = 3
+            assert not dom.is_stale()
+            assert dom.is_stale(verify=True)
+
+    def test_appium_xml_queries(self):
+        """Validate that appium page source is queried as xml snapshot"""
+
+        driver = StubDriver(HIERARCHY, {"platformName": "Android"})
+
+        with Snapshot(driver) as dom:
+            assert dom.kind == SNAPSHOT.XML
+            assert dom.text("id", "login") == "Log in"
+            assert dom.text("accessibility id", "Login") == "Log in"
+            assert dom.count("class name", "android.widget.CheckBox") == 1
+            assert dom.is_selected("xpath", "//*[@text='Remember me']")
+            assert not dom.is_displayed("id", "com.nrobo.app:id/remember")
+
+        assert driver.commands == ["getPageSource"]
+
+    def test_unsupported_locator(self):
+        """Validate that a locator not answerable from a snapshot raises ValueError"""
+
+        with Snapshot(StubDriver(HIERARCHY, {"platformName": "Android"})) as dom:
+            with pytest.raises(ValueError, match="-android uiautomator"):
+                dom.find_elements("-android uiautomator", "new UiSelector()")
@@ -0,0 +1,103 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from nrobo.exceptions import NRoBoInvalidShard
+from nrobo.util.sharding import SHARD, parse_shard, partition, select_shard, merge_junit, merge_results, \
+    append_result, load_durations, start_results
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites name="pytest tests">
+<testsuite name="pytest" errors="0" failures="{failures}" skipped="0" tests="2" time="{time}">
+<testcase classname="tests.web.test_{shard}" name="test_a" time="1.0"/>
+<testcase classname="tests.web.test_{shard}" name="test_b" time="2.0"><failure message="boom">trace</failure></testcase>
+</testsuite>
+</testsuites>
+"""
+
+
+class TestShardingPkg:
+    """Tests for nrobo.util.sharding package"""
+
+    def test_parse_shard(self):
+        """Validate shard spec parsing"""
+
+        assert parse_shard("2/5") == (2, 5)
+
+        for invalid in ["0/3", "4/3", "a/b", "3", "1/0"]:
+            with pytest.raises(NRoBoInvalidShard):
+                parse_shard(invalid)
+
+    def test_partition_covers_all_tests_exactly_once(self):
+        """Validate that shards are disjoint and complete"""
+
+        nodeids = [f"tests/test_mod.py::test_{idx}" for idx in range(23)]
+        shards = partition(nodeids, 4)
+
+        assert sorted(sum(shards, [])) == sorted(nodeids)
+        assert max(len(s) for s in shards) - min(len(s) for s in shards) <= 1
+
+    def test_partition_is_duration_balanced_and_deterministic(self):
+        """Validate that long tests are spread across shards"""
+
+        durations = {"t::slow1": 60, "t::slow2": 60, "t::fast1": 1, "t::fast2": 1, "t::fast3": 1}
+        nodeids = list(durations)
+
+        shards = partition(nodeids, 2, durations)
+
+        assert [set(s) for s in shards] == [set(s) for s in partition(list(reversed(nodeids)), 2, durations)]
+        assert {"t::slow1", "t::slow2"} & set(shards[0]) and {"t::slow1", "t::slow2"} & set(shards[1])
+        assert select_shard(nodeids, "1/2", durations) == shards[0]
+        assert select_shard(nodeids, "1/2", durations) == select_shard(nodeids, "1/2", dict(durations))
+
+    def test_merge_junit_sums_counters(self, tmp_path):
+        """Validate that junit files are merged into one report"""
+
+        files = []
+        for shard in [1, 2]:
+            junit_file = tmp_path / f"junit_{shard}.xml"
+            junit_file.write_text(JUNIT.format(failures=1, time=3.0, shard=shard))
+            files.append(junit_file)
+
+        totals = merge_junit(files, tmp_path / "merged.xml")
+
+        root = ET.parse(tmp_path / "merged.xml").getroot()
+        assert totals["tests"] == 4 and totals["failures"] == 2
+        assert root.get("tests") == "4" and root.get("time") == "6.0"
+        assert len(root.findall("testsuite")) == 2
+        assert len(root.findall("testsuite/testcase")) == 4
+        assert root.find("testsuite/testcase/failure").get("message") == "boom"
+
+    def test_merge_results_of_shards(self, tmp_path):
+        """Validate that results directories of shards are merged"""
+
+        dirs = []
+        for shard in [1, 2]:
+            results_dir = tmp_path / f"shard{shard}" / "results"
+            (results_dir / SHARD.ALLURE_DIR).mkdir(parents=True)
+            (results_dir / SHARD.JUNIT_FILE).write_text(JUNIT.format(failures=0, time=3.0, shard=shard))
+            (results_dir / SHARD.ALLURE_DIR / f"uuid{shard}-result.json").write_text("{}")
+            append_result(results_dir / SHARD.RESULTS_FILE,
+                          {"nodeid": f"tests/test_{shard}.py::test_a", "duration": float(shard), "outcome": "passed"})
+            dirs.append(results_dir)
+
+        summary = merge_results(dirs, tmp_path / "merged", durations_file=tmp_path / SHARD.DURATIONS_FILE)
+
+        assert summary["junit"]["tests"] == 4
+        assert summary["allure_files"] == 2
+        assert summary["tests"] == 2
+        assert load_durations(tmp_path / SHARD.DURATIONS_FILE) == {"tests/test_1.py::test_a": 1.0,
+                                                                  "tests/test_2.py::test_a": 2.0}
+        with open(tmp_path / "merged" / SHARD.RESULTS_FILE) as f:
+            assert [json.loads(line)["outcome"] for line in f] == ["passed", "passed"]
+
+    def test_next_run_starts_without_results_of_previous_run(self, tmp_path):
+        """Validate that result data of a previous run is not merged into durations of the next one"""
+
+        append_result(tmp_path / SHARD.RESULTS_FILE, {"nodeid": "tests/test_a.py::test_a", "duration": 1.0,
+                                                      "outcome": "passed"})
+        start_results(tmp_path)
+        start_results(tmp_path)  # nothing to remove
+
+        assert not (tmp_path / SHARD.RESULTS_FILE).exists()
@@ -545,6 +545,22 @@ class TestNRoboFrameworkPaths():
 
         assert nrobo_util_regex_pkg_path.exists()
 
+    def test_util_retention_pkg_is_present(self):
+        """Validate that nrobo.util.retention package is present_release"""
+        set_environment()
+
+        nrobo_util_retention_pkg_path = Path(os.environ[EnvKeys.EXEC_DIR]) / NROBO_PATHS.UTIL_RETENTION_PKG
+
+        assert nrobo_util_retention_pkg_path.exists()
+
+    def test_util_sharding_pkg_is_present(self):
+        """Validate that nrobo.util.sharding package is present_release"""
+        set_environment()
+
+        nrobo_util_sharding_pkg_path = Path(os.environ[EnvKeys.EXEC_DIR]) / NROBO_PATHS.UTIL_SHARDING_PKG
+
+        assert nrobo_util_sharding_pkg_path.exists()
+
     def test_util_version_pkg_is_present(self):
         """Validate that nrobo.util.version package is present_release"""
         set_environment()
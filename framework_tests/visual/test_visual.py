@@ -0,0 +1,225 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy
+import pytest
+from PIL import Image
+
+from nrobo.util.visual import VISUAL, VisualChecker, baseline_path, finish_visual_checks, png_size, visual_report, \
+    visual_settings
+from nrobo.util.visual.compare import compare_images, diff_image, failed_blocks
+
+
+def page(width=64, height=48):
+    """white page with a black box"""
+    image = numpy.full((height, width, 3), 255, dtype="uint8")
+    image[10:20, 10:30] = 0
+    return image
+
+
+def png(image) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class Element:
+
+    def __init__(self, image, rect):
+        self.screenshot_as_png = png(image)
+        self.rect = rect
+
+
+class Driver:
+
+    def __init__(self, image, capabilities=None):
+        self.image = image
+        self.capabilities = capabilities or {"browserName": "chrome"}
+        self.elements = {}
+        self.client_rects = {}
+
+    def get_screenshot_as_png(self):
+        return png(self.image)
+
+    def get_window_size(self):
+        return {"width": self.image.shape[1], "height": self.image.shape[0]}
+
+    def find_element(self, by, value):
+        return self.elements[value]
+
+    def execute_script(self, script, *elements):
+        """css pixels are half of screenshot pixels"""
+        return [self.image.shape[1] / 2, [self.client_rects[id(element)] for element in elements]]
+
+
+class TestCompare:
+    """Tests for nrobo.util.visual.compare module"""
+
+    def test_identical_images_pass(self):
+        """Validate that identical images pass"""
+
+        assert compare_images(page(), page()).passed
+
+    def test_small_colour_noise_is_within_tolerance(self):
+        """Validate that small colour differences are within pixel tolerance"""
+
+        actual = page().astype("int16")
+        actual[30:40, 30:40] -= 10
+        assert compare_images(page(), actual.astype("uint8")).passed
+
+    def test_changed_box_fails_blocks(self):
+        """Validate that a changed area fails its blocks and is marked in the diff image"""
+
+        actual = page()
+        actual[30:40, 40:60] = 0
+
+        diff = compare_images(page(), actual)
+
+        assert not diff.passed
+        assert diff.diff_pixels == 200
+        assert diff.failed_blocks == [(32, 32, 32, 16)]  # 40 of 1024 pixels of block above is within tolerance
+        assert diff_image(page(), actual, diff)[35, 50].tolist() == [255, 0, 0]
+
+    def test_masked_change_passes(self):
+        """Validate that changes inside masks are ignored"""
+
+        actual = page()
+        actual[30:40, 40:60] = 0
+        assert compare_images(page(), actual, masks=[(40, 30, 20, 10)]).passed
+
+    def test_anti_aliased_edge_passes(self):
+        """Validate that an edge shifted by anti-aliasing passes unless anti-aliasing detection is off"""
+
+        actual = page()
+        actual[10:20, 30] = 0  # edge of box shifted by a pixel the way sub pixel rendering does
+        assert compare_images(page(), actual, max_diff_ratio=0.0, block_tolerance=0.0).passed
+        assert not compare_images(page(), actual, max_diff_ratio=0.0, block_tolerance=0.0, anti_aliasing=False).passed
+
+    def test_size_change_fails(self):
+        """Validate that images of different size fail"""
+
+        diff = compare_images(page(), page(width=80))
+        assert not diff.passed and "Size differs" in diff.summary()
+
+    def test_failed_blocks_of_partial_edge_block(self):
+        """Validate that blocks at image edges are clipped to the image"""
+
+        mask = numpy.zeros((40, 40), dtype=bool)
+        mask[35:40, 35:40] = True
+        assert failed_blocks(mask, 32, 0.05) == [(32, 32, 8, 8)]
+
+
+def checker(tmp_path, mode=VISUAL.IMMEDIATE, **nconfig):
+    settings = visual_settings({VISUAL.BASELINE_DIR: str(tmp_path / "baselines"), VISUAL.MODE: mode, **nconfig})
+    return VisualChecker(settings, tmp_path / "results", executor_factory=ThreadPoolExecutor)
+
+
+class TestVisual:
+    """Tests for nrobo.util.visual package"""
+
+    def test_first_run_records_baseline_then_compares(self, tmp_path):
+        """Validate that first check records the baseline and later checks compare with it"""
+
+        driver = Driver(page())
+
+        assert checker(tmp_path).check(driver, "home")["status"] == VISUAL.NEW
+        assert baseline_path(tmp_path / "baselines", "chrome", "64x48", "home").exists()
+        assert checker(tmp_path).check(driver, "home")["status"] == VISUAL.PASSED
+
+        driver.image = page()
+        driver.image[30:40, 40:60] = 0
+        with pytest.raises(AssertionError, match="Visual check home"):
+            checker(tmp_path).check(driver, "home")
+        assert (tmp_path / "results" / VISUAL.DIFF_DIR / "chrome" / "64x48" / "home-diff.png").exists()
+
+    def test_update_mode_replaces_baseline(self, tmp_path):
+        """Validate that update mode replaces the baseline"""
+
+        checker(tmp_path).check(Driver(page()), "home")
+        changed = page()
+        changed[30:40, 40:60] = 0
+
+        result = checker(tmp_path, **{VISUAL.UPDATE: True}).check(Driver(changed), "home")
+
+        assert result["status"] == VISUAL.UPDATED
+        assert checker(tmp_path).check(Driver(changed), "home")["passed"]
+
+    def test_region_and_masks_in_screenshot_pixels(self, tmp_path):
+        """Validate that region and masks of web pages are converted to screenshot pixels"""
+
+        driver = Driver(page())
+        region = Element(page(), {})
+        mask = Element(page(), {})
+        driver.elements = {"region": region, "clock": mask}
+        driver.client_rects = {id(region): [5, 5, 32, 24], id(mask): [25, 20, 10, 5]}
+
+        job = checker(tmp_path).capture(driver, "card", region=("id", "region"), mask=[("id", "clock"), (0, 0, 4, 4)])
+
+        assert png_size(job["actual"]) == (64, 48)
+        assert job["masks"] == [(0, 0, 4, 4), (40.0, 30.0, 20.0, 10.0)]
+
+    def test_native_app_masks_use_element_rects(self, tmp_path):
+        """Validate that masks of native apps use element rects as they are"""
+
+        driver = Driver(page(), {"platformName": "Android"})
+        driver.elements = {"clock": Element(page(), {"x": 40, "y": 30, "width": 20, "height": 10})}
+
+        job = checker(tmp_path).capture(driver, "home", mask=[("id", "clock")])
+
+        assert (job["browser"], job["viewport"]) == ("Android", "64x48")
+        assert job["masks"] == [(40, 30, 20, 10)]
+
+    @pytest.mark.parametrize("mode", [VISUAL.DEFERRED, VISUAL.BATCH])
+    def test_later_modes_do_not_fail_test_right_away(self, tmp_path, mode, monkeypatch):
+        """Validate that deferred and batch modes compare after the test instead of failing it right away"""
+
+        monkeypatch.setenv("PYTEST_CURRENT_TEST", "test_home.py::test_home (call)")
+        checker(tmp_path).check(Driver(page()), "home")
+        changed = page()
+        changed[30:40, 40:60] = 0
+        visual = checker(tmp_path, mode)
+
+        assert visual.check(Driver(changed), "home") is None
+
+        if mode == VISUAL.DEFERRED:
+            assert len(visual.resolve("test_home.py::test_home")) == 1
+            assert visual.finish()[0]["status"] == VISUAL.FAILED
+        else:
+            assert visual.resolve("test_home.py::test_home") == []
+            assert visual.finish()[0]["nodeid"] == "test_home.py::test_home"
+            assert not list((tmp_path / "results" / VISUAL.PENDING_DIR).iterdir())
+
+    def test_batch_workers_keep_their_own_screenshots(self, tmp_path, monkeypatch):
+        """Validate that batch mode workers finish their own pending screenshots only"""
+
+        monkeypatch.setenv("PYTEST_CURRENT_TEST", "test_home.py::test_home (call)")
+        checkers = []
+        for worker in ["gw0", "gw1"]:
+            monkeypatch.setenv("PYTEST_XDIST_WORKER", worker)
+            checkers.append(checker(tmp_path, VISUAL.BATCH))
+            checkers[-1].check(Driver(page()), "home")
+
+        first, second = checkers
+        assert first.pending_dir != second.pending_dir
+        assert first.finish()[0]["status"] == VISUAL.NEW
+        assert Path(second._batch[0]["actual"]).exists()  # not removed by finish() of the other worker
+        assert second.finish()[0]["status"] == VISUAL.PASSED
+        assert not list((tmp_path / "results" / VISUAL.PENDING_DIR).iterdir())
+
+    def test_visual_report_counts_results_of_run(self, tmp_path, monkeypatch):
+        """Validate that visual report counts checks of the run"""
+
+        import nrobo.util.visual as visual
+
+        changed = page()
+        changed[30:40, 40:60] = 0
+        for image in [page(), changed]:
+            monkeypatch.setattr(visual, "_CHECKER", checker(tmp_path, VISUAL.BATCH))
+            visual._CHECKER.check(Driver(image), "home")
+            finish_visual_checks(tmp_path / "results")
+
+        report = visual_report(tmp_path / "results")
+
+        assert (report["checks"], report["new"], report["failed"]) == (2, 1, 1)
+        assert (tmp_path / "results" / VISUAL.REPORT_FILE).exists()
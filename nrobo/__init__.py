@@ -25,6 +25,8 @@ from pathlib import Path
 class DB_CONNECTOR_TYPE:
     """Database Connector Types"""
     MYSQL = "mysql"
+    SQLITE = "sqlite"
+    POSTGRESQL = "postgresql"
 
 class NROBO_CONST:
     """nrobo special constants"""
@@ -191,6 +193,10 @@ class NROBO_PATHS:
     UTIL_PYTHON_PKG = NROBO / UTIL / UTIL_PYTHON / INIT_PY
     UTIL_REGEX = Path("regex")
     UTIL_REGEX_PKG = NROBO / UTIL / UTIL_REGEX / INIT_PY
+    UTIL_RETENTION = Path("retention")
+    UTIL_RETENTION_PKG = NROBO / UTIL / UTIL_RETENTION / INIT_PY
+    UTIL_SHARDING = Path("sharding")
+    UTIL_SHARDING_PKG = NROBO / UTIL / UTIL_SHARDING / INIT_PY
     UTIL_VERSION = Path("version")
     UTIL_VERSION_PKG = NROBO / UTIL / UTIL_VERSION / INIT_PY
     CONFTEST_PY = Path("conftest.py")
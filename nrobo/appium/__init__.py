@@ -24,3 +24,18 @@ class AUTOMATION_NAMES:
 
     UI_AUTOMATION2 = 'uiautomator2'
     XCUITEST = 'XCUITest'
+
+
+def appium_options(capabilities: dict):
+    """Returns appium options of automationName of given <capabilities>"""
+
+    if capabilities[CAPABILITY.AUTOMATION_NAME] == AUTOMATION_NAMES.UI_AUTOMATION2:
+        """Create uiautomator2 driver instance"""
+        from appium.options.android import UiAutomator2Options
+
+        return UiAutomator2Options().load_capabilities(capabilities)
+
+    elif capabilities[CAPABILITY.AUTOMATION_NAME] == AUTOMATION_NAMES.XCUITEST:
+        from appium.options.ios import XCUITestOptions
+
+        return XCUITestOptions().load_capabilities(capabilities)
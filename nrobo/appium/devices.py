@@ -0,0 +1,353 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Spread mobile tests over a rack of devices.
+
+Devices are listed in a device inventory file in appium directory,
+named by appium_devices in nrobo-config.yaml:
+
+    devices:
+      pixel-7:
+        endpoint: http://localhost:4723
+        tags: [tablet]
+        capabilities:
+          platformName: Android
+          appium:automationName: uiautomator2
+          appium:udid: emulator-5554
+      iphone-15:
+        endpoint: http://localhost:4724
+        capabilities: ...
+
+Every test worker leases a device exclusively and keeps it while its
+tests fit. A test marked with platform markers (platformName of devices
+and their tags, e.g. @pytest.mark.android, @pytest.mark.tablet) gets a
+device carrying all of them. A device whose session can not be created
+or whose appium server stops answering is marked unhealthy, so workers
+move on to other devices till its cooldown passes. Busy time of every
+device is reported as utilisation at the end of the run.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import os
+import time
+import urllib.request
+from pathlib import Path
+from typing import Callable, Union
+
+from nrobo.exceptions import NRoBoNoDeviceAvailable
+
+
+class DEVICES:
+    """Device scheduler settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    INVENTORY = "appium_devices"  # inventory file in appium directory
+    LEASE_DIR = "appium_device_lease_dir"
+    LEASE_TIMEOUT = "appium_device_lease_timeout"  # seconds to wait for a busy device
+    COOLDOWN = "appium_device_cooldown"  # seconds an unhealthy device is skipped
+
+    DEFAULT_LEASE_DIR = ".nrobo-device-leases"
+    DEFAULT_LEASE_TIMEOUT = 600
+    DEFAULT_COOLDOWN = 300
+    POLL_INTERVAL = 1
+    HEALTH_TIMEOUT = 5
+
+    LEASE_EXTENSION = ".lease"
+    UNHEALTHY_EXTENSION = ".unhealthy"
+    USAGE_FILE = "device-usage.jsonl"
+    REPORT_FILE = "device-utilisation.json"
+    PLATFORM_NAME = "platformName"
+
+
+class Device:
+    """Device of inventory"""
+
+    def __init__(self, name: str, endpoint: str, capabilities: dict, tags: [str] = ()):
+        self.name = name
+        self.endpoint = endpoint.rstrip("/")
+        self.capabilities = dict(capabilities or {})
+        platform = str(self.capabilities.get(DEVICES.PLATFORM_NAME, "")).lower()
+        self.tags = {str(tag).lower() for tag in tags} | ({platform} if platform else set())
+
+    def session_capabilities(self, capabilities: dict) -> dict:
+        """Capabilities of capability file overridden by capabilities of this device"""
+        return {**(capabilities or {}), **self.capabilities}
+
+    def matches(self, tags: set) -> bool:
+        return tags <= self.tags
+
+    def __repr__(self):
+        return f"Device({self.name}, {self.endpoint})"
+
+
+def load_inventory(inventory: dict) -> [Device]:
+    """Devices of parsed device inventory file"""
+
+    return [Device(name, entry["endpoint"], entry.get("capabilities"), entry.get("tags", []))
+            for name, entry in ((inventory or {}).get("devices") or {}).items()]
+
+
+def required_tags(item, known_tags: set) -> set:
+    """Platform markers of test <item>: its markers naming a device platform or tag"""
+    return {marker.name.lower() for marker in item.iter_markers()} & known_tags
+
+
+def endpoint_healthy(endpoint: str, timeout: float = DEVICES.HEALTH_TIMEOUT) -> bool:
+    """True if appium server at <endpoint> answers its status endpoint"""
+
+    try:
+        with urllib.request.urlopen(f"{endpoint}/status", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def process_alive(pid: int) -> bool:
+    """True if process <pid> holding a lease still runs"""
+
+    if pid == os.getpid():
+        return True
+
+    import psutil
+    return psutil.pid_exists(pid)
+
+
+class DeviceLeases:
+    """Exclusive device leases shared by processes of this machine through lease files"""
+
+    def __init__(self, directory: Union[str, Path], cooldown: float = DEVICES.DEFAULT_COOLDOWN,
+                 clock: Callable = time.time, alive: Callable = process_alive):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.cooldown = cooldown
+        self.clock = clock
+        self.alive = alive
+
+    def _lease_file(self, device: Device) -> Path:
+        return self.directory / (device.name + DEVICES.LEASE_EXTENSION)
+
+    def _unhealthy_file(self, device: Device) -> Path:
+        return self.directory / (device.name + DEVICES.UNHEALTHY_EXTENSION)
+
+    def try_lease(self, device: Device, owner: str) -> bool:
+        """Lease <device> to <owner> unless another live process holds it"""
+
+        lease = self._lease_file(device)
+        for _ in range(2):
+            try:
+                descriptor = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    holder = json.loads(lease.read_text())
+                except (OSError, ValueError):
+                    return False  # being written by its new holder
+                if self.alive(holder["pid"]):
+                    return False
+                lease.unlink(missing_ok=True)  # holder died without releasing
+                continue
+            with os.fdopen(descriptor, "w") as file:
+                json.dump({"owner": owner, "pid": os.getpid(), "since": self.clock()}, file)
+            return True
+
+        return False
+
+    def release(self, device: Device) -> None:
+        self._lease_file(device).unlink(missing_ok=True)
+
+    def mark_unhealthy(self, device: Device) -> None:
+        self._unhealthy_file(device).write_text(str(self.clock()))
+
+    def is_unhealthy(self, device: Device) -> bool:
+        try:
+            marked = float(self._unhealthy_file(device).read_text())
+        except (OSError, ValueError):
+            return False
+        return self.clock() - marked < self.cooldown
+
+
+class DeviceScheduler:
+    """Leases devices of inventory to tests of this process"""
+
+    def __init__(self, devices: [Device], leases: DeviceLeases, owner: str,
+                 timeout: float = DEVICES.DEFAULT_LEASE_TIMEOUT, health_check: Callable = endpoint_healthy,
+                 on_release: Callable = None, clock: Callable = time.time, sleep: Callable = time.sleep):
+        """
+        Constructor
+
+        :param devices: devices of inventory
+        :param leases: lease files shared with other workers
+        :param owner: name of this worker
+        :param timeout: seconds to wait for a matching device to become free
+        :param health_check: health_check(endpoint) -> bool, asked before leasing a device
+        :param on_release: on_release(device) is called when this process gives a device up
+        """
+        self.devices = devices
+        self.tags = set().union(*[device.tags for device in devices]) if devices else set()
+        self.leases = leases
+        self.owner = owner
+        self.timeout = timeout
+        self.health_check = health_check
+        self.on_release = on_release
+        self.clock = clock
+        self.sleep = sleep
+        self.current = None
+        self.usage = {}  # device name: {tests, failed, busy_s, first, last}
+
+    def lease(self, tags: set = frozenset()) -> Device:
+        """Returns device carrying all <tags>, keeping current lease while it fits"""
+
+        tags = set(tags)
+        if self.current is not None:
+            if self.current.matches(tags) and not self.leases.is_unhealthy(self.current):
+                return self.current
+            self.release()
+
+        """prefer least specialised devices, leaving tagged ones for tests needing them"""
+        candidates = sorted([device for device in self.devices if device.matches(tags)],
+                            key=lambda device: (len(device.tags), device.name))
+        deadline = self.clock() + self.timeout
+        while True:
+            healthy = [device for device in candidates if not self.leases.is_unhealthy(device)]
+            if not healthy:
+                raise NRoBoNoDeviceAvailable(tags)
+            for device in healthy:
+                if self.leases.try_lease(device, self.owner):
+                    if self.health_check(device.endpoint):
+                        self.current = device
+                        return device
+                    self.leases.mark_unhealthy(device)
+                    self.leases.release(device)
+            if self.clock() >= deadline:
+                raise NRoBoNoDeviceAvailable(tags)
+            self.sleep(DEVICES.POLL_INTERVAL)
+
+    def unhealthy(self, device: Device) -> None:
+        """Take <device> out of rotation for cooldown and give up its lease"""
+
+        self.leases.mark_unhealthy(device)
+        if self.current is device:
+            self.release()
+
+    def release(self) -> None:
+        """Give up currently leased device"""
+
+        device, self.current = self.current, None
+        if device is None:
+            return
+        if self.on_release is not None:
+            self.on_release(device)
+        self.leases.release(device)
+
+    def record(self, device: Device, started: float, failed: bool = False) -> None:
+        """Record test on <device> running from <started> till now. A failed test triggers a health check."""
+
+        ended = self.clock()
+        usage = self.usage.setdefault(device.name, {"tests": 0, "failed": 0, "busy_s": 0.0,
+                                                    "first": started, "last": ended})
+        usage["tests"] += 1
+        usage["failed"] += int(failed)
+        usage["busy_s"] += ended - started
+        usage["first"], usage["last"] = min(usage["first"], started), max(usage["last"], ended)
+
+        if failed and not self.health_check(device.endpoint):
+            self.unhealthy(device)
+
+    def close(self, report_dir: Union[str, Path, None] = None) -> None:
+        """Release lease and append usage of this process to device usage file of the run"""
+
+        self.release()
+        if report_dir is None or not self.usage:
+            return
+
+        Path(report_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(report_dir) / DEVICES.USAGE_FILE, "a") as f:
+            for name, usage in self.usage.items():
+                f.write(json.dumps({"device": name, "owner": self.owner, **usage}) + "\n")
+        self.usage = {}
+
+
+def utilisation_report(report_dir: Union[str, Path]) -> dict:
+    """Tests, failures and busy share of run time per device. Written to report dir."""
+
+    usage_file = Path(report_dir) / DEVICES.USAGE_FILE
+    if not usage_file.exists():
+        return {}
+
+    with open(usage_file) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    usage_file.unlink()
+
+    if not records:
+        return {}
+    window = max(r["last"] for r in records) - min(r["first"] for r in records)
+
+    report = {}
+    for record in records:
+        device = report.setdefault(record["device"], {"tests": 0, "failed": 0, "busy_s": 0.0})
+        device["tests"] += record["tests"]
+        device["failed"] += record["failed"]
+        device["busy_s"] += record["busy_s"]
+    for device in report.values():
+        device["busy_s"] = round(device["busy_s"], 1)
+        device["utilisation"] = round(device["busy_s"] / window, 3) if window > 0 else 0.0
+
+    with open(Path(report_dir) / DEVICES.REPORT_FILE, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    return report
+
+
+def device_scheduler_settings(nconfig: Union[dict, None]) -> dict:
+    """Read device scheduler settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'inventory': nconfig.get(DEVICES.INVENTORY) or None,
+        'lease_dir': nconfig.get(DEVICES.LEASE_DIR, DEVICES.DEFAULT_LEASE_DIR),
+        'timeout': float(nconfig.get(DEVICES.LEASE_TIMEOUT, DEVICES.DEFAULT_LEASE_TIMEOUT)),
+        'cooldown': float(nconfig.get(DEVICES.COOLDOWN, DEVICES.DEFAULT_COOLDOWN))
+    }
+
+
+_SCHEDULER = None
+
+
+def device_scheduler(nconfig: Union[dict, None], read_inventory: Callable) -> Union[DeviceScheduler, None]:
+    """Returns device scheduler of this process, None if no device inventory is configured.
+
+       read_inventory(file name) returns parsed inventory file."""
+
+    global _SCHEDULER
+
+    settings = device_scheduler_settings(nconfig)
+    if settings['inventory'] is None:
+        return None
+
+    if _SCHEDULER is None:
+        from nrobo.appium.session_pool import discard_pooled_sessions
+        _SCHEDULER = DeviceScheduler(load_inventory(read_inventory(settings['inventory'])),
+                                     DeviceLeases(settings['lease_dir'], settings['cooldown']),
+                                     owner=os.environ.get("PYTEST_XDIST_WORKER", "main"),
+                                     timeout=settings['timeout'],
+                                     on_release=lambda device: discard_pooled_sessions(device.endpoint))
+
+    return _SCHEDULER
+
+
+def close_device_scheduler(report_dir: Union[str, Path]) -> None:
+    """Release device of this process and write its usage"""
+
+    global _SCHEDULER
+
+    scheduler, _SCHEDULER = _SCHEDULER, None
+    if scheduler is not None:
+        scheduler.close(report_dir)
@@ -0,0 +1,243 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Appium sessions kept alive across tests.
+
+A new appium session reinstalls and launches the app, which takes
+tens of seconds. With appium_session_pool: true in nrobo-config.yaml,
+sessions are pooled per appium server and capability set, and between
+tests only app state is reset:
+
+    noReset: true     app is restarted (terminate + activate), data kept
+    noReset: false    app data is cleared and app restarted (android),
+                      not pooled on other platforms
+    fullReset: true   not pooled, every test gets a new session
+
+A session is recycled (quit and replaced) after appium_session_max_uses
+tests, when its test failed or when resetting the app fails.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import threading
+from typing import Callable, Union
+
+
+class APPIUM_POOL:
+    """Appium session pool settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    ENABLED = "appium_session_pool"
+    MAX_USES = "appium_session_max_uses"
+    DEFAULT_MAX_USES = 20
+
+    NO_RESET = "noReset"
+    FULL_RESET = "fullReset"
+    PLATFORM_NAME = "platformName"
+    APP_ID_KEYS = ["appPackage", "bundleId"]
+    VENDOR_PREFIX = "appium:"
+    ANDROID = "android"
+
+    RESTART = "restart"  # terminate + activate app
+    CLEAR = "clear"  # clear app data + activate app
+
+
+def capability(capabilities: dict, name: str, default=None):
+    """Value of capability <name> given with or without appium: prefix"""
+
+    if name in capabilities:
+        return capabilities[name]
+    return capabilities.get(APPIUM_POOL.VENDOR_PREFIX + name, default)
+
+
+def pool_key(server_url: str, capabilities: dict) -> str:
+    """Sessions are shared by tests asking same server for same capabilities"""
+    return server_url + "|" + json.dumps(capabilities, sort_keys=True, default=str)
+
+
+def reset_mode(capabilities: dict) -> Union[str, None]:
+    """How app state is reset between tests. None means capabilities ask for a new session every test."""
+
+    if str(capability(capabilities, APPIUM_POOL.FULL_RESET, False)).lower() == "true":
+        return None
+    if str(capability(capabilities, APPIUM_POOL.NO_RESET, False)).lower() == "true":
+        return APPIUM_POOL.RESTART
+    if str(capability(capabilities, APPIUM_POOL.PLATFORM_NAME, "")).lower() != APPIUM_POOL.ANDROID:
+        return None  # only uiautomator2 clears app data without a new session
+    return APPIUM_POOL.CLEAR
+
+
+def app_id(capabilities: dict) -> Union[str, None]:
+    """Android package or iOS bundle id of app under test"""
+
+    for key in APPIUM_POOL.APP_ID_KEYS:
+        if capability(capabilities, key):
+            return capability(capabilities, key)
+    return None
+
+
+def reset_app(driver, capabilities: dict, mode: str) -> None:
+    """Bring app under test to a fresh state without a new session"""
+
+    application = app_id(capabilities)
+    if application is None:
+        return  # nothing known to reset
+
+    if mode == APPIUM_POOL.CLEAR:
+        """uiautomator2 stops the app and wipes its data"""
+        driver.execute_script("mobile: clearApp", {"appId": application})
+    else:
+        driver.terminate_app(application)
+    driver.activate_app(application)
+
+
+class PooledSession:
+    """Appium session with its pool bookkeeping"""
+
+    def __init__(self, key: str, driver, capabilities: dict, mode: Union[str, None]):
+        self.key = key
+        self.driver = driver
+        self.capabilities = capabilities
+        self.mode = mode
+        self.uses = 0
+
+
+class AppiumSessionPool:
+    """Idle appium sessions per server and capability set"""
+
+    def __init__(self, max_uses: int = APPIUM_POOL.DEFAULT_MAX_USES):
+        self.max_uses = max_uses
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self._idle = {}  # pool key: [PooledSession]
+        self._lock = threading.Lock()
+
+    def acquire(self, server_url: str, capabilities: dict, factory: Callable) -> PooledSession:
+        """Returns reset idle session for <capabilities> or a new one made by <factory>()"""
+
+        key = pool_key(server_url, capabilities)
+        mode = reset_mode(capabilities)
+
+        while mode is not None:
+            with self._lock:
+                idle = self._idle.get(key)
+                session = idle.pop() if idle else None
+            if session is None:
+                break
+            try:
+                reset_app(session.driver, capabilities, mode)
+            except Exception:
+                self._recycle(session)
+                continue
+            session.uses += 1
+            self.reused += 1
+            return session
+
+        session = PooledSession(key, factory(), capabilities, mode)
+        session.uses = 1
+        self.created += 1
+        return session
+
+    def release(self, session: PooledSession, failed: bool = False) -> None:
+        """Test of <session> is over. Keep it for next test or quit it."""
+
+        if failed or session.mode is None or session.uses >= self.max_uses:
+            self._recycle(session)
+            return
+
+        with self._lock:
+            self._idle.setdefault(session.key, []).append(session)
+
+    def _recycle(self, session: PooledSession) -> None:
+        if session.mode is not None:
+            self.recycled += 1
+        try:
+            session.driver.quit()
+        except Exception:
+            pass  # session already gone
+
+    def discard(self, server_url: str) -> None:
+        """Quit idle sessions on appium server <server_url>, e.g. when its device goes to another worker"""
+
+        prefix = server_url + "|"
+        with self._lock:
+            keys = [key for key in self._idle if key.startswith(prefix)]
+            sessions = [session for key in keys for session in self._idle.pop(key)]
+        for session in sessions:
+            try:
+                session.driver.quit()
+            except Exception:
+                pass
+
+    def idle_sessions(self) -> int:
+        with self._lock:
+            return sum(len(sessions) for sessions in self._idle.values())
+
+    def report(self) -> dict:
+        return {"created": self.created, "reused": self.reused, "recycled": self.recycled}
+
+    def close(self) -> dict:
+        """Quit every idle session and return pool report"""
+
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle.clear()
+        for session in sessions:
+            try:
+                session.driver.quit()
+            except Exception:
+                pass
+
+        return self.report()
+
+
+def appium_pool_settings(nconfig: Union[dict, None]) -> dict:
+    """Read appium session pool settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'enabled': bool(nconfig.get(APPIUM_POOL.ENABLED, False)),
+        'max_uses': int(nconfig.get(APPIUM_POOL.MAX_USES, APPIUM_POOL.DEFAULT_MAX_USES))
+    }
+
+
+_POOL = None
+
+
+def appium_session_pool(nconfig: Union[dict, None]) -> Union[AppiumSessionPool, None]:
+    """Returns appium session pool of this process, None if pooling is disabled"""
+
+    global _POOL
+
+    settings = appium_pool_settings(nconfig)
+    if not settings['enabled']:
+        return None
+    if _POOL is None:
+        _POOL = AppiumSessionPool(settings['max_uses'])
+
+    return _POOL
+
+
+def discard_pooled_sessions(server_url: str) -> None:
+    """Quit pooled sessions of this process on appium server <server_url>"""
+
+    if _POOL is not None:
+        _POOL.discard(server_url)
+
+
+def close_appium_session_pool() -> Union[dict, None]:
+    """Quit pooled sessions of this process. Returns pool report, None if nothing was pooled."""
+
+    global _POOL
+
+    pool, _POOL = _POOL, None
+    return pool.close() if pool is not None else None
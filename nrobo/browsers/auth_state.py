@@ -0,0 +1,422 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Log in once per worker and inject auth state into every new browser.
+
+Auth state (cookies, localStorage and sessionStorage) is captured after
+one login, cached in a file shared by workers until it expires and
+restored into each new driver. Chromium drivers get cookies in bulk
+through CDP Network.setCookies and storage through a script evaluated
+on every new document, other drivers through add_cookie and a storage
+restore script. If the app answers with 401 (or registered logged out
+check says so) state is thrown away and login happens again.
+
+Cached state holds session cookies and tokens in plain json, so cache
+files are readable by their owner only (0600). auth_state_dir in
+nrobo-config.yaml moves the cache, e.g. into the report directory,
+empty value puts it in the system temp directory.
+
+Usage (in conftest.py of tests project):
+
+    from nrobo.browsers.auth_state import register_login
+
+    def api_login(url, username, password):
+        session = requests.Session()
+        session.post(url + "/api/login", json={"user": username, "password": password})
+        return session  # or {'cookies': [...], 'local_storage': {...}} or AuthState
+
+    register_login(api_login)  # or register_login(ui_login, kind="ui") with ui_login(driver, url, username, password)
+
+    def test_dashboard(self, auth_state):
+        ...  # browser is logged in already
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Union
+from urllib.parse import urlsplit
+
+
+class AUTH_STATE:
+    """Auth state settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    TTL = "auth_state_ttl"  # seconds a captured auth state is reused
+    CACHE_DIR = "auth_state_dir"
+
+    DEFAULT_TTL = 1800
+    DEFAULT_CACHE_DIR = ".nrobo-auth"
+    TEMP_CACHE_DIR = "nrobo-auth"  # under system temp directory
+    FILE_MODE = 0o600
+    DIR_MODE = 0o700
+
+    LOGIN_HTTP = "http"  # login(url, username, password) returns cookies
+    LOGIN_UI = "ui"  # login(driver, url, username, password) logs in through the browser
+    LOGIN_KINDS = [LOGIN_HTTP, LOGIN_UI]
+
+    UNAUTHORIZED = 401
+    SELENIUM_COOKIE_KEYS = ["name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite"]
+
+
+CAPTURE_STORAGE_SCRIPT = """
+const dump = (storage) => {
+    const items = {};
+    for (let i = 0; i < storage.length; i++) { const key = storage.key(i); items[key] = storage.getItem(key); }
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+NAVIGATION_STATUS_SCRIPT = """
+const navigation = performance.getEntriesByType('navigation')[0];
+return navigation && navigation.responseStatus !== undefined ? navigation.responseStatus : null;
+"""
+
+
+def origin_of(url: str) -> str:
+    """Returns scheme://host[:port] of <url>"""
+
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def storage_restore_script(state: "AuthState") -> str:
+    """Returns script filling localStorage and sessionStorage of state origin.
+
+       Script is self contained, so it can be run by execute_script or on every
+       new document through CDP. Pages of other origins are left alone."""
+
+    payload = json.dumps({"origin": state.origin, "local": state.local_storage, "session": state.session_storage})
+
+    return f"""(function (state) {{
+    if (window.location.origin !== state.origin) {{ return false; }}
+    for (const [key, value] of Object.entries(state.local)) {{ window.localStorage.setItem(key, value); }}
+    for (const [key, value] of Object.entries(state.session)) {{ window.sessionStorage.setItem(key, value); }}
+    return true;
+}})({payload});"""
+
+
+class AuthState:
+    """Cookies and web storage of a logged in session"""
+
+    def __init__(self, origin: str, cookies: [dict], local_storage: dict = None, session_storage: dict = None,
+                 created: float = None, expires_at: float = None):
+        """
+        Constructor
+
+        :param origin: origin the state belongs to
+        :param cookies: cookies in selenium format (name, value, domain, path, expiry...)
+        :param local_storage: {key: value} of window.localStorage
+        :param session_storage: {key: value} of window.sessionStorage
+        :param created: epoch seconds state was captured at
+        :param expires_at: epoch seconds after which state must not be used
+        """
+        self.origin = origin
+        self.cookies = list(cookies or [])
+        self.local_storage = dict(local_storage or {})
+        self.session_storage = dict(session_storage or {})
+        self.created = time.time() if created is None else created
+        self.expires_at = expires_at
+
+    def expired(self, now: float = None) -> bool:
+        """True if ttl of the state or any of its session cookies has passed"""
+
+        now = time.time() if now is None else now
+        if self.expires_at is not None and now >= self.expires_at:
+            return True
+
+        return any(cookie.get("expiry") is not None and cookie["expiry"] <= now for cookie in self.cookies)
+
+    def to_dict(self) -> dict:
+        return {"origin": self.origin, "cookies": self.cookies, "local_storage": self.local_storage,
+                "session_storage": self.session_storage, "created": self.created, "expires_at": self.expires_at}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AuthState":
+        return cls(data["origin"], data.get("cookies"), data.get("local_storage"), data.get("session_storage"),
+                   data.get("created"), data.get("expires_at"))
+
+
+def cookie_from_cookiejar(cookie) -> dict:
+    """Convert http.cookiejar.Cookie (e.g. of requests.Session) to selenium cookie dict"""
+
+    selenium_cookie = {"name": cookie.name, "value": cookie.value, "domain": cookie.domain,
+                       "path": cookie.path or "/", "secure": bool(cookie.secure),
+                       "httpOnly": cookie.has_nonstandard_attr("HttpOnly")}
+    if cookie.expires is not None:
+        selenium_cookie["expiry"] = int(cookie.expires)
+
+    return selenium_cookie
+
+
+def auth_state_from_login_result(result, url: str, ttl: float, now: float = None) -> AuthState:
+    """Build AuthState from what an http login callable returned.
+
+       <result> may be AuthState, a dict with cookies/local_storage/session_storage keys,
+       a requests.Session (anything having cookies attribute) or an iterable of cookies."""
+
+    now = time.time() if now is None else now
+
+    if isinstance(result, AuthState):
+        state = result
+    else:
+        if isinstance(result, dict):
+            cookies, local_storage, session_storage = result.get("cookies", []), \
+                result.get("local_storage"), result.get("session_storage")
+        else:
+            cookies, local_storage, session_storage = getattr(result, "cookies", result), None, None
+        cookies = [cookie if isinstance(cookie, dict) else cookie_from_cookiejar(cookie) for cookie in cookies]
+        state = AuthState(origin_of(url), cookies, local_storage, session_storage, created=now)
+
+    if state.expires_at is None:
+        state.expires_at = now + ttl
+
+    return state
+
+
+def capture_auth_state(driver, ttl: float, now: float = None) -> AuthState:
+    """Capture cookies and web storage of the current page of <driver>"""
+
+    now = time.time() if now is None else now
+    storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT) or {}
+
+    return AuthState(origin_of(driver.current_url), driver.get_cookies(),
+                     storage.get("local"), storage.get("session"), created=now, expires_at=now + ttl)
+
+
+def cdp_cookie(cookie: dict, origin: str) -> dict:
+    """Convert selenium cookie dict to CDP Network.CookieParam"""
+
+    param = {"name": cookie["name"], "value": cookie["value"], "path": cookie.get("path", "/")}
+    if cookie.get("domain"):
+        param["domain"] = cookie["domain"]
+    else:
+        param["url"] = origin
+    for selenium_key, cdp_key in [("secure", "secure"), ("httpOnly", "httpOnly"),
+                                  ("sameSite", "sameSite"), ("expiry", "expires")]:
+        if cookie.get(selenium_key) is not None:
+            param[cdp_key] = cookie[selenium_key]
+
+    return param
+
+
+def restore_auth_state(driver, state: AuthState) -> str:
+    """Restore <state> into <driver>. Returns "cdp" or "add_cookie", the way state was restored.
+
+       CDP path needs no navigation at all, storage is filled as soon as a page
+       of state origin loads. Other drivers load the origin once to set cookies."""
+
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            driver.execute_cdp_cmd("Network.setCookies",
+                                   {"cookies": [cdp_cookie(cookie, state.origin) for cookie in state.cookies]})
+            if state.local_storage or state.session_storage:
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                       {"source": storage_restore_script(state)})
+            return "cdp"
+        except Exception:
+            pass  # e.g. remote driver without cdp access, fall back to webdriver commands
+
+    driver.get(state.origin)
+    for cookie in state.cookies:
+        driver.add_cookie({key: value for key, value in cookie.items() if key in AUTH_STATE.SELENIUM_COOKIE_KEYS})
+    driver.execute_script(storage_restore_script(state))
+
+    return "add_cookie"
+
+
+def is_unauthorized(driver) -> bool:
+    """True if the current page of <driver> was answered with 401"""
+
+    try:
+        return driver.execute_script(NAVIGATION_STATUS_SCRIPT) == AUTH_STATE.UNAUTHORIZED
+    except Exception:
+        return False
+
+
+class AuthStateCache:
+    """Auth state of one (url, username) kept in memory of the worker and in a file shared by workers"""
+
+    def __init__(self, url: str, username: str, password: str, login: Callable,
+                 kind: str = AUTH_STATE.LOGIN_HTTP, ttl: float = AUTH_STATE.DEFAULT_TTL,
+                 cache_dir: Union[str, Path] = AUTH_STATE.DEFAULT_CACHE_DIR,
+                 is_logged_out: Callable = None, clock: Callable = time.time):
+        """
+        Constructor
+
+        :param url: app url
+        :param username: user to log in with
+        :param password: password of the user
+        :param login: login(url, username, password) for http kind, login(driver, url, username, password) for ui kind
+        :param kind: http or ui
+        :param ttl: seconds a captured state is reused
+        :param cache_dir: directory of the cache file shared by workers
+        :param is_logged_out: optional is_logged_out(driver) check for apps which redirect instead of answering 401
+        :param clock: returns current epoch seconds
+        """
+        if kind not in AUTH_STATE.LOGIN_KINDS:
+            raise ValueError(f"Invalid login kind: {kind}. Valid kinds are {AUTH_STATE.LOGIN_KINDS}")
+
+        self.url = url
+        self.username = username
+        self.password = password
+        self.login = login
+        self.kind = kind
+        self.ttl = ttl
+        self.is_logged_out = is_logged_out
+        self.clock = clock
+        self.logins = 0
+        self.restores = 0
+        self._state = None
+        self._lock = threading.Lock()
+
+        key = hashlib.sha1(f"{url}|{username}".encode("utf-8")).hexdigest()[:16]
+        self.path = Path(cache_dir) / f"{key}.json"
+
+    def _load(self) -> Union[AuthState, None]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                state = AuthState.from_dict(json.load(file))
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return None if state.expired(self.clock()) else state
+
+    def _save(self, state: AuthState) -> None:
+        self.path.parent.mkdir(mode=AUTH_STATE.DIR_MODE, parents=True, exist_ok=True)
+        partial = self.path.with_suffix(f".{os.getpid()}.part")
+        # owner only from the start, state holds session cookies and tokens
+        descriptor = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, AUTH_STATE.FILE_MODE)
+        os.chmod(partial, AUTH_STATE.FILE_MODE)  # O_CREAT mode does not apply to a left over file
+        with open(descriptor, "w", encoding="utf-8") as file:
+            json.dump(state.to_dict(), file)
+        os.replace(partial, self.path)  # atomic, other workers never read a half written file
+
+    def invalidate(self) -> None:
+        """Throw away cached state, next get() logs in again"""
+
+        with self._lock:
+            self._state = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, driver=None) -> (AuthState, bool):
+        """Returns (state, logged_in). logged_in is True if login happened in this call.
+
+           ui login happens in <driver>, which is then logged in already."""
+
+        with self._lock:
+            if self._state is not None and not self._state.expired(self.clock()):
+                return self._state, False
+
+            self._state = self._load()
+            if self._state is not None:
+                return self._state, False
+
+            if self.kind == AUTH_STATE.LOGIN_UI:
+                self.login(driver, self.url, self.username, self.password)
+                self._state = capture_auth_state(driver, self.ttl, self.clock())
+            else:
+                self._state = auth_state_from_login_result(self.login(self.url, self.username, self.password),
+                                                           self.url, self.ttl, self.clock())
+            self.logins += 1
+            self._save(self._state)
+
+            return self._state, True
+
+    def logged_out(self, driver) -> bool:
+        """True if app answered the current page with 401 or registered check says so"""
+
+        return is_unauthorized(driver) or bool(self.is_logged_out and self.is_logged_out(driver))
+
+    def apply(self, driver, verify: bool = True) -> AuthState:
+        """Make <driver> logged in.
+
+           With <verify>, app url is opened and state is refreshed once if app says we are logged out."""
+
+        for attempt in range(2):
+            state, logged_in = self.get(driver)
+            if not (logged_in and self.kind == AUTH_STATE.LOGIN_UI):
+                restore_auth_state(driver, state)
+                self.restores += 1
+
+            if not verify:
+                return state
+
+            driver.get(self.url)
+            if not self.logged_out(driver) or attempt:
+                return state
+
+            self.invalidate()  # session expired on server side
+
+        return state
+
+    def check(self, driver) -> bool:
+        """Refresh auth state if the current page says we are logged out. Returns True if refreshed."""
+
+        if not self.logged_out(driver):
+            return False
+
+        self.invalidate()
+        self.apply(driver)
+
+        return True
+
+
+_LOGIN = {}
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def register_login(login: Callable, kind: str = AUTH_STATE.LOGIN_HTTP, is_logged_out: Callable = None) -> None:
+    """Register login used by auth_state fixture. See AuthStateCache for signatures."""
+
+    if kind not in AUTH_STATE.LOGIN_KINDS:
+        raise ValueError(f"Invalid login kind: {kind}. Valid kinds are {AUTH_STATE.LOGIN_KINDS}")
+
+    _LOGIN.update(login=login, kind=kind, is_logged_out=is_logged_out)
+    with _CACHES_LOCK:
+        _CACHES.clear()
+
+
+def auth_state_settings(nconfig: Union[dict, None]) -> dict:
+    """Read auth state settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+    cache_dir = nconfig.get(AUTH_STATE.CACHE_DIR, AUTH_STATE.DEFAULT_CACHE_DIR)
+
+    return {
+        'ttl': float(nconfig.get(AUTH_STATE.TTL, AUTH_STATE.DEFAULT_TTL)),
+        'cache_dir': os.path.expandvars(os.path.expanduser(str(cache_dir))) if cache_dir
+        else str(Path(tempfile.gettempdir()) / AUTH_STATE.TEMP_CACHE_DIR)
+    }
+
+
+def auth_state_cache(url: str, username: str, password: str, nconfig: Union[dict, None] = None) -> AuthStateCache:
+    """Returns auth state cache of this worker for (url, username) using registered login"""
+
+    if not _LOGIN:
+        raise RuntimeError("No login registered for auth_state. "
+                           "Call nrobo.browsers.auth_state.register_login() in your conftest.py")
+
+    with _CACHES_LOCK:
+        key = (url, username)
+        if key not in _CACHES:
+            _CACHES[key] = AuthStateCache(url, username, password, _LOGIN['login'], _LOGIN['kind'],
+                                          is_logged_out=_LOGIN['is_logged_out'], **auth_state_settings(nconfig))
+        return _CACHES[key]
@@ -0,0 +1,351 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Chrome DevTools Protocol session with events.
+
+driver.execute_cdp_cmd() can send commands but never sees events
+(Fetch.requestPaused, Page.screencastFrame...). CdpSession talks to the
+browser over its own devtools websocket, attached to the page of the
+driver, on an asyncio loop in a background thread. Event callbacks run
+on a dispatcher thread, so they may send commands themselves.
+
+Usage:
+
+    from nrobo.browsers.cdp import cdp_session
+
+    session = cdp_session(driver)  # None for browsers without devtools
+    session.on("Network.responseReceived", lambda params: ...)
+    session.send("Network.enable")
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import queue
+import struct
+import threading
+import urllib.request
+from typing import Callable, Union
+from urllib.parse import urlsplit
+
+from nrobo.exceptions import NRoBoCdpError
+
+
+class CDP:
+    """CDP session settings"""
+
+    TIMEOUT = 30
+    CAPABILITY_KEYS = ["goog:chromeOptions", "ms:edgeOptions"]
+    GRID_CAPABILITY = "se:cdp"  # browser websocket url published by selenium grid
+    SESSION_ATTRIBUTE = "_nrobo_cdp_session"
+    WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    OPCODE_CONTINUATION = 0x0
+    OPCODE_TEXT = 0x1
+    OPCODE_BINARY = 0x2
+    OPCODE_CLOSE = 0x8
+    OPCODE_PING = 0x9
+    OPCODE_PONG = 0xA
+
+
+def encode_frame(payload: bytes, opcode: int = CDP.OPCODE_TEXT, mask: bool = True) -> bytes:
+    """Encode single websocket frame. Clients must mask, servers must not."""
+
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+
+    if not mask:
+        return bytes(header) + payload
+
+    key = os.urandom(4)
+    return bytes(header) + key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> (bool, int, bytes):
+    """Read single websocket frame. Returns (fin, opcode, payload)."""
+
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+async def read_message(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Union[bytes, None]:
+    """Read next complete data message, answering pings. Returns None when connection closes."""
+
+    message = b""
+    while True:
+        fin, opcode, payload = await read_frame(reader)
+        if opcode == CDP.OPCODE_CLOSE:
+            return None
+        if opcode == CDP.OPCODE_PING:
+            writer.write(encode_frame(payload, CDP.OPCODE_PONG))
+            continue
+        if opcode == CDP.OPCODE_PONG:
+            continue
+        message += payload
+        if fin:
+            return message
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept expected for Sec-WebSocket-Key <key>"""
+    return base64.b64encode(hashlib.sha1((key + CDP.WEBSOCKET_GUID).encode()).digest()).decode()
+
+
+async def websocket_connect(url: str, limit: int = 2 ** 26) -> (asyncio.StreamReader, asyncio.StreamWriter):
+    """Open websocket connection to ws://host:port/path"""
+
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80, limit=limit)
+
+    key = base64.b64encode(os.urandom(16)).decode()
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    writer.write((f"GET {path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                  f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await writer.drain()
+
+    response = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    if " 101 " not in response.split("\r\n")[0] or accept_key(key) not in response:
+        writer.close()
+        raise ConnectionError(f"Websocket handshake with {url} failed: {response.splitlines()[0]}")
+
+    return reader, writer
+
+
+def debugger_address(driver) -> Union[str, None]:
+    """Returns host:port of devtools of a local chromium driver"""
+
+    capabilities = getattr(driver, "capabilities", None) or {}
+    for key in CDP.CAPABILITY_KEYS:
+        address = (capabilities.get(key) or {}).get("debuggerAddress")
+        if address:
+            return address
+
+    return None
+
+
+def browser_websocket_url(driver) -> Union[str, None]:
+    """Returns browser level devtools websocket url of <driver> or None if browser has no devtools"""
+
+    capabilities = getattr(driver, "capabilities", None) or {}
+    if capabilities.get(CDP.GRID_CAPABILITY):
+        return capabilities[CDP.GRID_CAPABILITY]
+
+    address = debugger_address(driver)
+    if address is None:
+        return None
+
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=CDP.TIMEOUT) as response:
+        return json.loads(response.read())["webSocketDebuggerUrl"]
+
+
+class CdpSession:
+    """Devtools websocket session attached to one page target"""
+
+    def __init__(self, websocket_url: str, target_id: str = None, timeout: float = CDP.TIMEOUT):
+        """
+        Constructor
+
+        :param websocket_url: browser level devtools websocket url
+        :param target_id: page target to attach to, first page if not given or not found
+        :param timeout: seconds to wait for a command result
+        """
+        self.websocket_url = websocket_url
+        self.target_id = target_id
+        self.timeout = timeout
+        self.session_id = None
+        self._ids = itertools.count(1)
+        self._pending = {}  # command id: (method, future)
+        self._listeners = {}  # event: [callback]
+        self._listeners_lock = threading.Lock()
+        self._events = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        self._writer = None
+        self._closed = threading.Event()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="nrobo-cdp", daemon=True)
+        self._dispatch_thread = threading.Thread(target=self._dispatch, name="nrobo-cdp-events", daemon=True)
+
+    def start(self) -> "CdpSession":
+        """Connect and attach to page target"""
+
+        self._loop_thread.start()
+        self._dispatch_thread.start()
+        asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(self.timeout)
+
+        targets = [t for t in self.send("Target.getTargets")["targetInfos"] if t["type"] == "page"]
+        target = next((t for t in targets if t["targetId"] == self.target_id), targets[0] if targets else None)
+        if target is None:
+            raise ConnectionError("No page target to attach CDP session to")
+
+        self.target_id = target["targetId"]
+        self.session_id = self.send("Target.attachToTarget", {"targetId": self.target_id, "flatten": True},
+                                    session=False)["sessionId"]
+        return self
+
+    async def _connect(self) -> None:
+        reader, self._writer = await websocket_connect(self.websocket_url)
+        self._loop.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                message = await read_message(reader, self._writer)
+                if message is None:
+                    break
+                self._receive(json.loads(message))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._closed.set()
+            for _, future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("CDP connection closed"))
+            self._events.put(None)
+
+    def _receive(self, message: dict) -> None:
+        if "id" in message:
+            method, future = self._pending.pop(message["id"], (None, None))
+            if future is not None and not future.done():
+                if "error" in message:
+                    future.set_exception(NRoBoCdpError(method, message["error"]))
+                else:
+                    future.set_result(message.get("result", {}))
+        elif message.get("sessionId") in (None, self.session_id):
+            self._events.put((message["method"], message.get("params", {})))
+
+    def _dispatch(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            method, params = event
+            with self._listeners_lock:
+                callbacks = list(self._listeners.get(method, []))
+            for callback in callbacks:
+                try:
+                    callback(params)
+                except Exception:
+                    pass  # a broken listener must not stop others
+
+    async def _send(self, method: str, params: dict, session: bool) -> dict:
+        command_id = next(self._ids)
+        message = {"id": command_id, "method": method, "params": params}
+        if session and self.session_id:
+            message["sessionId"] = self.session_id
+
+        future = self._loop.create_future()
+        self._pending[command_id] = (method, future)
+        self._writer.write(encode_frame(json.dumps(message).encode("utf-8")))
+        await self._writer.drain()
+
+        return await future
+
+    def send(self, method: str, params: dict = None, timeout: float = None, session: bool = True) -> dict:
+        """Send command and wait for its result. May be called from any thread but the loop thread."""
+
+        if self._closed.is_set():
+            raise ConnectionError("CDP connection closed")
+
+        return asyncio.run_coroutine_threadsafe(self._send(method, params or {}, session),
+                                                self._loop).result(timeout or self.timeout)
+
+    def on(self, event: str, callback: Callable[[dict], None]) -> None:
+        """Call <callback>(params) on every <event>"""
+
+        with self._listeners_lock:
+            self._listeners.setdefault(event, []).append(callback)
+
+    def off(self, event: str, callback: Callable[[dict], None]) -> None:
+        with self._listeners_lock:
+            if callback in self._listeners.get(event, []):
+                self._listeners[event].remove(callback)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def close(self) -> None:
+        """Close websocket and stop background threads"""
+
+        async def _close():
+            if self._writer is not None:
+                try:
+                    self._writer.write(encode_frame(b"", CDP.OPCODE_CLOSE))
+                    await self._writer.drain()
+                except (ConnectionError, OSError):
+                    pass
+                self._writer.close()
+
+        if self._loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(_close(), self._loop).result(self.timeout)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(self.timeout)
+        self._events.put(None)
+        self._closed.set()
+
+
+def cdp_session(driver) -> Union[CdpSession, None]:
+    """Returns CDP session of <driver>, opened on first use. None if browser has no devtools."""
+
+    session = getattr(driver, CDP.SESSION_ATTRIBUTE, None)
+    if session is not None and not session.closed:
+        return session
+
+    try:
+        url = browser_websocket_url(driver)
+    except (OSError, ValueError, KeyError):
+        return None
+    if url is None:
+        return None
+
+    try:
+        target_id = driver.current_window_handle
+    except Exception:
+        target_id = None
+
+    session = CdpSession(url, target_id).start()
+    setattr(driver, CDP.SESSION_ATTRIBUTE, session)
+
+    return session
+
+
+def close_cdp_session(driver) -> None:
+    """Close CDP session of <driver> if one was opened"""
+
+    session = getattr(driver, CDP.SESSION_ATTRIBUTE, None)
+    if session is not None:
+        session.close()
+        setattr(driver, CDP.SESSION_ATTRIBUTE, None)
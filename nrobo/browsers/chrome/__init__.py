@@ -10,10 +10,11 @@ FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
 @author: Panchdev Singh Chauhan
 @email: erpanchdev@gmail.com
 
-Development is still in progress...
+Curated chromium switches. Combined into named launch profiles
+by nrobo.browsers.launch_profiles.
 """
-chrome_switches = [
-    # Commonly unwanted browser features
+# Commonly unwanted browser features
+unwanted_feature_switches = [
     '--disable-client-side-phishing-detection',
     '--disable-component-extensions-with-background-pages',
     '--disable-default-apps',
@@ -32,10 +33,10 @@ chrome_switches = [
     '--disable-hang-monitor',
     '--disable-ipc-flooding-protection',
     '--disable-renderer-backgrounding',
-    '--disable-hang-monitor',
-    '--disable-ipc-flooding-protection',
-    '--disable-renderer-backgrounding',
-    # web platform behavior
+]
+
+# web platform behavior
+web_platform_switches = [
     '--aggressive-cache-discard',
     '--allow-running-insecure-content',
     '--disable-back-forward-cache',
@@ -53,11 +54,16 @@ chrome_switches = [
     '--use-fake-device-for-media-stream',
     '--use-fake-ui-for-media-stream',
     '--use-file-for-fake-video-capture=<path-to-file>',
+]
+
+chrome_switches = unwanted_feature_switches + web_platform_switches + [
     # Interactivity suppression
     # In-progess
 ]
 
+# Features which throttle timers and tasks of background or occluded pages.
+# Disabled by launch profiles, so tests in non focused windows run at full speed.
 task_throttling_feature = [
-
-
-]
\ No newline at end of file
+    'IntensiveWakeUpThrottling',
+    'CalculateNativeWinOcclusion',
+]
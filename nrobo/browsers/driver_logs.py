@@ -0,0 +1,206 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Driver service log capture.
+
+In failure mode, driver service output is piped into a bounded
+in-memory ring buffer per session and written (gzip compressed)
+to results/driver-logs only when the test fails or errors.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import gzip
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Union
+
+
+class DRIVER_LOG:
+    """Driver log capture settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    MODE = "driver_log_mode"  # file | failure | off
+    LEVEL = "driver_log_level"  # trace | debug | info | warn | error | off
+    BUFFER_LINES = "driver_log_buffer_lines"
+
+    MODE_FILE = "file"  # full log of every test is written to disk
+    MODE_FAILURE = "failure"  # log is kept in memory and written to disk on failure only
+    MODE_OFF = "off"  # no driver logs at all
+
+    DEFAULT_MODE = MODE_FILE
+    DEFAULT_BUFFER_LINES = 5000
+    COMPRESSED_EXTENSION = ".gz"
+
+
+# nRoBo log level -> chromedriver/msedgedriver --log-level value
+CHROMIUM_LOG_LEVELS = {
+    "trace": "ALL",
+    "debug": "DEBUG",
+    "info": "INFO",
+    "warn": "WARNING",
+    "error": "SEVERE",
+    "off": "OFF"
+}
+
+# nRoBo log level -> geckodriver --log value
+GECKO_LOG_LEVELS = {
+    "trace": "trace",
+    "debug": "debug",
+    "info": "info",
+    "warn": "warn",
+    "error": "error",
+    "off": "fatal"
+}
+
+
+def chromium_service_args(level: Union[str, None]) -> [str]:
+    """Returns chromedriver/msedgedriver service args for given log <level>"""
+
+    if not level:
+        return []
+
+    return [f"--log-level={CHROMIUM_LOG_LEVELS[str(level).lower()]}"]
+
+
+def gecko_service_args(level: Union[str, None]) -> [str]:
+    """Returns geckodriver service args for given log <level>.
+
+       Defaults to debug which has been nRoBo behaviour for firefox."""
+
+    return ['--log', GECKO_LOG_LEVELS[str(level).lower()] if level else 'debug']
+
+
+class DriverLogBuffer:
+    """Bounded in-memory ring buffer fed by a driver service through an os pipe.
+
+       Usage:
+            buffer = DriverLogBuffer(max_lines=5000)
+            service = ChromeService(log_output=buffer.fileno())
+            ...
+            buffer.close()
+            if test_failed:
+                buffer.flush(log_path)
+    """
+
+    def __init__(self, max_lines: int = DRIVER_LOG.DEFAULT_BUFFER_LINES):
+        self._lines = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._read_fd, self._write_fd = os.pipe()
+        self._pipe = os.fstat(self._write_fd)
+        self._service_fds = []  # duplicates of write end handed out by fileno()
+        self._reader = threading.Thread(target=self._drain, name="nrobo-driver-log", daemon=True)
+        self._reader.start()
+
+    def fileno(self) -> int:
+        """Duplicate of the pipe write end. Pass it as log_output of a driver service,
+           which owns it from then on (selenium Service.stop() closes it)."""
+
+        fd = os.dup(self._write_fd)
+        self._service_fds.append(fd)
+        return fd
+
+    def _is_pipe(self, fd: int) -> bool:
+        """True if <fd> is still open on the write end of this buffer's pipe"""
+
+        try:
+            stat = os.fstat(fd)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino) == (self._pipe.st_dev, self._pipe.st_ino)
+
+    def _drain(self):
+        """Read service output line by line into the ring buffer until EOF"""
+
+        with os.fdopen(self._read_fd, "rb", buffering=0) as pipe:
+            for line in iter(pipe.readline, b""):
+                with self._lock:
+                    if len(self._lines) == self._lines.maxlen:
+                        self._dropped += 1
+                    self._lines.append(line)
+
+    def write(self, line: Union[str, bytes]):
+        """Append a line to the buffer directly"""
+
+        if isinstance(line, str):
+            line = line.encode()
+
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(line)
+
+    @property
+    def dropped(self) -> int:
+        """Number of oldest lines evicted from the buffer"""
+        return self._dropped
+
+    def lines(self) -> [bytes]:
+        """Snapshot of buffered lines"""
+        with self._lock:
+            return list(self._lines)
+
+    def close(self, timeout: float = 5) -> None:
+        """Close own write end of the pipe, and copies handed out which are still open,
+           then wait for the reader to drain.
+
+           Must be called after the driver service is stopped."""
+
+        if self._write_fd is not None:
+            for fd in self._service_fds:
+                if self._is_pipe(fd):
+                    """service never started or kept its copy open, else the number may be reused"""
+                    os.close(fd)
+            self._service_fds = []
+            os.close(self._write_fd)
+            self._write_fd = None
+        self._reader.join(timeout=timeout)
+
+    def flush(self, log_path: Union[str, Path]) -> Path:
+        """Write buffered lines to <log_path>.gz and return its path"""
+
+        log_path = Path(str(log_path) + DRIVER_LOG.COMPRESSED_EXTENSION)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with gzip.open(log_path, "wb") as f:
+            if self._dropped:
+                f.write(f"... {self._dropped} earlier line(s) dropped from driver log buffer ...\n".encode())
+            f.writelines(self.lines())
+
+        return log_path
+
+
+def driver_log_settings(nconfig: Union[dict, None]) -> dict:
+    """Read driver log settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'mode': str(nconfig.get(DRIVER_LOG.MODE, DRIVER_LOG.DEFAULT_MODE)).lower(),
+        'level': nconfig.get(DRIVER_LOG.LEVEL, None),
+        'buffer_lines': int(nconfig.get(DRIVER_LOG.BUFFER_LINES, DRIVER_LOG.DEFAULT_BUFFER_LINES))
+    }
+
+
+def driver_log_output(settings: dict, log_path: Union[str, Path]):
+    """Returns (log_output, buffer) for a driver service as per driver log <settings>.
+
+       log_output is a path in file mode, pipe fd in failure mode and
+       os.devnull in off mode. buffer is None unless failure mode is selected."""
+
+    if settings['mode'] == DRIVER_LOG.MODE_FAILURE:
+        buffer = DriverLogBuffer(max_lines=settings['buffer_lines'])
+        return buffer.fileno(), buffer
+    elif settings['mode'] == DRIVER_LOG.MODE_OFF:
+        return os.devnull, None
+
+    return str(log_path), None
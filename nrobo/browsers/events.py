@@ -0,0 +1,336 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Browser events: console, js exceptions, network and navigation.
+
+Instead of polling get_log, the event log subscribes to devtools
+events of the session. They arrive on the asyncio loop of the CDP
+session in a background thread and are buffered, newest event_buffer
+events kept, as plain dicts with kind, seq, time and event fields:
+
+    console         level, text, url, line
+    exception       text, url, line
+    log             level, text, source, url
+    request         request_id, url, method, type
+    response        request_id, url, status, mime_type, type
+    request_failed  request_id, url, error, canceled, type
+    navigation      url
+    load
+
+Usage in page classes:
+
+    mark = self.events.mark()
+    self.click(*SAVE)
+    response = self.events.wait_for("response", url="*/api/orders*", since=mark)
+    assert response["status"] == 201
+    assert not self.events.console_errors()
+
+    pending = self.events.expect("navigation", url="*/thank-you")
+    self.click(*PAY)
+    pending.result(10)  # or, in async code: await self.events.until("navigation", url="*/thank-you")
+
+Filters match string fields with globs, other fields by equality, and
+callables as predicates, e.g. status=lambda status: status >= 500.
+Events are recorded from the first use of self.events in a test.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from fnmatch import fnmatchcase
+from typing import Callable, Union
+
+from nrobo.exceptions import NRoBoCdpNotAvailable
+
+
+class EVENTS:
+    """Browser event settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    BUFFER = "event_buffer"
+
+    DEFAULT_BUFFER = 2000
+    ATTRIBUTE = "_nrobo_event_log"
+    TIMEOUT = 10
+    MAX_TEXT = 2000  # characters kept of console and exception texts
+    ENABLE = ["Runtime.enable", "Log.enable", "Network.enable", "Page.enable"]
+    ERROR_STATUS = 400
+
+
+def clip(text) -> str:
+    text = "" if text is None else str(text)
+    return text if len(text) <= EVENTS.MAX_TEXT else text[:EVENTS.MAX_TEXT] + "..."
+
+
+def remote_object_text(remote: dict) -> str:
+    """Text of a Runtime.RemoteObject console argument"""
+
+    if "value" in remote:
+        return str(remote["value"])
+    return str(remote.get("description") or remote.get("unserializableValue") or remote.get("type", ""))
+
+
+def top_frame(params: dict) -> dict:
+    frames = (params.get("stackTrace") or {}).get("callFrames") or [{}]
+    return frames[0]
+
+
+def console_event(params: dict) -> (str, dict):
+    frame = top_frame(params)
+    level = params.get("type", "log")
+    return "console", {"level": "warning" if level == "warn" else level,
+                       "text": clip(" ".join(remote_object_text(arg) for arg in params.get("args", []))),
+                       "url": frame.get("url"), "line": frame.get("lineNumber")}
+
+
+def exception_event(params: dict) -> (str, dict):
+    details = params.get("exceptionDetails") or {}
+    return "exception", {"text": clip((details.get("exception") or {}).get("description") or details.get("text")),
+                         "url": details.get("url"), "line": details.get("lineNumber")}
+
+
+def log_event(params: dict) -> (str, dict):
+    entry = params.get("entry") or {}
+    return "log", {"level": entry.get("level"), "text": clip(entry.get("text")), "source": entry.get("source"),
+                   "url": entry.get("url")}
+
+
+def request_event(params: dict) -> (str, dict):
+    request = params.get("request") or {}
+    return "request", {"request_id": params.get("requestId"), "url": request.get("url"),
+                       "method": request.get("method"), "type": params.get("type")}
+
+
+def response_event(params: dict) -> (str, dict):
+    response = params.get("response") or {}
+    return "response", {"request_id": params.get("requestId"), "url": response.get("url"),
+                        "status": response.get("status"), "mime_type": response.get("mimeType"),
+                        "type": params.get("type")}
+
+
+def failed_event(params: dict) -> (str, dict):
+    return "request_failed", {"request_id": params.get("requestId"), "error": params.get("errorText"),
+                              "canceled": bool(params.get("canceled")), "type": params.get("type")}
+
+
+def navigation_event(params: dict) -> Union[tuple, None]:
+    frame = params.get("frame") or {}
+    if frame.get("parentId"):
+        return None  # iframe navigation
+    return "navigation", {"url": frame.get("url")}
+
+
+# CDP event: converter to (kind, fields)
+CONVERTERS = {
+    "Runtime.consoleAPICalled": console_event,
+    "Runtime.exceptionThrown": exception_event,
+    "Log.entryAdded": log_event,
+    "Network.requestWillBeSent": request_event,
+    "Network.responseReceived": response_event,
+    "Network.loadingFailed": failed_event,
+    "Page.frameNavigated": navigation_event,
+    "Page.loadEventFired": lambda params: ("load", {}),
+}
+
+
+def matches(event: dict, kind: Union[str, list, tuple, None], filters: dict) -> bool:
+    """True if <event> is of <kind> (any if None) and passes every filter"""
+
+    if kind is not None and event["kind"] not in ([kind] if isinstance(kind, str) else kind):
+        return False
+
+    for field, expected in filters.items():
+        actual = event.get(field)
+        if callable(expected):
+            if not expected(actual):
+                return False
+        elif isinstance(expected, str) and isinstance(actual, str):
+            if not fnmatchcase(actual, expected):
+                return False
+        elif actual != expected:
+            return False
+
+    return True
+
+
+class EventLog:
+    """Bounded buffer of browser events of one CDP session"""
+
+    def __init__(self, session, buffer: int = EVENTS.DEFAULT_BUFFER):
+        """
+        Constructor
+
+        :param session: CDP session, see nrobo.browsers.cdp
+        :param buffer: events kept, oldest are dropped first
+        """
+        self.session = session
+        self.events = deque(maxlen=buffer)
+        self.dropped = 0
+        self.sequence = 0  # events recorded so far
+        self._urls = OrderedDict()  # request id: url, for failed requests
+        self._expectations = []  # (kind, filters, future)
+        self._condition = threading.Condition()
+        self._handlers = {}
+
+    def start(self) -> "EventLog":
+        """Subscribe to events and enable their devtools domains"""
+
+        for method, convert in CONVERTERS.items():
+            self._handlers[method] = functools.partial(self._on_event, convert)
+            self.session.on(method, self._handlers[method])
+        for command in EVENTS.ENABLE:
+            self.session.send(command)
+
+        return self
+
+    def _on_event(self, convert: Callable, params: dict) -> None:
+        converted = convert(params)
+        if converted is not None:
+            self.record(*converted)
+
+    def record(self, kind: str, fields: dict) -> dict:
+        """Buffer event and resolve expectations it meets"""
+
+        with self._condition:
+            if kind == "request":
+                self._urls[fields.get("request_id")] = fields.get("url")
+                if len(self._urls) > self.events.maxlen:
+                    self._urls.popitem(last=False)
+            elif kind == "request_failed" and fields.get("url") is None:
+                fields["url"] = self._urls.get(fields.get("request_id"))
+
+            self.sequence += 1
+            event = {"kind": kind, "seq": self.sequence, "time": time.time(), **fields}
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(event)
+
+            met = [expectation for expectation in self._expectations if matches(event, *expectation[:2])]
+            for expectation in met:
+                self._expectations.remove(expectation)
+            self._condition.notify_all()
+
+        for _, _, future in met:
+            if not future.done():
+                future.set_result(event)
+
+        return event
+
+    def mark(self) -> int:
+        """Sequence number of last event, to look only at events after it with since="""
+        return self.sequence
+
+    def filter(self, kind: Union[str, list, None] = None, since: int = 0, **filters) -> [dict]:
+        """Buffered events of <kind> after mark <since> passing <filters>"""
+
+        with self._condition:
+            return [event for event in self.events if event["seq"] > since and matches(event, kind, filters)]
+
+    def first(self, kind: Union[str, list, None] = None, since: int = 0, **filters) -> Union[dict, None]:
+        found = self.filter(kind, since, **filters)
+        return found[0] if found else None
+
+    def console_errors(self, since: int = 0) -> [dict]:
+        """Console errors and uncaught js exceptions"""
+
+        return [event for event in self.filter(["console", "exception"], since)
+                if event["kind"] == "exception" or event["level"] == "error"]
+
+    def failed_requests(self, since: int = 0) -> [dict]:
+        """Responses with error status and requests which failed without response"""
+
+        return [event for event in self.filter(["response", "request_failed"], since)
+                if event["kind"] == "request_failed" or (event["status"] or 0) >= EVENTS.ERROR_STATUS]
+
+    def wait_for(self, kind: Union[str, list, None] = None, timeout: float = EVENTS.TIMEOUT, since: int = 0,
+                 **filters) -> dict:
+        """First event of <kind> after mark <since> passing <filters>, waiting up to <timeout> seconds for it"""
+
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                event = next((event for event in self.events
+                              if event["seq"] > since and matches(event, kind, filters)), None)
+                if event is not None:
+                    return event
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No {kind or 'browser'} event matching {filters} in {timeout}s")
+                self._condition.wait(remaining)
+
+    def expect(self, kind: Union[str, list, None] = None, **filters) -> Future:
+        """Future of the next event of <kind> passing <filters>. Expect before the action causing it."""
+
+        future = Future()
+        with self._condition:
+            self._expectations.append((kind, filters, future))
+
+        return future
+
+    async def until(self, kind: Union[str, list, None] = None, timeout: float = EVENTS.TIMEOUT, since: int = 0,
+                    **filters) -> dict:
+        """Awaitable wait_for, for asyncio code"""
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.wait_for, kind, timeout, since, **filters))
+
+    def clear(self) -> None:
+        with self._condition:
+            self.events.clear()
+
+    def close(self) -> None:
+        """Unsubscribe and cancel pending expectations"""
+
+        for method, handler in self._handlers.items():
+            self.session.off(method, handler)
+        self._handlers = {}
+        with self._condition:
+            expectations, self._expectations = self._expectations, []
+        for _, _, future in expectations:
+            future.cancel()
+
+
+def events_settings(nconfig: Union[dict, None]) -> dict:
+    """Read browser event settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {'buffer': int(nconfig.get(EVENTS.BUFFER, EVENTS.DEFAULT_BUFFER))}
+
+
+def event_log(driver, nconfig: Union[dict, None] = None) -> EventLog:
+    """Returns event log of <driver>, subscribed on first use"""
+
+    log = getattr(driver, EVENTS.ATTRIBUTE, None)
+    if log is not None and not log.session.closed:
+        return log
+
+    from nrobo.browsers.cdp import cdp_session
+    session = cdp_session(driver)
+    if session is None:
+        raise NRoBoCdpNotAvailable("self.events")
+
+    log = EventLog(session, events_settings(nconfig)['buffer']).start()
+    setattr(driver, EVENTS.ATTRIBUTE, log)
+
+    return log
+
+
+def close_event_log(driver) -> None:
+    """Stop recording events of <driver> if they were recorded"""
+
+    log = getattr(driver, EVENTS.ATTRIBUTE, None)
+    if log is not None:
+        log.close()
+        setattr(driver, EVENTS.ATTRIBUTE, None)
@@ -7,11 +7,35 @@ TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
 FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
 ===================================================
 
-Firefox cli.
-
-Development: Not Started
+Firefox cli and curated preferences.
 
 
 @author: Panchdev Singh Chauhan
 @email: erpanchdev@gmail.com
-"""
\ No newline at end of file
+"""
+
+# Preferences switching off first run pages, background services and telemetry
+lean_prefs = {
+    'browser.shell.checkDefaultBrowser': False,
+    'browser.startup.homepage_override.mstone': 'ignore',
+    'startup.homepage_welcome_url': 'about:blank',
+    'startup.homepage_welcome_url.additional': '',
+    'browser.aboutwelcome.enabled': False,
+    'datareporting.policy.dataSubmissionEnabled': False,
+    'datareporting.healthreport.uploadEnabled': False,
+    'toolkit.telemetry.reportingpolicy.firstRun': False,
+    'app.update.auto': False,
+    'app.update.enabled': False,
+    'extensions.update.enabled': False,
+    'browser.safebrowsing.malware.enabled': False,
+    'browser.safebrowsing.phishing.enabled': False,
+    'browser.tabs.remote.autostart': True,
+    'dom.min_background_timeout_value': 0,
+    'media.autoplay.default': 0,
+}
+
+# Preferences helping to debug a failing test
+debug_prefs = {
+    'devtools.console.stdout.content': True,
+    'browser.dom.window.dump.enabled': True,
+}
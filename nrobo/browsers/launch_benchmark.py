@@ -0,0 +1,142 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Cold start and memory benchmark of launch profiles.
+
+Each run starts a fresh browser with the profile, loads a locally
+served stand-in page and records time till page load and resident
+memory of the browser process tree.
+
+Usage:
+
+    python -m nrobo.browsers.launch_benchmark --browser chrome --runs 5 none lean ci-headless
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from nrobo.browsers.launch_profiles import resolve_launch_profile, apply_launch_profile
+
+STAND_IN_PAGE = """<!doctype html>
+<html><head><title>nRoBo stand-in</title><style>body{font-family:sans-serif}</style></head>
+<body><h1>nRoBo launch benchmark</h1><script>document.title += " loaded";</script></body></html>
+"""
+
+
+def serve_stand_in_page(directory: Path) -> (ThreadingHTTPServer, str):
+    """Serve stand-in page from <directory>. Returns (server, page url)."""
+
+    (directory / "index.html").write_text(STAND_IN_PAGE)
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f"http://127.0.0.1:{server.server_address[1]}/index.html"
+
+
+def browser_tree_rss(driver_pid: int) -> int:
+    """Resident memory of every process started by the driver service (the browser tree)"""
+
+    import psutil
+
+    total = 0
+    for process in psutil.Process(driver_pid).children(recursive=True):
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass  # process ended meanwhile
+
+    return total
+
+
+def new_driver(browser: str, profile):
+    """Start local <browser> with launch <profile> applied"""
+
+    from selenium import webdriver
+
+    if browser == "firefox":
+        return webdriver.Firefox(options=apply_launch_profile(webdriver.FirefoxOptions(), profile))
+    if browser == "edge":
+        return webdriver.Edge(options=apply_launch_profile(webdriver.EdgeOptions(), profile))
+
+    return webdriver.Chrome(options=apply_launch_profile(webdriver.ChromeOptions(), profile))
+
+
+def measure(browser: str, spec: str, url: str, runs: int) -> dict:
+    """Returns cold start and rss figures of launch profile <spec> over <runs> fresh sessions"""
+
+    profile = resolve_launch_profile(spec)
+    starts, memory = [], []
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        driver = new_driver(browser, profile)
+        try:
+            driver.get(url)
+            starts.append(time.perf_counter() - started)
+            memory.append(browser_tree_rss(driver.service.process.pid))
+        finally:
+            driver.quit()
+
+    return {
+        "profile": spec,
+        "runs": runs,
+        "cold_start_median_s": round(statistics.median(starts), 3),
+        "cold_start_max_s": round(max(starts), 3),
+        "rss_median_mb": round(statistics.median(memory) / (1024 * 1024), 1),
+    }
+
+
+def benchmark(browser: str, specs: [str], runs: int = 3) -> [dict]:
+    """Measure every launch profile of <specs> against a locally served page"""
+
+    with tempfile.TemporaryDirectory() as directory:
+        server, url = serve_stand_in_page(Path(directory))
+        try:
+            return [measure(browser, spec, url, runs) for spec in specs]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start and memory benchmark of nRoBo launch profiles")
+    parser.add_argument("profiles", nargs="*", default=["none", "lean", "ci-headless"],
+                        help="Launch profiles to compare. none is the plain browser.")
+    parser.add_argument("--browser", choices=["chrome", "edge", "firefox"], default="chrome")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh sessions per profile")
+    args = parser.parse_args(argv)
+
+    from rich.table import Table
+    from nrobo import console
+
+    table = Table(title=f"Launch profiles on {args.browser}")
+    results = benchmark(args.browser, args.profiles, args.runs)
+    for column in results[0]:
+        table.add_column(column)
+    for result in results:
+        table.add_row(*[str(value) for value in result.values()])
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Named, versioned browser launch profiles.
+
+    lean         curated chromium switches and firefox prefs turning off
+                 first run, extensions, background throttling...
+    ci-headless  lean plus headless, fixed window size and container friendly switches
+    debug        headed browser with devtools and verbose browser logging
+
+Select a profile with --launch-profile on command line or launch_profile in
+nrobo-config.yaml. Pin a version with name@version, e.g. lean@1, to fail
+fast when a profile changes under your tests. More profiles can be defined
+under launch_profiles in nrobo-config.yaml.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import copy
+from typing import Union
+
+from nrobo.browsers.chrome import unwanted_feature_switches, task_throttling_feature
+from nrobo.browsers.firefox import lean_prefs, debug_prefs
+
+
+class LAUNCH_PROFILE:
+    """Launch profile settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    PROFILE = "launch_profile"
+    PROFILES = "launch_profiles"  # user defined profiles
+    NONE = "none"
+
+    LEAN = "lean"
+    CI_HEADLESS = "ci-headless"
+    DEBUG = "debug"
+
+    VERSION = "version"
+    CHROMIUM = "chromium"  # chromium switches, used for chrome and edge
+    FIREFOX_ARGS = "firefox_args"
+    FIREFOX_PREFS = "firefox_prefs"
+
+    DISABLE_FEATURES = "--disable-features="
+    VERSION_SEPARATOR = "@"
+
+
+_LEAN_CHROMIUM = unwanted_feature_switches + [f"{LAUNCH_PROFILE.DISABLE_FEATURES}{feature}"
+                                              for feature in task_throttling_feature]
+
+PROFILES = {
+    LAUNCH_PROFILE.LEAN: {
+        LAUNCH_PROFILE.VERSION: 1,
+        LAUNCH_PROFILE.CHROMIUM: _LEAN_CHROMIUM,
+        LAUNCH_PROFILE.FIREFOX_ARGS: [],
+        LAUNCH_PROFILE.FIREFOX_PREFS: lean_prefs,
+    },
+    LAUNCH_PROFILE.CI_HEADLESS: {
+        LAUNCH_PROFILE.VERSION: 1,
+        LAUNCH_PROFILE.CHROMIUM: _LEAN_CHROMIUM + ['--headless=new', '--window-size=1920,1080',
+                                                   '--disable-gpu', '--disable-dev-shm-usage', '--no-sandbox'],
+        LAUNCH_PROFILE.FIREFOX_ARGS: ['-headless', '--width=1920', '--height=1080'],
+        LAUNCH_PROFILE.FIREFOX_PREFS: lean_prefs,
+    },
+    LAUNCH_PROFILE.DEBUG: {
+        LAUNCH_PROFILE.VERSION: 1,
+        LAUNCH_PROFILE.CHROMIUM: ['--auto-open-devtools-for-tabs', '--enable-logging=stderr', '--v=1'],
+        LAUNCH_PROFILE.FIREFOX_ARGS: ['-devtools'],
+        LAUNCH_PROFILE.FIREFOX_PREFS: debug_prefs,
+    },
+}
+
+
+def launch_profiles(nconfig: Union[dict, None] = None) -> dict:
+    """Returns built-in profiles updated with profiles defined in nrobo <nconfig>"""
+
+    profiles = copy.deepcopy(PROFILES)
+    for name, profile in ((nconfig or {}).get(LAUNCH_PROFILE.PROFILES) or {}).items():
+        profiles[name] = {
+            LAUNCH_PROFILE.VERSION: int(profile.get(LAUNCH_PROFILE.VERSION, 1)),
+            LAUNCH_PROFILE.CHROMIUM: list(profile.get(LAUNCH_PROFILE.CHROMIUM) or []),
+            LAUNCH_PROFILE.FIREFOX_ARGS: list(profile.get(LAUNCH_PROFILE.FIREFOX_ARGS) or []),
+            LAUNCH_PROFILE.FIREFOX_PREFS: dict(profile.get(LAUNCH_PROFILE.FIREFOX_PREFS) or {}),
+        }
+
+    return profiles
+
+
+def resolve_launch_profile(spec: Union[str, None], nconfig: Union[dict, None] = None) -> Union[dict, None]:
+    """Returns profile for <spec> (name or name@version), None for no profile"""
+
+    if not spec or str(spec).lower() == LAUNCH_PROFILE.NONE:
+        return None
+
+    name, _, version = str(spec).partition(LAUNCH_PROFILE.VERSION_SEPARATOR)
+    profiles = launch_profiles(nconfig)
+    if name not in profiles:
+        raise ValueError(f"Unknown launch profile: {name}. Available profiles are {list(profiles)}")
+
+    profile = profiles[name]
+    if version and int(version) != profile[LAUNCH_PROFILE.VERSION]:
+        raise ValueError(f"Launch profile {name} is at version {profile[LAUNCH_PROFILE.VERSION]}, "
+                         f"but version {version} was requested")
+
+    return {"name": name, **profile}
+
+
+def selected_launch_profile(cli_value: Union[str, None], nconfig: Union[dict, None]) -> Union[dict, None]:
+    """Returns profile selected on command line, else the one of nrobo-config.yaml"""
+
+    return resolve_launch_profile(cli_value or (nconfig or {}).get(LAUNCH_PROFILE.PROFILE), nconfig)
+
+
+def merge_chromium_switches(switches: [str]) -> [str]:
+    """Dedupe switches and fold every --disable-features=... into one switch.
+
+       Chromium honours only the last --disable-features switch, so
+       separate ones would silently cancel each other."""
+
+    merged = []
+    features = []
+    for switch in switches:
+        if switch.startswith(LAUNCH_PROFILE.DISABLE_FEATURES):
+            features.extend(f for f in switch[len(LAUNCH_PROFILE.DISABLE_FEATURES):].split(",") if f)
+        elif "<" in switch:
+            continue  # switch with unfilled placeholder, e.g. <path-to-file>
+        elif switch not in merged:
+            merged.append(switch)
+
+    if features:
+        merged.append(LAUNCH_PROFILE.DISABLE_FEATURES + ",".join(dict.fromkeys(features)))
+
+    return merged
+
+
+def apply_launch_profile(options, profile: Union[dict, None]):
+    """Apply <profile> to browser <options>. Browsers other than chromium and firefox are left as is."""
+
+    if profile is None:
+        return options
+
+    if hasattr(options, "set_preference"):
+        """firefox"""
+        for argument in profile[LAUNCH_PROFILE.FIREFOX_ARGS]:
+            if argument not in options.arguments:
+                options.add_argument(argument)
+        for name, value in profile[LAUNCH_PROFILE.FIREFOX_PREFS].items():
+            options.set_preference(name, value)
+
+    elif hasattr(options, "add_experimental_option"):
+        """chrome and edge"""
+        switches = merge_chromium_switches(list(options.arguments) + profile[LAUNCH_PROFILE.CHROMIUM])
+        options.arguments.clear()
+        for switch in switches:
+            options.add_argument(switch)
+
+    return options
@@ -0,0 +1,124 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Driver launched on first use.
+
+driver fixture is autouse, yet many tests (nogui, api, unit, tests
+using logger or faker only) never touch a browser. The fixture yields
+a LazyDriver, which launches the browser the first time an attribute
+of the driver is used. Tests that never use it launch nothing, and
+their teardown and screenshots are skipped. Launches and avoided
+launches are counted per run.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Union
+
+
+class LAZY_DRIVER:
+    """Lazy driver constants"""
+
+    STATS_FILE = "driver-launches.jsonl"
+
+
+class LazyDriver:
+    """Proxy of a webdriver made by factory() on first attribute access"""
+
+    __slots__ = ("_factory", "_driver", "_launched", "_error", "_lock")
+
+    def __init__(self, factory: Callable):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_driver", None)
+        object.__setattr__(self, "_launched", False)
+        object.__setattr__(self, "_error", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def materialised(self) -> bool:
+        """True once browser was launched (even if launching failed)"""
+        return self._launched
+
+    def materialise(self):
+        """Launch browser if not yet done and return the driver.
+           A failed launch is not retried, its error is raised again on every use."""
+
+        if not self._launched:
+            with self._lock:
+                if not self._launched:
+                    object.__setattr__(self, "_launched", True)
+                    try:
+                        object.__setattr__(self, "_driver", self._factory())
+                    except Exception as e:
+                        object.__setattr__(self, "_error", e)
+        if self._error is not None:
+            raise self._error
+        return self._driver
+
+    def __getattr__(self, name):
+        return getattr(self.materialise(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.materialise(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.materialise(), name)
+
+    def __enter__(self):
+        return self.materialise().__enter__()
+
+    def __exit__(self, *args):
+        return self.materialise().__exit__(*args)
+
+    def __repr__(self):
+        return f"<LazyDriver of {self._driver!r}>" if self._launched else "<LazyDriver (not launched)>"
+
+
+_LAUNCHES = {"tests": 0, "launched": 0}
+
+
+def record_launch(launched: bool) -> None:
+    """Count a test of this process and whether it launched its browser"""
+
+    _LAUNCHES["tests"] += 1
+    _LAUNCHES["launched"] += int(launched)
+
+
+def flush_launch_stats(report_dir: Union[str, Path]) -> None:
+    """Append browser launch counts of this process to launch stats file of the run"""
+
+    if not _LAUNCHES["tests"]:
+        return
+
+    Path(report_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(report_dir) / LAZY_DRIVER.STATS_FILE, "a") as f:
+        f.write(json.dumps(_LAUNCHES) + "\n")
+    _LAUNCHES.update(tests=0, launched=0)
+
+
+def launch_report(report_dir: Union[str, Path]) -> dict:
+    """Tests, browser launches and avoided launches of the run"""
+
+    stats_file = Path(report_dir) / LAZY_DRIVER.STATS_FILE
+    if not stats_file.exists():
+        return {}
+
+    report = {"tests": 0, "launched": 0}
+    with open(stats_file) as f:
+        for line in f:
+            if line.strip():
+                for key, value in json.loads(line).items():
+                    report[key] += value
+    stats_file.unlink()
+    report["avoided"] = report["tests"] - report["launched"]
+
+    return report
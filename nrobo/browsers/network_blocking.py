@@ -0,0 +1,208 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Network request blocking profiles.
+
+Profiles are defined in nrobo-config.yaml under network_blocking_profiles
+as url patterns and resource types to block. Default profile is given by
+network_blocking_profile and can be overridden per test with marker:
+
+    @pytest.mark.block_network("lean")
+    def test_checkout(self, driver):
+        ...
+
+Chromium drivers block matching requests through CDP Network.setBlockedURLs.
+Patterns match urls with or without query string. Other browsers run the
+test unblocked. Number of blocked requests per resource type is recorded in
+user properties of every test, together with bytes saved. Blocked requests
+are never downloaded, so bytes saved is an estimate: blocked requests times
+typical transfer size of their resource type (TYPICAL_BYTES).
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import logging
+from typing import Union
+
+
+class NETWORK_BLOCKING:
+    """Network blocking settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    PROFILES = "network_blocking_profiles"  # {profile: {urls: [...], resource_types: [...]}}
+    PROFILE = "network_blocking_profile"  # default profile of every test
+    MARKER = "block_network"
+
+    URLS = "urls"
+    RESOURCE_TYPES = "resource_types"
+    NONE = "none"
+
+    BLOCKED_REASON = "inspector"  # blockedReason of requests blocked by setBlockedURLs
+    USER_PROPERTY = "network_blocking"
+    LOGGING_PREFS = "goog:loggingPrefs"
+
+
+# Network.setBlockedURLs matches urls only, so resource types are blocked by their file extensions.
+# Patterns are matched against the whole url, see blocked_url_patterns() for urls with query string.
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"],
+    "Font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "Media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.mov"],
+    "Stylesheet": ["*.css"],
+    "Script": ["*.js"],
+}
+
+# Typical transfer size per resource type. Blocked requests are never downloaded, so bytes saved are estimated.
+TYPICAL_BYTES = {
+    "Image": 40_000,
+    "Font": 30_000,
+    "Media": 500_000,
+    "Stylesheet": 20_000,
+    "Script": 60_000,
+    "Other": 10_000,
+}
+
+
+def blocking_profile(nconfig: Union[dict, None], name: Union[str, None]) -> Union[dict, None]:
+    """Returns {urls: [...], resource_types: [...]} of profile <name> or None for no blocking"""
+
+    if not name or str(name).lower() == NETWORK_BLOCKING.NONE:
+        return None
+
+    profiles = (nconfig or {}).get(NETWORK_BLOCKING.PROFILES) or {}
+    if name not in profiles:
+        raise ValueError(f"Unknown network blocking profile: {name}. Defined profiles are {list(profiles)}")
+
+    profile = profiles[name] or {}
+    return {NETWORK_BLOCKING.URLS: list(profile.get(NETWORK_BLOCKING.URLS) or []),
+            NETWORK_BLOCKING.RESOURCE_TYPES: list(profile.get(NETWORK_BLOCKING.RESOURCE_TYPES) or [])}
+
+
+def selected_profile_name(item, nconfig: Union[dict, None]) -> Union[str, None]:
+    """Returns blocking profile name of test <item>: its block_network marker or default of config"""
+
+    marker = item.get_closest_marker(NETWORK_BLOCKING.MARKER) if item is not None else None
+    if marker is not None:
+        return marker.args[0] if marker.args else marker.kwargs.get("profile", NETWORK_BLOCKING.NONE)
+
+    return (nconfig or {}).get(NETWORK_BLOCKING.PROFILE)
+
+
+def blocked_url_patterns(profile: dict) -> [str]:
+    """Returns Network.setBlockedURLs patterns of <profile>"""
+
+    patterns = list(profile[NETWORK_BLOCKING.URLS])
+    for resource_type in profile[NETWORK_BLOCKING.RESOURCE_TYPES]:
+        try:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        except KeyError:
+            raise ValueError(f"Unsupported resource type to block: {resource_type}. "
+                             f"Supported types are {list(RESOURCE_TYPE_PATTERNS)}")
+
+    # whole url is matched, so *.png would miss /logo.png?v=3
+    patterns = [variant for pattern in patterns
+                for variant in ([pattern] if pattern.endswith("*") or "?" in pattern else [pattern, f"{pattern}?*"])]
+
+    return list(dict.fromkeys(patterns))  # unique, in order
+
+
+def enable_performance_log(options):
+    """Ask chromium driver for the performance log which blocked requests are counted from"""
+
+    options.set_capability(NETWORK_BLOCKING.LOGGING_PREFS, {"performance": "ALL"})
+    return options
+
+
+class NetworkBlocker:
+    """Applies a blocking profile to a driver and counts blocked requests"""
+
+    def __init__(self, driver, name: str, profile: dict):
+        """
+        Constructor
+
+        :param driver: webdriver of the test
+        :param name: profile name
+        :param profile: profile as returned by blocking_profile()
+        """
+        self.driver = driver
+        self.name = name
+        self.patterns = blocked_url_patterns(profile)
+        self.enabled = False
+        self.blocked = 0
+        self.blocked_by_type = {}  # resource type: blocked requests
+
+    def enable(self) -> bool:
+        """Start blocking. Returns False if the driver does not support CDP."""
+
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            logging.getLogger("nrobo").info(f"Network blocking profile <{self.name}> "
+                                            f"is not supported by this browser. Running unblocked.")
+            return False
+
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        except Exception as e:
+            logging.getLogger("nrobo").info(f"Network blocking profile <{self.name}> could not be applied: {e}")
+            return False
+
+        self.enabled = True
+        return True
+
+    def consume(self, entries: [dict]) -> None:
+        """Update counters from performance log <entries>"""
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            params = message.get("params", {})
+            if message.get("method") == "Network.loadingFailed" \
+                    and params.get("blockedReason") == NETWORK_BLOCKING.BLOCKED_REASON:
+                self.blocked += 1
+                resource_type = params.get("type") or "Other"
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def collect(self) -> None:
+        """Read pending performance log of the driver into counters"""
+
+        if not self.enabled:
+            return
+
+        try:
+            self.consume(self.driver.get_log("performance"))
+        except Exception:
+            pass  # performance log not enabled for this driver
+
+    def counters(self) -> dict:
+        """Returns counters of the test"""
+
+        self.collect()
+        estimates = {resource_type: count * TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES["Other"])
+                     for resource_type, count in self.blocked_by_type.items()}
+        return {"profile": self.name, "enabled": self.enabled, "blocked_requests": self.blocked,
+                "blocked_by_type": dict(self.blocked_by_type),
+                "estimated_bytes_saved": sum(estimates.values()), "estimated_bytes_saved_by_type": estimates}
+
+
+def network_blocker(driver, item, nconfig: Union[dict, None]) -> Union[NetworkBlocker, None]:
+    """Apply blocking profile of test <item> to <driver>. Returns None if test has no profile."""
+
+    name = selected_profile_name(item, nconfig)
+    profile = blocking_profile(nconfig, name)
+    if profile is None or driver is None:
+        return None
+
+    blocker = NetworkBlocker(driver, name, profile)
+    blocker.enable()
+
+    return blocker
@@ -0,0 +1,270 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Front-end performance metrics.
+
+Usage in page classes:
+
+    metrics = self.perf.metrics()  # of current page
+    assert metrics["lcp"] < 2500
+
+metrics() reads Navigation Timing, Paint Timing, largest contentful
+paint and cumulative layout shift (PerformanceObserver), JS heap size
+and, on chromium, CDP Performance.getMetrics. Every sample is recorded
+against the running test. With perf_metrics: true in nrobo-config.yaml
+the last page of every passed test is sampled too. Samples of the run
+are aggregated into percentile tables per page url, written to
+results/perf-report.json and shown in the html report.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import html
+import json
+import math
+from pathlib import Path
+from typing import Union
+from urllib.parse import urlsplit, urlunsplit
+
+
+class PERF:
+    """Performance metrics settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    ENABLED = "perf_metrics"
+
+    ATTRIBUTE = "_nrobo_perf_collector"
+    SAMPLES_FILE = "perf-samples.jsonl"
+    REPORT_FILE = "perf-report.json"
+    PERCENTILES = [50, 75, 95]
+    WAIT_MS = 50  # for buffered observer entries
+
+    # CDP Performance.getMetrics name: (metric, scale)
+    CDP_METRICS = {
+        "Nodes": ("dom_nodes", 1),
+        "JSEventListeners": ("event_listeners", 1),
+        "LayoutCount": ("layouts", 1),
+        "RecalcStyleCount": ("style_recalcs", 1),
+        "ScriptDuration": ("script_ms", 1000),
+        "TaskDuration": ("task_ms", 1000),
+        "JSHeapUsedSize": ("heap_used", 1),
+        "JSHeapTotalSize": ("heap_total", 1),
+    }
+
+    # columns of report section
+    REPORT_METRICS = ["ttfb", "fcp", "lcp", "cls", "dom_content_loaded", "load", "heap_used"]
+
+    SCRIPT = """
+var done = arguments[arguments.length - 1];
+var observed = {lcp: null, cls: 0};
+try {
+    new PerformanceObserver(function (list) {
+        var entries = list.getEntries();
+        if (entries.length) { observed.lcp = entries[entries.length - 1].startTime; }
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+    new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (entry) { if (!entry.hadRecentInput) { observed.cls += entry.value; } });
+    }).observe({type: 'layout-shift', buffered: true});
+} catch (e) { observed.cls = null; }
+setTimeout(function () {
+    var navigation = performance.getEntriesByType('navigation')[0];
+    var paint = {};
+    performance.getEntriesByType('paint').forEach(function (entry) { paint[entry.name] = entry.startTime; });
+    var memory = performance.memory;
+    done({url: location.href, navigation: navigation ? navigation.toJSON() : null, paint: paint,
+          lcp: observed.lcp, cls: observed.cls,
+          heap: memory ? {used: memory.usedJSHeapSize, total: memory.totalJSHeapSize} : null});
+}, arguments[0]);
+"""
+
+
+def page_key(url: str) -> str:
+    """Samples are grouped by url without query and fragment"""
+
+    parts = urlsplit(url or "")
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def flatten(raw: dict) -> dict:
+    """Metrics in milliseconds, bytes and counts out of raw page measurements"""
+
+    metrics = {"url": raw.get("url")}
+    navigation = raw.get("navigation") or {}
+    if navigation:
+        metrics.update({
+            "ttfb": navigation["responseStart"] - navigation.get("startTime", 0),
+            "dns": navigation["domainLookupEnd"] - navigation["domainLookupStart"],
+            "connect": navigation["connectEnd"] - navigation["connectStart"],
+            "response": navigation["responseEnd"] - navigation["responseStart"],
+            "dom_interactive": navigation["domInteractive"],
+            "dom_content_loaded": navigation["domContentLoadedEventEnd"],
+            "load": navigation["loadEventEnd"],
+            "transfer_size": navigation.get("transferSize"),
+        })
+
+    paint = raw.get("paint") or {}
+    metrics["fp"] = paint.get("first-paint")
+    metrics["fcp"] = paint.get("first-contentful-paint")
+    metrics["lcp"] = raw.get("lcp")
+    metrics["cls"] = raw.get("cls")
+
+    heap = raw.get("heap") or {}
+    metrics["heap_used"] = heap.get("used")
+    metrics["heap_total"] = heap.get("total")
+
+    for name, value in (raw.get("cdp") or {}).items():
+        if name in PERF.CDP_METRICS:
+            metric, scale = PERF.CDP_METRICS[name]
+            metrics[metric] = value * scale
+
+    return {key: value for key, value in metrics.items() if value is not None}
+
+
+class PerfCollector:
+    """Performance samples of one driver"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.samples = []
+        self._cdp_enabled = False
+
+    def cdp_metrics(self) -> dict:
+        """CDP Performance.getMetrics by name, empty for browsers without devtools"""
+
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return {}
+
+        try:
+            if not self._cdp_enabled:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                self._cdp_enabled = True
+            return {metric["name"]: metric["value"]
+                    for metric in self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        except Exception:
+            return {}
+
+    def metrics(self, record: bool = True) -> dict:
+        """Measure current page. <record> keeps sample for the run report."""
+
+        raw = self.driver.execute_async_script(PERF.SCRIPT, PERF.WAIT_MS) or {}
+        raw["cdp"] = self.cdp_metrics()
+        metrics = flatten(raw)
+        if record:
+            self.samples.append(metrics)
+
+        return metrics
+
+
+def perf_collector(driver) -> PerfCollector:
+    """Returns performance collector of <driver>"""
+
+    collector = getattr(driver, PERF.ATTRIBUTE, None)
+    if collector is None:
+        collector = PerfCollector(driver)
+        setattr(driver, PERF.ATTRIBUTE, collector)
+
+    return collector
+
+
+def perf_settings(nconfig: Union[dict, None]) -> dict:
+    """Read performance metrics settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {'enabled': bool(nconfig.get(PERF.ENABLED, False))}
+
+
+def start_perf_samples(report_dir: Union[str, Path]) -> None:
+    """Remove samples and report of a previous run, results directory is not cleaned between runs"""
+
+    (Path(report_dir) / PERF.SAMPLES_FILE).unlink(missing_ok=True)
+    (Path(report_dir) / PERF.REPORT_FILE).unlink(missing_ok=True)
+
+
+def flush_perf_samples(driver, nodeid: str, report_dir: Union[str, Path], nconfig: Union[dict, None],
+                       passed: bool = True) -> int:
+    """Append performance samples of test <nodeid> to samples file of the run. Samples last page
+       of a passed test first if perf_metrics is enabled. Returns number of samples written."""
+
+    if perf_settings(nconfig)['enabled'] and passed:
+        try:
+            perf_collector(driver).metrics()
+        except Exception:
+            pass  # e.g. no page loaded
+
+    collector = getattr(driver, PERF.ATTRIBUTE, None)
+    if collector is None or not collector.samples:
+        return 0
+
+    samples, collector.samples = collector.samples, []
+    Path(report_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(report_dir) / PERF.SAMPLES_FILE, "a") as f:
+        f.write("".join(json.dumps({"nodeid": nodeid, **sample}) + "\n" for sample in samples))
+
+    return len(samples)
+
+
+def percentile(values: [float], q: float) -> float:
+    """Nearest rank percentile"""
+
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def aggregate(samples: [dict]) -> dict:
+    """Percentile table per page url: {url: {metric: {count, p50, p75, p95, max}}}"""
+
+    pages = {}
+    for sample in samples:
+        page = pages.setdefault(page_key(sample.get("url")), {})
+        for metric, value in sample.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                page.setdefault(metric, []).append(value)
+
+    return {url: {metric: {"count": len(values),
+                           **{f"p{q}": round(percentile(values, q), 4) for q in PERF.PERCENTILES},
+                           "max": round(max(values), 4)}
+                  for metric, values in sorted(metrics.items())}
+            for url, metrics in sorted(pages.items())}
+
+
+def perf_report(report_dir: Union[str, Path]) -> dict:
+    """Aggregate performance samples of the run and write them to perf report file.
+       Samples are kept till next run starts, html report summary aggregates them again."""
+
+    samples_file = Path(report_dir) / PERF.SAMPLES_FILE
+    if not samples_file.exists():
+        return {}
+
+    with open(samples_file) as f:
+        report = aggregate([json.loads(line) for line in f if line.strip()])
+
+    with open(Path(report_dir) / PERF.REPORT_FILE, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    return report
+
+
+def perf_html(report: dict) -> str:
+    """Html report section: p50 / p95 of main metrics per page url"""
+
+    if not report:
+        return ""
+
+    header = "".join(f"<th>{metric} p50 / p95</th>" for metric in PERF.REPORT_METRICS)
+    rows = []
+    for url, metrics in report.items():
+        cells = "".join(f"<td>{metrics[m]['p50']:g} / {metrics[m]['p95']:g}</td>" if m in metrics else "<td>-</td>"
+                        for m in PERF.REPORT_METRICS)
+        count = max(m["count"] for m in metrics.values())
+        rows.append(f"<tr><td>{html.escape(url)}</td><td>{count}</td>{cells}</tr>")
+
+    return (f"<h2>Performance</h2><p>Milliseconds, cls unitless, heap in bytes. "
+            f"Full tables in {PERF.REPORT_FILE}.</p>"
+            f"<table><tr><th>page</th><th>samples</th>{header}</tr>{''.join(rows)}</table>")
@@ -0,0 +1,383 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Pre-warmed browser profile templates cloned per session.
+
+A fresh browser profile pays first run initialisation, component
+registration and cache population on every session. With
+profile_templates: true in nrobo-config.yaml, the first local session
+of each browser in a run seeds a template profile. When it quits,
+cookies, storage and session state are dropped from it and the
+template, with its first run state and cached app assets, is sealed.
+Every later session starts from a clone of the template:
+
+    auto      reflink (copy on write) where the file system supports it, else copy
+    reflink   same as auto
+    hardlink  cache directories are hard linked, everything else copied.
+              Fastest, but browser writes to a shared cache entry reach the
+              template too. Use when tests do not change app assets.
+    copy      plain copy
+
+Clones are removed in background after their session. Startup time of
+sessions with and without template is reported at the end of the run.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import os
+import queue
+import shutil
+import statistics
+import threading
+import uuid
+from pathlib import Path
+from typing import Union
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+
+class PROFILE_TEMPLATE:
+    """Profile template settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    ENABLED = "profile_templates"
+    DIR = "profile_template_dir"
+    CLONE = "profile_template_clone"  # auto | reflink | hardlink | copy
+
+    AUTO = "auto"
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+    COPY = "copy"
+    CLONE_METHODS = [AUTO, REFLINK, HARDLINK, COPY]
+
+    DEFAULT_DIR = ".nrobo-profile-templates"
+    ENV_RUN = "NROBO_PROFILE_TEMPLATE_RUN"  # templates are shared by test workers of one run
+    TEMPLATE = "template"
+    CLONES = "clones"
+    READY_FILE = ".nrobo-template-ready"
+    LOCK_FILE = ".nrobo-template-lock"
+    STARTUP_FILE = "profile-startup.jsonl"
+    REPORT_FILE = "profile-templates.json"
+
+    CHROMIUM = "chromium"
+    FIREFOX = "firefox"
+    FICLONE = 0x40049409  # linux ioctl
+
+    # per session state dropped from template before sealing it
+    SESSION_STATE = {
+        CHROMIUM: ["SingletonLock", "SingletonSocket", "SingletonCookie", "Default/Cookies",
+                   "Default/Cookies-journal", "Default/Local Storage", "Default/Session Storage",
+                   "Default/Sessions", "Default/IndexedDB", "Default/Service Worker", "Default/History",
+                   "Default/History-journal", "Default/Login Data", "Default/Login Data-journal",
+                   "Default/Web Data", "Default/Web Data-journal", "Default/Current Session",
+                   "Default/Current Tabs", "Default/Last Session", "Default/Last Tabs"],
+        FIREFOX: ["lock", ".parentlock", "parent.lock", "cookies.sqlite", "cookies.sqlite-wal", "webappsstore.sqlite",
+                  "storage", "sessionstore.jsonlz4", "sessionstore-backups", "places.sqlite", "places.sqlite-wal",
+                  "formhistory.sqlite", "logins.json", "key4.db"],
+    }
+
+    # directories shared by hard links in hardlink mode
+    CACHE_DIRS = {
+        CHROMIUM: ["Default/Cache", "Default/Code Cache", "Default/GPUCache", "GrShaderCache", "ShaderCache"],
+        FIREFOX: ["cache2", "startupCache"],
+    }
+
+
+def browser_kind(browser: str) -> str:
+    """Profile format of <browser>: chromium or firefox"""
+    return PROFILE_TEMPLATE.FIREFOX if str(browser).startswith(PROFILE_TEMPLATE.FIREFOX) else PROFILE_TEMPLATE.CHROMIUM
+
+
+def reflink(source: Union[str, Path], target: Union[str, Path]) -> bool:
+    """Copy on write clone of file <source> to <target>. False if file system can not clone."""
+
+    if fcntl is None:
+        return False
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), PROFILE_TEMPLATE.FICLONE, src.fileno())
+        except OSError:
+            return False
+
+    shutil.copystat(source, target)
+    return True
+
+
+def clone_tree(source: Union[str, Path], target: Union[str, Path], method: str = PROFILE_TEMPLATE.AUTO,
+               shared_dirs: [str] = ()) -> str:
+    """Clone directory <source> to <target> by <method>. Returns method actually used."""
+
+    source, target = Path(source), Path(target)
+    shared = [source / d for d in shared_dirs]
+    can_reflink = method in [PROFILE_TEMPLATE.AUTO, PROFILE_TEMPLATE.REFLINK]
+    used = set()
+
+    for root, dirs, files in os.walk(source):
+        root = Path(root)
+        destination = target / root.relative_to(source)
+        destination.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            src, dst = root / name, destination / name
+            if src.is_symlink():
+                os.symlink(os.readlink(src), dst)
+                continue
+            if method == PROFILE_TEMPLATE.HARDLINK and any(d == root or d in root.parents for d in shared):
+                try:
+                    os.link(src, dst)
+                    used.add(PROFILE_TEMPLATE.HARDLINK)
+                    continue
+                except OSError:
+                    pass  # e.g. clone on other device
+            if can_reflink:
+                if reflink(src, dst):
+                    used.add(PROFILE_TEMPLATE.REFLINK)
+                    continue
+                can_reflink = False  # not supported here, do not retry for every file
+            shutil.copy2(src, dst)
+            used.add(PROFILE_TEMPLATE.COPY)
+
+    for preferred in [PROFILE_TEMPLATE.HARDLINK, PROFILE_TEMPLATE.REFLINK]:
+        if preferred in used:
+            return preferred
+    return PROFILE_TEMPLATE.COPY
+
+
+def drop_session_state(profile: Union[str, Path], kind: str) -> None:
+    """Remove cookies, storage and session files from <profile> of browser <kind>"""
+
+    for name in PROFILE_TEMPLATE.SESSION_STATE[kind]:
+        path = Path(profile) / name
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.exists() or path.is_symlink():
+            path.unlink()
+
+
+class ProfileCleaner:
+    """Removes profile directories on a background thread"""
+
+    def __init__(self):
+        self.removed = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="nrobo-profile-cleaner", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                if path is not None:
+                    shutil.rmtree(path, ignore_errors=True)
+                    self.removed += 1
+            finally:
+                self._queue.task_done()
+
+    def remove(self, path: Union[str, Path]) -> None:
+        self._queue.put(path)
+
+    def drain(self) -> None:
+        """Wait till every queued directory is removed"""
+        self._queue.join()
+
+
+class ProfileTemplates:
+    """Seeds, seals and clones profile templates of one run"""
+
+    def __init__(self, directory: Union[str, Path], run_id: str, method: str = PROFILE_TEMPLATE.AUTO):
+        """
+        Constructor
+
+        :param directory: base directory of templates
+        :param run_id: templates are shared by every process of run <run_id>
+        :param method: clone method, see module doc
+        """
+        if method not in PROFILE_TEMPLATE.CLONE_METHODS:
+            raise ValueError(f"Invalid profile template clone method: {method}. "
+                             f"Valid methods are {PROFILE_TEMPLATE.CLONE_METHODS}")
+
+        self.directory = Path(directory) / run_id
+        self.method = method
+        self.cleaner = ProfileCleaner()
+        self._seeding = {}  # browser: template being seeded by this process
+        self._lock = threading.Lock()
+
+    def _template(self, browser: str) -> Path:
+        return self.directory / browser / PROFILE_TEMPLATE.TEMPLATE
+
+    def _new_clone(self, browser: str) -> Path:
+        return self.directory / browser / PROFILE_TEMPLATE.CLONES / uuid.uuid4().hex
+
+    def _claim_seeding(self, browser: str) -> bool:
+        """Only one process of the run seeds template of <browser>"""
+
+        lock = self.directory / browser / PROFILE_TEMPLATE.LOCK_FILE
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+    def acquire(self, browser: str) -> (Path, bool):
+        """Returns (profile directory for new session of <browser>, whether it was cloned from template)"""
+
+        template = self._template(browser)
+        if (template / PROFILE_TEMPLATE.READY_FILE).exists():
+            clone = self._new_clone(browser)
+            clone_tree(template, clone, self.method, PROFILE_TEMPLATE.CACHE_DIRS[browser_kind(browser)])
+            return clone, True
+
+        with self._lock:
+            if browser not in self._seeding and self._claim_seeding(browser):
+                template.mkdir(parents=True, exist_ok=True)
+                self._seeding[browser] = template
+                return template, False
+
+        """template being seeded by another session, start from an empty profile"""
+        clone = self._new_clone(browser)
+        clone.mkdir(parents=True)
+        return clone, False
+
+    def release(self, browser: str, profile: Union[str, Path]) -> None:
+        """Session of <profile> has ended: seal seeded template or remove clone in background"""
+
+        with self._lock:
+            seeded = self._seeding.get(browser) == Path(profile)
+            if seeded:
+                del self._seeding[browser]
+
+        if seeded:
+            drop_session_state(profile, browser_kind(browser))
+            (Path(profile) / PROFILE_TEMPLATE.READY_FILE).touch()
+        else:
+            self.cleaner.remove(profile)
+
+    def close(self) -> None:
+        self.cleaner.drain()
+
+
+def apply_profile(options, profile: Union[str, Path, None]):
+    """Start browser of <options> with profile directory <profile>. No-op if profile is None."""
+
+    if profile is None:
+        return options
+
+    if hasattr(options, "set_preference"):
+        """firefox, use directory in place. options.profile would copy it."""
+        options.add_argument("-profile")
+        options.add_argument(str(profile))
+    else:
+        options.add_argument(f"--user-data-dir={profile}")
+
+    return options
+
+
+def profile_template_settings(nconfig: Union[dict, None]) -> dict:
+    """Read profile template settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'enabled': bool(nconfig.get(PROFILE_TEMPLATE.ENABLED, False)),
+        'directory': nconfig.get(PROFILE_TEMPLATE.DIR, PROFILE_TEMPLATE.DEFAULT_DIR),
+        'method': str(nconfig.get(PROFILE_TEMPLATE.CLONE, PROFILE_TEMPLATE.AUTO)).lower()
+    }
+
+
+def start_profile_templates(nconfig: Union[dict, None], report_dir: Union[str, Path]) -> Union[str, None]:
+    """Start templates of this run if enabled and publish run id to test workers"""
+
+    if not profile_template_settings(nconfig)['enabled']:
+        return None
+
+    (Path(report_dir) / PROFILE_TEMPLATE.STARTUP_FILE).unlink(missing_ok=True)  # startup data of previous run
+
+    os.environ[PROFILE_TEMPLATE.ENV_RUN] = uuid.uuid4().hex
+    return os.environ[PROFILE_TEMPLATE.ENV_RUN]
+
+
+_TEMPLATES = None
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def profile_templates(nconfig: Union[dict, None]) -> Union[ProfileTemplates, None]:
+    """Returns profile templates of this run in this process, None if disabled"""
+
+    global _TEMPLATES
+
+    run_id = os.environ.get(PROFILE_TEMPLATE.ENV_RUN)
+    if not run_id:
+        return None
+
+    with _TEMPLATES_LOCK:
+        if _TEMPLATES is None:
+            settings = profile_template_settings(nconfig)
+            _TEMPLATES = ProfileTemplates(settings['directory'], run_id, settings['method'])
+
+    return _TEMPLATES
+
+
+def close_profile_templates() -> None:
+    """Wait for background removal of clones of this process"""
+
+    global _TEMPLATES
+
+    with _TEMPLATES_LOCK:
+        templates, _TEMPLATES = _TEMPLATES, None
+    if templates is not None:
+        templates.close()
+
+
+def record_startup(report_dir: Union[str, Path], browser: str, seconds: float, templated: bool) -> None:
+    """Append browser startup time of one session to startup data file of the run"""
+
+    Path(report_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(report_dir) / PROFILE_TEMPLATE.STARTUP_FILE, "a") as f:
+        f.write(json.dumps({'browser': browser, 'seconds': round(seconds, 4), 'templated': templated}) + "\n")
+
+
+def startup_report(report_dir: Union[str, Path]) -> dict:
+    """Median startup time per browser with and without template. Written to report dir."""
+
+    startup_file = Path(report_dir) / PROFILE_TEMPLATE.STARTUP_FILE
+    if not startup_file.exists():
+        return {}
+
+    samples = {}
+    with open(startup_file) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                key = 'with_template' if record['templated'] else 'without_template'
+                samples.setdefault(record['browser'], {}).setdefault(key, []).append(record['seconds'])
+
+    report = {browser: {key: {'sessions': len(values), 'median_s': round(statistics.median(values), 3)}
+                        for key, values in groups.items()}
+              for browser, groups in samples.items()}
+
+    with open(Path(report_dir) / PROFILE_TEMPLATE.REPORT_FILE, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    return report
+
+
+def stop_profile_templates(nconfig: Union[dict, None], report_dir: Union[str, Path]) -> dict:
+    """Remove templates of this run and return startup report"""
+
+    run_id = os.environ.pop(PROFILE_TEMPLATE.ENV_RUN, None)
+    close_profile_templates()
+    if run_id:
+        shutil.rmtree(Path(profile_template_settings(nconfig)['directory']) / run_id, ignore_errors=True)
+
+    return startup_report(report_dir)
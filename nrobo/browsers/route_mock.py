@@ -0,0 +1,280 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Answer browser requests from local fixtures through CDP Fetch interception.
+
+Usage in page classes:
+
+    self.mock_route("*/api/orders*", "orders.json")  # fixture file in mock_fixtures_dir
+    self.mock_route("*/api/user", lambda request: {"status": 200, "body": {"name": "nRoBo"}})
+
+With mock_mode: record in nrobo-config.yaml, file routes are passed to
+the real backend once and responses are written to their fixture files.
+In replay mode (default) fixture files answer the requests. Per test
+report of routes served from mocks is recorded in user properties.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import base64
+import fnmatch
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Union
+
+from nrobo.exceptions import NRoBoCdpError, NRoBoCdpNotAvailable
+
+
+class MOCK:
+    """Route mocking settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    MODE = "mock_mode"  # replay | record
+    FIXTURES_DIR = "mock_fixtures_dir"
+
+    REPLAY = "replay"
+    RECORD = "record"
+    MODES = [REPLAY, RECORD]
+
+    DEFAULT_FIXTURES_DIR = "test-data/mocks"
+    FIXTURE_EXTENSION = ".json"
+    ATTRIBUTE = "_nrobo_route_mocker"
+    USER_PROPERTY = "mocked_routes"
+    # headers describing the encoding on the wire, not true of the decoded body a fixture holds
+    TRANSPORT_HEADERS = ["content-encoding", "content-length", "transfer-encoding"]
+
+
+def body_headers(headers: dict) -> dict:
+    """<headers> without transport headers, fit for a decoded body"""
+    return {name: value for name, value in headers.items() if name.lower() not in MOCK.TRANSPORT_HEADERS}
+
+
+def load_fixture(path: Union[str, Path]) -> (int, dict, bytes):
+    """Returns (status, headers, body) stored in fixture file <path>"""
+
+    with open(path, encoding="utf-8") as file:
+        fixture = json.load(file)
+
+    body = fixture.get("body", "")
+    if fixture.get("base64"):
+        body = base64.b64decode(body)
+    elif not isinstance(body, str):
+        body = json.dumps(body)
+
+    return fixture.get("status", 200), body_headers(fixture.get("headers", {})), \
+        body if isinstance(body, bytes) else body.encode()
+
+
+def save_fixture(path: Union[str, Path], status: int, headers: dict, body: bytes) -> None:
+    """Write response to fixture file <path>. Text bodies are kept readable."""
+
+    try:
+        text, is_base64 = body.decode("utf-8"), False
+    except UnicodeDecodeError:
+        text, is_base64 = base64.b64encode(body).decode("ascii"), True
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"status": status, "headers": body_headers(headers), "body": text, "base64": is_base64}, file,
+                  indent=2)
+
+
+def handler_response(result) -> (int, dict, bytes):
+    """Convert what a route callable returned into (status, headers, body).
+
+       A dict with status, headers or body keys describes the response,
+       str and bytes are the body, anything else is answered as json."""
+
+    if isinstance(result, dict) and {"status", "headers", "body"} & set(result):
+        status, headers, body = result.get("status", 200), dict(result.get("headers", {})), result.get("body", "")
+    else:
+        status, headers, body = 200, {}, result
+
+    if not isinstance(body, (str, bytes)):
+        body = json.dumps(body)
+        headers.setdefault("Content-Type", "application/json")
+
+    return status, headers, body if isinstance(body, bytes) else body.encode("utf-8")
+
+
+class Route:
+    """Mocked url pattern and its counters"""
+
+    def __init__(self, pattern: str, handler: Union[Callable, Path]):
+        self.pattern = pattern
+        self.handler = handler
+        self.served = 0  # answered from fixture or callable
+        self.recorded = 0  # real response written to fixture
+        self.passthrough = 0  # replay without fixture file, went to backend
+
+    @property
+    def is_file(self) -> bool:
+        return isinstance(self.handler, Path)
+
+    def matches(self, url: str) -> bool:
+        return fnmatch.fnmatchcase(url, self.pattern)
+
+    def report(self) -> dict:
+        return {"pattern": self.pattern,
+                "fixture": str(self.handler) if self.is_file else getattr(self.handler, "__name__", "callable"),
+                "served": self.served, "recorded": self.recorded, "passthrough": self.passthrough}
+
+
+class RouteMocker:
+    """Intercepts requests of a CDP session and answers mocked routes"""
+
+    def __init__(self, session, mode: str = MOCK.REPLAY, fixtures_dir: Union[str, Path] = MOCK.DEFAULT_FIXTURES_DIR):
+        """
+        Constructor
+
+        :param session: CdpSession of the page, see nrobo.browsers.cdp
+        :param mode: replay or record
+        :param fixtures_dir: directory of fixture files given by name
+        """
+        if mode not in MOCK.MODES:
+            raise ValueError(f"Invalid mock mode: {mode}. Valid modes are {MOCK.MODES}")
+
+        self.session = session
+        self.mode = mode
+        self.fixtures_dir = Path(fixtures_dir)
+        self.routes = []
+        self._lock = threading.Lock()
+        self.session.on("Fetch.requestPaused", self._paused)
+
+    def add(self, pattern: str, fixture_or_callable: Union[str, Path, Callable]) -> Route:
+        """Mock requests to urls matching glob <pattern>. Routes added later take precedence."""
+
+        handler = fixture_or_callable
+        if not callable(handler):
+            handler = Path(handler)
+            if not handler.is_absolute():
+                handler = self.fixtures_dir / handler
+            if not handler.suffix:
+                handler = handler.with_suffix(MOCK.FIXTURE_EXTENSION)
+
+        route = Route(pattern, handler)
+        with self._lock:
+            self.routes.append(route)
+            routes = list(self.routes)
+
+        self.session.send("Fetch.enable", {"patterns": [
+            {"urlPattern": r.pattern, "requestStage": "Response" if self._records(r) else "Request"}
+            for r in routes]})
+
+        return route
+
+    def _records(self, route: Route) -> bool:
+        return self.mode == MOCK.RECORD and route.is_file
+
+    def _route(self, url: str) -> Union[Route, None]:
+        with self._lock:
+            return next((route for route in reversed(self.routes) if route.matches(url)), None)
+
+    def _fulfill(self, request_id: str, status: int, headers: Union[dict, list], body: bytes) -> None:
+        if isinstance(headers, dict):
+            headers = [{"name": name, "value": str(value)} for name, value in headers.items()]
+        self.session.send("Fetch.fulfillRequest", {"requestId": request_id, "responseCode": status,
+                                                   "responseHeaders": headers,
+                                                   "body": base64.b64encode(body).decode("ascii")})
+
+    def _paused(self, params: dict) -> None:
+        request_id = params["requestId"]
+        route = self._route(params["request"]["url"])
+
+        try:
+            if route is None:
+                self.session.send("Fetch.continueRequest", {"requestId": request_id})
+
+            elif "responseStatusCode" in params:
+                """record real response of the backend, body comes decoded"""
+                result = self.session.send("Fetch.getResponseBody", {"requestId": request_id})
+                body = base64.b64decode(result["body"]) if result.get("base64Encoded") \
+                    else result["body"].encode("utf-8")
+                headers = {header["name"]: header["value"] for header in params.get("responseHeaders", [])}
+                save_fixture(route.handler, params["responseStatusCode"], headers, body)
+                route.recorded += 1
+                try:
+                    """let live response through as it came"""
+                    self.session.send("Fetch.continueResponse", {"requestId": request_id})
+                except NRoBoCdpError:
+                    """browsers before Fetch.continueResponse (chromium 108)"""
+                    self._fulfill(request_id, params["responseStatusCode"], body_headers(headers), body)
+
+            elif route.is_file and not route.handler.exists():
+                route.passthrough += 1
+                self.session.send("Fetch.continueRequest", {"requestId": request_id})
+
+            else:
+                response = load_fixture(route.handler) if route.is_file else handler_response(
+                    route.handler(params["request"]))
+                route.served += 1
+                self._fulfill(request_id, *response)
+
+        except Exception:
+            """never leave the browser waiting on a paused request"""
+            try:
+                self.session.send("Fetch.continueRequest", {"requestId": request_id})
+            except Exception:
+                pass
+
+    def report(self) -> [dict]:
+        """Returns counters of every route"""
+
+        with self._lock:
+            return [route.report() for route in self.routes]
+
+    def close(self) -> None:
+        self.session.off("Fetch.requestPaused", self._paused)
+        try:
+            self.session.send("Fetch.disable")
+        except Exception:
+            pass
+
+
+def mock_settings(nconfig: Union[dict, None]) -> dict:
+    """Read route mocking settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'mode': str(nconfig.get(MOCK.MODE, MOCK.REPLAY)).lower(),
+        'fixtures_dir': nconfig.get(MOCK.FIXTURES_DIR, MOCK.DEFAULT_FIXTURES_DIR)
+    }
+
+
+def route_mocker(driver, nconfig: Union[dict, None] = None) -> RouteMocker:
+    """Returns route mocker of <driver>, created on first use"""
+
+    mocker = getattr(driver, MOCK.ATTRIBUTE, None)
+    if mocker is not None:
+        return mocker
+
+    from nrobo.browsers.cdp import cdp_session
+    session = cdp_session(driver)
+    if session is None:
+        raise NRoBoCdpNotAvailable("mock_route")
+
+    mocker = RouteMocker(session, **mock_settings(nconfig))
+    setattr(driver, MOCK.ATTRIBUTE, mocker)
+
+    return mocker
+
+
+def close_route_mocker(driver) -> Union[list, None]:
+    """Stop mocking on <driver> and return report of its routes, None if nothing was mocked"""
+
+    mocker = getattr(driver, MOCK.ATTRIBUTE, None)
+    if mocker is None:
+        return None
+
+    setattr(driver, MOCK.ATTRIBUTE, None)
+    mocker.close()
+
+    return mocker.report()
@@ -0,0 +1,239 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Screencast of chromium sessions, kept for failed tests only.
+
+With screencast: true in nrobo-config.yaml, Page.screencastFrame jpeg
+frames of each test are streamed into a bounded ring buffer holding
+the last screencast_seconds of the test. Frames of passed tests are
+dropped. Frames of failed tests are encoded in a background process,
+as animated webp or, with screencast_format: mp4 and ffmpeg on PATH,
+as mp4 video, and attached to html and allure reports.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import base64
+import io
+import re
+import shutil
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Union
+
+
+class SCREENCAST:
+    """Screencast settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    ENABLED = "screencast"
+    FPS = "screencast_fps"
+    SECONDS = "screencast_seconds"
+    QUALITY = "screencast_quality"
+    MAX_WIDTH = "screencast_max_width"
+    FORMAT = "screencast_format"  # webp | mp4
+
+    DEFAULT_FPS = 5
+    DEFAULT_SECONDS = 15
+    DEFAULT_QUALITY = 60
+    DEFAULT_MAX_WIDTH = 1280
+
+    WEBP = "webp"
+    MP4 = "mp4"
+    FORMATS = [WEBP, MP4]
+
+    DIR = "screencasts"
+    ITEM_ATTRIBUTE = "_nrobo_screencast"
+    FRAME_EVENT = "Page.screencastFrame"
+
+
+class ScreencastRecorder:
+    """Ring buffer of screencast frames of one CDP session"""
+
+    def __init__(self, session, fps: int = SCREENCAST.DEFAULT_FPS, seconds: int = SCREENCAST.DEFAULT_SECONDS,
+                 quality: int = SCREENCAST.DEFAULT_QUALITY, max_width: int = SCREENCAST.DEFAULT_MAX_WIDTH):
+        """
+        Constructor
+
+        :param session: CdpSession of page to record
+        :param fps: frames kept per second, browser sends frames on repaint only
+        :param seconds: length of buffer, older frames are evicted
+        """
+        self.session = session
+        self.fps = fps
+        self.quality = quality
+        self.max_width = max_width
+        self.received = 0
+        self._frames = deque(maxlen=max(fps * seconds, 1))  # (timestamp, base64 jpeg)
+        self._last = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "ScreencastRecorder":
+        self.session.on(SCREENCAST.FRAME_EVENT, self._frame)
+        self.session.send("Page.startScreencast", {"format": "jpeg", "quality": self.quality,
+                                                   "maxWidth": self.max_width, "maxHeight": self.max_width})
+        return self
+
+    def _frame(self, params: dict) -> None:
+        """Keep frame unless it is closer to previous one than frame rate allows. Browser waits for ack."""
+
+        try:
+            self.session.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+        except Exception:
+            pass  # session going away
+
+        timestamp = params.get("metadata", {}).get("timestamp", 0.0)
+        with self._lock:
+            self.received += 1
+            if self._last is not None and timestamp - self._last < 1 / self.fps:
+                return
+            self._last = timestamp
+            self._frames.append((timestamp, params["data"]))
+
+    def stop(self) -> None:
+        self.session.off(SCREENCAST.FRAME_EVENT, self._frame)
+        try:
+            self.session.send("Page.stopScreencast")
+        except Exception:
+            pass  # browser already gone
+
+    def frames(self) -> [tuple]:
+        """Buffered (timestamp, jpeg bytes), oldest first"""
+
+        with self._lock:
+            frames = list(self._frames)
+        return [(timestamp, base64.b64decode(data)) for timestamp, data in frames]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+
+
+def frame_durations(timestamps: [float], fps: int) -> [int]:
+    """Milliseconds each frame stays on screen. Last frame is shown for one frame interval."""
+
+    durations = [max(round((later - earlier) * 1000), 1) for earlier, later in zip(timestamps, timestamps[1:])]
+    return durations + [int(1000 / fps)] if timestamps else []
+
+
+def encode_screencast(frames: [tuple], path: Union[str, Path], image_format: str, fps: int) -> str:
+    """Encode (timestamp, jpeg bytes) <frames> to <path> without extension. Runs in a pool process.
+       Returns path of encoded file, webp if mp4 was asked for but ffmpeg is missing."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    ffmpeg = shutil.which("ffmpeg")
+    if image_format == SCREENCAST.MP4 and ffmpeg:
+        video = Path(f"{path}.mp4")
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "image2pipe", "-framerate", str(fps),
+                        "-c:v", "mjpeg", "-i", "-", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+                        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", str(video)],
+                       input=b"".join(jpeg for _, jpeg in frames), check=True, capture_output=True)
+        return str(video)
+
+    from PIL import Image
+
+    images = [Image.open(io.BytesIO(jpeg)) for _, jpeg in frames]
+    animation = Path(f"{path}.webp")
+    images[0].save(animation, format="WEBP", save_all=True, append_images=images[1:], loop=0,
+                   duration=frame_durations([timestamp for timestamp, _ in frames], fps), quality=60)
+    return str(animation)
+
+
+def screencast_settings(nconfig: Union[dict, None]) -> dict:
+    """Read screencast settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'enabled': bool(nconfig.get(SCREENCAST.ENABLED, False)),
+        'fps': int(nconfig.get(SCREENCAST.FPS, SCREENCAST.DEFAULT_FPS)),
+        'seconds': int(nconfig.get(SCREENCAST.SECONDS, SCREENCAST.DEFAULT_SECONDS)),
+        'quality': int(nconfig.get(SCREENCAST.QUALITY, SCREENCAST.DEFAULT_QUALITY)),
+        'max_width': int(nconfig.get(SCREENCAST.MAX_WIDTH, SCREENCAST.DEFAULT_MAX_WIDTH)),
+        'format': str(nconfig.get(SCREENCAST.FORMAT, SCREENCAST.WEBP)).lower()
+    }
+
+
+def start_screencast(driver, nconfig: Union[dict, None]) -> Union[ScreencastRecorder, None]:
+    """Start recording <driver>. None if screencast is disabled or browser has no devtools."""
+
+    settings = screencast_settings(nconfig)
+    if not settings['enabled']:
+        return None
+
+    from nrobo.browsers.cdp import cdp_session
+    try:
+        session = cdp_session(driver)
+    except Exception:
+        return None
+    if session is None:
+        return None
+
+    return ScreencastRecorder(session, settings['fps'], settings['seconds'], settings['quality'],
+                              settings['max_width']).start()
+
+
+_EXECUTOR = None
+
+
+def encoder() -> ProcessPoolExecutor:
+    """Background process encoding screencasts of this process"""
+
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        _EXECUTOR = ProcessPoolExecutor(max_workers=1)
+    return _EXECUTOR
+
+
+def stop_screencast(item, recorder: ScreencastRecorder, failed: bool, report_dir: Union[str, Path],
+                    nconfig: Union[dict, None], executor=None) -> Union[Future, None]:
+    """Stop <recorder> of test <item>. Frames of failed test are encoded in background,
+       the future is kept on <item> for attaching the screencast to reports."""
+
+    recorder.stop()
+    frames = recorder.frames() if failed else []
+    recorder.clear()
+    if not frames:
+        return None
+
+    settings = screencast_settings(nconfig)
+    path = Path(report_dir) / SCREENCAST.DIR / re.sub(r"[^\w.-]+", "_", item.nodeid).strip("_")
+    future = (executor or encoder()).submit(encode_screencast, frames, str(path), settings['format'],
+                                            settings['fps'])
+    setattr(item, SCREENCAST.ITEM_ATTRIBUTE, future)
+
+    return future
+
+
+def screencast_of(item, timeout: float = 120) -> Union[str, None]:
+    """Path of encoded screencast of test <item>, waiting for the encoder if needed"""
+
+    future = getattr(item, SCREENCAST.ITEM_ATTRIBUTE, None)
+    if future is None:
+        return None
+
+    setattr(item, SCREENCAST.ITEM_ATTRIBUTE, None)
+    try:
+        return future.result(timeout)
+    except Exception:
+        return None  # a broken screencast must not fail the run
+
+
+def close_screencast_encoder() -> None:
+    global _EXECUTOR
+
+    executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown()
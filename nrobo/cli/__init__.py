@@ -66,8 +66,9 @@ def main():
         # remove 'dist' directory created by python build module during packaging
         remove_files_recursively(NROBO_CONST.DIST_DIR)
 
-        # delete results directory created by nrobo for storing test results
-        # remove_files_recursively(NREPORT.REPORT_DIR)
+        # archive results directory of previous run and compact results archive in background
+        from nrobo.util.retention import start_compaction, retention_settings
+        start_compaction(NREPORT.REPORT_DIR, NREPORT.ARCHIVE_DIR, **retention_settings())
 
         # parse nrobo cli arguments
         launch_nrobo()
@@ -32,6 +32,7 @@ class NREPORT:
     NROBO_FRAMEWORK_TESTS_DIR = "nrobo_framework_tests"
     PATCHES = Path("patches")
     DEFAULT_REPORT_TITLE = "Test Automation Report"
+    ARCHIVE_DIR = "results-archive"
 
 
 class nCLI:
@@ -67,6 +68,15 @@ class nCLI:
     PACKAGES = "packages"
     GRID = "grid"
     MARKER = "marker"
+    RESULTS = "results"
+    SHARD = "shard"
+    MERGE_RESULTS = "merge-results"
+    LAUNCH_PROFILE = "launch-profile"
+    LOAD = "load"
+    LOAD_USERS = "load-users"
+    LOAD_DURATION = "load-duration"
+    LOAD_ITERATIONS = "load-iterations"
+    LOAD_RAMP_UP = "load-ramp-up"
 
     ARGS = {
         NPM: NPM,
@@ -92,7 +102,16 @@ class nCLI:
         KEY: KEY,
         PACKAGES: PACKAGES,
         GRID: GRID,
-        MARKER: MARKER
+        MARKER: MARKER,
+        RESULTS: RESULTS,
+        SHARD: SHARD,
+        MERGE_RESULTS: MERGE_RESULTS,
+        LAUNCH_PROFILE: LAUNCH_PROFILE,
+        LOAD: LOAD,
+        LOAD_USERS: LOAD_USERS,
+        LOAD_DURATION: LOAD_DURATION,
+        LOAD_ITERATIONS: LOAD_ITERATIONS,
+        LOAD_RAMP_UP: LOAD_RAMP_UP
     }
 
     DEFAULT_ARGS = {
@@ -62,6 +62,42 @@ def launcher_command(exit_on_failure=True):
         console.print(f"nrobo {__version__}\n")
         return None, None, None
 
+    if args.results:
+        # manage archived results
+        from nrobo.util.retention import gc, retention_settings
+        with console.status(f"[{STYLE.TASK}]Compacting test results archive...\n"):
+            summary = gc(Path(NREPORT.ARCHIVE_DIR), **retention_settings())
+        console.print(f"[{STYLE.HLGreen}]Archived {len(summary['archived'])} run(s), "
+                      f"removed {len(summary['removed'])} bundle(s), "
+                      f"kept {len(summary['kept'])} bundle(s) in {NREPORT.ARCHIVE_DIR}")
+        return None, None, None
+
+    if args.merge_results:
+        # merge results of sharded runs
+        from nrobo.util.sharding import merge_results, SHARD
+        with console.status(f"[{STYLE.TASK}]Merging test results...\n"):
+            summary = merge_results(args.merge_results, Path(NREPORT.REPORT_DIR),
+                                    durations_file=NROBO_PATHS.EXEC_DIR / SHARD.DURATIONS_FILE)
+        console.print(f"[{STYLE.HLGreen}]Merged {summary['junit']['tests']} test(s) "
+                      f"from {len(args.merge_results)} results directories into {NREPORT.REPORT_DIR}")
+        return None, None, None
+
+    if args.load:
+        # load test a flow with concurrent headless browsers
+        from nrobo.util.load import LOAD, run_load, print_load_report
+        users = args.load_users or LOAD.DEFAULT_USERS
+        with console.status(f"[{STYLE.TASK}]Running load test with {users} virtual users...\n"):
+            report = run_load(args.load, args.browser, users, args.load_duration, args.load_iterations,
+                              args.load_ramp_up or 0, args.url, NREPORT.REPORT_DIR)
+        print_load_report(report)
+        console.print(f"[{STYLE.HLGreen}]Load report written to {Path(NREPORT.REPORT_DIR) / LOAD.REPORT_FILE}")
+        return None, None, None
+
+    if args.shard:
+        # fail early on a malformed shard
+        from nrobo.util.sharding import parse_shard
+        parse_shard(args.shard)
+
     if args.suppress:
         # suppress upgrade prompt
         os.environ[EnvKeys.SUPPRESS_PROMPT] = '0'
@@ -212,7 +248,8 @@ def launcher_command(exit_on_failure=True):
 
                             # Doc: https://allurereport.org/docs/gettingstarted-installation/
                     else:
-                        if key == nCLI.TARGET or key == nCLI.FILES:
+                        if key in [nCLI.TARGET, nCLI.FILES, nCLI.LOAD_USERS, nCLI.LOAD_DURATION,
+                                   nCLI.LOAD_ITERATIONS, nCLI.LOAD_RAMP_UP]:
                             continue  # DO NOT ADD TO PYTEST LAUNCHER
 
                         if key in [nCLI.APP, nCLI.REPORT_TITLE]:
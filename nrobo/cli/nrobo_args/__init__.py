@@ -188,6 +188,58 @@ def nrobo_cli_parser(exit_on_failure=True):
     parser.add_argument(f"--{nCLI.GRID}", help="""
                 Remote Grid server url. Tests will be running on the machine when Grid server is running pointed by Grid url.
                 """)
+    parser.add_argument(f"--{nCLI.RESULTS}", choices=["gc"], help=f"""
+                Manage archived test results under {NREPORT.ARCHIVE_DIR} directory.
+
+                Usage:
+                    nrobo --results gc
+
+                Compresses pending results and prunes run bundles as per
+                retention_runs and retention_days settings in nrobo-config.yaml.
+                """)
+    parser.add_argument(f"--{nCLI.SHARD}", help="""
+                Run only i-th of N shards of the collected tests. Format is i/N.
+                Tests are split by recorded durations, so every shard takes about the same time.
+
+                Usage (on three CI machines):
+                    nrobo --shard 1/3
+                    nrobo --shard 2/3
+                    nrobo --shard 3/3
+                """)
+    parser.add_argument(f"--{nCLI.MERGE_RESULTS}", nargs='+', help=f"""
+                Merge results directories of sharded runs into {NREPORT.REPORT_DIR} directory.
+                Junit xml, allure results, screenshots and nRoBo result data are merged.
+
+                Usage:
+                    nrobo --merge-results shard1/results shard2/results shard3/results
+                """)
+    parser.add_argument(f"--{nCLI.LAUNCH_PROFILE}", help="""
+                Named browser launch profile applied to chrome, edge and firefox.
+                Built-in profiles are lean, ci-headless and debug. More can be defined
+                under launch_profiles in nrobo-config.yaml. Pin a profile version with name@version.
+
+                Usage:
+                    nrobo --browser chrome_headless --launch-profile ci-headless
+                    nrobo --launch-profile lean@1
+                """)
+    parser.add_argument(f"--{nCLI.LOAD}", help="""
+                Load test mode. Runs given test method or flow function with concurrent headless
+                browser sessions instead of running the test suite. Flows may take driver, logger and url.
+                Without --url, flows get the url of a locally served stand-in site.
+
+                Usage:
+                    nrobo --load tests/test_shop.py::TestShop::test_checkout --load-users 20 --load-ramp-up 60
+                    nrobo --load tests/load_flows.py::checkout --load-iterations 10 --url https://staging.example.com
+                """)
+    parser.add_argument(f"--{nCLI.LOAD_USERS}", type=int,
+                        help="Concurrent virtual users (browser sessions) in load test mode. Default is 5.")
+    parser.add_argument(f"--{nCLI.LOAD_DURATION}", type=float,
+                        help="Seconds each virtual user keeps running the flow. Default is 60 unless "
+                             f"--{nCLI.LOAD_ITERATIONS} is given.")
+    parser.add_argument(f"--{nCLI.LOAD_ITERATIONS}", type=int,
+                        help="Flow iterations per virtual user in load test mode.")
+    parser.add_argument(f"--{nCLI.LOAD_RAMP_UP}", type=float,
+                        help="Seconds over which virtual users are started one by one. Default is 0.")
     parser.add_argument("-m", "--marker", help="""
         Only run tests matching given mark expression.
         For example: -m 'mark1 and not mark2'
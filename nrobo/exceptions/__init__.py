@@ -65,3 +65,93 @@ class NRoBoInvalidOperation(Exception):
 
     def __str__(self):
         return repr(self.value)
+
+
+class NRoBoInvalidShard(Exception):
+    """Raises when shard spec is not in i/N format
+
+       or shard index i is out of range 1..N."""
+
+    # constructor
+    def __init__(self, shard):
+        self.value = f"Invalid shard <{shard}>. Expected format is i/N, e.g. 1/4"
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoDatabaseConnectionError(Exception):
+    """Raises when database connection could not be established
+
+       even after retrying with backoff."""
+
+    # constructor
+    def __init__(self, error):
+        self.value = f"Database connection did not established!!! Last error: {error}"
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoDatabasePoolExhausted(Exception):
+    """Raises when no pooled database connection
+
+       became free within lease timeout."""
+
+    # constructor
+    def __init__(self, size, timeout):
+        self.value = f"All {size} pooled database connections are in use. Waited {timeout} sec."
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoCdpError(Exception):
+    """Raises when browser answers a CDP command with an error"""
+
+    # constructor
+    def __init__(self, method, error):
+        self.value = f"CDP command {method} failed: {error}"
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoCdpNotAvailable(Exception):
+    """Raises when a feature needs Chrome DevTools Protocol
+
+       but browser under test does not provide it."""
+
+    # constructor
+    def __init__(self, feature):
+        self.value = f"{feature} needs Chrome DevTools Protocol. Run tests on chrome or edge."
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoNoDeviceAvailable(Exception):
+    """Raises when no healthy device of device inventory
+
+       matches platform markers of a test."""
+
+    # constructor
+    def __init__(self, tags):
+        self.value = f"No healthy device in appium device inventory matches platform markers {sorted(tags)}"
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class NRoBoStaleSnapshot(Exception):
+    """Raises when a page snapshot is queried
+
+       after an action changed the page it was taken of."""
+
+    # constructor
+    def __init__(self, command):
+        self.value = f"Page snapshot is stale since {command} ran after it was taken. " \
+                     f"Take a new snapshot or call refresh() on it."
+
+    def __str__(self):
+        return repr(self.value)
@@ -46,6 +46,7 @@ from selenium.webdriver.support.wait import WebDriverWait
 from seleniumpagefactory import PageFactory
 from selenium.webdriver.support import expected_conditions
 from nrobo.util.common import Common
+from nrobo.selenese.session import driver_session
 from selenium.webdriver.common.keys import Keys
 from nrobo.cli.nglobals import *
 from selenium.common.exceptions import UnexpectedAlertPresentException, WebDriverException
@@ -94,9 +95,9 @@ class WebdriverWrapperNrobo(WebDriver):
         :param logger: reference to logger instance"""
         self.driver = driver
         self.logger = logger
-        self.nconfig = read_nrobo_configs()
+        self.session = driver_session(driver, read_nrobo_configs)  # config is read for a new session only
+        self.nconfig = self.session.nconfig
         self.nprint = nprint
-        self._windows = {}
 
     """
     Following are selenium webdriver wrapper methods and properties
@@ -104,11 +105,12 @@ class WebdriverWrapperNrobo(WebDriver):
 
     @property
     def windows(self):
-        return self._windows
+        """Window registry {title: handle}, shared by page objects on the driver"""
+        return self.session.windows
 
     @windows.setter
     def windows(self, _windows: {str: str}):
-        self._windows = _windows
+        self.session.windows = _windows
 
     def update_windows(self, _window_handles: list[str] = None):
 
@@ -1150,8 +1152,10 @@ class WaitImplementationsNrobo(WebElementWrapperNrobo):
 
         # nprint("Wait for page load...", style=STYLE.HLOrange)
         try:
-            # Webdriver implementation of page load timeout
-            self.set_page_load_timeout(self.nconfig[WAITS.TIMEOUT])
+            # Webdriver implementation of page load timeout, set once per session
+            if not self.session.page_load_timeout_set:
+                self.set_page_load_timeout(self.nconfig[WAITS.TIMEOUT])
+                self.session.page_load_timeout_set = True
 
             # Custom page load timeout
             WebDriverWait(self.driver, self.nconfig[WAITS.TIMEOUT]).until(
@@ -1160,6 +1164,7 @@ class WaitImplementationsNrobo(WebElementWrapperNrobo):
             nprint(f"Exception: {te}", STYLE.HLRed)
         except AttributeError as ae:
             nprint(f"Exception: {ae}", STYLE.HLRed)
+        self.session.page_changed = False
         # nprint("End of Wait for page load...", style=STYLE.PURPLE4)
 
     @staticmethod
@@ -1271,11 +1276,12 @@ class ActionChainsNrobo(WaitImplementationsNrobo):
         :param logger: reference to logger instance
         """
         super().__init__(driver, logger)
-        self._action_chain = ActionChains(self.driver, duration=duration, devices=devices)
+        self._duration = duration
+        self._devices = devices
 
     def action_chain(self):
-        """Return ActionChains object"""
-        return self._action_chain
+        """Return ActionChains object, shared by page objects on the driver"""
+        return self.session.action_chain(self._duration, self._devices)
 
 
 class AlertNrobo(ActionChainsNrobo):
@@ -1426,6 +1432,107 @@ class NRoBoCustomMethods(AppiumNrobo):
         """Type given text into given element located by (by, value)"""
         self.send_keys(by, value, text)
 
+    def mock_route(self, pattern: str, fixture_or_callable: Union[str, Path, typing.Callable]):
+        """
+        Answer requests to urls matching glob <pattern> from a local fixture.
+
+        :param pattern: url glob pattern, e.g. */api/orders*
+        :param fixture_or_callable: fixture file (relative to mock_fixtures_dir) or
+                                    callable(request) returning response body or {status, headers, body}
+        :return: mocked route with its counters
+        """
+        from nrobo.browsers.route_mock import route_mocker
+        return route_mocker(self.driver, self.nconfig).add(pattern, fixture_or_callable)
+
+    def snapshot(self, kind: Optional[str] = None):
+        """
+        Page snapshot answering read-only queries locally from one page source fetch.
+
+        Usage:
+            with self.snapshot() as dom:
+                assert dom.text(*HEADING) == "Orders"
+                assert dom.is_displayed(By.ID, "checkout")
+
+        :param kind: html or xml, detected from driver if not given
+        :return: snapshot, stale once an action changes the page
+        """
+        from nrobo.selenese.snapshot import Snapshot
+        return Snapshot(self.driver, kind)
+
+    def assert_visual(self, name: str, region: Optional[tuple] = None, mask: Optional[list] = None):
+        """
+        Compare screenshot of page or of <region> with its baseline.
+
+        Usage:
+            self.assert_visual("cart", region=(By.ID, "cart"), mask=[(By.CSS_SELECTOR, ".timestamp")])
+
+        :param name: baseline name, unique per browser and viewport
+        :param region: (by, value) of element to capture, whole page if not given
+        :param mask: (by, value) locators or (x, y, width, height) rectangles ignored by comparison
+        :return: comparison result in immediate visual_mode, None when resolved later
+        """
+        from nrobo.util.visual import visual_checker
+        return visual_checker(self.nconfig).check(self.driver, name, region, mask)
+
+    @property
+    def perf(self):
+        """
+        Front-end performance metrics of current page, recorded for the run perf report.
+
+        Usage:
+            metrics = self.perf.metrics()
+            assert metrics["lcp"] < 2500
+
+        :return: performance collector of driver
+        """
+        from nrobo.browsers.perf import perf_collector
+        return perf_collector(self.driver)
+
+    @property
+    def events(self):
+        """
+        Console, js exception, network and navigation events of the browser, recorded in background.
+
+        Usage:
+            mark = self.events.mark()
+            self.click(*SAVE)
+            assert self.events.wait_for("response", url="*/api/orders*", since=mark)["status"] == 201
+            assert not self.events.console_errors()
+
+        :return: event log of driver
+        """
+        from nrobo.browsers.events import event_log
+        return event_log(self.driver, self.nconfig)
+
+    def fill_form(self, fields: dict, typing: bool = False) -> None:
+        """
+        Fill many form fields in one round trip instead of find, clear and send keys per field.
+
+        Usage:
+            self.fill_form({(By.ID, "first-name"): "Panchdev", (By.NAME, "email"): "erpanchdev@gmail.com",
+                            (By.ID, "terms"): True})
+
+        :param fields: {(by, value): text}, True/False checks or unchecks checkboxes and radios
+        :param typing: type like a user, with one W3C actions payload, instead of setting values by script
+        :return:
+        """
+        from nrobo.selenese.forms import fill_form
+        fill_form(self.driver, fields, self.nconfig[WAITS.ELE_WAIT], typing)
+
+    def clear_many(self, *locators, typing: bool = False) -> None:
+        """
+        Clear text fields of (by, value) <locators> in one round trip.
+
+        Usage:
+            self.clear_many((By.ID, "first-name"), (By.NAME, "email"))
+
+        :param locators: (by, value) of fields
+        :param typing: select all and delete with one W3C actions payload instead of by script
+        :return:
+        """
+        from nrobo.selenese.forms import clear_many
+        clear_many(self.driver, locators, self.nconfig[WAITS.ELE_WAIT], typing)
+
 
 class NRobo(NRoBoCustomMethods):
     """Base NRobo class for each of the Page Classes in nRoBo framework.
@@ -1479,15 +1586,25 @@ class NRobo(NRoBoCustomMethods):
         """
         super().__init__(driver, logger, duration=duration, devices=devices)
 
-        # objects from common classes
-        self.keys = Keys()
-        self.by = By()
-        self.print_options = PrintOptions()
-        self.window_types = WindowTypes()
         self.scrolled_height = 0
 
-        # wait for page load
-        self.wait_for_page_to_be_loaded()
+        # wait for page load, unless nothing changed the page since the last wait
+        if self.session.page_changed:
+            self.wait_for_page_to_be_loaded()
+
+    # objects from common classes
+    keys = Keys()
+    by = By()
+    window_types = WindowTypes()
+
+    @property
+    def print_options(self) -> PrintOptions:
+        """Print options, shared by page objects on the driver"""
+        return self.session.print_options
+
+    @print_options.setter
+    def print_options(self, print_options: PrintOptions):
+        self.session.print_options = print_options
 
     def scroll_down(self):
         """scroll down web page by its scroll height"""
@@ -0,0 +1,137 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Round trip benchmark of form filling.
+
+A locally served stand-in form is filled field by field with clear
+and send_keys, then with fill_form and with fill_form typing. Every
+webdriver command is counted as a round trip.
+
+Usage:
+
+    python -m nrobo.selenese.form_benchmark --browser chrome --fields 30
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import argparse
+import logging
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from nrobo.selenese.listeners import add_command_listener, remove_command_listener
+
+READ_VALUES = "return Array.prototype.map.call(document.querySelectorAll('input'), function (i) { return i.value; })"
+
+
+def stand_in_form(fields: int) -> str:
+    inputs = "".join(f'<p><label>Field {index} <input id="field-{index}" value="old"></label></p>'
+                     for index in range(fields))
+    return f"""<!doctype html>
+<html><head><title>nRoBo stand-in form</title></head>
+<body><h1>nRoBo form benchmark</h1><form>{inputs}</form></body></html>
+"""
+
+
+@contextmanager
+def round_trips(driver):
+    """Counts webdriver commands sent by <driver> inside the block"""
+
+    counter = {"count": 0}
+
+    def counting(command, params=None):
+        counter["count"] += 1
+
+    add_command_listener(driver, counting)
+    try:
+        yield counter
+    finally:
+        remove_command_listener(driver, counting)
+
+
+def fill_field_by_field(page, fields: dict) -> None:
+    """How page objects fill forms without fill_form"""
+
+    for (by, value), text in fields.items():
+        page.clear(by, value)
+        page.send_keys(by, value, text)
+
+
+METHODS = {
+    "clear + send_keys per field": fill_field_by_field,
+    "fill_form": lambda page, fields: page.fill_form(fields),
+    "fill_form typing": lambda page, fields: page.fill_form(fields, typing=True),
+}
+
+
+def measure(page, url: str, count: int) -> [dict]:
+    """Round trips and seconds of every fill method on stand-in form at <url>"""
+
+    fields = {("id", f"field-{index}"): f"value {index}" for index in range(count)}
+    results = []
+    for name, method in METHODS.items():
+        page.driver.get(url)
+        with round_trips(page.driver) as trips:
+            started = time.perf_counter()
+            method(page, fields)
+            elapsed = time.perf_counter() - started
+
+        results.append({
+            "method": name,
+            "fields": count,
+            "round_trips": trips["count"],
+            "seconds": round(elapsed, 3),
+            "filled": page.driver.execute_script(READ_VALUES) == list(fields.values()),
+        })
+
+    return results
+
+
+def benchmark(browser: str, count: int) -> [dict]:
+    """Fill a stand-in form of <count> fields with every method in a headless <browser>"""
+
+    from nrobo.browsers.launch_benchmark import new_driver, serve_stand_in_page
+    from nrobo.browsers.launch_profiles import resolve_launch_profile
+    from nrobo.selenese import NRoBoCustomMethods
+
+    with tempfile.TemporaryDirectory() as directory:
+        server, url = serve_stand_in_page(Path(directory))
+        (Path(directory) / "index.html").write_text(stand_in_form(count))
+        driver = new_driver(browser, resolve_launch_profile("ci-headless"))
+        try:
+            return measure(NRoBoCustomMethods(driver, logging.getLogger("nrobo.form_benchmark")), url, count)
+        finally:
+            driver.quit()
+            server.shutdown()
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round trip benchmark of nRoBo form filling")
+    parser.add_argument("--browser", choices=["chrome", "edge", "firefox"], default="chrome")
+    parser.add_argument("--fields", type=int, default=30, help="Text fields of stand-in form")
+    args = parser.parse_args(argv)
+
+    from rich.table import Table
+    from nrobo import console
+
+    table = Table(title=f"Filling {args.fields} fields on {args.browser}")
+    results = benchmark(args.browser, args.fields)
+    for column in results[0]:
+        table.add_column(column)
+    for result in results:
+        table.add_row(*[str(value) for value in result.values()])
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Bulk form fill.
+
+Filling a form field by field costs a wait, a find and a send keys
+round trip per field, and clear() adds two finds and an actions
+sequence more. fill_form sets every field in one script, through the
+native value setter so that frameworks tracking input (React, Vue,
+Angular) see the change, and dispatches input and change events:
+
+    self.fill_form({(By.ID, "first-name"): "Panchdev",
+                    (By.NAME, "email"): "erpanchdev@gmail.com",
+                    (By.ID, "terms"): True})
+
+With typing=True fields are located in one script and typed into
+with one W3C actions payload: click, select all, delete and key
+presses of every field, so key handlers fire as for a real user.
+True and False check or uncheck checkboxes and radios. Fields not yet
+present are looked up again till ele_wait runs out.
+
+Round trips before and after:
+
+    python -m nrobo.selenese.form_benchmark --fields 30
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import time
+from typing import Union
+
+
+class FORMS:
+    """Bulk form fill constants"""
+
+    POLL = 0.25  # seconds between lookups of fields not yet present
+    ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"  # W3C web element reference
+
+    # selenium Keys
+    CONTROL = "\ue009"
+    COMMAND = "\ue03d"
+    DELETE = "\ue017"
+    SELECT_ALL = "a"
+    MAC_PLATFORMS = ["mac", "macos", "darwin"]
+
+    LOCATE = """
+function nroboLocate(by, value) {
+    switch (by) {
+        case 'css selector': return document.querySelector(value);
+        case 'xpath':
+            return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case 'id': return document.getElementById(value);
+        case 'name': return document.getElementsByName(value)[0] || null;
+        case 'class name': return document.getElementsByClassName(value)[0] || null;
+        case 'tag name': return document.getElementsByTagName(value)[0] || null;
+        case 'link text': case 'partial link text':
+            return Array.prototype.find.call(document.links, function (link) {
+                var text = link.textContent.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) >= 0;
+            }) || null;
+    }
+    throw new Error('nRoBo form fill does not support locator strategy ' + by);
+}
+function nroboCheckable(element) {
+    var type = (element.type || '').toLowerCase();
+    return type === 'checkbox' || type === 'radio';
+}
+"""
+
+    FILL_SCRIPT = "/* nrobo fill form */" + LOCATE + """
+function nroboSetValue(element, value) {
+    if (nroboCheckable(element)) {
+        if (element.checked !== (value === true || value === 'true')) { element.click(); }
+        return;
+    }
+    element.focus();
+    if (element.isContentEditable) {
+        element.textContent = value;
+    } else {
+        var tag = element.tagName.toLowerCase();
+        if (tag === 'select') {
+            var option = Array.prototype.find.call(element.options, function (option) {
+                return option.value === value || option.text.trim() === value;
+            });
+            value = option ? option.value : value;
+        }
+        var prototype = tag === 'select' ? HTMLSelectElement.prototype
+            : tag === 'textarea' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, value);
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.blur();
+}
+var missing = [];
+arguments[0].forEach(function (field, index) {
+    var element = nroboLocate(field[0], field[1]);
+    if (element === null) { missing.push(index); } else { nroboSetValue(element, field[2]); }
+});
+return missing;
+"""
+
+    FIND_SCRIPT = "/* nrobo find fields */" + LOCATE + """
+return arguments[0].map(function (field) {
+    var element = nroboLocate(field[0], field[1]);
+    return element === null ? null : [element, nroboCheckable(element) ? element.checked : null];
+});
+"""
+
+
+def form_fields(fields: dict) -> [list]:
+    """[[by, value, text]] of {(by, value): text}. True/False are kept for checkboxes and radios."""
+
+    return [[by, value, text if isinstance(text, bool) else str(text)] for (by, value), text in fields.items()]
+
+
+def not_found(fields: [list], timeout: float):
+    from selenium.common import TimeoutException
+
+    return TimeoutException(f"Form fields not found in {timeout}s: {[(by, value) for by, value, _ in fields]}")
+
+
+def set_values(driver, fields: [list], timeout: float = 0) -> None:
+    """Set <fields> in one script. Fields not yet present are retried till <timeout>."""
+
+    deadline = time.monotonic() + timeout
+    while fields:
+        missing = driver.execute_script(FORMS.FILL_SCRIPT, fields)
+        fields = [fields[index] for index in missing or []]
+        if fields and time.monotonic() >= deadline:
+            raise not_found(fields, timeout)
+        if fields:
+            time.sleep(FORMS.POLL)
+
+
+def find_fields(driver, fields: [list], timeout: float = 0) -> [list]:
+    """[element, checked] of every field, checked is None unless field is a checkbox or radio"""
+
+    deadline = time.monotonic() + timeout
+    found = [None] * len(fields)
+    pending = list(range(len(fields)))
+    while pending:
+        results = driver.execute_script(FORMS.FIND_SCRIPT, [fields[index] for index in pending])
+        for index, result in zip(pending, results):
+            found[index] = result
+        pending = [index for index in pending if found[index] is None]
+        if pending and time.monotonic() >= deadline:
+            raise not_found([fields[index] for index in pending], timeout)
+        if pending:
+            time.sleep(FORMS.POLL)
+
+    return found
+
+
+def select_all_key(driver) -> str:
+    platform = str((getattr(driver, "capabilities", None) or {}).get("platformName", "")).lower()
+    return FORMS.COMMAND if platform in FORMS.MAC_PLATFORMS else FORMS.CONTROL
+
+
+def typing_actions(fields: [list], found: [list], modifier: str = FORMS.CONTROL) -> dict:
+    """
+    One W3C actions payload typing into every field: click, select all and delete,
+    then key presses of its text. Checkboxes and radios are clicked only if their
+    state differs from True/False asked for, other fields get True/False typed as true/false.
+    """
+    pointer, keys = [], []
+
+    def tick(pointer_action: Union[dict, None] = None, key_action: Union[dict, None] = None):
+        """Every tick has one action per input source, the idle source pauses"""
+        pointer.append(pointer_action or {"type": "pause", "duration": 0})
+        keys.append(key_action or {"type": "pause", "duration": 0})
+
+    def press(key: str):
+        tick(key_action={"type": "keyDown", "value": key})
+        tick(key_action={"type": "keyUp", "value": key})
+
+    for (_, _, text), (element, checked) in zip(fields, found):
+        if checked is not None and checked == (text is True or text == "true"):
+            continue
+
+        tick({"type": "pointerMove", "duration": 0, "x": 0, "y": 0,
+              "origin": {FORMS.ELEMENT_KEY: element.id}})
+        tick({"type": "pointerDown", "duration": 0, "button": 0})
+        tick({"type": "pointerUp", "duration": 0, "button": 0})
+        if checked is not None:
+            continue
+
+        tick(key_action={"type": "keyDown", "value": modifier})
+        press(FORMS.SELECT_ALL)
+        tick(key_action={"type": "keyUp", "value": modifier})
+        press(FORMS.DELETE)
+        if isinstance(text, bool):
+            text = "true" if text else "false"  # as the fill script sets it on fields which are not checkable
+        for key in text:
+            press(key)
+
+    return {"actions": [
+        {"type": "pointer", "id": "mouse", "parameters": {"pointerType": "mouse"}, "actions": pointer},
+        {"type": "key", "id": "key", "actions": keys},
+    ]}
+
+
+def fill_form(driver, fields: dict, timeout: float = 0, typing: bool = False) -> None:
+    """
+    Fill form <fields> {(by, value): text}, in one round trip, or in two with <typing>.
+
+    :param driver: webdriver
+    :param fields: {(by, value): text}, True/False checks or unchecks checkboxes and radios
+    :param timeout: seconds to wait for fields not yet present
+    :param typing: type like a user with one actions payload instead of setting values by script
+    """
+    fields = form_fields(fields)
+    if not fields:
+        return
+
+    if not typing:
+        set_values(driver, fields, timeout)
+        return
+
+    payload = typing_actions(fields, find_fields(driver, fields, timeout), select_all_key(driver))
+    if payload["actions"][0]["actions"]:
+        driver.execute("actions", payload)
+
+
+def clear_many(driver, locators: [tuple], timeout: float = 0, typing: bool = False) -> None:
+    """Clear text fields of <locators> [(by, value)] in one round trip, or in two with <typing>"""
+
+    fill_form(driver, {tuple(locator): "" for locator in locators}, timeout, typing)
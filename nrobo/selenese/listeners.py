@@ -0,0 +1,86 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+One command hook per driver for everything watching webdriver commands.
+
+Driver session, snapshots and benchmarks all want to see the commands
+a driver sends. Instead of each wrapping driver.execute, which breaks
+as soon as they unwrap in another order than they wrapped, the driver
+gets one hook and watchers register with it:
+
+    add_command_listener(driver, on_command)  # on_command(command, params)
+    ...
+    remove_command_listener(driver, on_command)
+
+Listeners are called before the command is sent, in registration order.
+The hook is removed with the last listener.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+from typing import Callable
+
+
+class COMMAND_LISTENERS:
+    """Command listener constants"""
+
+    ATTRIBUTE = "_nrobo_command_listeners"
+
+
+class CommandListeners:
+    """Listeners of one driver and the execute hook calling them"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.listeners = []
+        self.previous_execute = driver.__dict__.get("execute")  # None if execute is the driver's own method
+        execute = driver.execute
+
+        def execute_with_listeners(command, params=None):
+            for listener in tuple(self.listeners):
+                listener(command, params)
+            return execute(command, params)
+
+        self.hook = execute_with_listeners
+        driver.execute = execute_with_listeners
+
+    def uninstall(self) -> None:
+        """Put back previous execute unless someone wrapped the hook meanwhile"""
+
+        if self.driver.__dict__.get("execute") is not self.hook:
+            return
+        if self.previous_execute is None:
+            del self.driver.execute
+        else:
+            self.driver.execute = self.previous_execute
+        setattr(self.driver, COMMAND_LISTENERS.ATTRIBUTE, None)
+
+
+def add_command_listener(driver, listener: Callable) -> None:
+    """Call <listener>(command, params) for every command <driver> sends"""
+
+    listeners = getattr(driver, COMMAND_LISTENERS.ATTRIBUTE, None)
+    if listeners is None:
+        listeners = CommandListeners(driver)
+        setattr(driver, COMMAND_LISTENERS.ATTRIBUTE, listeners)
+
+    if listener not in listeners.listeners:
+        listeners.listeners.append(listener)
+
+
+def remove_command_listener(driver, listener: Callable) -> None:
+    """Stop calling <listener> for commands of <driver>"""
+
+    listeners = getattr(driver, COMMAND_LISTENERS.ATTRIBUTE, None)
+    if listeners is None or listener not in listeners.listeners:
+        return
+
+    listeners.listeners.remove(listener)
+    if not listeners.listeners:
+        listeners.uninstall()
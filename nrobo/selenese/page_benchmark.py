@@ -0,0 +1,104 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Microbenchmark of page object creation.
+
+Page objects are created on a stand-in driver answering commands
+locally, so only the cost of creation itself is measured. Commands
+sent per page object are counted, each is a round trip to a real
+browser. A page object created after a navigation waits for page
+load, as every page object did before driver sessions.
+
+Usage:
+
+    python -m nrobo.selenese.page_benchmark --pages 10000
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import argparse
+import logging
+import os
+import time
+
+
+class StandInDriver:
+    """Answers commands of page object creation locally and counts them"""
+
+    def __init__(self):
+        self.capabilities = {"browserName": "chrome"}
+        self.commands = 0
+
+    def execute(self, command, params=None):
+        self.commands += 1
+        return {"value": "complete"}
+
+    def execute_script(self, script, *args):
+        return self.execute("w3cExecuteScript", {"script": script, "args": list(args)})["value"]
+
+    def set_page_load_timeout(self, time_to_wait: float) -> None:
+        self.execute("setTimeouts", {"pageLoad": int(time_to_wait * 1000)})
+
+    def get(self, url: str) -> None:
+        self.execute("get", {"url": url})
+
+
+def measure(page_class, pages: int, navigate: bool = False) -> dict:
+    """Mean microseconds and commands per page object over <pages> creations on one driver"""
+
+    driver = StandInDriver()
+    logger = logging.getLogger("nrobo.page_benchmark")
+    page_class(driver, logger)  # first page object starts driver session
+    driver.commands = 0
+
+    elapsed = 0.0
+    for _ in range(pages):
+        if navigate:
+            driver.get("about:blank")
+            driver.commands -= 1  # navigation itself is not creation cost
+        started = time.perf_counter()
+        page_class(driver, logger)
+        elapsed += time.perf_counter() - started
+
+    return {
+        "page objects": "after navigation" if navigate else "same page",
+        "created": pages,
+        "mean_us": round(elapsed / pages * 1e6, 2),
+        "commands_per_page": round(driver.commands / pages, 2),
+    }
+
+
+def benchmark(pages: int) -> [dict]:
+    from nrobo import EnvKeys
+    from nrobo.selenese import NRobo
+
+    os.environ.setdefault(EnvKeys.APPIUM, "0")
+    return [measure(NRobo, pages), measure(NRobo, pages, navigate=True)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark of nRoBo page object creation")
+    parser.add_argument("--pages", type=int, default=10000, help="Page objects created per case")
+    args = parser.parse_args(argv)
+
+    from rich.table import Table
+    from nrobo import console
+
+    table = Table(title="Page object creation")
+    results = benchmark(args.pages)
+    for column in results[0]:
+        table.add_column(column)
+    for result in results:
+        table.add_row(*[str(value) for value in result.values()])
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Per driver session shared by page objects.
+
+Page objects are created often, one per page, component or step,
+and all of them on the same driver. What is per driver rather than
+per page object lives in one DriverSession attached to the driver:
+nrobo config, the window registry, action chains, print options and
+a cache for anything else worth keeping for the session. Creating a
+page object then only looks the session up.
+
+The session listens to commands sent by the driver, see
+nrobo.selenese.listeners. A page object waits for the page to be
+loaded only if a command which may change the page (navigation,
+click, send keys, script...) ran since the last wait, so page objects
+of an unchanged page are created in microseconds.
+
+Microbenchmark:
+
+    python -m nrobo.selenese.page_benchmark
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+from typing import Callable, Union
+
+from nrobo.selenese.listeners import add_command_listener
+from nrobo.selenese.snapshot import changes_page
+
+
+class SESSION:
+    """Driver session constants"""
+
+    ATTRIBUTE = "_nrobo_session"
+
+
+class DriverSession:
+    """What page objects on one driver share"""
+
+    __slots__ = ("driver", "nconfig", "windows", "cache", "page_changed", "page_load_timeout_set",
+                 "_action_chains", "_print_options")
+
+    def __init__(self, driver, nconfig: Union[dict, None]):
+        self.driver = driver
+        self.nconfig = nconfig
+        self.windows = {}  # window title: handle
+        self.cache = {}
+        self.page_changed = True  # first page object waits for page load
+        self.page_load_timeout_set = False
+        self._action_chains = {}
+        self._print_options = None
+
+    def watch(self) -> None:
+        """Mark page changed when a command which may change it runs on the driver"""
+
+        if getattr(self.driver, "execute", None) is not None:
+            add_command_listener(self.driver, self._on_command)
+
+    def _on_command(self, command: str, params: Union[dict, None]) -> None:
+        if not self.page_changed and changes_page(command, params):
+            self.page_changed = True
+
+    def action_chain(self, duration: int = 250, devices: Union[list, None] = None):
+        """ActionChains of driver, one per duration and devices"""
+
+        key = (duration, tuple(id(device) for device in devices or []))
+        chain = self._action_chains.get(key)
+        if chain is None:
+            from selenium.webdriver import ActionChains
+            chain = self._action_chains[key] = ActionChains(self.driver, duration=duration, devices=devices)
+
+        return chain
+
+    @property
+    def print_options(self):
+        if self._print_options is None:
+            from selenium.webdriver.common.print_page_options import PrintOptions
+            self._print_options = PrintOptions()
+
+        return self._print_options
+
+    @print_options.setter
+    def print_options(self, print_options):
+        self._print_options = print_options
+
+
+def driver_session(driver, nconfig: Union[dict, Callable, None] = None) -> DriverSession:
+    """Returns session of <driver>, started with <nconfig> on first use.
+       <nconfig> may be a callable returning it, called only when the session is started."""
+
+    session = getattr(driver, SESSION.ATTRIBUTE, None)
+    if session is None:
+        session = DriverSession(driver, nconfig() if callable(nconfig) else nconfig)
+        if driver is not None:
+            setattr(driver, SESSION.ATTRIBUTE, session)
+            session.watch()
+
+    return session
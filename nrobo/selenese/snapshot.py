@@ -0,0 +1,354 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Local page snapshot for read-only assertions.
+
+Every text, is_displayed or get_attribute call is a webdriver round
+trip. A snapshot fetches page source once and answers locator queries
+locally with lxml. Locators are the (By, value) tuples page objects
+already use:
+
+    with self.snapshot() as dom:
+        assert dom.text(*HEADING) == "Orders"
+        assert dom.count(By.CSS_SELECTOR, "tr.order") == 10
+        assert dom.get_attribute("href", (By.LINK_TEXT, "Help")).endswith("/help")
+
+Web pages are parsed as html (css, xpath, id, name, class name, tag
+name and link text locators). Native appium apps are parsed as the xml
+view hierarchy (xpath, id, accessibility id and class name locators).
+
+A snapshot goes stale as soon as a command changing the page (click,
+send keys, navigation, script...) runs on the driver. Queries on a
+stale snapshot raise NRoBoStaleSnapshot. is_stale(verify=True) also
+asks the browser whether the page changed by itself.
+
+Requires lxml and cssselect.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import functools
+import hashlib
+import re
+from typing import Optional, Union
+
+from nrobo.exceptions import NRoBoStaleSnapshot
+from nrobo.selenese.listeners import add_command_listener, remove_command_listener
+
+
+class SNAPSHOT:
+    """Page snapshot settings"""
+
+    HTML = "html"
+    XML = "xml"
+    NATIVE_PLATFORMS = ["android", "ios"]
+
+    # By and AppiumBy strategies
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
+    ACCESSIBILITY_ID = "accessibility id"
+
+    # webdriver commands which may change the page
+    CHANGING_COMMANDS = {
+        "get", "goBack", "goForward", "refresh", "clickElement", "clearElement", "sendKeysToElement", "actions",
+        "clearActionState", "switchToFrame", "switchToParentFrame", "switchToWindow", "newWindow", "close",
+        "w3cAcceptAlert", "w3cDismissAlert", "w3cSetAlertValue", "setWindowRect", "fullscreenWindow",
+        "minimizeWindow", "w3cMaximizeWindow", "w3cExecuteScript", "w3cExecuteScriptAsync",
+        # appium
+        "setValue", "replaceValue", "pressKeyCode", "longPressKeyCode", "hideKeyboard", "activateApp",
+        "terminateApp", "background", "switchToContext", "touchAction", "multiTouchAction", "setOrientation",
+    }
+    # scripts selenium runs for read-only element queries
+    READ_ONLY_SCRIPTS = ["/* getAttribute */", "/* isDisplayed */", "/* nrobo snapshot */"]
+
+    CAPTURE_SCRIPT = """/* nrobo snapshot */
+if (!window.__nroboSnapshot) {
+    window.__nroboSnapshot = {mutations: 0};
+    new MutationObserver(function (records) { window.__nroboSnapshot.mutations += records.length; })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return [document.documentElement.outerHTML, window.__nroboSnapshot.mutations, document.URL];
+"""
+    STATE_SCRIPT = """/* nrobo snapshot */
+return [window.__nroboSnapshot ? window.__nroboSnapshot.mutations : -1, document.URL];
+"""
+
+    BLOCK_TAGS = {"address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+                  "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+                  "li", "main", "nav", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul"}
+    HIDDEN_TAGS = {"head", "script", "style", "template", "noscript", "title", "meta", "link"}
+    HIDDEN_STYLE = re.compile(r"(display\s*:\s*none|visibility\s*:\s*hidden)", re.IGNORECASE)
+
+
+def locator(by, value: Optional[str] = None) -> (str, str):
+    """Accept both (by, value) arguments and a (By, value) tuple"""
+
+    if isinstance(by, (tuple, list)):
+        by, value = by
+    return str(by), value
+
+
+@functools.lru_cache(maxsize=512)
+def css_to_xpath(selector: str) -> str:
+    from cssselect import HTMLTranslator
+    return HTMLTranslator().css_to_xpath(selector)
+
+
+def is_native(driver) -> bool:
+    """True for native appium apps, whose page source is the xml view hierarchy"""
+
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return str(capabilities.get("platformName", "")).lower() in SNAPSHOT.NATIVE_PLATFORMS \
+        and not capabilities.get("browserName")
+
+
+def changes_page(command: str, params: Optional[dict]) -> bool:
+    """True if webdriver <command> may change the page"""
+
+    if command not in SNAPSHOT.CHANGING_COMMANDS:
+        return False
+    if command.startswith("w3cExecuteScript"):
+        script = (params or {}).get("script", "").lstrip()
+        return not any(script.startswith(prefix) for prefix in SNAPSHOT.READ_ONLY_SCRIPTS)
+    return True
+
+
+class SnapshotElement:
+    """Element of a page snapshot answering read-only queries locally"""
+
+    def __init__(self, snapshot: "Snapshot", node):
+        self._snapshot = snapshot
+        self._node = node
+
+    @property
+    def tag_name(self) -> str:
+        self._snapshot.ensure_fresh()
+        return self._node.tag
+
+    @property
+    def text(self) -> str:
+        """Visible text (html) or text, label or value attribute (xml)"""
+
+        self._snapshot.ensure_fresh()
+        if self._snapshot.kind == SNAPSHOT.XML:
+            for name in ["text", "label", "value"]:
+                if self._node.get(name):
+                    return self._node.get(name)
+            return ""
+
+        parts = []
+        for node in self._node.iter():
+            visible = node is self._node or (isinstance(node.tag, str) and _visible(node, self._node))
+            block = node.tag in SNAPSHOT.BLOCK_TAGS
+            if visible:
+                parts.append(" " if block else "")
+                parts.append(node.text or "")
+            if node is not self._node and _visible(node.getparent(), self._node):
+                parts.append(" " if block else "")
+                parts.append(node.tail or "")
+        return " ".join("".join(parts).split())
+
+    def get_attribute(self, name: str) -> Union[str, None]:
+        self._snapshot.ensure_fresh()
+        return self._node.get(name)
+
+    def is_displayed(self) -> bool:
+        self._snapshot.ensure_fresh()
+        if self._snapshot.kind == SNAPSHOT.XML:
+            for name in ["displayed", "visible"]:
+                if self._node.get(name) is not None:
+                    return self._node.get(name) == "true"
+            return True
+        return _visible(self._node)
+
+    def is_enabled(self) -> bool:
+        self._snapshot.ensure_fresh()
+        if self._snapshot.kind == SNAPSHOT.XML:
+            return self._node.get("enabled", "true") == "true"
+        return self._node.get("disabled") is None
+
+    def is_selected(self) -> bool:
+        self._snapshot.ensure_fresh()
+        if self._snapshot.kind == SNAPSHOT.XML:
+            return "true" in [self._node.get("selected"), self._node.get("checked")]
+        return self._node.get("checked") is not None or self._node.get("selected") is not None
+
+    def __repr__(self):
+        return f"SnapshotElement(<{self._node.tag}>)"
+
+
+def _visible(node, upto=None) -> bool:
+    """False if html <node> or an ancestor (up to <upto>) is hidden"""
+
+    while node is not None and node is not upto:
+        if node.tag in SNAPSHOT.HIDDEN_TAGS or node.get("hidden") is not None \
+                or node.get("type") == "hidden" or SNAPSHOT.HIDDEN_STYLE.search(node.get("style") or ""):
+            return False
+        node = node.getparent()
+    return True
+
+
+class Snapshot:
+    """Page source of a driver taken once, queried locally"""
+
+    def __init__(self, driver, kind: Optional[str] = None):
+        """
+        Constructor
+
+        :param driver: webdriver or appium driver
+        :param kind: html or xml, detected from driver capabilities if not given
+        """
+        self.driver = driver
+        self.kind = kind or (SNAPSHOT.XML if is_native(driver) else SNAPSHOT.HTML)
+        self.root = None
+        self.url = None
+        self.stale_by = None  # command which made the snapshot stale
+        self._mutations = None
+        self._digest = None
+        self._watching = False
+
+    def capture(self) -> "Snapshot":
+        """Fetch page source with one round trip and parse it"""
+
+        if self.kind == SNAPSHOT.XML:
+            from lxml import etree
+            source = self.driver.page_source
+            self._digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+            self.root = etree.fromstring(source.encode("utf-8"))
+        else:
+            import lxml.html
+            source, self._mutations, self.url = self.driver.execute_script(SNAPSHOT.CAPTURE_SCRIPT)
+            self.root = lxml.html.document_fromstring(source)
+
+        self.stale_by = None
+        return self
+
+    refresh = capture
+
+    def watch(self) -> None:
+        """Mark snapshot stale when a command changing the page runs on the driver"""
+
+        if not self._watching:
+            add_command_listener(self.driver, self._on_command)
+            self._watching = True
+
+    def unwatch(self) -> None:
+        if self._watching:
+            remove_command_listener(self.driver, self._on_command)
+            self._watching = False
+
+    def _on_command(self, command: str, params: Optional[dict]) -> None:
+        if self.stale_by is None and changes_page(command, params):
+            self.stale_by = command
+
+    def __enter__(self) -> "Snapshot":
+        self.capture()
+        self.watch()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unwatch()
+
+    def is_stale(self, verify: bool = False) -> bool:
+        """True if page changed since capture. <verify> also asks the browser, one round trip."""
+
+        if self.stale_by is not None or not verify:
+            return self.stale_by is not None
+
+        if self.kind == SNAPSHOT.XML:
+            changed = hashlib.sha1(self.driver.page_source.encode("utf-8")).hexdigest() != self._digest
+        else:
+            mutations, url = self.driver.execute_script(SNAPSHOT.STATE_SCRIPT)
+            changed = mutations != self._mutations or url != self.url
+        if changed:
+            self.stale_by = "page update"
+
+        return changed
+
+    def ensure_fresh(self) -> None:
+        if self.root is None:
+            self.capture()
+        if self.stale_by is not None:
+            raise NRoBoStaleSnapshot(self.stale_by)
+
+    def _xpath(self, by: str, value: str) -> (str, dict):
+        """XPath and its variables for locator (by, value)"""
+
+        if by == SNAPSHOT.XPATH:
+            return value, {}
+        if by == SNAPSHOT.CSS_SELECTOR and self.kind == SNAPSHOT.HTML:
+            return css_to_xpath(value), {}
+        if by == SNAPSHOT.CLASS_NAME:
+            if self.kind == SNAPSHOT.XML:
+                return "//*[local-name()=$v]", {"v": value}
+            return "//*[contains(concat(' ', normalize-space(@class), ' '), concat(' ', $v, ' '))]", {"v": value}
+        if by == SNAPSHOT.TAG_NAME:
+            return "//*[local-name()=$v]", {"v": value if self.kind == SNAPSHOT.XML else value.lower()}
+
+        if self.kind == SNAPSHOT.XML:
+            if by == SNAPSHOT.ID:
+                return "//*[@resource-id=$v or substring(@resource-id, string-length(@resource-id) " \
+                       "- string-length($s) + 1)=$s or @name=$v]", {"v": value, "s": f":id/{value}"}
+            if by == SNAPSHOT.ACCESSIBILITY_ID:
+                return "//*[@content-desc=$v or @name=$v]", {"v": value}
+        else:
+            if by == SNAPSHOT.ID:
+                return "//*[@id=$v]", {"v": value}
+            if by == SNAPSHOT.NAME:
+                return "//*[@name=$v]", {"v": value}
+            if by == SNAPSHOT.LINK_TEXT:
+                return "//a[normalize-space(string())=normalize-space($v)]", {"v": value}
+            if by == SNAPSHOT.PARTIAL_LINK_TEXT:
+                return "//a[contains(string(), $v)]", {"v": value}
+
+        raise ValueError(f"Locator strategy {by} can not be answered from a {self.kind} page snapshot")
+
+    def find_elements(self, by, value: Optional[str] = None) -> [SnapshotElement]:
+        by, value = locator(by, value)
+        self.ensure_fresh()
+        xpath, variables = self._xpath(by, value)
+        return [SnapshotElement(self, node) for node in self.root.xpath(xpath, **variables)
+                if isinstance(getattr(node, "tag", None), str)]
+
+    def find_element(self, by, value: Optional[str] = None) -> SnapshotElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"No element in page snapshot for locator {locator(by, value)}")
+        return elements[0]
+
+    def exists(self, by, value: Optional[str] = None) -> bool:
+        return bool(self.find_elements(by, value))
+
+    def count(self, by, value: Optional[str] = None) -> int:
+        return len(self.find_elements(by, value))
+
+    def text(self, by, value: Optional[str] = None) -> str:
+        return self.find_element(by, value).text
+
+    def texts(self, by, value: Optional[str] = None) -> [str]:
+        return [element.text for element in self.find_elements(by, value)]
+
+    def get_attribute(self, name: str, by, value: Optional[str] = None) -> Union[str, None]:
+        return self.find_element(by, value).get_attribute(name)
+
+    def is_displayed(self, by, value: Optional[str] = None) -> bool:
+        return self.find_element(by, value).is_displayed()
+
+    def is_enabled(self, by, value: Optional[str] = None) -> bool:
+        return self.find_element(by, value).is_enabled()
+
+    def is_selected(self, by, value: Optional[str] = None) -> bool:
+        return self.find_element(by, value).is_selected()
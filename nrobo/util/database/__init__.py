@@ -0,0 +1,2 @@
+from nrobo.util.database.registry import Connector, Database, connect, register_connector, get_connector, \
+    connector_types
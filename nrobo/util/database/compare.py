@@ -0,0 +1,295 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Compare tables of two databases without pulling every row into python.
+
+Table is split into key ranges of about chunk_size rows each, range
+boundaries are read from the key index with NTILE. Each side computes
+count and checksum of every chunk on the database server, only
+mismatching chunks are split further (Merkle style) until they are
+small enough to be fetched and diffed row by row. Chunks are compared
+in parallel on a thread pool, submitted as workers free up, and every
+worker thread keeps one connection per side for the whole comparison.
+
+Usage:
+
+    from nrobo.util.database.compare import compare_tables
+
+    result = compare_tables(source_config, target_config, "orders", key="id")
+    assert result.equal, result.summary()
+
+Table key must be a unique integer column, typically the primary key,
+and the databases must support window functions (sqlite 3.25+,
+mysql 8, postgresql).
+Both sides should be of the same database type since checksums
+depend on how the engine renders values as text.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from nrobo.util.database.registry import Database, connect
+
+
+class COMPARE:
+    """Defaults of comparison engine"""
+
+    CHUNK_SIZE = 10000  # rows of a top level chunk
+    LEAF_SIZE = 200  # chunks with at most these many rows are diffed row by row
+    FANOUT = 8  # a mismatching chunk is split into these many sub chunks
+    MAX_WORKERS = 4
+    IN_FLIGHT_PER_WORKER = 2  # chunks submitted ahead of free workers
+
+
+class ComparisonResult:
+    """Outcome of comparing one table"""
+
+    def __init__(self, table: str, columns: [str]):
+        self.table = table
+        self.columns = columns
+        self.missing = []  # rows of source absent in target
+        self.extra = []  # rows of target absent in source
+        self.changed = []  # (source row, target row) with same key but different values
+        self.chunks_compared = 0
+        self.chunks_mismatched = 0
+        self.rows_fetched = 0
+
+    @property
+    def equal(self) -> bool:
+        return not (self.missing or self.extra or self.changed)
+
+    def summary(self) -> dict:
+        """Returns counters of the comparison"""
+
+        return {
+            "table": self.table,
+            "equal": self.equal,
+            "missing": len(self.missing),
+            "extra": len(self.extra),
+            "changed": len(self.changed),
+            "chunks_compared": self.chunks_compared,
+            "chunks_mismatched": self.chunks_mismatched,
+            "rows_fetched": self.rows_fetched,
+        }
+
+
+class TableComparison:
+    """Chunked-hash comparison of <table> between source and target database"""
+
+    SOURCE = "source"
+    TARGET = "target"
+
+    def __init__(self, source_config: dict, target_config: dict, table: str, key: str,
+                 columns: [str] = None, target_table: str = None,
+                 chunk_size: int = COMPARE.CHUNK_SIZE, leaf_size: int = COMPARE.LEAF_SIZE,
+                 fanout: int = COMPARE.FANOUT, max_workers: int = COMPARE.MAX_WORKERS):
+        """
+        Constructor
+
+        :param source_config: connector config of source database
+        :param target_config: connector config of target database
+        :param table: table to compare
+        :param key: unique integer key column which defines chunk ranges
+        :param columns: columns to compare, all columns of source table by default
+        :param target_table: name of the table in target database if differs
+        :param chunk_size: rows of top level chunks
+        :param leaf_size: mismatching chunks with at most these many rows are diffed row by row
+        :param fanout: number of sub chunks a mismatching chunk is split into
+        :param max_workers: number of threads comparing chunks
+        """
+        self.source_config = source_config
+        self.target_config = target_config
+        self.table = table
+        self.target_table = target_table or table
+        self.key = key
+        self.columns = columns
+        self.chunk_size = max(1, chunk_size)
+        self.leaf_size = max(1, leaf_size)
+        self.fanout = max(2, fanout)
+        self.max_workers = max(1, max_workers)
+        self._sides = {self.SOURCE: (source_config, self.table), self.TARGET: (target_config, self.target_table)}
+        self._local = threading.local()  # connections of a worker thread: {side: Database}
+        self._opened = []  # every connection opened by worker threads
+        self._lock = threading.Lock()
+
+    def _connect(self, config: dict) -> Database:
+        database = connect(config)
+        database.connector.prepare(database.connection)
+        return database
+
+    def _database(self, side: str) -> Database:
+        """Connection of current worker thread to <side>, opened on first use and kept till run ends"""
+
+        databases = self._local.__dict__
+        if side not in databases:
+            databases[side] = self._connect(self._sides[side][0])
+            with self._lock:
+                self._opened.append(databases[side])
+        return databases[side]
+
+    def _close(self) -> None:
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for database in opened:
+            database.close()
+
+    def _select_list(self, database: Database) -> str:
+        return ", ".join(database.connector.quote(c) for c in self.columns)
+
+    def _range_where(self, database: Database) -> str:
+        key = database.connector.quote(self.key)
+        return f"{key} >= {database.placeholder} AND {key} < {database.placeholder}"
+
+    def _resolve_columns(self, database: Database) -> None:
+        if self.columns is None:
+            database.fetch_all(f"SELECT * FROM {database.connector.quote(self.table)} WHERE 1 = 0")
+            self.columns = list(database.last_columns)
+        if self.key not in self.columns:
+            self.columns = [self.key] + list(self.columns)
+
+    def _bounds(self, side: str) -> tuple:
+        """Returns (row count, min key, max key) of <side>"""
+
+        config, table = self._sides[side]
+        with self._connect(config) as database:
+            key = database.connector.quote(self.key)
+            return database.fetch_all(
+                f"SELECT COUNT(*), MIN({key}), MAX({key}) FROM {database.connector.quote(table)}")[0]
+
+    def _chunks(self, database: Database, table: str, low: int, high: int, tiles: int) -> [tuple]:
+        """Split [low, high) into <tiles> key ranges of about equal row count of <table>"""
+
+        key = database.connector.quote(self.key)
+        starts = [row[0] for row in database.fetch_all(
+            f"SELECT MIN({key}) FROM (SELECT {key}, NTILE({int(tiles)}) OVER (ORDER BY {key}) AS nrobo_tile "
+            f"FROM {database.connector.quote(table)} WHERE {self._range_where(database)}) tiles "
+            f"GROUP BY nrobo_tile ORDER BY 1", (low, high))]
+        starts = [low] + [start for start in starts if start > low]
+        return list(zip(starts, starts[1:] + [high]))
+
+    def _checksum(self, side: str, low: int, high: int) -> tuple:
+        """Returns (row count, checksum) of rows with key in [low, high) computed by the database"""
+
+        database, table = self._database(side), self._sides[side][1]
+        row_hash = database.connector.row_hash_sql(self.columns)
+        count, checksum = database.fetch_all(
+            f"SELECT COUNT(*), COALESCE(SUM({row_hash}), 0) FROM {database.connector.quote(table)} "
+            f"WHERE {self._range_where(database)}", (low, high))[0]
+        return count, int(checksum)
+
+    def _rows(self, side: str, low: int, high: int) -> dict:
+        """Returns {key: row} of rows with key in [low, high)"""
+
+        database, table = self._database(side), self._sides[side][1]
+        rows = database.iter_rows(
+            f"SELECT {self._select_list(database)} FROM {database.connector.quote(table)} "
+            f"WHERE {self._range_where(database)}", (low, high))
+        key_index = self.columns.index(self.key)
+        return {row[key_index]: tuple(row) for row in rows}
+
+    def _compare_chunk(self, low: int, high: int):
+        """Compare checksums of a chunk. Returns sub chunks to compare next or rows to diff."""
+
+        source_count, source_checksum = self._checksum(self.SOURCE, low, high)
+        target_count, target_checksum = self._checksum(self.TARGET, low, high)
+
+        if (source_count, source_checksum) == (target_count, target_checksum):
+            return "equal", None
+
+        if max(source_count, target_count) > self.leaf_size:
+            """split by rows of the bigger side"""
+            side = self.SOURCE if source_count >= target_count else self.TARGET
+            chunks = self._chunks(self._database(side), self._sides[side][1], low, high, self.fanout)
+            if len(chunks) > 1:
+                return "split", chunks
+
+        return "diff", (self._rows(self.SOURCE, low, high), self._rows(self.TARGET, low, high))
+
+    def run(self) -> ComparisonResult:
+        """Compare the table and return the result"""
+
+        with self._connect(self.source_config) as database:
+            self._resolve_columns(database)
+
+        result = ComparisonResult(self.table, list(self.columns))
+
+        bounds = {side: self._bounds(side) for side in self._sides}
+        keys = [key for count, *low_high in bounds.values() for key in low_high if key is not None]
+        if not keys:
+            return result  # both tables are empty
+
+        low, high = min(keys), max(keys) + 1
+        side = max(bounds, key=lambda name: bounds[name][0])  # ranges by rows of the bigger side
+        config, table = self._sides[side]
+        with self._connect(config) as database:
+            tiles = -(-bounds[side][0] // self.chunk_size)  # ceil
+            chunks = iter(self._chunks(database, table, low, high, tiles))
+        queued = deque()  # sub chunks of mismatching chunks, compared before further top level chunks
+        limit = self.max_workers * COMPARE.IN_FLIGHT_PER_WORKER
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nrobo-compare") as executor:
+                pending = set()
+                while True:
+                    while len(pending) < limit:
+                        chunk = queued.popleft() if queued else next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending.add(executor.submit(self._compare_chunk, *chunk))
+                    if not pending:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        outcome, payload = future.result()
+                        result.chunks_compared += 1
+                        if outcome == "equal":
+                            continue
+                        result.chunks_mismatched += 1
+                        if outcome == "split":
+                            queued.extend(payload)
+                        else:
+                            self._diff_rows(result, *payload)
+        finally:
+            self._close()
+
+        key_index = self.columns.index(self.key)
+        for rows in (result.missing, result.extra):
+            rows.sort(key=lambda row: row[key_index])
+        result.changed.sort(key=lambda pair: pair[0][key_index])
+
+        return result
+
+    @staticmethod
+    def _diff_rows(result: ComparisonResult, source_rows: dict, target_rows: dict) -> None:
+        result.rows_fetched += len(source_rows) + len(target_rows)
+
+        for key, row in source_rows.items():
+            if key not in target_rows:
+                result.missing.append(row)
+            elif target_rows[key] != row:
+                result.changed.append((row, target_rows[key]))
+
+        result.extra.extend(row for key, row in target_rows.items() if key not in source_rows)
+
+
+def compare_tables(source_config: dict, target_config: dict, table: str, key: str, **kwargs) -> ComparisonResult:
+    """Compare <table> of source and target database. See TableComparison for kwargs."""
+
+    return TableComparison(source_config, target_config, table, key, **kwargs).run()
+
+
+def compare_databases(source_config: dict, target_config: dict, tables: dict, **kwargs) -> dict:
+    """Compare several tables given as {table: key column}. Returns {table: ComparisonResult}."""
+
+    return {table: compare_tables(source_config, target_config, table, key, **kwargs)
+            for table, key in tables.items()}
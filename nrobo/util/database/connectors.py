@@ -1,15 +1,20 @@
-from nrobo.selenese import NRobo as nrobo
+import time
+
+from nrobo.util.database.pool import POOL_ATTRIBUTES, backoff_delay, get_pool
 
 
 class CONNECTOR_TYPE:
     """Database Connector Types"""
     MYSQL = "mysql"
+    SQLITE = "sqlite"
+    POSTGRESQL = "postgresql"
 
 
 class CONNECTOR_ATTRIBUTES:
     """Database connector attributes"""
 
     TYPE = "type"
+    POOLED = "pooled"
     MAX_RETRY = 5
     MAX_WAIT_BETWEEN_EACH_ATTEMPT = 5
 
@@ -25,17 +30,51 @@ def db_connector(config: {}):
           if config[CONNECTOR_ATTRIBUTES.TYPE] is 'mysql'
              Then it calls mysql_db_connector.
 
-       Possible Connector types are ['mysql']
+       Possible Connector types are the ones registered in
+       nrobo.util.database.registry, ['sqlite', 'mysql', 'postgresql'] out of the box.
+
+       If config[CONNECTOR_ATTRIBUTES.POOLED] is True, connection is leased
+       from a pool kept per config and connection.close() gives it back to the pool.
       """
 
-    # Copy config, remove type attribute from config and pass it to connector
-    copy_of_config = config.copy()
-    copy_of_config.pop(CONNECTOR_ATTRIBUTES.TYPE)
+    if config.get(CONNECTOR_ATTRIBUTES.POOLED):
+        copy_of_config = config.copy()
+        copy_of_config.pop(CONNECTOR_ATTRIBUTES.POOLED)
+        _db_connection = get_pool(copy_of_config).acquire()
+
+        return {'connection': _db_connection, 'cursor': _db_connection.cursor()}
 
     if config[CONNECTOR_ATTRIBUTES.TYPE] == CONNECTOR_TYPE.MYSQL:
+        # Copy config, remove type attribute from config and pass it to connector
+        copy_of_config = _connection_config(config)
+        copy_of_config.pop(CONNECTOR_ATTRIBUTES.TYPE)
         return mysql_db_connector(config=copy_of_config)
-    else:
-        raise Exception(f"Invalid database connector type: {config[CONNECTOR_ATTRIBUTES.TYPE]}")
+
+    _db_connection = raw_connection(config)
+    return {'connection': _db_connection, 'cursor': _db_connection.cursor()}
+
+
+def _connection_config(config: {}) -> {}:
+    """Returns copy of config without nRoBo specific pooling keys"""
+
+    copy_of_config = config.copy()
+    copy_of_config.pop(CONNECTOR_ATTRIBUTES.POOLED, None)
+    [copy_of_config.pop(key, None) for key in POOL_ATTRIBUTES.KEYS]
+
+    return copy_of_config
+
+
+def raw_connection(config: {}):
+    """Open a new db-api connection for given config without any retry.
+
+       Used by connection pools, which retry with backoff on their own."""
+
+    from nrobo.util.database.registry import get_connector
+
+    copy_of_config = _connection_config(config)
+    _type = copy_of_config.pop(CONNECTOR_ATTRIBUTES.TYPE)
+
+    return get_connector(_type).connect(copy_of_config)
 
 
 def mysql_db_connector(config: {}):
@@ -62,6 +101,8 @@ def mysql_db_connector(config: {}):
             else:
                 print(err)
 
-            nrobo.wait(time_in_sec=CONNECTOR_ATTRIBUTES.MAX_WAIT_BETWEEN_EACH_ATTEMPT)
+            # back off exponentially instead of blocking for fixed time on each attempt
+            if each_attempt < CONNECTOR_ATTRIBUTES.MAX_RETRY - 1:
+                time.sleep(backoff_delay(each_attempt, cap=CONNECTOR_ATTRIBUTES.MAX_WAIT_BETWEEN_EACH_ATTEMPT))
 
     raise Exception('Database connection did not established!!!')
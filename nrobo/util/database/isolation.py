@@ -0,0 +1,139 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Test isolation for seeded databases without reseeding.
+
+transaction: test runs inside a savepoint of a leased connection
+             and everything is rolled back at teardown. Changes are
+             visible only through that connection. A failing statement
+             is rolled back alone, earlier changes of the test stay.
+
+snapshot:    whole database is copied once per session and restored
+             after every test, so changes made by any connection
+             (e.g. application under test) are undone as well.
+             Needs connector support, sqlite uses its backup api.
+
+Usage:
+
+    def test_orders(self, db):
+        database = db.isolated(config)  # or db.isolated(config, mode="snapshot")
+        database.execute("DELETE FROM orders")
+        ...  # seeded orders are back for the next test
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+from nrobo.util.database.registry import Database
+
+
+class ISOLATION:
+    """Isolation modes"""
+
+    TRANSACTION = "transaction"
+    SNAPSHOT = "snapshot"
+
+    MODES = [TRANSACTION, SNAPSHOT]
+    SAVEPOINT = "nrobo_test"
+    STATEMENT_SAVEPOINT = "nrobo_statement"
+
+
+class TransactionalDatabase(Database):
+    """Database whose changes are kept in a savepoint and rolled back by end().
+
+       Every statement runs in a nested savepoint of its own, so a failing
+       statement (or batch of executemany/bulk_insert) is undone alone and
+       changes made earlier in the test are kept."""
+
+    def __init__(self, connection, connector):
+        super().__init__(connection, connector)
+        self._savepoints = []  # open savepoints, innermost last
+
+    def _savepoint(self, name: str) -> None:
+        super().execute(f"SAVEPOINT {name}")
+        self._savepoints.append(name)
+
+    def _release(self, name: str) -> None:
+        self._savepoints.remove(name)
+        super().execute(f"RELEASE SAVEPOINT {name}")
+
+    def _statement(self) -> str:
+        name = f"{ISOLATION.STATEMENT_SAVEPOINT}_{len(self._savepoints)}"
+        self._savepoint(name)
+        return name
+
+    def begin(self) -> "TransactionalDatabase":
+        """Open the savepoint every change of the test goes into"""
+
+        self._savepoint(ISOLATION.SAVEPOINT)
+        return self
+
+    def execute(self, sql: str, params=None) -> int:
+        statement = self._statement()
+        try:
+            count = super().execute(sql, params)
+        except Exception:
+            self.rollback()
+            raise
+        finally:
+            self._release(statement)
+        return count
+
+    def executemany(self, sql: str, rows, batch_size: int = Database.DEFAULT_CHUNK_SIZE,
+                    commit: bool = True) -> int:
+        # base executemany calls rollback() on error, which undoes this statement only
+        statement = self._statement()
+        try:
+            return super().executemany(sql, rows, batch_size=batch_size, commit=commit)
+        finally:
+            self._release(statement)
+
+    def commit(self) -> None:
+        # changes stay visible on this connection but are never made durable
+        pass
+
+    def rollback(self) -> None:
+        """Undo changes of the running statement, or, outside statements, every change since begin()"""
+        super().execute(f"ROLLBACK TO SAVEPOINT {self._savepoints[-1]}")
+
+    def end(self) -> None:
+        """Roll back the whole transaction and give back the connection"""
+
+        try:
+            self.connection.rollback()
+        finally:
+            self._savepoints = []
+            self.connection.close()
+
+    def close(self) -> None:
+        # closing is done by end() at teardown
+        pass
+
+
+class Snapshot:
+    """Copy of a whole database taken once and restored any number of times"""
+
+    def __init__(self, database: Database):
+        """
+        Constructor
+
+        :param database: database to take the snapshot of
+        """
+        self.connector = database.connector
+        self._copy = self.connector.snapshot(database.connection)
+        self.restores = 0
+
+    def restore(self, database: Database) -> None:
+        """Overwrite <database> with the snapshot"""
+
+        database.connection.rollback()  # backup cannot run inside an open transaction
+        self.connector.restore(database.connection, self._copy)
+        self.restores += 1
+
+    def close(self) -> None:
+        self._copy.close()
@@ -0,0 +1,467 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Bounded, thread safe database connection pools.
+
+One pool is kept per database config (keyed by config hash),
+so tests verifying data reuse warm connections instead of paying
+TCP and auth handshake on every call.
+
+Usage:
+
+    from nrobo.util.database.pool import get_pool
+
+    with get_pool(config).lease() as connection:
+        cursor = connection.cursor()
+        ...
+
+Or through the session scoped db fixture:
+
+    def test_orders(self, db):
+        connection = db.connect(config)  # released at the end of the test
+        ...
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+from nrobo.exceptions import NRoBoDatabaseConnectionError, NRoBoDatabasePoolExhausted
+
+
+class POOL_ATTRIBUTES:
+    """Pool settings. These keys are read from (and removed from) database config."""
+
+    SIZE = "pool_size"
+    MAX_IDLE = "pool_max_idle"  # seconds, idle connections older than this are closed
+    HEALTH_CHECK_INTERVAL = "pool_health_check_interval"  # seconds between health checks of idle connection
+    LEASE_TIMEOUT = "pool_lease_timeout"  # seconds to wait for a free connection
+
+    DEFAULT_SIZE = 5
+    DEFAULT_MAX_IDLE = 300
+    DEFAULT_HEALTH_CHECK_INTERVAL = 30
+    DEFAULT_LEASE_TIMEOUT = 30
+
+    BACKOFF_BASE = 0.5  # seconds
+    BACKOFF_MAX = 8  # seconds
+    MAX_RETRY = 5
+
+    KEYS = [SIZE, MAX_IDLE, HEALTH_CHECK_INTERVAL, LEASE_TIMEOUT]
+
+
+def backoff_delay(attempt: int, base: float = POOL_ATTRIBUTES.BACKOFF_BASE,
+                  cap: float = POOL_ATTRIBUTES.BACKOFF_MAX) -> float:
+    """Returns exponential backoff delay in seconds for given zero based <attempt>"""
+    return min(base * (2 ** attempt), cap)
+
+
+def default_ping(connection) -> bool:
+    """Returns True if <connection> is still usable"""
+
+    if hasattr(connection, "is_connected"):
+        # mysql connector pings the server
+        return connection.is_connected()
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+    return True
+
+
+def config_hash(config: dict) -> str:
+    """Returns stable hash of database <config>"""
+
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PooledConnection:
+    """Leased connection. Behaves like the underlying db-api connection,
+
+       except that close() gives the connection back to its pool."""
+
+    __slots__ = ("_pool", "_connection", "_released")
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+        self._released = False
+
+    @property
+    def raw(self):
+        """Underlying db-api connection"""
+        return self._connection
+
+    def __getattr__(self, item):
+        return getattr(self._connection, item)
+
+    def close(self) -> None:
+        """Give the connection back to the pool"""
+        if not self._released:
+            self._released = True
+            self._pool.release(self._connection)
+
+    def invalidate(self) -> None:
+        """Close the underlying connection instead of reusing it"""
+        if not self._released:
+            self._released = True
+            self._pool.release(self._connection, broken=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded connection pool with health checks, idle eviction and exponential backoff reconnects"""
+
+    def __init__(self, connect: Callable, ping: Callable = default_ping,
+                 size: int = POOL_ATTRIBUTES.DEFAULT_SIZE,
+                 max_idle: float = POOL_ATTRIBUTES.DEFAULT_MAX_IDLE,
+                 health_check_interval: float = POOL_ATTRIBUTES.DEFAULT_HEALTH_CHECK_INTERVAL,
+                 lease_timeout: float = POOL_ATTRIBUTES.DEFAULT_LEASE_TIMEOUT,
+                 max_retry: int = POOL_ATTRIBUTES.MAX_RETRY,
+                 sleep: Callable = time.sleep):
+        """
+        Constructor
+
+        :param connect: callable returning a new db-api connection
+        :param ping: callable returning True if given connection is healthy
+        :param size: maximum number of open connections
+        :param max_idle: idle connections older than <max_idle> seconds are closed
+        :param health_check_interval: idle connection is pinged before reuse if not checked for this many seconds
+        :param lease_timeout: seconds to wait for a free connection when pool is exhausted
+        :param max_retry: connect attempts before giving up
+        """
+        self._connect = connect
+        self._ping = ping
+        self.size = size
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.lease_timeout = lease_timeout
+        self.max_retry = max_retry
+        self._sleep = sleep
+
+        self._idle = deque()  # (connection, last_used, last_checked), most recently used on the right
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._metrics = {'created': 0, 'reused': 0, 'released': 0, 'evicted': 0, 'health_check_failures': 0,
+                         'connect_retries': 0, 'connect_failures': 0, 'waits': 0, 'wait_time': 0.0}
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self, now: float):
+        """Close idle connections unused for more than max_idle seconds. Caller holds the lock."""
+
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            connection, _, _ = self._idle.popleft()
+            self._close_quietly(connection)
+            self._open -= 1
+            self._metrics['evicted'] += 1
+
+    def _count(self, metric: str):
+        with self._cond:
+            self._metrics[metric] += 1
+
+    def _healthy(self, connection) -> bool:
+        try:
+            return bool(self._ping(connection))
+        except Exception:
+            return False
+
+    def _new_connection(self):
+        """Open a new connection retrying with exponential backoff"""
+
+        last_error = None
+        for attempt in range(self.max_retry):
+            try:
+                connection = self._connect()
+                self._count('created')
+                return connection
+            except Exception as e:
+                last_error = e
+                self._count('connect_retries')
+                if attempt < self.max_retry - 1:
+                    self._sleep(backoff_delay(attempt))
+
+        self._count('connect_failures')
+        raise NRoBoDatabaseConnectionError(last_error)
+
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        """Lease a connection from the pool"""
+
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_since = None
+
+        while True:
+            connection = None
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    self._evict_idle(now)
+
+                    if self._idle:
+                        connection, last_used, last_checked = self._idle.pop()
+                        break
+
+                    if self._open < self.size:
+                        self._open += 1  # reserve a slot, connect outside the lock
+                        self._record_wait(waited_since)
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise NRoBoDatabasePoolExhausted(self.size, timeout)
+                    if waited_since is None:
+                        waited_since = now
+                        self._metrics['waits'] += 1
+                    self._cond.wait(remaining)
+
+            if connection is None:
+                break
+
+            # ping outside the lock, a slow or hanging server must not block other leases
+            if now - last_checked > self.health_check_interval and not self._healthy(connection):
+                self._close_quietly(connection)
+                with self._cond:
+                    self._metrics['health_check_failures'] += 1
+                    self._open -= 1
+                    self._cond.notify()
+                continue  # next idle connection or a new one in its place
+
+            with self._cond:
+                self._metrics['reused'] += 1
+                self._record_wait(waited_since)
+            return PooledConnection(self, connection)
+
+        try:
+            return PooledConnection(self, self._new_connection())
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _record_wait(self, waited_since):
+        if waited_since is not None:
+            self._metrics['wait_time'] += time.monotonic() - waited_since
+
+    def release(self, connection, broken: bool = False) -> None:
+        """Give <connection> back to the pool. Broken connections are closed."""
+
+        if not broken:
+            try:
+                # do not leak uncommitted work of one test into the next one
+                connection.rollback()
+            except Exception:
+                broken = True
+
+        with self._cond:
+            self._metrics['released'] += 1
+            if broken or self._closed:
+                self._close_quietly(connection)
+                self._open -= 1
+            else:
+                now = time.monotonic()
+                self._idle.append((connection, now, now))
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        """Context manager leasing a connection. Connection is invalidated if block raises a database error."""
+
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except Exception:
+            if not connection._released and not self._healthy(connection.raw):
+                connection.invalidate()
+            raise
+        finally:
+            connection.close()
+
+    def metrics(self) -> dict:
+        """Returns pool metrics"""
+
+        with self._cond:
+            return {**self._metrics, 'size': self.size, 'open': self._open, 'idle': len(self._idle),
+                    'in_use': self._open - len(self._idle)}
+
+    def close(self) -> None:
+        """Close idle connections. Leased connections are closed as they are released."""
+
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                connection, _, _ = self._idle.pop()
+                self._close_quietly(connection)
+                self._open -= 1
+            self._cond.notify_all()
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def split_pool_settings(config: dict) -> (dict, dict):
+    """Split <config> into (connection config, pool settings)"""
+
+    connection_config = {k: v for k, v in config.items() if k not in POOL_ATTRIBUTES.KEYS}
+    pool_settings = {
+        'size': config.get(POOL_ATTRIBUTES.SIZE, POOL_ATTRIBUTES.DEFAULT_SIZE),
+        'max_idle': config.get(POOL_ATTRIBUTES.MAX_IDLE, POOL_ATTRIBUTES.DEFAULT_MAX_IDLE),
+        'health_check_interval': config.get(POOL_ATTRIBUTES.HEALTH_CHECK_INTERVAL,
+                                            POOL_ATTRIBUTES.DEFAULT_HEALTH_CHECK_INTERVAL),
+        'lease_timeout': config.get(POOL_ATTRIBUTES.LEASE_TIMEOUT, POOL_ATTRIBUTES.DEFAULT_LEASE_TIMEOUT)
+    }
+
+    return connection_config, pool_settings
+
+
+def get_pool(config: dict) -> ConnectionPool:
+    """Returns the pool for database <config>, creating it on first use"""
+
+    from nrobo.util.database.connectors import raw_connection
+
+    connection_config, pool_settings = split_pool_settings(config)
+    key = config_hash(connection_config)
+
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ConnectionPool(lambda: raw_connection(connection_config), **pool_settings)
+        return _POOLS[key]
+
+
+def close_pools() -> None:
+    """Close and forget every pool"""
+
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+
+class DatabaseSession:
+    """Session wide access to pooled connections.
+
+       Connections leased through connect() are given back
+       to their pools when the current test finishes."""
+
+    def __init__(self):
+        self._leases = []
+        self._isolated = []  # (database, snapshot or None) of the current test
+        self._snapshots = {}  # config hash: Snapshot taken once per session
+        self._lock = threading.Lock()
+
+    def connect(self, config: dict) -> PooledConnection:
+        """Lease a connection for database <config> for the duration of the current test"""
+
+        connection = get_pool(config).acquire()
+        with self._lock:
+            self._leases.append(connection)
+        return connection
+
+    def isolated(self, config: dict, mode: str = None):
+        """Returns Database for <config> whose changes are undone when the current test finishes.
+
+           mode is transaction (default) or snapshot, see nrobo.util.database.isolation"""
+
+        from nrobo.util.database.connectors import CONNECTOR_ATTRIBUTES
+        from nrobo.util.database.isolation import ISOLATION, Snapshot, TransactionalDatabase
+        from nrobo.util.database.registry import Database, get_connector
+
+        mode = mode or ISOLATION.TRANSACTION
+        if mode not in ISOLATION.MODES:
+            raise ValueError(f"Invalid database isolation mode: {mode}. Valid modes are {ISOLATION.MODES}")
+
+        connector = get_connector(config[CONNECTOR_ATTRIBUTES.TYPE])
+
+        if mode == ISOLATION.TRANSACTION:
+            database = TransactionalDatabase(get_pool(config).acquire(), connector).begin()
+            snapshot = None
+        else:
+            database = Database(get_pool(config).acquire(), connector)
+            key = config_hash(split_pool_settings(config)[0])
+            with self._lock:
+                if key not in self._snapshots:
+                    self._snapshots[key] = Snapshot(database)
+                snapshot = self._snapshots[key]
+
+        with self._lock:
+            self._isolated.append((database, snapshot))
+        return database
+
+    def release_leases(self) -> None:
+        """Give back every connection leased by the current test and undo changes of isolated databases"""
+
+        with self._lock:
+            leases, self._leases = self._leases, []
+            isolated, self._isolated = self._isolated, []
+        for connection in leases:
+            connection.close()
+        for database, snapshot in isolated:
+            if snapshot is None:
+                database.end()
+            else:
+                try:
+                    snapshot.restore(database)
+                finally:
+                    database.close()
+
+    def metrics(self) -> dict:
+        """Returns {config hash: pool metrics} of every pool"""
+
+        with _POOLS_LOCK:
+            return {key: pool.metrics() for key, pool in _POOLS.items()}
+
+    def close(self) -> None:
+        """Release leases and close every pool"""
+
+        self.release_leases()
+        with self._lock:
+            snapshots, self._snapshots = self._snapshots, {}
+        for snapshot in snapshots.values():
+            snapshot.close()
+        close_pools()
+
+
+_DATABASE_SESSION = None
+
+
+def database_session() -> DatabaseSession:
+    """Returns database session of this test run"""
+
+    global _DATABASE_SESSION
+    if _DATABASE_SESSION is None:
+        _DATABASE_SESSION = DatabaseSession()
+    return _DATABASE_SESSION
+
+
+def release_test_leases() -> None:
+    """Give back connections leased by the finished test. No-op if db fixture was never used."""
+
+    if _DATABASE_SESSION is not None:
+        _DATABASE_SESSION.release_leases()
@@ -0,0 +1,391 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Pluggable database connector registry and uniform database API.
+
+Connectors for sqlite, postgresql and mysql are registered out of the box.
+Register your own with register_connector().
+
+Usage:
+
+    from nrobo.util.database import connect
+
+    with connect({'type': 'postgresql', 'host': ..., 'dbname': ...}) as database:
+        for rows in database.stream("SELECT * FROM orders", chunk_size=5000):
+            ...
+        database.bulk_insert("users", ["id", "name"], rows)
+        columns = database.to_numpy("SELECT id, amount FROM orders")
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import hashlib
+import itertools
+from typing import Iterable, Iterator, Union
+
+NULL_MARKER = "\\N"  # text of NULL in row hashes, keeps NULL apart from empty string and from a shifted column
+
+
+class Connector:
+    """Base class of database connectors.
+
+       A connector knows how to open a connection, which placeholder
+       its driver uses and how to get a streaming (server side) cursor."""
+
+    type = None
+    placeholder = "%s"
+
+    def connect(self, config: dict):
+        """Open a new db-api connection for <config> (without type key)"""
+        raise NotImplementedError
+
+    def stream_cursor(self, connection, chunk_size: int):
+        """Returns a cursor which fetches rows from the server in chunks"""
+        return connection.cursor()
+
+    def executemany(self, connection, cursor, sql: str, rows: [tuple]) -> None:
+        """Execute <sql> for every row of <rows>"""
+        cursor.executemany(sql, rows)
+
+    def quote(self, identifier: str) -> str:
+        """Quote table or column name"""
+        return '"' + str(identifier).replace('"', '""') + '"'
+
+    def row_hash_sql(self, columns: [str]) -> str:
+        """SQL expression hashing <columns> of a row to a 32 bit integer.
+
+           Used for server side chunk checksums, see nrobo.util.database.compare."""
+        raise NotImplementedError(f"Row hashing is not supported by {self.type} connector")
+
+    def prepare(self, connection) -> None:
+        """Prepare <connection> for row hashing, e.g. register sql functions"""
+
+    def snapshot(self, connection):
+        """Returns a copy of the whole database behind <connection>, see nrobo.util.database.isolation"""
+        raise NotImplementedError(f"Snapshots are not supported by {self.type} connector")
+
+    def restore(self, connection, snapshot) -> None:
+        """Overwrite database behind <connection> with <snapshot>"""
+        raise NotImplementedError(f"Snapshots are not supported by {self.type} connector")
+
+
+def row_hash(*values) -> int:
+    """Python counterpart of Connector.row_hash_sql(): md5 of values joined by #, NULL as \\N, first 32 bits"""
+
+    text = "#".join(NULL_MARKER if value is None else str(value) for value in values)
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def escaped_literal(text: str) -> str:
+    """<text> as sql string literal with backslash escapes, as mysql and postgresql E'' read them"""
+    return "'" + text.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+class SqliteConnector(Connector):
+    """sqlite3 connector. Handy as a local stand-in for database servers."""
+
+    type = "sqlite"
+    placeholder = "?"
+
+    def connect(self, config: dict):
+        import sqlite3
+
+        # connection may be leased by different threads over its lifetime in a pool
+        return sqlite3.connect(config['database'], check_same_thread=False,
+                               timeout=config.get('timeout', 5))
+
+    def stream_cursor(self, connection, chunk_size: int):
+        cursor = connection.cursor()
+        cursor.arraysize = chunk_size  # sqlite steps rows lazily
+        return cursor
+
+    def row_hash_sql(self, columns: [str]) -> str:
+        return f"nrobo_row_hash({', '.join(self.quote(c) for c in columns)})"
+
+    def prepare(self, connection) -> None:
+        # sqlite has no hash function, register one on the connection (runs in-process)
+        getattr(connection, "raw", connection).create_function("nrobo_row_hash", -1, row_hash,
+                                                               deterministic=True)
+
+    def snapshot(self, connection):
+        import sqlite3
+
+        # online backup api copies pages into an in-memory database
+        copy = sqlite3.connect(":memory:", check_same_thread=False)
+        getattr(connection, "raw", connection).backup(copy)
+        return copy
+
+    def restore(self, connection, snapshot) -> None:
+        snapshot.backup(getattr(connection, "raw", connection))
+
+
+class MysqlConnector(Connector):
+    """mysql-connector-python connector"""
+
+    type = "mysql"
+    placeholder = "%s"
+
+    def connect(self, config: dict):
+        import mysql.connector
+        return mysql.connector.connect(**config)
+
+    def stream_cursor(self, connection, chunk_size: int):
+        # unbuffered cursor reads result set from the socket as rows are fetched
+        return connection.cursor(buffered=False)
+
+    def quote(self, identifier: str) -> str:
+        return "`" + str(identifier).replace("`", "``") + "`"
+
+    def row_hash_sql(self, columns: [str]) -> str:
+        # CONCAT_WS skips NULLs, mark them instead
+        null = escaped_literal(NULL_MARKER)
+        values = ", ".join(f"COALESCE(CAST({self.quote(c)} AS CHAR), {null})" for c in columns)
+        return f"CAST(CONV(SUBSTRING(MD5(CONCAT_WS('#', {values})), 1, 8), 16, 10) AS UNSIGNED)"
+
+
+class PostgresqlConnector(Connector):
+    """PostgreSQL connector. Uses psycopg2 if installed, else psycopg (3)."""
+
+    type = "postgresql"
+    placeholder = "%s"
+    _cursor_ids = itertools.count()
+
+    def connect(self, config: dict):
+        try:
+            import psycopg2
+            return psycopg2.connect(**config)
+        except ImportError:
+            import psycopg
+            return psycopg.connect(**config)
+
+    def stream_cursor(self, connection, chunk_size: int):
+        # named cursor is a server side cursor, rows are fetched <itersize> at a time
+        cursor = connection.cursor(name=f"nrobo_stream_{next(self._cursor_ids)}")
+        cursor.itersize = chunk_size
+        return cursor
+
+    def executemany(self, connection, cursor, sql: str, rows: [tuple]) -> None:
+        try:
+            from psycopg2.extras import execute_batch
+            execute_batch(cursor, sql, rows, page_size=len(rows) or 1)
+        except ImportError:
+            cursor.executemany(sql, rows)
+
+    def row_hash_sql(self, columns: [str]) -> str:
+        # concat_ws skips NULLs, mark them instead
+        null = "E" + escaped_literal(NULL_MARKER)
+        values = ", ".join(f"COALESCE({self.quote(c)}::text, {null})" for c in columns)
+        return f"('x' || substr(md5(concat_ws('#', {values})), 1, 8))::bit(32)::bigint"
+
+
+_CONNECTORS = {}
+
+
+def register_connector(connector: Connector) -> Connector:
+    """Register <connector> under its type. Replaces connector already registered for the type."""
+
+    _CONNECTORS[connector.type] = connector
+    return connector
+
+
+def get_connector(connector_type: str) -> Connector:
+    """Returns connector registered for <connector_type>"""
+
+    try:
+        return _CONNECTORS[connector_type]
+    except KeyError:
+        raise Exception(f"Invalid database connector type: {connector_type}")
+
+
+def connector_types() -> [str]:
+    """Returns registered connector types"""
+    return list(_CONNECTORS)
+
+
+register_connector(SqliteConnector())
+register_connector(MysqlConnector())
+register_connector(PostgresqlConnector())
+
+
+class Database:
+    """Uniform API over a db-api connection of any registered connector"""
+
+    DEFAULT_CHUNK_SIZE = 1000
+
+    def __init__(self, connection, connector: Connector):
+        """
+        Constructor
+
+        :param connection: db-api connection, plain or leased from a pool
+        :param connector: connector the connection belongs to
+        """
+        self.connection = connection
+        self.connector = connector
+        self.last_columns = []  # column names of the latest query
+
+    @property
+    def placeholder(self) -> str:
+        """Parameter placeholder of the driver, ? or %s"""
+        return self.connector.placeholder
+
+    def execute(self, sql: str, params: Union[tuple, dict, None] = None) -> int:
+        """Execute a statement and return affected row count"""
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params or ())
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def fetch_all(self, sql: str, params: Union[tuple, dict, None] = None) -> [tuple]:
+        """Returns every row of the query. Use stream() for large result sets."""
+        return [row for rows in self.stream(sql, params) for row in rows]
+
+    def stream(self, sql: str, params: Union[tuple, dict, None] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+        """Yield rows of the query in chunks of at most <chunk_size> rows.
+
+           Server side cursors are used where the backend supports them,
+           so the full result set is never materialised."""
+
+        cursor = self.connector.stream_cursor(self.connection, chunk_size)
+        try:
+            cursor.execute(sql, params or ())
+            rows = cursor.fetchmany(chunk_size)
+            # server side cursors (psycopg2 named cursor) describe columns on first fetch only
+            self.last_columns = [d[0] for d in cursor.description] if cursor.description else []
+            while rows:
+                yield rows
+                rows = cursor.fetchmany(chunk_size)
+        finally:
+            cursor.close()
+
+    def iter_rows(self, sql: str, params: Union[tuple, dict, None] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+        """Yield rows of the query one by one, fetched in chunks"""
+
+        for rows in self.stream(sql, params, chunk_size):
+            yield from rows
+
+    def executemany(self, sql: str, rows: Iterable[tuple], batch_size: int = DEFAULT_CHUNK_SIZE,
+                    commit: bool = True) -> int:
+        """Execute <sql> for each of <rows> in batches of <batch_size>.
+
+           <rows> may be any iterable, e.g. a generator, and is consumed batch by batch.
+           Returns number of rows processed."""
+
+        rows = iter(rows)
+        count = 0
+        cursor = self.connection.cursor()
+        try:
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                self.connector.executemany(self.connection, cursor, sql, batch)
+                count += len(batch)
+        except Exception:
+            self.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        if commit:
+            self.commit()
+
+        return count
+
+    def bulk_insert(self, table: str, columns: [str], rows: Iterable[tuple],
+                    batch_size: int = DEFAULT_CHUNK_SIZE, commit: bool = True) -> int:
+        """Insert <rows> into <table> <columns> in batches. Handy for seeding test data."""
+
+        quote = self.connector.quote
+        sql = f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) " \
+              f"VALUES ({', '.join([self.placeholder] * len(columns))})"
+
+        return self.executemany(sql, rows, batch_size=batch_size, commit=commit)
+
+    def to_columns(self, sql: str, params: Union[tuple, dict, None] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+        """Returns {column: [values]} of the query"""
+
+        columns = None
+        data = None
+        for rows in self.stream(sql, params, chunk_size):
+            if columns is None:
+                columns = self.last_columns
+                data = [[] for _ in columns]
+            for idx, values in enumerate(zip(*rows)):
+                data[idx].extend(values)
+
+        if columns is None:
+            return {}
+
+        return dict(zip(columns, data))
+
+    def to_numpy(self, sql: str, params: Union[tuple, dict, None] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+        """Returns {column: numpy array} of the query. Requires numpy."""
+
+        import numpy
+
+        return {column: numpy.asarray(values) for column, values in
+                self.to_columns(sql, params, chunk_size).items()}
+
+    def to_arrow(self, sql: str, params: Union[tuple, dict, None] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Returns pyarrow.Table of the query built chunk by chunk. Requires pyarrow."""
+
+        import pyarrow
+
+        batches = [pyarrow.RecordBatch.from_arrays([pyarrow.array(values) for values in zip(*rows)],
+                                                   names=self.last_columns)
+                   for rows in self.stream(sql, params, chunk_size)]
+
+        if not batches:
+            return pyarrow.table({column: [] for column in self.last_columns})
+
+        return pyarrow.Table.from_batches(batches)
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+
+    def close(self) -> None:
+        """Close the connection. Pooled connection goes back to its pool."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def connect(config: dict) -> Database:
+    """Returns Database for given <config>.
+
+       config['type'] selects the connector. If config['pooled'] is True,
+       connection is leased from the pool of this config."""
+
+    from nrobo.util.database.connectors import CONNECTOR_ATTRIBUTES
+    from nrobo.util.database.pool import get_pool
+
+    connector = get_connector(config[CONNECTOR_ATTRIBUTES.TYPE])
+
+    if config.get(CONNECTOR_ATTRIBUTES.POOLED):
+        copy_of_config = config.copy()
+        copy_of_config.pop(CONNECTOR_ATTRIBUTES.POOLED)
+        return Database(get_pool(copy_of_config).acquire(), connector)
+
+    from nrobo.util.database.connectors import raw_connection
+    return Database(raw_connection(config), connector)
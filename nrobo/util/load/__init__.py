@@ -0,0 +1,336 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Browser based load testing with page flows.
+
+A flow is a test method or a function taking driver (and optionally
+logger and url), e.g. one driving existing Page objects. It is run
+by concurrent virtual users, each owning a headless browser, for a
+duration or a number of iterations. Users start one by one over the
+ramp up period. Named steps inside a flow are timed separately:
+
+    from nrobo.util.load import step
+
+    def checkout(driver, url):
+        with step("open shop"):
+            driver.get(url)
+        with step("add to cart"):
+            PageShop(driver).add_to_cart()
+
+Usage:
+
+    nrobo --load tests/test_shop.py::TestShop::test_checkout --load-users 20 --load-ramp-up 60 --load-duration 300
+    nrobo --load tests/load_flows.py::checkout --load-iterations 10 --url https://staging.example.com
+
+Without --url the flow gets the url of a locally served stand-in site.
+Latencies go into histograms per step, throughput, p50/p95/p99 and
+error rates are printed and written to results/load-report.json.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import importlib
+import importlib.util
+import inspect
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Union
+
+from nrobo.util.load.histogram import LatencyHistogram
+
+
+class LOAD:
+    """Load test constants"""
+
+    DEFAULT_USERS = 5
+    DEFAULT_DURATION = 60
+    FLOW_STEP = "flow"  # whole iteration of a flow
+    PERCENTILES = [50, 95, 99]
+    REPORT_FILE = "load-report.json"
+    PROFILE = "ci-headless"  # launch profile of virtual user browsers
+    FLOW_ARGS = ["driver", "logger", "url"]
+
+    # nrobo browser name: browser launched headless
+    BROWSERS = {"chrome": "chrome", "chrome_headless": "chrome", "anti_bot_chrome": "chrome",
+                "firefox": "firefox", "firefox_headless": "firefox", "edge": "edge"}
+
+    STAND_IN_PAGES = {
+        "index.html": """<!doctype html><html><head><title>nRoBo shop</title></head><body>
+<h1>nRoBo stand-in shop</h1><ul id="products"><li><a id="product" href="product.html">Product</a></li></ul>
+</body></html>""",
+        "product.html": """<!doctype html><html><head><title>Product</title></head><body>
+<h1>Product</h1><button id="add" onclick="document.getElementById('cart').textContent = '1'">Add to cart</button>
+<a id="checkout" href="cart.html">Cart (<span id="cart">0</span>)</a></body></html>""",
+        "cart.html": """<!doctype html><html><head><title>Cart</title></head><body>
+<h1>Cart</h1><form action="index.html"><input id="email" name="email"><button id="pay">Pay</button></form>
+</body></html>""",
+    }
+
+
+_USER = threading.local()
+
+
+class StepStats:
+    """Latencies and errors of one step"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+
+    def merge(self, other: "StepStats") -> "StepStats":
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        return self
+
+
+@contextmanager
+def step(name: str):
+    """Time block as step <name> of running flow. Outside of a load run it only runs the block."""
+
+    stats = getattr(_USER, "stats", None)
+    if stats is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stats.setdefault(name, StepStats()).errors += 1
+        raise
+    stats.setdefault(name, StepStats()).histogram.record(time.perf_counter() - started)
+
+
+def load_flow(target: str) -> Callable:
+    """
+    Returns flow callable of <target>:
+
+        path/to/file.py::function
+        path/to/file.py::Class::method   class is instantiated without arguments
+        package.module:function
+    """
+    if "::" in target:
+        path, *names = target.split("::")
+        spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+        if spec is None:
+            raise ValueError(f"Cannot load flow module {path}")
+        sys.path.insert(0, str(Path(path).resolve().parent))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module_name, _, function = target.partition(":")
+        module, names = importlib.import_module(module_name), [function]
+
+    flow = module
+    for index, name in enumerate(names):
+        flow = getattr(flow, name)
+        if inspect.isclass(flow) and index < len(names) - 1:
+            flow = flow()
+
+    unsupported = [name for name in inspect.signature(flow).parameters if name not in LOAD.FLOW_ARGS]
+    if unsupported:
+        raise ValueError(f"Flow {target} asks for {unsupported}. Flows may only take {LOAD.FLOW_ARGS}.")
+
+    return flow
+
+
+def call_flow(flow: Callable, driver, url: Union[str, None]) -> None:
+    available = {"driver": driver, "logger": logging.getLogger("nrobo.load"), "url": url}
+    flow(**{name: available[name] for name in inspect.signature(flow).parameters})
+
+
+def ramp_schedule(users: int, ramp_up: float) -> [float]:
+    """Start offset in seconds of each virtual user, evenly spread over <ramp_up>"""
+    return [ramp_up * user / users for user in range(users)]
+
+
+class LoadRunner:
+    """Runs a flow with concurrent virtual users"""
+
+    def __init__(self, flow: Callable, driver_factory: Callable, users: int = LOAD.DEFAULT_USERS,
+                 duration: float = None, iterations: int = None, ramp_up: float = 0, url: str = None):
+        """
+        Constructor
+
+        :param flow: see load_flow()
+        :param driver_factory: driver_factory() -> new browser session of a virtual user
+        :param users: concurrent virtual users
+        :param duration: seconds each user keeps iterating, counted from its start
+        :param iterations: iterations per user, used when duration is not given
+        :param ramp_up: seconds over which users are started
+        :param url: url passed to flow
+        """
+        if duration is None and iterations is None:
+            duration = LOAD.DEFAULT_DURATION
+
+        self.flow = flow
+        self.driver_factory = driver_factory
+        self.users = users
+        self.duration = duration
+        self.iterations = iterations
+        self.ramp_up = ramp_up
+        self.url = url
+        self.stats = {}  # step name: StepStats
+        self.sessions = 0
+        self.session_errors = 0
+        self._lock = threading.Lock()
+
+    def _user(self, offset: float, started: float) -> None:
+        time.sleep(max(started + offset - time.perf_counter(), 0))
+
+        stats = _USER.stats = {}
+        deadline = time.perf_counter() + self.duration if self.duration is not None else None
+        driver, iteration, sessions, session_errors = None, 0, 0, 0
+
+        try:
+            while (self.iterations is None or iteration < self.iterations) \
+                    and (deadline is None or time.perf_counter() < deadline):
+                iteration += 1
+                if driver is None:
+                    try:
+                        driver = self.driver_factory()
+                        sessions += 1
+                    except Exception:
+                        session_errors += 1
+                        stats.setdefault(LOAD.FLOW_STEP, StepStats()).errors += 1
+                        continue
+                try:
+                    with step(LOAD.FLOW_STEP):
+                        call_flow(self.flow, driver, self.url)
+                except Exception:
+                    """failed iteration continues in a fresh browser, like a new visitor"""
+                    quit_driver(driver)
+                    driver = None
+        finally:
+            quit_driver(driver)
+            _USER.stats = None
+            with self._lock:
+                for name, step_stats in stats.items():
+                    self.stats.setdefault(name, StepStats()).merge(step_stats)
+                self.sessions += sessions
+                self.session_errors += session_errors
+
+    def run(self) -> dict:
+        """Run virtual users till they are done and return load report"""
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._user, args=(offset, started), name=f"nrobo-load-{user}",
+                                    daemon=True)
+                   for user, offset in enumerate(ramp_schedule(self.users, self.ramp_up))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> dict:
+        steps = {}
+        for name, stats in sorted(self.stats.items(), key=lambda item: item[0] != LOAD.FLOW_STEP):
+            histogram = stats.histogram
+            attempts = histogram.count + stats.errors
+            steps[name] = {
+                "count": histogram.count,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / attempts, 4) if attempts else 0.0,
+                "throughput_per_s": round(histogram.count / elapsed, 3) if elapsed else 0.0,
+                "mean_ms": round(histogram.mean * 1000, 1),
+                **{f"p{q}_ms": round(histogram.percentile(q) * 1000, 1) for q in LOAD.PERCENTILES},
+                "max_ms": round((histogram.max or 0) * 1000, 1),
+            }
+
+        return {"users": self.users, "ramp_up_s": self.ramp_up, "duration_s": self.duration,
+                "iterations": self.iterations, "elapsed_s": round(elapsed, 3), "sessions": self.sessions,
+                "session_errors": self.session_errors, "steps": steps}
+
+
+def quit_driver(driver) -> None:
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass  # browser already gone
+
+
+def headless_driver_factory(browser: Union[str, None]) -> Callable:
+    """Factory of headless <browser> sessions started with ci-headless launch profile"""
+
+    name = LOAD.BROWSERS.get(str(browser or "chrome").lower())
+    if name is None:
+        raise ValueError(f"Load mode supports {sorted(LOAD.BROWSERS)} browsers, not {browser}")
+
+    from nrobo.browsers.launch_benchmark import new_driver
+    from nrobo.browsers.launch_profiles import resolve_launch_profile
+    profile = resolve_launch_profile(LOAD.PROFILE)
+
+    return lambda: new_driver(name, profile)
+
+
+def serve_stand_in_site(directory: Path):
+    """Serve stand-in shop from <directory>. Returns (server, url of its index page)."""
+
+    from nrobo.browsers.launch_benchmark import serve_stand_in_page
+
+    server, url = serve_stand_in_page(directory)
+    for page, content in LOAD.STAND_IN_PAGES.items():
+        (directory / page).write_text(content)  # shop index replaces benchmark page
+
+    return server, url
+
+
+def run_load(target: str, browser: str = None, users: int = LOAD.DEFAULT_USERS, duration: float = None,
+             iterations: int = None, ramp_up: float = 0, url: str = None,
+             report_dir: Union[str, Path] = None, driver_factory: Callable = None) -> dict:
+    """Load test <target> flow, against stand-in site if no <url> is given. Report is written to <report_dir>."""
+
+    import tempfile
+
+    flow = load_flow(target)
+    driver_factory = driver_factory or headless_driver_factory(browser)
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if not url:
+            server, url = serve_stand_in_site(Path(directory))
+        try:
+            report = LoadRunner(flow, driver_factory, users, duration, iterations, ramp_up, url).run()
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    report = {"flow": target, "url": url if server is None else "stand-in", **report}
+    if report_dir is not None:
+        Path(report_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(report_dir) / LOAD.REPORT_FILE, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    return report
+
+
+def print_load_report(report: dict) -> None:
+    from rich.table import Table
+    from nrobo import console
+
+    table = Table(title=f"Load test of {report['flow']}: {report['users']} users, {report['elapsed_s']}s, "
+                        f"{report['sessions']} browser sessions")
+    columns = ["step", "count", "errors", "error_rate", "throughput_per_s", "mean_ms", "p50_ms", "p95_ms",
+               "p99_ms", "max_ms"]
+    for column in columns:
+        table.add_column(column)
+    for name, stats in report["steps"].items():
+        table.add_row(name, *[f"{stats[column]:.2%}" if column == "error_rate" else str(stats[column])
+                              for column in columns[1:]])
+
+    console.print(table)
@@ -0,0 +1,80 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Latency histogram in the spirit of HdrHistogram.
+
+Values are counted in logarithmic buckets of fixed relative width,
+so memory stays constant however many values are recorded and every
+percentile is accurate within the bucket precision (1% by default)
+from microseconds to hours. Histograms of virtual users are merged by
+adding bucket counts.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import math
+
+
+class LatencyHistogram:
+    """Latencies in seconds, recorded with <precision> relative error"""
+
+    UNIT = 1e-6  # smallest distinguishable latency, one microsecond
+
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.buckets = {}  # bucket index: count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, seconds: float) -> int:
+        return int(math.log(max(seconds / self.UNIT, 1.0)) / self._log_base)
+
+    def _value(self, index: int) -> float:
+        """Upper bound of bucket <index> in seconds"""
+        return math.exp((index + 1) * self._log_base) * self.UNIT
+
+    def record(self, seconds: float) -> None:
+        index = self._index(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, q: float) -> float:
+        """Latency below which <q> percent of recorded values fall. 0 if nothing is recorded."""
+
+        if not self.count:
+            return 0.0
+
+        rank = max(math.ceil(q / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self._value(index), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
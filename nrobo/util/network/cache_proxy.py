@@ -0,0 +1,523 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Embedded caching http proxy for static assets of app under test.
+
+When asset_cache is enabled in nrobo-config.yaml, nRoBo starts one proxy
+per run and points every local browser to it. Cacheable static responses
+(js, css, images, fonts...) are stored on disk by content hash, so bundles
+are downloaded once per machine instead of once per browser profile.
+Cache is bounded by asset_cache_max_mb and evicts least recently used
+entries. https is tunnelled as is (it can not be cached without
+intercepting tls).
+
+Entries are served while fresh as per Cache-Control max-age (or, without
+it, a tenth of their age since Last-Modified as browsers do). Stale
+entries are revalidated with ETag / Last-Modified. no-store and private
+responses, and requests carrying Cookie or Authorization, bypass cache.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import hashlib
+import http.client
+import json
+import os
+import re
+import select
+import socket
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Union
+from urllib.parse import urlsplit
+
+
+class ASSET_CACHE:
+    """Asset cache settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    ENABLED = "asset_cache"
+    DIR = "asset_cache_dir"
+    MAX_MB = "asset_cache_max_mb"
+
+    DEFAULT_DIR = ".nrobo-asset-cache"
+    DEFAULT_MAX_MB = 512
+
+    ENV_ADDRESS = "NROBO_ASSET_CACHE_PROXY"  # host:port of the proxy of this run, inherited by workers
+    REPORT_FILE = "asset-cache.json"
+    INDEX_FILE = "index.json"
+    BLOBS_DIR = "blobs"
+    UPSTREAM_TIMEOUT = 30
+
+    STATIC_EXTENSIONS = (".js", ".mjs", ".css", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg",
+                         ".ico", ".woff", ".woff2", ".ttf", ".otf", ".eot", ".map", ".wasm")
+    HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+                          "proxy-connection", "te", "trailers", "transfer-encoding", "upgrade"}
+    CREDENTIAL_HEADERS = {"cookie", "authorization"}
+    CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since"}
+    HEURISTIC_FRACTION = 0.1  # of time since Last-Modified, freshness of responses without max-age
+
+
+def header(headers: Union[dict, list], name: str) -> Union[str, None]:
+    """Value of header <name> of <headers>, case insensitive"""
+
+    items = headers.items() if isinstance(headers, dict) else headers
+    return next((value for key, value in items if key.lower() == name), None)
+
+
+def http_date(value: Union[str, None]) -> Union[float, None]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Union[dict, list]) -> float:
+    """Seconds response stays fresh: max-age, else a tenth of its age since Last-Modified"""
+
+    cache_control = (header(headers, "cache-control") or "").lower()
+    if "no-cache" in cache_control:
+        return 0
+
+    max_age = re.search(r"max-age=(\d+)", cache_control)
+    if max_age:
+        return int(max_age.group(1))
+
+    date, last_modified = http_date(header(headers, "date")), http_date(header(headers, "last-modified"))
+    if date is None or last_modified is None:
+        return 0
+    return max(date - last_modified, 0) * ASSET_CACHE.HEURISTIC_FRACTION
+
+
+def credentialed(headers: Union[dict, list]) -> bool:
+    """True if request carries user credentials, its response may be personal"""
+    return any(header(headers, name) is not None for name in ASSET_CACHE.CREDENTIAL_HEADERS)
+
+
+def cacheable(url: str, status: int, headers: dict) -> bool:
+    """True if response is a static asset which may be served again from cache"""
+
+    if status != 200:
+        return False
+
+    headers = {k.lower(): v for k, v in headers.items()}
+    cache_control = headers.get("cache-control", "").lower()
+    if any(directive in cache_control for directive in ["no-store", "private"]):
+        return False
+    if headers.get("vary", "").strip().lower() not in ["", "accept-encoding"]:
+        return False
+    if "set-cookie" in headers:
+        return False
+
+    max_age = re.search(r"max-age=(\d+)", cache_control)
+    if not (max_age and int(max_age.group(1)) > 0) \
+            and not urlsplit(url).path.lower().endswith(ASSET_CACHE.STATIC_EXTENSIONS):
+        return False
+
+    """worth storing only if it can be served fresh or revalidated"""
+    return freshness_lifetime(headers) > 0 or "etag" in headers or "last-modified" in headers
+
+
+class DiskCache:
+    """Content addressed, size bounded LRU cache of http responses.
+
+       Entries are keyed by url and point to blobs named by sha256
+       of their body, so identical bundles served under different
+       urls are stored once."""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.blobs = self.directory / ASSET_CACHE.BLOBS_DIR
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()  # url: entry, least recently used first
+        self._refs = {}  # digest: number of entries pointing to the blob
+        self._sizes = {}  # digest: blob size
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @property
+    def size(self) -> int:
+        """Bytes of all blobs"""
+        return sum(self._sizes.values())
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs / digest[:2] / digest
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.directory / ASSET_CACHE.INDEX_FILE, encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        for url, entry in entries:
+            blob = self._blob_path(entry["digest"])
+            if blob.exists():
+                self._add(url, entry, blob.stat().st_size)
+
+    def _add(self, url: str, entry: dict, size: int) -> None:
+        self._entries[url] = entry
+        self._refs[entry["digest"]] = self._refs.get(entry["digest"], 0) + 1
+        self._sizes[entry["digest"]] = size
+
+    def _remove(self, url: str) -> None:
+        digest = self._entries.pop(url)["digest"]
+        self._refs[digest] -= 1
+        if not self._refs[digest]:
+            del self._refs[digest]
+            del self._sizes[digest]
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, url: str, stale: bool = False) -> Union[tuple, None]:
+        """Returns (status, headers, body) cached for <url> while fresh, or even if <stale>, or None"""
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or not stale and entry.get("expires", 0) <= time.time():
+                return None
+            self._entries.move_to_end(url)
+
+        try:
+            body = self._blob_path(entry["digest"]).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                if url in self._entries:
+                    self._remove(url)
+            return None
+
+        return entry["status"], entry["headers"], body
+
+    def validators(self, url: str) -> dict:
+        """Conditional request headers revalidating stale entry of <url>, empty if there is nothing to revalidate"""
+
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+
+        conditions = {"If-None-Match": header(entry["headers"], "etag"),
+                      "If-Modified-Since": header(entry["headers"], "last-modified")}
+        return {name: value for name, value in conditions.items() if value is not None}
+
+    def refresh(self, url: str, headers: list) -> Union[tuple, None]:
+        """Update entry of <url> with <headers> of a 304 response. Returns (status, headers, body) or None."""
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            updated = {name.lower() for name, _ in headers}
+            entry["headers"] = [[name, value] for name, value in entry["headers"] if name.lower() not in updated] \
+                + [[name, value] for name, value in headers]
+            entry["expires"] = time.time() + freshness_lifetime(entry["headers"])
+
+        return self.get(url, stale=True)
+
+    def put(self, url: str, status: int, headers: dict, body: bytes) -> None:
+        """Store response of <url> and evict least recently used entries beyond max size"""
+
+        if len(body) > self.max_bytes:
+            return
+
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(exist_ok=True)
+            partial = blob.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.part")
+            partial.write_bytes(body)
+            os.replace(partial, blob)  # atomic, concurrent writers produce identical content
+
+        expires = time.time() + freshness_lifetime(headers)
+        with self._lock:
+            previous = self._entries.get(url)
+            if previous is not None and previous["digest"] == digest:
+                previous.update(status=status, headers=headers, expires=expires)
+                self._entries.move_to_end(url)
+                return
+            if previous is not None:
+                self._remove(url)
+            self._add(url, {"status": status, "headers": headers, "digest": digest, "expires": expires}, len(body))
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+    def save_index(self) -> None:
+        """Persist index, so next run starts with a warm cache"""
+
+        with self._lock:
+            entries = list(self._entries.items())
+
+        partial = self.directory / f"{ASSET_CACHE.INDEX_FILE}.{os.getpid()}.part"
+        with open(partial, "w", encoding="utf-8") as file:
+            json.dump(entries, file)
+        os.replace(partial, self.directory / ASSET_CACHE.INDEX_FILE)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheStats:
+    """Counters of a caching proxy"""
+
+    def __init__(self):
+        self.hits = 0
+        self.revalidated = 0  # stale entries served after upstream answered 304
+        self.misses = 0
+        self.passthrough = 0  # requests which were not cacheable at all
+        self.bytes_from_cache = 0
+        self.bytes_from_origin = 0
+        self._lock = threading.Lock()
+
+    def count(self, attribute: str, size: int = 0) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+            if attribute in ["hits", "revalidated"]:
+                self.bytes_from_cache += size
+            else:
+                self.bytes_from_origin += size
+
+    def report(self) -> dict:
+        lookups = self.hits + self.revalidated + self.misses
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "passthrough": self.passthrough,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_from_cache, "bytes_from_origin": self.bytes_from_origin}
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Forward proxy request handler. Server carries cache and stats."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # keep test console clean
+
+    def _send(self, status: int, headers: list, body: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in ASSET_CACHE.HOP_BY_HOP_HEADERS and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _forward(self) -> None:
+        if not self.path.startswith("http://"):
+            self._send(400, [], b"nRoBo asset cache accepts proxy requests only")
+            return
+
+        url = self.path
+        cache, stats = self.server.cache, self.server.stats
+        lookup = self.command == "GET" and not credentialed(self.headers.items())
+        conditions = {}
+
+        if lookup:
+            cached = cache.get(url)
+            if cached is not None:
+                status, headers, body = cached
+                stats.count("hits", len(body))
+                self._send(status, headers, body)
+                return
+            if not any(name.lower() in ASSET_CACHE.CONDITIONAL_HEADERS for name in self.headers.keys()):
+                """browser's own conditional request goes through as is"""
+                conditions = cache.validators(url)
+
+        parts = urlsplit(url)
+        length = int(self.headers.get("Content-Length") or 0)
+        request_body = self.rfile.read(length) if length else None
+
+        while True:
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in ASSET_CACHE.HOP_BY_HOP_HEADERS}
+            headers.update(conditions)
+
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80,
+                                                    timeout=ASSET_CACHE.UPSTREAM_TIMEOUT)
+            try:
+                connection.request(self.command, (parts.path or "/") + (f"?{parts.query}" if parts.query else ""),
+                                   body=request_body, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                response_headers = response.getheaders()
+            except (OSError, http.client.HTTPException) as e:
+                self._send(502, [("Content-Type", "text/plain")], f"nRoBo asset cache: {e}".encode("utf-8"))
+                return
+            finally:
+                connection.close()
+
+            if not conditions or response.status != 304:
+                break
+
+            cached = cache.refresh(url, [(k, v) for k, v in response_headers
+                                         if k.lower() not in ASSET_CACHE.HOP_BY_HOP_HEADERS
+                                         and k.lower() != "content-length"])
+            if cached is not None:
+                status, headers, body = cached
+                stats.count("revalidated", len(body))
+                self._send(status, headers, body)
+                return
+            conditions = {}  # entry evicted meanwhile, fetch whole response
+
+        if lookup and cacheable(url, response.status, dict(response_headers)):
+            cache.put(url, response.status, [(k, v) for k, v in response_headers
+                                             if k.lower() not in ASSET_CACHE.HOP_BY_HOP_HEADERS], body)
+            stats.count("misses", len(body))
+        else:
+            stats.count("passthrough", len(body))
+
+        self._send(response.status, response_headers, body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _forward
+
+    def do_CONNECT(self):
+        """Tunnel https as is"""
+
+        host, _, port = self.path.partition(":")
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=ASSET_CACHE.UPSTREAM_TIMEOUT)
+        except OSError:
+            self.send_error(502)
+            return
+
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, ASSET_CACHE.UPSTREAM_TIMEOUT)
+                if errored or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    (upstream if source is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+
+class CachingProxy:
+    """Caching http proxy running in a background thread"""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int, host: str = "127.0.0.1", port: int = 0):
+        """
+        Constructor
+
+        :param directory: cache directory, shared by runs on this machine
+        :param max_bytes: cache size limit
+        :param host: interface to listen on
+        :param port: port to listen on, any free port by default
+        """
+        self.server = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.cache = DiskCache(directory, max_bytes)
+        self.server.stats = CacheStats()
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def cache(self) -> DiskCache:
+        return self.server.cache
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.server.stats
+
+    def start(self) -> "CachingProxy":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="nrobo-asset-cache", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stop proxy, persist cache index and return report"""
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.save_index()
+        return self.report()
+
+    def report(self) -> dict:
+        return {**self.stats.report(), "entries": len(self.cache), "cache_bytes": self.cache.size}
+
+
+def asset_cache_settings(nconfig: Union[dict, None]) -> dict:
+    """Read asset cache settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'enabled': bool(nconfig.get(ASSET_CACHE.ENABLED, False)),
+        'directory': nconfig.get(ASSET_CACHE.DIR, ASSET_CACHE.DEFAULT_DIR),
+        'max_bytes': int(float(nconfig.get(ASSET_CACHE.MAX_MB, ASSET_CACHE.DEFAULT_MAX_MB)) * 1024 * 1024)
+    }
+
+
+def start_asset_cache(nconfig: Union[dict, None]) -> Union[CachingProxy, None]:
+    """Start asset cache proxy of this run if enabled and publish its address to test workers"""
+
+    settings = asset_cache_settings(nconfig)
+    if not settings['enabled']:
+        return None
+
+    proxy = CachingProxy(settings['directory'], settings['max_bytes']).start()
+    os.environ[ASSET_CACHE.ENV_ADDRESS] = proxy.address
+
+    return proxy
+
+
+def stop_asset_cache(proxy: CachingProxy, report_dir: Union[str, Path]) -> dict:
+    """Stop <proxy> and write its report to <report_dir>"""
+
+    os.environ.pop(ASSET_CACHE.ENV_ADDRESS, None)
+    report = proxy.stop()
+
+    Path(report_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(report_dir) / ASSET_CACHE.REPORT_FILE, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    return report
+
+
+def proxy_address() -> Union[str, None]:
+    """Returns host:port of asset cache proxy of this run or None"""
+    return os.environ.get(ASSET_CACHE.ENV_ADDRESS) or None
+
+
+def apply_proxy(options, address: Union[str, None]):
+    """Point browser <options> to proxy at <address>. No-op if address is None."""
+
+    if not address:
+        return options
+
+    host, _, port = address.rpartition(":")
+    if hasattr(options, "set_preference"):
+        """firefox"""
+        options.set_preference("network.proxy.type", 1)
+        options.set_preference("network.proxy.http", host)
+        options.set_preference("network.proxy.http_port", int(port))
+        options.set_preference("network.proxy.allow_hijacking_localhost", True)
+    else:
+        """chromium, https goes direct since it can not be cached anyway"""
+        options.add_argument(f"--proxy-server=http={address}")
+        options.add_argument("--proxy-bypass-list=<-loopback>")  # route locally served apps through proxy too
+
+    return options
@@ -0,0 +1,236 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+
+nRoBo results retention utility.
+
+Each run's results directory is archived into a timestamped,
+compressed bundle under results-archive directory and old bundles
+are pruned as per retention settings in nrobo-config.yaml.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import os
+import shutil
+import tarfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+
+
+class RETENTION:
+    """Results retention constants.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    KEEP_RUNS = "retention_runs"  # Number of latest run bundles to keep
+    KEEP_DAYS = "retention_days"  # Number of days to keep run bundles for
+    COMPRESSION = "retention_compression"  # zstd | gzip
+
+    DEFAULT_KEEP_RUNS = 10
+    DEFAULT_KEEP_DAYS = 7
+
+    ZSTD = "zstd"
+    GZIP = "gzip"
+    EXT = {ZSTD: ".tar.zst", GZIP: ".tar.gz"}
+
+    GC = "gc"  # nrobo --results gc
+    BUNDLE_PREFIX = "run_"
+    PENDING_PREFIX = ".pending_"
+    PARTIAL_SUFFIX = ".part"
+    TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S_%f"
+
+
+def _zstd_available() -> bool:
+    """Returns True if zstandard library is installed"""
+    try:
+        import zstandard
+        return True
+    except ImportError:
+        return False
+
+
+def _bundle_name(timestamp: str, compression: str) -> str:
+    """Returns bundle file name for given <timestamp> and <compression>"""
+
+    if compression == RETENTION.ZSTD and not _zstd_available():
+        compression = RETENTION.GZIP
+
+    return RETENTION.BUNDLE_PREFIX + timestamp + RETENTION.EXT[compression]
+
+
+def _timestamp() -> str:
+    """Returns current timestamp used in bundle names"""
+    return datetime.now().strftime(RETENTION.TIMESTAMP_FORMAT)
+
+
+def stage_results(results_dir: Union[str, Path], archive_dir: Union[str, Path]) -> Union[Path, None]:
+    """Move <results_dir> of previous run aside into <archive_dir> for archiving later.
+
+       Rename is atomic and cheap, so results directory is free for
+       the next run immediately while compression happens in background.
+
+       Returns path of staged directory or None if nothing to stage."""
+
+    results_dir = Path(results_dir)
+    archive_dir = Path(archive_dir)
+
+    if not results_dir.exists() or not any(results_dir.iterdir()):
+        return None
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    staged_dir = archive_dir / (RETENTION.PENDING_PREFIX + _timestamp())
+    try:
+        os.replace(results_dir, staged_dir)
+    except OSError:
+        # results dir is on other device or locked. Move it the slow way.
+        shutil.move(str(results_dir), str(staged_dir))
+
+    return staged_dir
+
+
+def archive_dir_to_bundle(src_dir: Union[str, Path], bundle_path: Union[str, Path],
+                          compression: str = RETENTION.ZSTD) -> Path:
+    """Compress <src_dir> into tar bundle at <bundle_path>.
+
+       zstd compression is used if zstandard library is installed
+       otherwise gzip compression is used.
+
+       Bundle is written to a .part file first and renamed at the end,
+       so that an interrupted run never leaves a corrupt bundle behind."""
+
+    src_dir = Path(src_dir)
+    bundle_path = Path(bundle_path)
+    partial_path = bundle_path.with_name(bundle_path.name + RETENTION.PARTIAL_SUFFIX)
+
+    if compression == RETENTION.ZSTD and _zstd_available():
+        import zstandard
+        with open(partial_path, "wb") as f:
+            with zstandard.ZstdCompressor(threads=-1).stream_writer(f) as writer:
+                with tarfile.open(fileobj=writer, mode="w|") as tar:
+                    tar.add(src_dir, arcname=RETENTION.BUNDLE_PREFIX.rstrip("_"))
+    else:
+        with tarfile.open(partial_path, mode="w:gz") as tar:
+            tar.add(src_dir, arcname=RETENTION.BUNDLE_PREFIX.rstrip("_"))
+
+    os.replace(partial_path, bundle_path)
+
+    return bundle_path
+
+
+def archive_pending(archive_dir: Union[str, Path], compression: str = RETENTION.ZSTD) -> [Path]:
+    """Compress every staged results directory found in <archive_dir> into a bundle.
+
+       Returns list of created bundles."""
+
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+
+    bundles = []
+    for staged_dir in sorted(archive_dir.glob(RETENTION.PENDING_PREFIX + "*")):
+        if not staged_dir.is_dir():
+            continue
+
+        timestamp = staged_dir.name[len(RETENTION.PENDING_PREFIX):]
+        bundle = archive_dir / _bundle_name(timestamp, compression)
+        archive_dir_to_bundle(staged_dir, bundle, compression)
+        shutil.rmtree(staged_dir, ignore_errors=True)
+        bundles.append(bundle)
+
+    # Clean up leftovers of interrupted compressions
+    for partial in archive_dir.glob(RETENTION.BUNDLE_PREFIX + "*" + RETENTION.PARTIAL_SUFFIX):
+        partial.unlink(missing_ok=True)
+
+    return bundles
+
+
+def list_bundles(archive_dir: Union[str, Path]) -> [Path]:
+    """Returns run bundles in <archive_dir>, newest first."""
+
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+
+    bundles = [b for b in archive_dir.iterdir()
+               if b.is_file() and b.name.startswith(RETENTION.BUNDLE_PREFIX)
+               and any(b.name.endswith(ext) for ext in RETENTION.EXT.values())]
+
+    # Bundle names start with a sortable timestamp
+    return sorted(bundles, key=lambda b: b.name, reverse=True)
+
+
+def compact(archive_dir: Union[str, Path], keep_runs: int = RETENTION.DEFAULT_KEEP_RUNS,
+            keep_days: int = RETENTION.DEFAULT_KEEP_DAYS, now: float = None) -> [Path]:
+    """Prune run bundles in <archive_dir>.
+
+       A bundle is removed if it is not among the latest <keep_runs> bundles
+       or if it is older than <keep_days> days. Falsy value disables the respective limit.
+
+       Returns list of removed bundles."""
+
+    now = time.time() if now is None else now
+    removed = []
+
+    for idx, bundle in enumerate(list_bundles(archive_dir)):
+        too_many = bool(keep_runs) and idx >= keep_runs
+        too_old = bool(keep_days) and (now - bundle.stat().st_mtime) > keep_days * 24 * 60 * 60
+
+        if too_many or too_old:
+            bundle.unlink(missing_ok=True)
+            removed.append(bundle)
+
+    return removed
+
+
+def gc(archive_dir: Union[str, Path], keep_runs: int = RETENTION.DEFAULT_KEEP_RUNS,
+       keep_days: int = RETENTION.DEFAULT_KEEP_DAYS, compression: str = RETENTION.ZSTD) -> dict:
+    """Archive staged results and prune old bundles in <archive_dir>.
+
+       Returns summary of archived and removed bundles."""
+
+    archived = archive_pending(archive_dir, compression)
+    removed = compact(archive_dir, keep_runs=keep_runs, keep_days=keep_days)
+
+    return {'archived': archived, 'removed': removed, 'kept': list_bundles(archive_dir)}
+
+
+def start_compaction(results_dir: Union[str, Path], archive_dir: Union[str, Path],
+                     keep_runs: int = RETENTION.DEFAULT_KEEP_RUNS,
+                     keep_days: int = RETENTION.DEFAULT_KEEP_DAYS,
+                     compression: str = RETENTION.ZSTD) -> threading.Thread:
+    """Stage previous run's <results_dir> and run gc in a background thread.
+
+       Staging is done synchronously, so that the new run starts with
+       an empty results directory. Returns the started thread."""
+
+    stage_results(results_dir, archive_dir)
+
+    thread = threading.Thread(target=gc, name="nrobo-results-compaction",
+                              args=(archive_dir,),
+                              kwargs={'keep_runs': keep_runs, 'keep_days': keep_days,
+                                      'compression': compression})
+    thread.start()
+
+    return thread
+
+
+def retention_settings() -> dict:
+    """Read retention settings from nrobo-config.yaml falling back to defaults"""
+
+    from nrobo.selenese import read_nrobo_configs
+    nconfig = read_nrobo_configs() or {}
+
+    return {
+        'keep_runs': nconfig.get(RETENTION.KEEP_RUNS, RETENTION.DEFAULT_KEEP_RUNS),
+        'keep_days': nconfig.get(RETENTION.KEEP_DAYS, RETENTION.DEFAULT_KEEP_DAYS),
+        'compression': nconfig.get(RETENTION.COMPRESSION, RETENTION.ZSTD)
+    }
@@ -0,0 +1,221 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Screenshot post-processing.
+
+Raw png screenshots are megabytes each. Screenshots taken for the
+html report are transcoded to webp or jpeg as per screenshot_format
+in nrobo-config.yaml, and a thumbnail is made for the report grid.
+Full resolution png originals are kept for failed tests only.
+Encoding runs in a process pool, so tests do not wait for it.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Union
+
+
+class SCREENSHOT:
+    """Screenshot post-processing settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    FORMAT = "screenshot_format"  # png | webp | jpeg
+    QUALITY = "screenshot_quality"
+    MAX_WIDTH = "screenshot_max_width"
+    THUMBNAIL_WIDTH = "screenshot_thumbnail_width"
+    WORKERS = "screenshot_workers"
+
+    PNG = "png"
+    WEBP = "webp"
+    JPEG = "jpeg"
+    FORMATS = [PNG, WEBP, JPEG]
+    EXT = {WEBP: ".webp", JPEG: ".jpg"}
+
+    DEFAULT_FORMAT = WEBP
+    DEFAULT_QUALITY = 80
+    DEFAULT_MAX_WIDTH = 0  # no downscaling
+    DEFAULT_THUMBNAIL_WIDTH = 320
+    DEFAULT_WORKERS = 2
+
+    THUMBNAIL_SUFFIX = "_thumb"
+    STATS_FILE = "screenshot-stats.jsonl"
+
+
+def encode(image, image_format: str, quality: int) -> bytes:
+    """Encode Pillow <image> as webp or jpeg"""
+
+    buffer = io.BytesIO()
+    if image_format == SCREENSHOT.JPEG:
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def downscale(image, width: int):
+    """<image> scaled down to <width>, as is if already narrower"""
+
+    from PIL import Image
+
+    if not width or image.width <= width:
+        return image
+    return image.resize((width, max(round(image.height * width / image.width), 1)), Image.LANCZOS)
+
+
+def process_screenshot(job: dict) -> dict:
+    """Transcode png screenshot of <job> and make its thumbnail. Runs in a pool process."""
+
+    from PIL import Image
+
+    png, ext = job["png"], SCREENSHOT.EXT[job["format"]]
+    with Image.open(io.BytesIO(png)) as image:
+        image.load()
+        transcoded = encode(downscale(image, job["max_width"]), job["format"], job["quality"])
+        thumbnail = encode(downscale(image, job["thumbnail_width"]), job["format"], job["quality"])
+
+    stem = Path(job["stem"])
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    Path(f"{stem}{ext}").write_bytes(transcoded)
+    Path(f"{stem}{SCREENSHOT.THUMBNAIL_SUFFIX}{ext}").write_bytes(thumbnail)
+    if job["keep_original"]:
+        Path(f"{stem}.png").write_bytes(png)
+
+    return {"png_bytes": len(png), "stored_bytes": len(transcoded) + len(thumbnail)
+            + (len(png) if job["keep_original"] else 0)}
+
+
+class ScreenshotPipeline:
+    """Transcodes screenshots in background processes"""
+
+    def __init__(self, settings: dict, executor_factory: Callable = None):
+        """
+        Constructor
+
+        :param settings: see screenshot_settings()
+        :param executor_factory: executor_factory(max_workers) -> executor, process pool by default
+        """
+        if settings['format'] not in SCREENSHOT.EXT:
+            raise ValueError(f"Invalid screenshot format: {settings['format']}. "
+                             f"Valid formats are {list(SCREENSHOT.EXT)}")
+
+        self.settings = settings
+        self.executor_factory = executor_factory or (lambda workers: ProcessPoolExecutor(max_workers=workers))
+        self._executor = None
+        self._futures = []
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = self.executor_factory(self.settings['workers'])
+        return self._executor
+
+    def submit(self, png: bytes, path: Union[str, Path], failed: bool = False) -> (str, str):
+        """
+        Queue png screenshot meant for <path> (.png). Returns paths of image and its thumbnail,
+        files appear there once encoded. Image of a failed test is the png original itself.
+        """
+        stem, ext = Path(path).with_suffix(""), SCREENSHOT.EXT[self.settings['format']]
+
+        self._futures.append(self.executor.submit(process_screenshot, {
+            "png": png, "stem": str(stem), "format": self.settings['format'],
+            "quality": self.settings['quality'], "max_width": self.settings['max_width'],
+            "thumbnail_width": self.settings['thumbnail_width'], "keep_original": failed}))
+
+        image = f"{stem}.png" if failed else f"{stem}{ext}"
+        return image, f"{stem}{SCREENSHOT.THUMBNAIL_SUFFIX}{ext}"
+
+    def close(self) -> dict:
+        """Wait for queued screenshots and stop pool. Returns screenshots processed and bytes before and after."""
+
+        stats = {"screenshots": 0, "png_bytes": 0, "stored_bytes": 0, "errors": 0}
+        for future in self._futures:
+            try:
+                result = future.result()
+            except Exception:
+                stats["errors"] += 1
+                continue
+            stats["screenshots"] += 1
+            stats["png_bytes"] += result["png_bytes"]
+            stats["stored_bytes"] += result["stored_bytes"]
+        self._futures = []
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        return stats
+
+
+def screenshot_settings(nconfig: Union[dict, None]) -> dict:
+    """Read screenshot post-processing settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+    image_format = str(nconfig.get(SCREENSHOT.FORMAT, SCREENSHOT.DEFAULT_FORMAT)).lower()
+
+    return {
+        'format': SCREENSHOT.JPEG if image_format == "jpg" else image_format,
+        'quality': int(nconfig.get(SCREENSHOT.QUALITY, SCREENSHOT.DEFAULT_QUALITY)),
+        'max_width': int(nconfig.get(SCREENSHOT.MAX_WIDTH, SCREENSHOT.DEFAULT_MAX_WIDTH) or 0),
+        'thumbnail_width': int(nconfig.get(SCREENSHOT.THUMBNAIL_WIDTH, SCREENSHOT.DEFAULT_THUMBNAIL_WIDTH)),
+        'workers': int(nconfig.get(SCREENSHOT.WORKERS, SCREENSHOT.DEFAULT_WORKERS))
+    }
+
+
+_PIPELINE = None
+
+
+def screenshot_pipeline(nconfig: Union[dict, None]) -> Union[ScreenshotPipeline, None]:
+    """Returns screenshot pipeline of this process, None if screenshots are kept as png"""
+
+    global _PIPELINE
+
+    settings = screenshot_settings(nconfig)
+    if settings['format'] == SCREENSHOT.PNG:
+        return None
+    if _PIPELINE is None:
+        _PIPELINE = ScreenshotPipeline(settings)
+
+    return _PIPELINE
+
+
+def close_screenshot_pipeline(report_dir: Union[str, Path]) -> None:
+    """Finish screenshots of this process and append its stats to screenshot stats file of the run"""
+
+    global _PIPELINE
+
+    pipeline, _PIPELINE = _PIPELINE, None
+    if pipeline is None:
+        return
+
+    stats = pipeline.close()
+    Path(report_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(report_dir) / SCREENSHOT.STATS_FILE, "a") as f:
+        f.write(json.dumps(stats) + "\n")
+
+
+def screenshot_report(report_dir: Union[str, Path]) -> dict:
+    """Screenshot stats of all processes of the run"""
+
+    stats_file = Path(report_dir) / SCREENSHOT.STATS_FILE
+    if not stats_file.exists():
+        return {}
+
+    report = {"screenshots": 0, "png_bytes": 0, "stored_bytes": 0, "errors": 0}
+    with open(stats_file) as f:
+        for line in f:
+            if line.strip():
+                for key, value in json.loads(line).items():
+                    report[key] += value
+    stats_file.unlink()
+
+    return report
@@ -0,0 +1,265 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+
+Split one test suite across several machines and
+merge their results back into a single report.
+
+Sharding:
+    nrobo --shard 1/3       (on machine one)
+    nrobo --shard 2/3       (on machine two)
+    nrobo --shard 3/3       (on machine three)
+
+Merging:
+    nrobo --merge-results shard1/results shard2/results shard3/results
+
+Shards are balanced by test durations of .test-durations.json, which
+every shard must share. Sharded runs do not update it themselves,
+merging their results (or an unsharded run) does; commit or share the
+merged file before the next sharded run.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import heapq
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Union
+from xml.sax.saxutils import quoteattr
+
+from nrobo.exceptions import NRoBoInvalidShard
+
+
+class SHARD:
+    """Sharding and merging constants"""
+
+    SEPARATOR = "/"
+    DURATIONS_FILE = ".test-durations.json"  # stored under project root, survives results archiving
+    RESULTS_FILE = "nrobo-results.jsonl"  # nRoBo result data, one json record per test
+    JUNIT_FILE = "junit-report.xml"
+    ALLURE_DIR = "allure"
+    SCREENSHOTS_DIR = "screenshots"
+    DEFAULT_DURATION = 1.0  # seconds, assumed for tests that never ran before
+    JUNIT_COUNTERS = ["tests", "errors", "failures", "skipped"]
+
+
+def parse_shard(value: str) -> (int, int):
+    """Parse shard spec <value> given as i/N (1 based) and return (i, N)"""
+
+    try:
+        index, total = [int(v) for v in str(value).split(SHARD.SEPARATOR)]
+    except ValueError:
+        raise NRoBoInvalidShard(value)
+
+    if total < 1 or not 1 <= index <= total:
+        raise NRoBoInvalidShard(value)
+
+    return index, total
+
+
+def load_durations(durations_file: Union[str, Path]) -> dict:
+    """Returns {nodeid: duration} recorded by previous runs"""
+
+    try:
+        with open(durations_file) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_durations(durations_file: Union[str, Path], durations: dict) -> None:
+    """Merge <durations> into <durations_file>"""
+
+    merged = load_durations(durations_file)
+    merged.update(durations)
+
+    with open(durations_file, "w") as f:
+        json.dump(merged, f, sort_keys=True, indent=1)
+
+
+def partition(nodeids: [str], total: int, durations: dict = None) -> [[str]]:
+    """Split <nodeids> into <total> shards of about equal run time.
+
+       Longest tests are placed first, each into the currently lightest shard
+       (ties go to the lower shard). Unknown tests are given the average known
+       duration. The result depends only on the node ids and durations, so every
+       machine, and every xdist worker, computes the very same split."""
+
+    durations = durations or {}
+    known = [durations[n] for n in nodeids if n in durations]
+    default = sum(known) / len(known) if known else SHARD.DEFAULT_DURATION
+
+    weighted = sorted(((durations.get(n, default), n) for n in nodeids), key=lambda t: (-t[0], t[1]))
+
+    shards = [[] for _ in range(total)]
+    heap = [(0.0, idx) for idx in range(total)]
+    for duration, nodeid in weighted:
+        load, idx = heapq.heappop(heap)
+        shards[idx].append(nodeid)
+        heapq.heappush(heap, (load + duration, idx))
+
+    # keep original collection order inside each shard
+    order = {n: pos for pos, n in enumerate(nodeids)}
+    return [sorted(shard, key=order.get) for shard in shards]
+
+
+def select_shard(nodeids: [str], shard: str, durations: dict = None) -> [str]:
+    """Returns node ids belonging to <shard> given as i/N"""
+
+    index, total = parse_shard(shard)
+    return partition(nodeids, total, durations)[index - 1]
+
+
+def start_results(report_dir: Union[str, Path]) -> None:
+    """Remove nRoBo result data of a previous run, results directory is not cleaned by plain pytest runs"""
+
+    (Path(report_dir) / SHARD.RESULTS_FILE).unlink(missing_ok=True)
+
+
+def append_result(results_file: Union[str, Path], record: dict) -> None:
+    """Append one test <record> to nRoBo result data file"""
+
+    with open(results_file, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def _iter_results(results_file: Union[str, Path]):
+    """Yield records of nRoBo result data file one by one"""
+
+    with open(results_file) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _junit_totals(junit_files: [Path]) -> dict:
+    """First pass over junit files. Sum up testsuite counters without keeping elements."""
+
+    totals = {counter: 0 for counter in SHARD.JUNIT_COUNTERS}
+    totals["time"] = 0.0
+
+    for junit_file in junit_files:
+        for event, elem in ET.iterparse(junit_file, events=("end",)):
+            if elem.tag == "testsuite":
+                for counter in SHARD.JUNIT_COUNTERS:
+                    totals[counter] += int(elem.get(counter, 0))
+                totals["time"] += float(elem.get("time", 0))
+                elem.clear()
+
+    return totals
+
+
+def merge_junit(junit_files: [Union[str, Path]], output: Union[str, Path]) -> dict:
+    """Stream-merge <junit_files> into a single <output> junit xml file.
+
+       Only one testcase element is held in memory at a time.
+       Returns merged counters."""
+
+    junit_files = [Path(f) for f in junit_files if Path(f).exists()]
+    totals = _junit_totals(junit_files)
+
+    with open(output, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        root_attrs = " ".join(f"{k}={quoteattr(str(v))}" for k, v in totals.items())
+        out.write(f'<testsuites name="nrobo merged tests" {root_attrs}>\n')
+
+        for junit_file in junit_files:
+            depth, suite_depth = 0, None
+            for event, elem in ET.iterparse(junit_file, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if elem.tag == "testsuite":
+                        suite_depth = depth
+                        attrs = " ".join(f"{k}={quoteattr(v)}" for k, v in elem.attrib.items())
+                        out.write(f"<testsuite {attrs}>\n")
+                    continue
+
+                if elem.tag == "testsuite":
+                    out.write("</testsuite>\n")
+                    suite_depth = None
+                    elem.clear()
+                elif suite_depth is not None and depth == suite_depth + 1:
+                    # direct child of testsuite: testcase or properties
+                    elem.tail = None
+                    out.write(ET.tostring(elem, encoding="unicode") + "\n")
+                    elem.clear()
+                depth -= 1
+
+        out.write("</testsuites>\n")
+
+    return totals
+
+
+def merge_dir_files(src_dirs: [Union[str, Path]], output_dir: Union[str, Path]) -> int:
+    """Copy files of every directory in <src_dirs> into <output_dir>.
+
+       Allure results and screenshots have unique file names per test,
+       thus merging is plain copying. On a name clash the first file wins.
+       Returns number of files copied."""
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    copied = 0
+
+    for src_dir in [Path(d) for d in src_dirs]:
+        if not src_dir.is_dir():
+            continue
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                target = output_dir / entry.name
+                if not entry.is_file() or target.exists():
+                    continue
+                shutil.copyfile(entry.path, target)
+                copied += 1
+
+    return copied
+
+
+def merge_results_data(results_files: [Union[str, Path]], output: Union[str, Path]) -> dict:
+    """Stream-merge nRoBo result data files into <output>.
+
+       Returns {nodeid: duration} of merged tests."""
+
+    durations = {}
+    with open(output, "w") as out:
+        for results_file in [Path(f) for f in results_files if Path(f).exists()]:
+            for record in _iter_results(results_file):
+                out.write(json.dumps(record) + "\n")
+                durations[record["nodeid"]] = record["duration"]
+
+    return durations
+
+
+def merge_results(results_dirs: [Union[str, Path]], output_dir: Union[str, Path],
+                  durations_file: Union[str, Path, None] = None) -> dict:
+    """Merge results directories of sharded runs into <output_dir>.
+
+       Merges junit xml, allure results, screenshots and nRoBo result data.
+       Merged test durations are saved into <durations_file> for balancing next sharded runs.
+       Returns merge summary."""
+
+    results_dirs = [Path(d) for d in results_dirs]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    totals = merge_junit([d / SHARD.JUNIT_FILE for d in results_dirs], output_dir / SHARD.JUNIT_FILE)
+    allure_files = merge_dir_files([d / SHARD.ALLURE_DIR for d in results_dirs], output_dir / SHARD.ALLURE_DIR)
+    screenshots = merge_dir_files([d / SHARD.SCREENSHOTS_DIR for d in results_dirs],
+                                  output_dir / SHARD.SCREENSHOTS_DIR)
+    durations = merge_results_data([d / SHARD.RESULTS_FILE for d in results_dirs],
+                                   output_dir / SHARD.RESULTS_FILE)
+
+    if durations_file and durations:
+        save_durations(durations_file, durations)
+
+    return {'junit': totals, 'allure_files': allure_files, 'screenshots': screenshots,
+            'tests': len(durations)}
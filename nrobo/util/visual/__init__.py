@@ -0,0 +1,341 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Visual assertions against stored baselines.
+
+Usage in page classes:
+
+    self.assert_visual("cart", region=(By.ID, "cart"), mask=[(By.CSS_SELECTOR, ".timestamp")])
+
+Baselines are kept per browser and viewport under visual_baseline_dir.
+A missing baseline is recorded from the first screenshot. Screenshots
+are compared in a process pool (see nrobo.util.visual.compare), diff
+images are written to results/visual-diffs for failures only.
+visual_mode in nrobo-config.yaml decides when comparisons are resolved:
+
+    immediate  assert_visual waits for its comparison and fails right away
+    deferred   test carries on, comparisons are resolved when the test ends
+    batch      screenshots are saved, everything is compared at session end
+
+In batch mode each process, xdist worker, saves its screenshots in its
+own directory under results/visual-pending.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Union
+
+from nrobo.util.visual.compare import VISUAL_DIFF, compare_images, diff_image, load_image, save_image
+
+
+class VISUAL:
+    """Visual assertion settings.
+    Setting names are used as key in nrobo-config.yaml."""
+
+    BASELINE_DIR = "visual_baseline_dir"
+    MODE = "visual_mode"
+    UPDATE = "visual_update_baselines"
+    WORKERS = "visual_workers"
+    PIXEL_TOLERANCE = "visual_pixel_tolerance"
+    MAX_DIFF_RATIO = "visual_max_diff_ratio"
+    BLOCK_SIZE = "visual_block_size"
+    BLOCK_TOLERANCE = "visual_block_tolerance"
+    ANTI_ALIASING = "visual_anti_aliasing"
+
+    IMMEDIATE = "immediate"
+    DEFERRED = "deferred"
+    BATCH = "batch"
+    MODES = [IMMEDIATE, DEFERRED, BATCH]
+
+    DEFAULT_BASELINE_DIR = "visual-baselines"
+    DEFAULT_WORKERS = 2
+    DIFF_DIR = "visual-diffs"
+    PENDING_DIR = "visual-pending"
+    RESULTS_FILE = "visual-results.jsonl"
+    REPORT_FILE = "visual-report.json"
+
+    PASSED = "passed"
+    FAILED = "failed"
+    NEW = "new"
+    UPDATED = "updated"
+
+    RECTS_SCRIPT = """return [window.innerWidth, Array.prototype.map.call(arguments, function (element) {
+    var rect = element.getBoundingClientRect(); return [rect.x, rect.y, rect.width, rect.height]; })];"""
+
+
+def safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "visual"
+
+
+def baseline_path(baseline_dir: Union[str, Path], browser: str, viewport: str, name: str) -> Path:
+    return Path(baseline_dir) / safe_name(browser) / safe_name(viewport) / f"{safe_name(name)}.png"
+
+
+def png_size(png: bytes) -> (int, int):
+    """(width, height) from png header, without decoding the image"""
+    return int.from_bytes(png[16:20], "big"), int.from_bytes(png[20:24], "big")
+
+
+def native_app(driver) -> bool:
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return str(capabilities.get("platformName", "")).lower() in ["android", "ios"] \
+        and not capabilities.get("browserName")
+
+
+def is_rect(item) -> bool:
+    return isinstance(item, (tuple, list)) and len(item) == 4 and all(isinstance(v, (int, float)) for v in item)
+
+
+def run_check(job: dict) -> dict:
+    """Compare screenshot of <job> with its baseline. Runs in a pool process."""
+
+    actual_png = job["actual"] if isinstance(job["actual"], bytes) else Path(job["actual"]).read_bytes()
+    baseline = Path(job["baseline"])
+    result = {key: job[key] for key in ["name", "browser", "viewport", "nodeid"]}
+    result["baseline"] = str(baseline)
+
+    if job["update"] or not baseline.exists():
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        status = VISUAL.UPDATED if baseline.exists() else VISUAL.NEW
+        baseline.write_bytes(actual_png)
+        return {**result, "status": status, "passed": True, "summary": f"baseline {status}"}
+
+    expected, actual = load_image(baseline), load_image(actual_png)
+    diff = compare_images(expected, actual, job["masks"], **job["options"])
+    result.update(status=VISUAL.PASSED if diff.passed else VISUAL.FAILED, passed=diff.passed,
+                  summary=diff.summary(), diff_ratio=diff.diff_ratio)
+
+    if not diff.passed:
+        """diff images for failures only"""
+        prefix = Path(job["diff_dir"]) / safe_name(job["browser"]) / safe_name(job["viewport"]) / safe_name(job["name"])
+        Path(f"{prefix}-actual.png").parent.mkdir(parents=True, exist_ok=True)
+        Path(f"{prefix}-actual.png").write_bytes(actual_png)
+        if expected.shape == actual.shape:
+            save_image(diff_image(expected, actual, diff), f"{prefix}-diff.png")
+            result["diff"] = f"{prefix}-diff.png"
+        result["actual"] = f"{prefix}-actual.png"
+
+    return result
+
+
+def failure_message(result: dict) -> str:
+    message = f"Visual check {result['name']} ({result['browser']} {result['viewport']}) failed: {result['summary']}"
+    return message + (f". Diff: {result['diff']}" if result.get("diff") else "")
+
+
+class VisualChecker:
+    """Captures screenshots and resolves their comparisons as per visual mode"""
+
+    def __init__(self, settings: dict, report_dir: Union[str, Path], executor_factory: Callable = None):
+        """
+        Constructor
+
+        :param settings: see visual_settings()
+        :param report_dir: results directory, diffs and pending screenshots go under it
+        :param executor_factory: executor_factory(max_workers) -> executor, process pool by default
+        """
+        if settings['mode'] not in VISUAL.MODES:
+            raise ValueError(f"Invalid visual mode: {settings['mode']}. Valid modes are {VISUAL.MODES}")
+
+        self.settings = settings
+        self.report_dir = Path(report_dir)
+        self.executor_factory = executor_factory or (lambda workers: ProcessPoolExecutor(max_workers=workers))
+        self.results = []
+        self._executor = None
+        self._deferred = {}  # nodeid: [future]
+        self._batch = []  # jobs compared at session end
+        # own directory of this process, xdist workers share report dir
+        self.pending_dir = self.report_dir / VISUAL.PENDING_DIR / \
+            f"{os.environ.get('PYTEST_XDIST_WORKER', 'main')}-{os.getpid()}"
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = self.executor_factory(self.settings['workers'])
+        return self._executor
+
+    def capture(self, driver, name: str, region: tuple = None, mask: list = None) -> dict:
+        """Screenshot of page or <region> with <mask> rectangles in image pixels. Returns comparison job."""
+
+        element = driver.find_element(*region) if region else None
+        png = element.screenshot_as_png if element is not None else driver.get_screenshot_as_png()
+        width, height = png_size(png)
+
+        rects = [item for item in mask or [] if is_rect(item)]
+        masked = [driver.find_element(*item) for item in mask or [] if not is_rect(item)]
+        if native_app(driver):
+            viewport = f"{width}x{height}"
+            origin = element.rect if element is not None else {"x": 0, "y": 0}
+            rects += [(e.rect["x"] - origin["x"], e.rect["y"] - origin["y"], e.rect["width"], e.rect["height"])
+                      for e in masked]
+        else:
+            size = driver.get_window_size()
+            viewport = f"{size['width']}x{size['height']}"
+            if masked or element is not None:
+                inner_width, client_rects = driver.execute_script(
+                    VISUAL.RECTS_SCRIPT, *([element] if element is not None else []), *masked)
+                if element is not None:
+                    (x0, y0, region_width, _), client_rects = client_rects[0], client_rects[1:]
+                else:
+                    x0, y0, region_width = 0, 0, inner_width
+                scale = width / region_width if region_width else 1
+                rects += [((x - x0) * scale, (y - y0) * scale, w * scale, h * scale) for x, y, w, h in client_rects]
+
+        capabilities = getattr(driver, "capabilities", None) or {}
+        browser = capabilities.get("browserName") or capabilities.get("platformName") or "browser"
+
+        return {"name": name, "browser": browser, "viewport": viewport, "actual": png, "masks": rects,
+                "baseline": str(baseline_path(self.settings['baseline_dir'], browser, viewport, name)),
+                "diff_dir": str(self.report_dir / VISUAL.DIFF_DIR), "update": self.settings['update'],
+                "options": self.settings['options'], "nodeid": current_test()}
+
+    def check(self, driver, name: str, region: tuple = None, mask: list = None) -> Union[dict, None]:
+        """Visual assertion. Returns result in immediate mode, None when resolved later."""
+
+        return self.submit(self.capture(driver, name, region, mask))
+
+    def submit(self, job: dict) -> Union[dict, None]:
+        mode = self.settings['mode']
+
+        if mode == VISUAL.BATCH:
+            test = safe_name(job['nodeid'])[-100:]  # keep file name within file system limits
+            pending = self.pending_dir / f"{len(self._batch)}-{test}-{safe_name(job['name'])}.png"
+            pending.parent.mkdir(parents=True, exist_ok=True)
+            pending.write_bytes(job["actual"])
+            self._batch.append({**job, "actual": str(pending)})
+            return None
+
+        future = self.executor.submit(run_check, job)
+        if mode == VISUAL.DEFERRED:
+            self._deferred.setdefault(job["nodeid"], []).append(future)
+            return None
+
+        result = future.result()
+        self.results.append(result)
+        if not result["passed"]:
+            raise AssertionError(failure_message(result))
+        return result
+
+    def resolve(self, nodeid: str) -> [str]:
+        """Wait for deferred comparisons of test <nodeid>. Returns failure messages."""
+
+        results = [future.result() for future in self._deferred.pop(nodeid, [])]
+        self.results += results
+        return [failure_message(result) for result in results if not result["passed"]]
+
+    def finish(self) -> [dict]:
+        """Compare batch, wait for unresolved comparisons and stop pool. Returns every result."""
+
+        for nodeid in list(self._deferred):
+            self.resolve(nodeid)
+
+        if self._batch:
+            self.results += list(self.executor.map(run_check, self._batch))
+            for job in self._batch:
+                Path(job["actual"]).unlink(missing_ok=True)
+            self._batch = []
+            try:
+                self.pending_dir.rmdir()
+            except OSError:
+                pass
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        return self.results
+
+
+def current_test() -> str:
+    """Node id of running test"""
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0]
+
+
+def visual_settings(nconfig: Union[dict, None]) -> dict:
+    """Read visual assertion settings from given nrobo <nconfig> falling back to defaults"""
+
+    nconfig = nconfig or {}
+
+    return {
+        'baseline_dir': nconfig.get(VISUAL.BASELINE_DIR, VISUAL.DEFAULT_BASELINE_DIR),
+        'mode': str(nconfig.get(VISUAL.MODE, VISUAL.IMMEDIATE)).lower(),
+        'update': bool(nconfig.get(VISUAL.UPDATE, False)),
+        'workers': int(nconfig.get(VISUAL.WORKERS, VISUAL.DEFAULT_WORKERS)),
+        'options': {
+            'pixel_tolerance': int(nconfig.get(VISUAL.PIXEL_TOLERANCE, VISUAL_DIFF.PIXEL_TOLERANCE)),
+            'max_diff_ratio': float(nconfig.get(VISUAL.MAX_DIFF_RATIO, VISUAL_DIFF.MAX_DIFF_RATIO)),
+            'block_size': int(nconfig.get(VISUAL.BLOCK_SIZE, VISUAL_DIFF.BLOCK_SIZE)),
+            'block_tolerance': float(nconfig.get(VISUAL.BLOCK_TOLERANCE, VISUAL_DIFF.BLOCK_TOLERANCE)),
+            'anti_aliasing': bool(nconfig.get(VISUAL.ANTI_ALIASING, VISUAL_DIFF.ANTI_ALIASING)),
+        }
+    }
+
+
+_CHECKER = None
+
+
+def visual_checker(nconfig: Union[dict, None], report_dir: Union[str, Path] = None) -> VisualChecker:
+    """Returns visual checker of this process"""
+
+    global _CHECKER
+
+    if _CHECKER is None:
+        from nrobo.cli.cli_constants import NREPORT
+        _CHECKER = VisualChecker(visual_settings(nconfig), report_dir or NREPORT.REPORT_DIR)
+
+    return _CHECKER
+
+
+def resolve_visual_checks(nodeid: str) -> [str]:
+    """Failure messages of deferred visual checks of test <nodeid>"""
+    return _CHECKER.resolve(nodeid) if _CHECKER is not None else []
+
+
+def finish_visual_checks(report_dir: Union[str, Path]) -> None:
+    """Finish visual checks of this process and append their results to visual results file of the run"""
+
+    global _CHECKER
+
+    checker, _CHECKER = _CHECKER, None
+    if checker is None:
+        return
+
+    results = checker.finish()
+    if results:
+        Path(report_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(report_dir) / VISUAL.RESULTS_FILE, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+def visual_report(report_dir: Union[str, Path]) -> dict:
+    """Counts of visual check results of the run and its failures. Written to report dir."""
+
+    results_file = Path(report_dir) / VISUAL.RESULTS_FILE
+    if not results_file.exists():
+        return {}
+
+    with open(results_file) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    results_file.unlink()
+
+    report = {"checks": len(results),
+              **{status: sum(1 for r in results if r["status"] == status)
+                 for status in [VISUAL.PASSED, VISUAL.FAILED, VISUAL.NEW, VISUAL.UPDATED]},
+              "failures": [r for r in results if not r["passed"]]}
+
+    with open(Path(report_dir) / VISUAL.REPORT_FILE, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    return report
@@ -0,0 +1,164 @@
+"""
+=====================CAUTION=======================
+DO NOT DELETE THIS FILE SINCE IT IS PART OF NROBO
+FRAMEWORK AND IT MAY CHANGE IN THE FUTURE UPGRADES
+OF NROBO FRAMEWORK. THUS, TO BE ABLE TO SAFELY UPGRADE
+TO LATEST NROBO VERSION, PLEASE DO NOT DELETE THIS
+FILE OR ALTER ITS LOCATION OR ALTER ITS CONTENT!!!
+===================================================
+
+Vectorised image comparison.
+
+Pixels differ when any channel differs more than pixel_tolerance.
+Differences explained by anti-aliasing, i.e. each image's pixel lies
+within the colour range of the other image's 3x3 neighbourhood, are
+ignored. Masked rectangles are ignored. Images are then cut into
+blocks, so a small but dense change fails a block even when it is
+negligible for the image as a whole.
+
+Requires numpy and Pillow.
+
+@author: Panchdev Singh Chauhan
+@email: erpanchdev@gmail.com
+"""
+import io
+from pathlib import Path
+from typing import Union
+
+
+class VISUAL_DIFF:
+    """Defaults of image comparison"""
+
+    PIXEL_TOLERANCE = 16  # per channel, 0-255
+    MAX_DIFF_RATIO = 0.001  # share of differing pixels allowed in whole image
+    BLOCK_SIZE = 32
+    BLOCK_TOLERANCE = 0.05  # share of differing pixels allowed in any block
+    ANTI_ALIASING = True
+
+
+class VisualDiff:
+    """Outcome of comparing two images"""
+
+    def __init__(self, passed: bool, diff_ratio: float = 0.0, diff_pixels: int = 0, failed_blocks: list = None,
+                 reason: str = "", mask=None):
+        self.passed = passed
+        self.diff_ratio = diff_ratio
+        self.diff_pixels = diff_pixels
+        self.failed_blocks = failed_blocks or []  # (x, y, width, height)
+        self.reason = reason
+        self.mask = mask  # boolean array of differing pixels
+
+    def summary(self) -> str:
+        if self.reason:
+            return self.reason
+        return f"{self.diff_pixels} pixels ({self.diff_ratio:.4%}) differ, {len(self.failed_blocks)} blocks failed"
+
+
+def load_image(image: Union[str, Path, bytes]):
+    """Returns RGB image of png bytes or image file as (height, width, 3) uint8 array"""
+
+    import numpy
+    from PIL import Image
+
+    source = io.BytesIO(image) if isinstance(image, (bytes, bytearray)) else image
+    with Image.open(source) as img:
+        return numpy.asarray(img.convert("RGB"))
+
+
+def save_image(array, path: Union[str, Path]) -> None:
+    from PIL import Image
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(array).save(path)
+
+
+def apply_masks(array, masks: [tuple], value: bool = False):
+    """Set rectangles (x, y, width, height) of boolean <array> to <value>"""
+
+    for x, y, width, height in masks or []:
+        array[max(int(y), 0):max(int(y + height), 0), max(int(x), 0):max(int(x + width), 0)] = value
+    return array
+
+
+def neighbourhood_range(image):
+    """Per channel min and max over the 3x3 neighbourhood of every pixel"""
+
+    import numpy
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    padded = numpy.pad(image, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    windows = sliding_window_view(padded, (3, 3), axis=(0, 1))
+    return windows.min(axis=(-2, -1)), windows.max(axis=(-2, -1))
+
+
+def anti_aliased(baseline, actual, tolerance: int):
+    """Pixels where each image lies within the neighbourhood colour range of the other one"""
+
+    low, high = neighbourhood_range(baseline)
+    in_baseline = ((actual >= low.astype("int16") - tolerance) & (actual <= high.astype("int16") + tolerance)).all(-1)
+    low, high = neighbourhood_range(actual)
+    in_actual = ((baseline >= low.astype("int16") - tolerance) & (baseline <= high.astype("int16") + tolerance)).all(-1)
+    return in_baseline & in_actual
+
+
+def failed_blocks(mask, block_size: int, block_tolerance: float) -> [tuple]:
+    """Blocks of <mask> with more differing pixels than <block_tolerance>"""
+
+    import numpy
+
+    height, width = mask.shape
+    rows, columns = -(-height // block_size), -(-width // block_size)
+    padded = numpy.zeros((rows * block_size, columns * block_size), dtype=bool)
+    padded[:height, :width] = mask
+    counts = padded.reshape(rows, block_size, columns, block_size).sum(axis=(1, 3))
+
+    """edge blocks are smaller"""
+    block_heights = numpy.minimum(block_size, height - numpy.arange(rows) * block_size)
+    block_widths = numpy.minimum(block_size, width - numpy.arange(columns) * block_size)
+    areas = numpy.outer(block_heights, block_widths)
+
+    return [(int(column * block_size), int(row * block_size), int(block_widths[column]), int(block_heights[row]))
+            for row, column in zip(*numpy.nonzero(counts > areas * block_tolerance))]
+
+
+def compare_images(baseline, actual, masks: [tuple] = (), pixel_tolerance: int = VISUAL_DIFF.PIXEL_TOLERANCE,
+                   max_diff_ratio: float = VISUAL_DIFF.MAX_DIFF_RATIO, block_size: int = VISUAL_DIFF.BLOCK_SIZE,
+                   block_tolerance: float = VISUAL_DIFF.BLOCK_TOLERANCE,
+                   anti_aliasing: bool = VISUAL_DIFF.ANTI_ALIASING) -> VisualDiff:
+    """Compare (height, width, 3) uint8 arrays <baseline> and <actual>"""
+
+    import numpy
+
+    if baseline.shape != actual.shape:
+        return VisualDiff(False, 1.0, reason=f"Size differs: baseline {baseline.shape[1]}x{baseline.shape[0]}, "
+                                             f"actual {actual.shape[1]}x{actual.shape[0]}")
+
+    baseline16, actual16 = baseline.astype("int16"), actual.astype("int16")
+    mask = (numpy.abs(baseline16 - actual16) > pixel_tolerance).any(axis=-1)
+    apply_masks(mask, masks)
+    if anti_aliasing and mask.any():
+        mask &= ~anti_aliased(baseline16, actual16, pixel_tolerance)
+
+    diff_pixels = int(mask.sum())
+    diff_ratio = diff_pixels / mask.size if mask.size else 0.0
+    blocks = failed_blocks(mask, block_size, block_tolerance) if diff_pixels else []
+
+    return VisualDiff(diff_ratio <= max_diff_ratio and not blocks, diff_ratio, diff_pixels, blocks, mask=mask)
+
+
+def diff_image(baseline, actual, diff: VisualDiff):
+    """Faded grey actual image with differing pixels in red and failed blocks outlined"""
+
+    import numpy
+
+    grey = actual.mean(axis=-1, keepdims=True)
+    image = numpy.repeat(255 - (255 - grey) * 0.3, 3, axis=-1).astype("uint8")
+    if diff.mask is None:
+        return image
+
+    image[diff.mask] = (255, 0, 0)
+    for x, y, width, height in diff.failed_blocks:
+        image[y, x:x + width] = image[y + height - 1, x:x + width] = (255, 128, 0)
+        image[y:y + height, x] = image[y:y + height, x + width - 1] = (255, 128, 0)
+
+    return image